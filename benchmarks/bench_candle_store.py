@@ -0,0 +1,71 @@
+"""
+Benchmark reading candle history from the columnar candle store against ccxt-style lists.
+
+Writes a random walk of 1m candles to a temporary store, then compares
+holding the whole history as Python lists with memory-mapping it, and
+computing the indicators over a window of it from both.
+
+Usage:
+    python benchmarks/bench_candle_store.py [--days 365] [--window 10000]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_bot.indicators.indicators_engine import IndicatorsEngine
+from trading_bot.market_data.candle_store import CandleArray, CandleStore
+
+
+def timed(func):
+    """Run func once. Returns (result, seconds, peak bytes allocated)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the columnar candle store.')
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--window', type=int, default=10_000)
+    args = parser.parse_args()
+
+    count = args.days * 1440
+    rng = np.random.default_rng(42)
+    close = 60000.0 * np.cumprod(1 + rng.normal(0, 0.0005, count))
+    candles = CandleArray(np.arange(count, dtype=np.int64) * 60_000, close * (1 - 0.0002), close * 1.001,
+                          close * 0.999, close, rng.uniform(1, 100, count))
+    root = tempfile.mkdtemp()
+    try:
+        store = CandleStore(root)
+        _, seconds, _ = timed(lambda: store.write("BTC/USDT", "1m", candles))
+        print(f"write {count} candles: {seconds:.2f}s, "
+              f"{sum(os.path.getsize(os.path.join(dirpath, f)) for dirpath, _, files in os.walk(root) for f in files) / 1e6:.1f} MB on disk")
+
+        rows, seconds, peak = timed(candles.tolist)
+        print(f"history as lists:        {seconds:7.3f}s, {peak / 1e6:8.1f} MB allocated")
+        view, seconds, peak = timed(lambda: CandleStore(root).read("BTC/USDT", "1m"))
+        print(f"history memory-mapped:   {seconds:7.3f}s, {peak / 1e6:8.1f} MB allocated")
+
+        engine = IndicatorsEngine()
+        _, seconds, peak = timed(lambda: engine.get_all_indicators(rows[-args.window:]))
+        print(f"indicators from lists:   {seconds:7.3f}s, {peak / 1e6:8.1f} MB allocated")
+        _, seconds, peak = timed(lambda: engine.get_all_indicators(view[-args.window:]))
+        print(f"indicators from views:   {seconds:7.3f}s, {peak / 1e6:8.1f} MB allocated")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark the import time of the bot's entry points.
+
+Runs each import in a fresh interpreter with ``python -X importtime``,
+reports the cumulative time of the imported module, the heaviest modules
+it pulled in and which of the heavy third-party dependencies got loaded.
+With lazy imports and deferred singletons, importing the orchestrator
+should not load any of them; they are only loaded when a cycle uses them.
+
+Usage:
+    python benchmarks/bench_import_time.py [--module trading_bot.orchestrator] [--top 10] [--construct]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+HEAVY_DEPENDENCIES = ("ccxt", "openai", "google.generativeai", "dashscope", "chromadb", "pandas", "ta",
+                      "sqlalchemy", "fastapi")
+
+DEFAULT_MODULES = ("trading_bot.config", "trading_bot.orchestrator", "trading_bot.execution.matching_engine")
+
+PROBE = """
+import sys
+sys.path.insert(0, {root!r})
+{statement}
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print("LOADED:" + ",".join(heavy))
+"""
+
+
+def measure(statement: str, top: int):
+    """Run a statement under -X importtime. Returns (total_us, [(cumulative_us, module)], loaded heavy deps)."""
+    probe = PROBE.format(root=ROOT, statement=statement, heavy=HEAVY_DEPENDENCIES)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", probe],
+                            capture_output=True, text=True, cwd=ROOT)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        rows.append((int(cumulative_us), name, len(line.split("|")[-1]) - len(name)))
+    # Top-level imports (least indented) add up to the total.
+    indent = min((depth for _, _, depth in rows), default=0)
+    total = sum(cumulative for cumulative, _, depth in rows if depth == indent)
+    heaviest = sorted(((cumulative, name) for cumulative, name, _ in rows), reverse=True)[:top]
+    loaded = next((line[len("LOADED:"):] for line in result.stdout.splitlines() if line.startswith("LOADED:")), "")
+    return total, heaviest, [name for name in loaded.split(",") if name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark import time.')
+    parser.add_argument('--module', action='append', help='A module to import (repeatable).')
+    parser.add_argument('--top', type=int, default=10, help='The number of heaviest modules to list.')
+    parser.add_argument('--construct', action='store_true',
+                        help='Also time constructing a backtesting Orchestrator, i.e. loading what a cycle uses.')
+    args = parser.parse_args()
+
+    statements = [f"import {module}" for module in (args.module or DEFAULT_MODULES)]
+    if args.construct:
+        statements.append("from trading_bot.orchestrator import Orchestrator; Orchestrator(backtesting=True)")
+
+    for statement in statements:
+        total, heaviest, loaded = measure(statement, args.top)
+        print(f"{statement}: {total / 1000:.1f} ms")
+        print(f"  heavy dependencies loaded: {', '.join(loaded) or 'none'}")
+        for cumulative, name in heaviest:
+            print(f"  {cumulative / 1000:9.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark LLM debates end to end against the local stub LLM server.
+
+Points the three debate roles at a stub server (see trading_bot.llm_stub)
+and decides a series of contexts, synthetic or journaled, with each
+engine mode ("llm" debates every decision, "rules" pre-filters them)
+under each stub profile: a clean one, and a faulty one with injected
+errors, malformed and invalid replies and no json_schema support.
+Reports the debate wall time, the LLM calls and tokens, and the share of
+replies and decisions that could not be parsed.
+
+Usage:
+    python benchmarks/bench_llm_debate.py [--decisions 20] [--latency 0.05] [--modes llm,rules]
+        [--profiles clean,faulty] [--journal ./cycle_journal]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_bot.config import config
+from trading_bot.decision_engine.llm_decision_engine import LLMDecisionEngine
+from trading_bot.decision_engine.rule_based_decision_engine import RuleBasedDecisionEngine
+from trading_bot.llm_stub.server import StubServer
+from trading_bot.metrics.registry import metrics
+
+PROVIDERS = ("openai", "gemini", "qwen")
+PROFILES = {
+    "clean": {},
+    "faulty": {"error_rate": 0.05, "malformed_rate": 0.1, "invalid_rate": 0.05, "json_schema": False},
+}
+
+
+def synthetic_contexts(count: int, seed: int = 7):
+    """Contexts with random indicators, most of them quiet."""
+    rng = np.random.default_rng(seed)
+    contexts = []
+    for _ in range(count):
+        price = float(rng.uniform(20000, 80000))
+        timeframe = lambda: {"rsi": float(rng.normal(50, 12)), "ema": price * float(rng.normal(1, 0.01)),
+                             "atr": price * float(rng.uniform(0.002, 0.035)),
+                             "macd": {"macd": 0.0, "signal": 0.0, "hist": float(rng.normal(0, 1))}}
+        contexts.append({"symbol": "BTC/USDT", "ticker": {"last": price},
+                         "indicators": {"1h": timeframe(), "4h": timeframe(), "1d": timeframe()}, "news": []})
+    return contexts
+
+
+def journal_contexts(path: str, count: int):
+    """The contexts of the first journaled decisions."""
+    from trading_bot.journal.cycle_journal import CycleJournal
+    journal = CycleJournal(path)
+    try:
+        return [record["context"] for record in journal.records(0, count)]
+    finally:
+        journal.close()
+
+
+def counter(name: str) -> float:
+    """The total of a counter over the debate providers."""
+    if name == "llm_tokens_total":
+        return sum(metrics.get(name, provider=p, kind=k) or 0 for p in PROVIDERS for k in ("prompt", "completion"))
+    return sum(metrics.get(name, provider=p) or 0 for p in PROVIDERS)
+
+
+def run(engine, llm_engine, contexts):
+    """Decide every context. Returns the wall times, parsed replies and failed replies and decisions."""
+    walls, replies, failed_replies, failed_decisions = [], 0, 0, 0
+    for context in contexts:
+        with contextlib.redirect_stdout(io.StringIO()):  # The engine prints its debug output.
+            start = time.perf_counter()
+            decision = engine.decide(context)
+            walls.append(time.perf_counter() - start)
+            transcript = engine.last_transcript or []
+            for message in transcript:
+                if message.get("role") == "assistant" and message.get("name") != "Rules":
+                    replies += 1
+                    failed_replies += llm_engine._parse_final_decision([message]).reason.startswith("Failed to parse")
+        failed_decisions += decision.reason.startswith("Failed to parse")
+    return walls, replies, failed_replies, failed_decisions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark LLM debates against the stub LLM server.')
+    parser.add_argument('--decisions', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.05, help='The median reply latency in seconds.')
+    parser.add_argument('--modes', default='llm,rules')
+    parser.add_argument('--profiles', default='clean,faulty')
+    parser.add_argument('--journal', help='Decide the contexts of a cycle journal instead of synthetic ones.')
+    args = parser.parse_args()
+
+    contexts = journal_contexts(args.journal, args.decisions) if args.journal else synthetic_contexts(args.decisions)
+    print(f"{len(contexts)} decisions per run, median reply latency {args.latency * 1000:.0f}ms")
+    print(f"{'profile':8} {'mode':6} {'wall p50':>9} {'wall p95':>9} {'total':>8} {'calls':>6} {'tokens':>8} "
+          f"{'errors':>7} {'bad replies':>12} {'bad decisions':>14}")
+    for profile_name in args.profiles.split(','):
+        profile = {"latency": {"distribution": "lognormal", "median": args.latency, "sigma": 0.5},
+                   **PROFILES[profile_name]}
+        for mode in args.modes.split(','):
+            with StubServer(profile) as server:
+                config.config["llm_provider"] = "native_llms"
+                config.config["native_llms"] = {provider: {"api_key": "stub", "model_name": f"stub-{provider}",
+                                                           "endpoint": server.base_url} for provider in PROVIDERS}
+                with contextlib.redirect_stdout(io.StringIO()):
+                    llm_engine = LLMDecisionEngine()
+                engine = RuleBasedDecisionEngine(llm_engine) if mode == "rules" else llm_engine
+
+                calls, tokens = counter("llm_request_seconds"), counter("llm_tokens_total")
+                walls, replies, failed_replies, failed_decisions = run(engine, llm_engine, contexts)
+                calls, tokens = counter("llm_request_seconds") - calls, counter("llm_tokens_total") - tokens
+                walls = np.array(walls)
+                print(f"{profile_name:8} {mode:6} {np.percentile(walls, 50) * 1000:7.1f}ms "
+                      f"{np.percentile(walls, 95) * 1000:7.1f}ms {walls.sum():7.2f}s {int(calls):6d} "
+                      f"{int(tokens):8d} {server.stub.stats['errors']:7d} "
+                      f"{failed_replies / replies if replies else 0:12.1%} {failed_decisions / len(walls):14.1%}")
+
+
+if __name__ == "__main__":
+    main()
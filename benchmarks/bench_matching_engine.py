@@ -0,0 +1,66 @@
+"""
+Benchmark the simulated matching engine used for backtesting.
+
+Replays a random walk of quotes and submits a mix of market orders, resting
+limit orders and stop-loss orders, reporting the sustained order rate.
+
+Usage:
+    python benchmarks/bench_matching_engine.py [--orders 500000] [--orders-per-update 10]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_bot.execution.matching_engine import SimulatedMatchingEngine
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the simulated matching engine.')
+    parser.add_argument('--orders', type=int, default=500_000)
+    parser.add_argument('--orders-per-update', type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    symbol = "BTC/USDT"
+    # Draw the order flow up front, so only the engine is timed.
+    flow = []
+    for _ in range(args.orders):
+        side = "buy" if rng.random() < 0.5 else "sell"
+        flow.append((side, rng.random(), rng.uniform(-0.002, 0.002), rng.uniform(0.001, 0.5)))
+    moves = [1 + rng.gauss(0, 0.0005) for _ in range(args.orders // args.orders_per_update + 1)]
+
+    engine = SimulatedMatchingEngine(on_fill=lambda order, amount, cost, fee: None)
+    mid, timestamp = 60000.0, 0
+    fills = 0
+
+    start = time.perf_counter()
+    for i, (side, kind, offset, amount) in enumerate(flow):
+        if i % args.orders_per_update == 0:
+            mid *= moves[i // args.orders_per_update]
+            timestamp += 1000
+            fills += len(engine.update_market(symbol, mid * 0.9999, mid * 1.0001, timestamp))
+
+        if kind < 0.6:
+            engine.submit(symbol, side, "market", amount)
+        elif kind < 0.9:
+            price = mid * (1 - offset) if side == "buy" else mid * (1 + offset)
+            engine.submit(symbol, side, "limit", amount, price)
+        else:
+            trigger = mid * (0.995 if side == "sell" else 1.005)
+            engine.submit(symbol, side, "market", amount, params={"stopLossPrice": trigger})
+    elapsed = time.perf_counter() - start
+
+    statuses = {}
+    for order in engine.orders.values():
+        statuses[order["status"]] = statuses.get(order["status"], 0) + 1
+    print(f"Processed {args.orders} orders and {args.orders // args.orders_per_update} market updates "
+          f"in {elapsed:.2f}s: {args.orders / elapsed:,.0f} orders/s")
+    print(f"Final order statuses: {statuses}")
+
+
+if __name__ == "__main__":
+    main()
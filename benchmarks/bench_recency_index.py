@@ -0,0 +1,71 @@
+"""
+Benchmark latest-news retrieval over a large news history.
+
+Compares the SQLite recency index used by ChromaDBService.get_latest_news
+against the previous approach of loading every article's metadata and
+sorting it in Python.
+
+Usage:
+    python benchmarks/bench_recency_index.py [--articles 100000] [--k 5]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_bot.persistence.sqlite_persistence import SQLitePersistence
+
+
+def _timeit(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark latest-news retrieval.')
+    parser.add_argument('--articles', type=int, default=100_000)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    now = int(time.time())
+    entries = [{
+        "fingerprint": f"{i:040x}",
+        "title": f"Synthetic headline {i}",
+        "summary": "Synthetic summary. " * 5,
+        "source": "Benchmark",
+        "published_at": now - random.randint(0, 3 * 365 * 86400),
+    } for i in range(args.articles)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        persistence = SQLitePersistence(os.path.join(tmp_dir, 'bench.db'))
+        start = time.perf_counter()
+        for i in range(0, len(entries), 10_000):
+            persistence.save_news_index_entries(entries[i:i + 10_000])
+        print(f"Inserted {args.articles} index entries in {time.perf_counter() - start:.2f}s")
+
+        indexed = _timeit(lambda: persistence.get_latest_news_entries(args.k), args.repeat)
+        # The previous implementation: every metadata dict loaded, then sorted.
+        full_scan = _timeit(
+            lambda: sorted(
+                [dict(entry) for entry in entries],
+                key=lambda meta: meta.get('published_at', 0),
+                reverse=True
+            )[:args.k],
+            max(1, args.repeat // 10)
+        )
+        persistence.engine.dispose()
+
+    print(f"Recency index top-{args.k}: {indexed * 1e3:.3f} ms")
+    print(f"Full scan + sort top-{args.k}: {full_scan * 1e3:.3f} ms (lower bound, excludes Chroma I/O)")
+    print(f"Speed-up: {full_scan / indexed:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
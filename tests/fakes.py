@@ -0,0 +1,176 @@
+"""Lightweight stand-ins for external services used across the test suite."""
+
+import threading
+import time
+import zlib
+
+import numpy as np
+
+
+class HashEmbeddingFunction:
+    """
+    Deterministic stand-in for the ONNX embedding model.
+
+    Embeds text as a hashed bag of words, so texts sharing words have a
+    higher cosine similarity, without downloading a model.
+    """
+
+    dimensions = 64
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, input):
+        self.calls += 1
+        embeddings = []
+        for text in input:
+            vector = np.full(self.dimensions, 1e-3, dtype=np.float32)
+            for token in text.lower().split():
+                vector[zlib.crc32(token.encode("utf-8")) % self.dimensions] += 1.0
+            embeddings.append(vector / np.linalg.norm(vector))
+        return embeddings
+
+    @staticmethod
+    def name():
+        return "default"
+
+    def get_config(self):
+        return {}
+
+    def default_space(self):
+        return "cosine"
+
+    def supported_spaces(self):
+        return ["cosine", "l2", "ip"]
+
+    @staticmethod
+    def build_from_config(config):
+        return HashEmbeddingFunction()
+
+    def is_legacy(self):
+        return False
+
+
+class FakeExchange:
+    """
+    Local stand-in for an exchange that fills orders with a delay and in parts.
+
+    A new order stays open for ``fill_delay`` seconds, then each subsequent
+    fetch_order fills another ``1 / fill_steps`` of it until it is closed.
+    """
+
+    def __init__(self, price: float = 50000.0, fill_delay: float = 0.05, fill_steps: int = 3):
+        self.price = price
+        self.fill_delay = fill_delay
+        self.fill_steps = fill_steps
+        self.orders = {}
+        self.fetch_calls = 0
+        self._next_id = 0
+
+    def create_order(self, symbol, side, order_type, amount, price=None, params=None):
+        self._next_id += 1
+        order = {
+            "id": str(self._next_id),
+            "symbol": symbol,
+            "type": order_type,
+            "side": side,
+            "amount": amount,
+            "price": price or self.price,
+            "average": None,
+            "filled": 0.0,
+            "remaining": amount,
+            "status": "open",
+            "timestamp": int(time.time() * 1000),
+        }
+        self.orders[order["id"]] = {"order": order, "created": time.monotonic()}
+        return dict(order)
+
+    def fetch_order(self, order_id, symbol=None):
+        self.fetch_calls += 1
+        entry = self.orders[order_id]
+        order = entry["order"]
+        if order["status"] == "open" and time.monotonic() - entry["created"] >= self.fill_delay:
+            step = order["amount"] / self.fill_steps
+            order["filled"] = min(order["amount"], order["filled"] + step)
+            order["remaining"] = order["amount"] - order["filled"]
+            order["average"] = self.price
+            if order["remaining"] <= 1e-12:
+                order["status"] = "closed"
+        return dict(order)
+
+    def cancel_order(self, order_id, symbol=None):
+        self.orders[order_id]["order"]["status"] = "canceled"
+        return True
+
+
+class FakeOHLCVExchange:
+    """
+    Stand-in for an exchange serving synthetic OHLCV history, paged like Binance.
+
+    Candles exist every timeframe from ``listed_at`` to ``now``; fetch_ohlcv
+    returns up to ``limit`` of them from ``since``. Candles in ``drop_once``
+    are left out of the first page that would contain them, like an
+    exchange returning an incomplete page, there are none in the
+    ``halted`` (start, end) span, like a trading halt, and every
+    ``fail_every``-th request raises a network error.
+    """
+
+    rateLimit = 50
+
+    def __init__(self, listed_at=0, now=None, step_ms=3600 * 1000, max_limit=1000, drop_once=(), fail_every=0,
+                 halted=None):
+        self.listed_at = listed_at
+        self.now = now if now is not None else listed_at + 5000 * step_ms
+        self.step_ms = step_ms
+        self.max_limit = max_limit
+        self.drop_once = set(drop_once)
+        self.fail_every = fail_every
+        self.halted = halted
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def candle(self, timestamp):
+        base = 100.0 + (timestamp - self.listed_at) / self.step_ms
+        return [timestamp, base, base + 2, base - 2, base + 1, 10.0]
+
+    def fetch_ohlcv(self, symbol, timeframe="1h", since=None, limit=None):
+        import ccxt
+        with self.lock:
+            self.calls.append((symbol, timeframe, since, limit))
+            if self.fail_every and len(self.calls) % self.fail_every == 0:
+                raise ccxt.NetworkError("connection reset")
+            limit = min(limit or 500, self.max_limit)
+            start = max(self.listed_at, since or self.listed_at)
+            start = -(-(start - self.listed_at) // self.step_ms) * self.step_ms + self.listed_at
+            page = []
+            for timestamp in range(start, min(self.now, start + limit * self.step_ms), self.step_ms):
+                if timestamp in self.drop_once:
+                    self.drop_once.discard(timestamp)
+                    continue
+                if self.halted and self.halted[0] <= timestamp < self.halted[1]:
+                    continue
+                page.append(self.candle(timestamp))
+            return page
+
+
+def use_temp_stores(path):
+    """
+    Point the shared SQLite, ChromaDB and candle store services at fresh stores under a temporary directory,
+    so tests driving the orchestrator leave the runtime databases alone. Undo with services.reset().
+
+    Returns:
+        The SQLitePersistence, to dispose of once the test is done.
+    """
+    import os
+    from trading_bot.market_data.candle_store import CandleStore
+    from trading_bot.persistence.sqlite_persistence import SQLitePersistence
+    from trading_bot.rag_store.chromadb_service import ChromaDBService
+    from trading_bot.services import services
+
+    services.reset()
+    persistence = SQLitePersistence(os.path.join(path, "test.db"))
+    services.override("persistence", persistence)
+    services.override("chroma_db_service", ChromaDBService(os.path.join(path, "chroma"), persistence=persistence,
+                                                           embedding_function=HashEmbeddingFunction()))
+    services.override("candle_store", CandleStore(os.path.join(path, "candles")))
+    return persistence
@@ -0,0 +1,95 @@
+import unittest
+import os
+import sys
+import time
+
+# Add the parent directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_bot.execution.balance_cache import BalanceCache
+
+class TestBalanceCache(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.fetches = 0
+        self.exchange_balance = {"free": {"USDT": 1000.0, "BTC": 0.0}, "used": {}, "total": {"USDT": 1000.0, "BTC": 0.0}}
+        self.cache = BalanceCache(self.fetch, ttl_seconds=60, clock=lambda: self.now, wall_clock=lambda: self.now)
+
+    def fetch(self):
+        self.fetches += 1
+        return self.exchange_balance
+
+    def test_reads_are_served_from_memory(self):
+        for _ in range(10):
+            self.assertEqual(self.cache.get()["free"]["USDT"], 1000.0)
+        self.assertEqual(self.fetches, 1)
+
+    def test_stale_read_refreshes_in_background(self):
+        self.cache.get()
+        self.now = 61.0
+        self.assertEqual(self.cache.get()["free"]["USDT"], 1000.0)
+        deadline = time.monotonic() + 2
+        while self.cache.stats["refreshes"] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.fetches, 2)
+        self.assertEqual(self.cache.refreshed_at, 61.0)
+
+    def test_fills_are_applied_once(self):
+        self.cache.get()
+        order = {"id": "1", "symbol": "BTC/USDT", "side": "buy", "average": 50000.0, "status": "open", "filled": 0.01}
+        self.cache.apply_fill(order)
+        self.cache.apply_fill(order)
+        self.cache.apply_fill({**order, "status": "closed", "filled": 0.015})
+        self.cache.apply_fill({**order, "status": "closed", "filled": 0.015})
+
+        balance = self.cache.get()
+        self.assertAlmostEqual(balance["free"]["BTC"], 0.015)
+        self.assertAlmostEqual(balance["free"]["USDT"], 250.0)
+        self.assertEqual(self.fetches, 1)
+
+    def test_snapshots_only_cover_older_fills(self):
+        self.cache.get()
+        order = {"id": "1", "symbol": "BTC/USDT", "side": "buy", "average": 50000.0, "status": "closed",
+                 "filled": 0.01, "lastTradeTimestamp": 10_000}
+        self.cache.apply_fill(order)
+        # A snapshot taken before the fill misses it: the fill is replayed on top.
+        self.exchange_balance = {**self.exchange_balance, "timestamp": 5_000}
+        self.now = 20.0
+        self.cache.refresh()
+        self.assertAlmostEqual(self.cache.get()["free"]["BTC"], 0.01)
+
+        # A later snapshot includes it, and a late report of the same fill is not applied again.
+        self.exchange_balance = {"free": {"USDT": 500.0, "BTC": 0.01}, "used": {},
+                                 "total": {"USDT": 500.0, "BTC": 0.01}, "timestamp": 15_000}
+        self.cache.refresh()
+        self.assertEqual(self.cache._applied_fills, {})
+        self.cache.apply_fill(order)
+        self.assertAlmostEqual(self.cache.get()["free"]["BTC"], 0.01)
+
+    def test_resting_orders_lock_funds(self):
+        self.cache.get()
+        self.now = 1.0
+        order = {"id": "1", "symbol": "BTC/USDT", "side": "buy", "price": 40000.0, "amount": 0.02,
+                 "filled": 0.0, "remaining": 0.02, "status": "open"}
+        self.cache.reserve_order(order)
+        balance = self.cache.get()
+        self.assertAlmostEqual(balance["free"]["USDT"], 200.0)
+        self.assertAlmostEqual(balance["used"]["USDT"], 800.0)
+
+        self.cache.apply_fill({**order, "filled": 0.01, "remaining": 0.01, "average": 40000.0})
+        self.cache.apply_fill({**order, "filled": 0.01, "remaining": 0.01, "average": 40000.0, "status": "canceled"})
+        balance = self.cache.get()
+        self.assertAlmostEqual(balance["used"]["USDT"], 0.0)
+        self.assertAlmostEqual(balance["free"]["USDT"], 600.0)
+        self.assertAlmostEqual(balance["total"]["USDT"], 600.0)
+        self.assertAlmostEqual(balance["free"]["BTC"], 0.01)
+
+    def test_pushed_update_replaces_currencies(self):
+        self.cache.get()
+        self.cache.apply_balance_update({"free": {"USDT": 900.0}, "total": {"USDT": 950.0}})
+        balance = self.cache.get()
+        self.assertEqual(balance["free"], {"USDT": 900.0, "BTC": 0.0})
+        self.assertEqual(balance["total"]["USDT"], 950.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+# Add the parent directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_bot.indicators.indicators_engine import IndicatorsEngine
+from trading_bot.market_data.candle_store import CandleArray, CandleStore
+from trading_bot.market_data.market_data_manager import MarketDataManager
+from trading_bot.market_data.market_data_simulator import MarketDataSimulator
+
+HOUR_MS = 3600 * 1000
+
+def make_candles(start, count, step=HOUR_MS, base=100.0):
+    return [[start + i * step, base + i, base + i + 2, base + i - 2, base + i + 1, 10.0 + i] for i in range(count)]
+
+class TestCandleStore(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = CandleStore(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_reads_are_memory_mapped_views(self):
+        self.assertEqual(self.store.write("BTC/USDT", "1h", make_candles(0, 100)), 100)
+        self.assertEqual(self.store.write("BTC/USDT", "1h", make_candles(100 * HOUR_MS, 20)), 20)
+
+        candles = self.store.read("BTC/USDT", "1h", start=10 * HOUR_MS, end=19 * HOUR_MS)
+        self.assertEqual(len(candles), 10)
+        self.assertIsInstance(candles.close.base, np.memmap)
+        self.assertEqual(candles[0], [10 * HOUR_MS, 110.0, 112.0, 108.0, 111.0, 20.0])
+        self.assertEqual(self.store.read("BTC/USDT", "1h", limit=3).timestamp.tolist(),
+                         [117 * HOUR_MS, 118 * HOUR_MS, 119 * HOUR_MS])
+        self.assertEqual(self.store.info("BTC/USDT", "1h"), {"first": 0, "last": 119 * HOUR_MS, "count": 120})
+        self.assertEqual(self.store.symbols(), ["BTC/USDT"])
+        self.assertEqual(self.store.timeframes("BTC/USDT"), ["1h"])
+
+    def test_merges_overlapping_and_older_candles(self):
+        self.store.write("ETH/USDT", "1h", make_candles(10 * HOUR_MS, 10))
+        # Fill the history before the series and overwrite its first candle.
+        self.assertEqual(self.store.write("ETH/USDT", "1h", make_candles(0, 11, base=50.0)), 10)
+        candles = self.store.read("ETH/USDT", "1h")
+        self.assertEqual(candles.timestamp.tolist(), [i * HOUR_MS for i in range(20)])
+        self.assertEqual(candles[10][4], 61.0)
+        self.assertEqual(candles[11][4], 102.0)
+
+    def test_merge_swaps_in_all_columns_at_once(self):
+        self.store.write("ETH/USDT", "1h", make_candles(10 * HOUR_MS, 10))
+        series_dir = os.path.join(self.root, "ETH-USDT", "1h")
+        # A merge that crashed before its pointer swap leaves a partial generation that is never read.
+        os.makedirs(os.path.join(series_dir, "g000001"))
+        with open(os.path.join(series_dir, "g000001", "timestamp.bin"), "wb") as f:
+            np.array([0], dtype="<i8").tofile(f)
+        self.assertEqual(len(self.store.read("ETH/USDT", "1h")), 10)
+
+        self.store.write("ETH/USDT", "1h", make_candles(0, 5))
+        self.assertEqual(sorted(os.listdir(series_dir)), ["CURRENT", "g000001"])
+        self.assertEqual(len(self.store.read("ETH/USDT", "1h")), 15)
+        self.store.write("ETH/USDT", "1h", make_candles(5 * HOUR_MS, 5, base=0.0))
+        self.assertEqual(sorted(os.listdir(series_dir)), ["CURRENT", "g000002"])
+        self.assertEqual(self.store.read("ETH/USDT", "1h")[5][4], 1.0)
+
+    def test_interrupted_append_is_ignored_and_repaired(self):
+        self.store.write("BTC/USDT", "1h", make_candles(0, 5))
+        with open(os.path.join(self.root, "BTC-USDT", "1h", "timestamp.bin"), "ab") as f:
+            np.array([5 * HOUR_MS], dtype="<i8").tofile(f)
+        self.assertEqual(len(self.store.read("BTC/USDT", "1h")), 5)
+        self.store.write("BTC/USDT", "1h", make_candles(5 * HOUR_MS, 2))
+        self.assertEqual(self.store.read("BTC/USDT", "1h").timestamp.tolist(), [i * HOUR_MS for i in range(7)])
+
+    def test_indicators_accept_stored_columns(self):
+        rows = make_candles(0, 60)
+        self.store.write("BTC/USDT", "1h", rows)
+        engine = IndicatorsEngine()
+        self.assertEqual(engine.get_all_indicators(self.store.read("BTC/USDT", "1h")), engine.get_all_indicators(rows))
+
+    def test_simulator_replays_history_without_lookahead(self):
+        self.store.write("BTC/USDT", "1h", make_candles(0, 48))
+        simulator = MarketDataSimulator("BTC/USDT", candle_store=self.store)
+        simulator.set_time(10 * HOUR_MS)
+
+        candles = simulator.get_latest_candles("1h", limit=5)
+        self.assertIsInstance(candles, CandleArray)
+        # The candle opened at 10h is still forming at 10h, so the last closed one opened at 9h.
+        self.assertEqual(candles.timestamp.tolist(), [5 * HOUR_MS, 6 * HOUR_MS, 7 * HOUR_MS, 8 * HOUR_MS, 9 * HOUR_MS])
+        quote = simulator.get_current_quote()
+        self.assertEqual(quote["last"], 110.0)
+        self.assertEqual(quote["timestamp"], 10 * HOUR_MS)
+        # Timeframes without history are still generated.
+        self.assertIsInstance(simulator.get_latest_candles("4h", limit=5), list)
+
+        # A backtest moves the replay of every symbol, including the simulators created afterwards.
+        manager = MarketDataManager(backtesting=True)
+        manager.candle_store = self.store
+        manager.set_time(20 * HOUR_MS)
+        self.assertEqual(manager.get_current_quote("BTC/USDT")["timestamp"], 20 * HOUR_MS)
+        manager.set_time(30 * HOUR_MS)
+        self.assertEqual(manager.get_current_quote("BTC/USDT")["timestamp"], 30 * HOUR_MS)
+
+if __name__ == '__main__':
+    unittest.main()
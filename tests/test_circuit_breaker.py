@@ -0,0 +1,107 @@
+import unittest
+import os
+import sys
+import time
+from unittest.mock import patch
+
+# Add the parent directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_bot.decision_engine.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from trading_bot.decision_engine.llm_decision_engine import LLMDecisionEngine
+from trading_bot.llm_stub.server import StubServer
+from trading_bot.metrics.registry import metrics
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_on_failures_and_recovers_through_a_probe(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker("test", failure_threshold=2, recovery_seconds=60, clock=clock)
+        breaker.record(1.0, False)
+        self.assertEqual(breaker.state, CLOSED)
+        breaker.record(1.0, False)
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow())
+
+        clock.now = 60
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertFalse(breaker.allow())  # Only one probe at a time.
+        breaker.record(1.0, False)
+        self.assertEqual(breaker.state, OPEN)
+
+        clock.now = 120
+        self.assertTrue(breaker.allow())
+        breaker.record(1.0, True)
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertTrue(breaker.allow())
+
+    def test_slow_providers_lose_health(self):
+        breaker = CircuitBreaker("test", latency_budget=2.0, min_health=0.3, min_calls=5, clock=FakeClock())
+        for _ in range(4):
+            breaker.record(1.0, True)
+        self.assertEqual(breaker.health, 1.0)
+        for _ in range(6):
+            breaker.record(20.0, True)
+        self.assertLess(breaker.health, 0.3)
+        self.assertEqual(breaker.state, OPEN)
+        self.assertAlmostEqual(breaker.p95(), 20.0)
+
+class TestResilientDebate(unittest.TestCase):
+    def debate(self, server, resilience, fallback_model_name=None):
+        with patch('trading_bot.decision_engine.llm_decision_engine.config') as mock_config:
+            mock_config.get_llm_provider.return_value = "native_llms"
+            mock_config.get_llm_resilience_config.return_value = resilience
+            mock_config.get_llm_config.return_value = {
+                provider: {"api_key": "stub", "model_name": f"stub-{provider}", "endpoint": server.base_url,
+                           "fallback_model_name": fallback_model_name}
+                for provider in ("openai", "gemini", "qwen")
+            }
+            engine = LLMDecisionEngine()
+            start = time.monotonic()
+            decision = engine.decide({"symbol": "BTC/USDT", "ticker": {"last": 50000.0}, "indicators": {}})
+            return engine, decision, time.monotonic() - start
+
+    def test_open_breaker_skips_the_participant(self):
+        skipped = metrics.get("llm_participants_skipped_total", provider="gemini") or 0
+        with StubServer({"models": {"stub-gemini": {"error_rate": 1.0, "error_status": 500}}}) as server:
+            engine, decision, _ = self.debate(server, {"max_retries": 0, "failure_threshold": 1})
+        names = [message.get("name") for message in engine.last_transcript[2:]]
+        self.assertEqual(names.count("Gemini"), 1)
+        self.assertEqual(names.count("OpenAI"), 3)
+        self.assertEqual(engine.breakers["gemini"].state, OPEN)
+        self.assertEqual(metrics.get("llm_participants_skipped_total", provider="gemini"), skipped + 1)
+        self.assertFalse(decision.reason.startswith("Failed to parse"))
+
+    def test_unconfigured_provider_counts_as_failing(self):
+        with StubServer() as server, \
+                patch('trading_bot.decision_engine.llm_decision_engine.config') as mock_config:
+            mock_config.get_llm_provider.return_value = "native_llms"
+            mock_config.get_llm_resilience_config.return_value = {"failure_threshold": 1}
+            mock_config.get_llm_config.return_value = {
+                "openai": {"api_key": "stub", "model_name": "stub-openai", "endpoint": server.base_url}}
+            engine = LLMDecisionEngine()
+            engine.decide({"symbol": "BTC/USDT", "ticker": {"last": 50000.0}, "indicators": {}})
+        self.assertEqual(engine.breakers["gemini"].state, OPEN)
+        self.assertEqual(engine.breakers["openai"].state, CLOSED)
+
+    def test_slow_requests_are_hedged_to_the_fallback_model(self):
+        wins = metrics.get("llm_hedge_wins_total", provider="openai") or 0
+        profile = {"models": {provider: {"latency": {"distribution": "constant", "value": 1.0}}
+                              for provider in ("stub-openai", "stub-gemini", "stub-qwen")}}
+        with StubServer(profile) as server:
+            engine, decision, seconds = self.debate(
+                server, {"request_timeout": 2, "max_retries": 0, "hedge": True, "hedge_after": 0.1},
+                fallback_model_name="stub-fast")
+        self.assertLess(seconds, 9 * 0.5)
+        self.assertEqual(metrics.get("llm_hedge_wins_total", provider="openai"), wins + 3)
+        self.assertFalse(decision.reason.startswith("Failed to parse"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+# Add the parent directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_bot.journal.cycle_journal import CycleJournal
+from trading_bot.journal.replay import replay
+from trading_bot.models import Decision
+
+class EchoEngine:
+    """Decides to buy whenever the RSI in the context is under 30."""
+
+    def decide(self, context):
+        action = "BUY" if context["indicators"]["1h"]["rsi"] < 30 else "HOLD"
+        return Decision(action=action, symbol=context["symbol"], size=0.0)
+
+class TestCycleJournal(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def _record(self, symbol, rsi, action):
+        return {
+            "symbol": symbol,
+            "context": {"symbol": symbol, "candles": {"1h": [[1, 2.0, 3.0, 1.0, 2.5, 10.0]]},
+                        "indicators": {"1h": {"rsi": np.float64(rsi)}}, "news": []},
+            "transcript": [{"role": "assistant", "name": "OpenAI", "content": f"{action}!"}],
+            "decision": Decision(action=action, symbol=symbol, size=0.1),
+        }
+
+    def test_append_and_random_access(self):
+        journal = CycleJournal(self.path)
+        for i in range(50):
+            self.assertEqual(journal.append(self._record("BTC/USDT", float(i), "HOLD")), i)
+        self.assertEqual(len(journal), 50)
+        self.assertEqual(journal.read(7)["context"]["indicators"]["1h"]["rsi"], 7.0)
+        self.assertEqual(journal[-1]["decision"]["action"], "HOLD")
+        self.assertEqual(journal.read(3)["transcript"][0]["name"], "OpenAI")
+        # Records appended after a read are visible to the next one.
+        journal.append(self._record("ETH/USDT", 1.0, "BUY"))
+        self.assertEqual(journal[-1]["symbol"], "ETH/USDT")
+        with self.assertRaises(IndexError):
+            journal.read(51)
+        journal.sync()
+        journal.close()
+
+        reopened = CycleJournal(self.path)
+        self.assertEqual(len(reopened), 51)
+        self.assertEqual([r["context"]["indicators"]["1h"]["rsi"] for r in reopened.records(10, 13)], [10.0, 11.0, 12.0])
+        reopened.close()
+
+    def test_recovers_from_torn_write(self):
+        journal = CycleJournal(self.path)
+        journal.append(self._record("BTC/USDT", 10.0, "BUY"))
+        journal.append(self._record("BTC/USDT", 20.0, "BUY"))
+        journal.close()
+        # A crash after writing a record but before indexing it, then part of another record.
+        with open(os.path.join(self.path, "cycles.idx"), "r+b") as index:
+            index.truncate(8)
+        with open(os.path.join(self.path, "cycles.journal"), "ab") as data:
+            data.write(b"\x40\x00\x00\x00partial")
+
+        journal = CycleJournal(self.path)
+        self.assertEqual(len(journal), 2)
+        self.assertEqual(journal[1]["context"]["indicators"]["1h"]["rsi"], 20.0)
+        journal.append(self._record("BTC/USDT", 30.0, "HOLD"))
+        self.assertEqual(journal[2]["decision"]["action"], "HOLD")
+        journal.close()
+
+    def test_replay_through_alternative_engine(self):
+        journal = CycleJournal(self.path)
+        journal.append(self._record("BTC/USDT", 25.0, "BUY"))
+        journal.append(self._record("ETH/USDT", 25.0, "BUY"))
+        journal.append(self._record("BTC/USDT", 60.0, "BUY"))
+
+        results = replay(journal, EchoEngine(), symbol="BTC/USDT")
+        journal.close()
+        self.assertEqual([r["position"] for r in results], [0, 2])
+        self.assertEqual([r["replayed"]["action"] for r in results], ["BUY", "HOLD"])
+        self.assertEqual([r["match"] for r in results], [True, False])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -18,6 +18,7 @@ class TestLLMDecisionEngine(unittest.TestCase):
         self.config_patcher = patch('trading_bot.decision_engine.llm_decision_engine.config')
         self.mock_config = self.config_patcher.start()
         self.mock_config.get_llm_provider.return_value = 'native'
+        self.mock_config.get_llm_resilience_config.return_value = {}
         self.mock_config.get_llm_config.return_value = {
             'openai': {'api_key': 'dummy', 'model_name': 'gpt-4'},
             'gemini': {'api_key': 'dummy', 'model_name': 'gemini-pro'},
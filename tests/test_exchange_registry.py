@@ -0,0 +1,83 @@
+import unittest
+import os
+import sys
+import tempfile
+import threading
+
+# Add the parent directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_bot.exchange import ExchangeRegistry, RateLimiter
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+class TestRateLimiter(unittest.TestCase):
+    def test_burst_then_sustained_rate(self):
+        clock = FakeClock()
+        limiter = RateLimiter(rate_per_second=10, burst=5, clock=clock, sleep=clock.sleep)
+        waits = [limiter.acquire() for _ in range(7)]
+        self.assertEqual(waits[:5], [0.0] * 5)
+        self.assertAlmostEqual(clock.now, 0.2)
+
+    def test_pause_blocks_callers(self):
+        clock = FakeClock()
+        limiter = RateLimiter(rate_per_second=10, burst=5, clock=clock, sleep=clock.sleep)
+        limiter.pause(30)
+        self.assertAlmostEqual(limiter.acquire(), 30.0)
+
+    def test_concurrent_callers_share_the_budget(self):
+        waits = []
+        limiter = RateLimiter(rate_per_second=10, burst=1, clock=lambda: 0.0, sleep=lambda s: None)
+        threads = [threading.Thread(target=lambda: waits.append(limiter.acquire())) for _ in range(10)]
+        [t.start() for t in threads]
+        [t.join() for t in threads]
+        # Each caller queues behind the reservations made before it.
+        self.assertEqual(sorted(round(w, 6) for w in waits), [i / 10 for i in range(10)])
+
+class TestExchangeRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.registry = ExchangeRegistry(cache_dir=self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_one_instance_per_account_and_mode(self):
+        a = self.registry.get("binance", api_key="k", secret="s")
+        b = self.registry.get("binance", api_key="k", secret="s")
+        sandbox = self.registry.get("binance", api_key="k", secret="s", sandbox=True)
+        self.assertIs(a, b)
+        self.assertIsNot(a, sandbox)
+        # Request weight is per IP, so both instances spend the same budget.
+        self.assertEqual(a.throttle, sandbox.throttle)
+
+    def test_markets_are_cached_on_disk(self):
+        exchange = self.registry.get("binance")
+        markets = {"BTC/USDT": {"id": "BTCUSDT", "symbol": "BTC/USDT", "base": "BTC", "quote": "USDT",
+                                "baseId": "BTC", "quoteId": "USDT", "spot": True, "type": "spot"}}
+        loads = []
+
+        def fetch_markets(params={}):
+            loads.append(1)
+            return list(markets.values())
+
+        exchange.fetch_markets = fetch_markets
+        exchange.fetch_currencies = lambda params={}: {}
+        exchange.load_markets()
+        self.assertEqual(len(loads), 1)
+
+        restarted = ExchangeRegistry(cache_dir=self.tmp.name).get("binance")
+        restarted.fetch_markets = fetch_markets
+        self.assertIn("BTC/USDT", restarted.load_markets())
+        self.assertEqual(len(loads), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import os
+import sys
+import time
+from unittest.mock import MagicMock, patch
+
+# Add the parent directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_bot.execution.execution_manager import ExecutionManager
+from trading_bot.execution.mock_execution_adapter import MockExecutionAdapter
+from trading_bot.execution.order_requests import build_order_requests, client_order_id
+from trading_bot.models.decision import Decision
+from trading_bot.portfolio import PositionLedger
+
+class TimingOutAdapter(MockExecutionAdapter):
+    """Accepts the first order but reports a timeout to the caller."""
+
+    def __init__(self):
+        super().__init__()
+        self.create_calls = 0
+
+    def create_order(self, *args, **kwargs):
+        self.create_calls += 1
+        order = super().create_order(*args, **kwargs)
+        if self.create_calls == 1:
+            raise TimeoutError("read timed out")
+        return order
+
+class TestOrderRequests(unittest.TestCase):
+    def test_client_order_ids_are_deterministic_per_bucket_and_leg(self):
+        decision = Decision(action="BUY", symbol="BTC/USDT", size=0.001)
+        entry = client_order_id(decision, "entry", now=120.0)
+        self.assertEqual(entry, client_order_id(decision, "entry", now=179.0))
+        self.assertNotEqual(entry, client_order_id(decision, "entry", now=180.0))
+        self.assertNotEqual(entry, client_order_id(decision, "stop_loss", now=120.0))
+        self.assertLessEqual(len(entry), 36)
+
+    def test_protective_legs_close_the_entry(self):
+        decision = Decision(action="BUY", symbol="BTC/USDT", size=0.001, stop_loss=48000.0, take_profit=53000.0)
+        entry, stop_loss, take_profit = build_order_requests(decision)
+        self.assertEqual(entry["side"], "buy")
+        self.assertEqual(stop_loss["side"], "sell")
+        self.assertEqual(stop_loss["params"]["stopLossPrice"], 48000.0)
+        self.assertEqual(take_profit["params"]["takeProfitPrice"], 53000.0)
+
+@patch('trading_bot.execution.execution_manager.persistence')
+class TestExecutionManager(unittest.TestCase):
+    def setUp(self):
+        self.market_data_manager = MagicMock()
+        self.market_data_manager.get_current_quote.return_value = {"last": 50000.0, "bid": 49990.0, "ask": 50010.0}
+        self.manager = ExecutionManager(self.market_data_manager, backtesting=True)
+        self.manager.position_ledger = self.manager.risk_manager.position_ledger = PositionLedger()
+        self.manager.exchange_adapter.get_ticker = MagicMock(wraps=self.manager.exchange_adapter.get_ticker)
+        # The orchestrator marks each symbol to the cycle's ticker before deciding on it.
+        self.manager.mark_to_market("BTC/USDT", {"last": 50000.0})
+
+    def tearDown(self):
+        self.manager.order_tracker.stop()
+
+    def test_places_entry_and_protective_legs(self, mock_persistence):
+        decision = Decision(action="BUY", symbol="BTC/USDT", size=0.001, stop_loss=48000.0, take_profit=53000.0)
+        orders = self.manager.execute_trade(decision)
+
+        self.assertEqual([o["side"] for o in orders], ["buy", "sell", "sell"])
+        self.assertEqual(orders[0]["status"], "closed")
+        self.assertEqual(mock_persistence.save.call_count, 4)  # three orders and the entry's trade
+        self.assertAlmostEqual(self.manager.position_ledger.get_position("BTC/USDT").size, 0.001)
+        # Risk checks use the cycle's snapshot; only the simulated fill reads a quote.
+        self.manager.exchange_adapter.get_ticker.assert_not_called()
+        self.market_data_manager.get_current_quote.assert_called_once()
+
+    def test_protective_legs_wait_for_the_entry_fill(self, mock_persistence):
+        decision = Decision(action="BUY", symbol="BTC/USDT", size=0.001, price=40000.0,
+                            stop_loss=38000.0, take_profit=45000.0)
+        orders = self.manager.execute_trade(decision)
+
+        self.assertEqual([o["status"] for o in orders], ["open"])
+        self.assertEqual(len(self.manager.exchange_adapter.orders), 1)
+        self.assertEqual(self.manager.order_tracker.pending(), [orders[0]["id"]])
+
+    def test_filled_leg_cancels_its_sibling(self, mock_persistence):
+        self.manager.order_tracker.initial_delay = 0.01
+        self.manager.exchange_adapter.quote_refresh_seconds = 0.0
+        decision = Decision(action="BUY", symbol="BTC/USDT", size=0.001, stop_loss=48000.0, take_profit=53000.0)
+        entry, stop_loss, take_profit = self.manager.execute_trade(decision)
+        self.assertEqual(len(self.manager.order_tracker.pending()), 2)
+
+        self.market_data_manager.get_current_quote.return_value = {"last": 47000.0, "bid": 46990.0, "ask": 47010.0}
+        deadline = time.monotonic() + 5
+        while self.manager.order_tracker.pending() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        orders = self.manager.exchange_adapter.orders
+        self.assertEqual(orders[stop_loss["id"]]["status"], "closed")
+        self.assertEqual(orders[take_profit["id"]]["status"], "canceled")
+        self.assertAlmostEqual(self.manager.position_ledger.get_position("BTC/USDT").size, 0.0)
+        trades = [call.args[0] for call in mock_persistence.save.call_args_list if hasattr(call.args[0], "reason")]
+        self.assertEqual([trade.reason for trade in trades], ["LLM Decision", "Stop loss"])
+        self.assertLess(trades[1].realized_pnl, 0.0)
+
+    def test_hold_places_no_order(self, mock_persistence):
+        self.assertEqual(self.manager.execute_trade(Decision(action="HOLD", symbol="BTC/USDT", size=0.0)), [])
+        self.assertEqual(self.manager.exchange_adapter.orders, {})
+
+    def test_retry_after_timeout_does_not_duplicate_the_order(self, mock_persistence):
+        self.manager.exchange_adapter = TimingOutAdapter()
+        orders = self.manager.execute_trade(Decision(action="BUY", symbol="BTC/USDT", size=0.001))
+
+        self.assertEqual(len(orders), 1)
+        self.assertEqual(len(self.manager.exchange_adapter.orders), 1)
+        self.assertEqual(self.manager.exchange_adapter.create_calls, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+# Add the parent directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_bot.persistence.sqlite_persistence import SQLitePersistence
+from trading_bot.rag_store.fingerprint import (
+    FingerprintIndex, compute_fingerprint, compute_simhash, hamming_distance, normalize_text
+)
+from fakes import HashEmbeddingFunction
+
+class TestFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.persistence = SQLitePersistence(os.path.join(self.tmp_dir.name, 'test.db'))
+
+    def tearDown(self):
+        self.persistence.engine.dispose()
+        self.tmp_dir.cleanup()
+
+    def test_normalization_makes_rescrapes_identical(self):
+        a = "Bitcoin hits $100K — ETF inflows surge!"
+        b = "  bitcoin HITS 100k ETF inflows   surge "
+        self.assertEqual(normalize_text(a), normalize_text(b))
+        self.assertEqual(compute_fingerprint(a), compute_fingerprint(b))
+
+        # Non-Latin titles keep their words rather than all colliding on the same text.
+        self.assertEqual(normalize_text("Биткоин  ПРЕВЫСИЛ $100K!"), "биткоин превысил 100k")
+        self.assertNotEqual(compute_fingerprint("比特币突破十万美元"), compute_fingerprint("以太坊升级推迟"))
+
+    def test_simhash_distance(self):
+        base = "SEC approves spot bitcoin ETF applications from BlackRock Fidelity and others after long review"
+        edited = "SEC approves spot bitcoin ETF applications from BlackRock Fidelity and others after long review process"
+        unrelated = "Ethereum developers schedule Dencun upgrade for mainnet in March"
+        near = hamming_distance(compute_simhash(base), compute_simhash(edited))
+        far = hamming_distance(compute_simhash(base), compute_simhash(unrelated))
+        self.assertLess(near, far)
+
+    def test_index_detects_duplicates(self):
+        index = FingerprintIndex(self.persistence)
+        title = "Bitcoin price rallies above $70,000 as ETF demand returns"
+        self.assertFalse(index.is_duplicate(title))
+
+        index.add(title)
+        self.assertTrue(index.is_duplicate(title))
+        self.assertTrue(index.is_duplicate(title.upper() + "!!"))
+        self.assertFalse(index.is_duplicate("Solana network suffers five hour outage"))
+
+    def test_index_is_restored_from_sqlite(self):
+        title = "Bitcoin miners sell record amount of BTC ahead of halving"
+        FingerprintIndex(self.persistence).add(title)
+
+        restored = FingerprintIndex(self.persistence)
+        self.assertEqual(len(restored), 1)
+        self.assertTrue(restored.is_duplicate(title))
+
+    def test_chromadb_service_skips_exact_duplicates(self):
+        from trading_bot.rag_store.chromadb_service import ChromaDBService
+
+        service = ChromaDBService(path=os.path.join(self.tmp_dir.name, 'chroma'), persistence=self.persistence,
+                                  embedding_function=HashEmbeddingFunction())
+        title = "Bitcoin ETF sees largest daily outflow since launch"
+        self.assertTrue(service.add_news(title, "summary", "CoinTelegraph", datetime.now()))
+        self.assertFalse(service.add_news(title, "summary", "CoinTelegraph", datetime.now()))
+        self.assertTrue(service.is_news_present(" bitcoin etf sees largest daily outflow since launch. "))
+        self.assertEqual(service.collection.count(), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+
+# Add the parent directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_bot.exchange.exchange_registry import RateLimiter
+from trading_bot.market_data.candle_store import CandleStore
+from trading_bot.market_data.history_downloader import HistoryDownloader
+from fakes import FakeOHLCVExchange
+
+HOUR_MS = 3600 * 1000
+
+class TestHistoryDownloader(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = CandleStore(self.root)
+        self.sleeps = []
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _downloader(self, exchange, **kwargs):
+        return HistoryDownloader(exchange, self.store, page_limit=100, sleep=self.sleeps.append,
+                                 clock=lambda: exchange.now / 1000, **kwargs)
+
+    def _timestamps(self, symbol="BTC/USDT"):
+        return self.store.read(symbol, "1h").timestamp.tolist()
+
+    def test_pages_forward_with_retries_and_fills_gaps(self):
+        exchange = FakeOHLCVExchange(listed_at=50 * HOUR_MS, now=1000 * HOUR_MS, fail_every=4,
+                                     drop_once={300 * HOUR_MS, 301 * HOUR_MS, 302 * HOUR_MS})
+        stats = self._downloader(exchange).download("BTC/USDT", "1h", since=0)
+
+        self.assertEqual(self._timestamps(), [t * HOUR_MS for t in range(50, 1000)])
+        self.assertEqual(stats["stored"], 950)
+        self.assertEqual(stats["gap_pages"], 1)
+        self.assertEqual(stats["gaps"], [])
+        self.assertTrue(self.sleeps)
+
+    def test_pages_backward_to_the_listing_date(self):
+        exchange = FakeOHLCVExchange(listed_at=130 * HOUR_MS, now=400 * HOUR_MS)
+        stats = self._downloader(exchange).download("BTC/USDT", "1h", since=0, direction="backward")
+        self.assertEqual(self._timestamps(), [t * HOUR_MS for t in range(130, 400)])
+        # 400 -> 300 -> 200 -> 130, then empty pages before the listing down to the start of the range.
+        self.assertEqual(stats["pages"], 5)
+
+    def test_skips_holes_longer_than_a_page(self):
+        exchange = FakeOHLCVExchange(listed_at=0, now=1000 * HOUR_MS, halted=(300 * HOUR_MS, 550 * HOUR_MS))
+        stats = self._downloader(exchange).download("BTC/USDT", "1h", since=0)
+        self.assertEqual(self._timestamps(), [t * HOUR_MS for t in range(300)] + [t * HOUR_MS for t in range(550, 1000)])
+        self.assertEqual(stats["gaps"], [(300 * HOUR_MS, 550 * HOUR_MS)])
+
+        # Long before the listing date, paging stops after max_empty_pages.
+        exchange = FakeOHLCVExchange(listed_at=5000 * HOUR_MS, now=6000 * HOUR_MS)
+        stats = self._downloader(exchange, max_empty_pages=2).download("ETH/USDT", "1h", since=0,
+                                                                       direction="backward")
+        self.assertEqual(stats["pages"], 10 + 2)
+
+    def test_resumes_from_checkpoint_and_extends(self):
+        exchange = FakeOHLCVExchange(listed_at=0, now=500 * HOUR_MS, fail_every=3)
+        # Without retries, the third request fails the download halfway.
+        result = self._downloader(exchange, max_retries=0).download_all(["BTC/USDT"], ["1h"], since=0)
+        self.assertIn("error", result[0])
+        self.assertEqual(len(self._timestamps()), 200)
+
+        exchange = FakeOHLCVExchange(listed_at=0, now=600 * HOUR_MS)
+        self._downloader(exchange).download("BTC/USDT", "1h", since=0)
+        self.assertEqual(self._timestamps(), [t * HOUR_MS for t in range(600)])
+        self.assertEqual(exchange.calls[0][2], 200 * HOUR_MS)
+
+        # A later run only fetches the new candles.
+        exchange = FakeOHLCVExchange(listed_at=0, now=650 * HOUR_MS)
+        self._downloader(exchange).download("BTC/USDT", "1h", since=0)
+        self.assertEqual(exchange.calls[0][2], 600 * HOUR_MS)
+        self.assertEqual(len(self._timestamps()), 650)
+
+        # The checkpoint is the series', whatever the range: a backward run ending in it resumes before it.
+        exchange = FakeOHLCVExchange(listed_at=0, now=650 * HOUR_MS)
+        self._downloader(exchange).download("BTC/USDT", "1h", since=0, until=640 * HOUR_MS, direction="backward")
+        self.assertEqual(exchange.calls, [])
+
+    def test_downloads_series_concurrently_under_the_rate_limit(self):
+        exchange = FakeOHLCVExchange(listed_at=0, now=300 * HOUR_MS)
+        limiter = RateLimiter(rate_per_second=1000, burst=1000)
+        results = self._downloader(exchange, limiter=limiter, max_workers=3).download_all(
+            ["BTC/USDT", "ETH/USDT", "SOL/USDT"], ["1h"], since=0)
+        self.assertEqual([r["stored"] for r in results], [300, 300, 300])
+        self.assertEqual(self.store.symbols(), ["BTC/USDT", "ETH/USDT", "SOL/USDT"])
+        self.assertLess(limiter._tokens, 1000)
+
+if __name__ == '__main__':
+    unittest.main()
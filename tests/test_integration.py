@@ -1,6 +1,7 @@
 import unittest
 import os
 import sys
+import tempfile
 from unittest.mock import MagicMock, patch
 from trading_bot.models import Decision
 import trading_bot.orchestrator
@@ -8,12 +9,22 @@ import trading_bot.orchestrator
 # Add the parent directory to the python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from trading_bot.services import services
+from fakes import use_temp_stores
+
 class TestIntegration(unittest.TestCase):
     def setUp(self):
         # Set the config path to the test config
         sad = os.path.dirname(__file__)
         ssf = os.path.join(sad, '..', '..', 'config.test.yaml')
         os.environ['CONFIG_PATH'] = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'config.test.yaml'))
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.persistence = use_temp_stores(self.tmp_dir.name)
+
+    def tearDown(self):
+        services.reset()
+        self.persistence.engine.dispose()
+        self.tmp_dir.cleanup()
 
     @patch('trading_bot.orchestrator.orchestrator.decision_engine')
     @patch('trading_bot.orchestrator.orchestrator.rag_store')
@@ -28,7 +39,7 @@ class TestIntegration(unittest.TestCase):
         # Mock the return values for external services
         mock_news_ingestor.fetch_cointelegraph_news.return_value = []
         mock_news_analyzer.process_news.return_value = None
-        mock_rag_store.get_latest_news.return_value = "Mock news context"
+        mock_rag_store.get_relevant_news.return_value = "Mock news context"
         
         # Mock decision to avoid LLM call
         mock_decision = Decision(
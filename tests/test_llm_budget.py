@@ -0,0 +1,100 @@
+import unittest
+import os
+import sys
+import tempfile
+from datetime import datetime
+from unittest.mock import patch
+
+# Add the parent directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_bot.decision_engine.llm_budget import LLMBudget
+from trading_bot.decision_engine.llm_decision_engine import LLMDecisionEngine
+from trading_bot.llm_stub.server import StubServer
+from trading_bot.persistence.sqlite_persistence import Cycle, SQLitePersistence
+
+PRICES = {"gpt-4o": {"prompt": 2.5, "completion": 10.0}, "default": {"prompt": 1.0, "completion": 1.0}}
+
+class TestLLMBudget(unittest.TestCase):
+    def test_accounts_usage_and_enforces_limits(self):
+        budget = LLMBudget(prices=PRICES, cycle_tokens=5000, daily_cost=0.05,
+                           daily_usage_loader=lambda since: {"tokens": 100000, "cost": 0.04})
+        budget.start_cycle()
+        self.assertAlmostEqual(budget.record("openai", "gpt-4o", 1000, 500, symbol="BTC/USDT", debate_round=1),
+                               0.0075)
+        self.assertAlmostEqual(budget.price("unlisted", 1e6, 0), 1.0)
+        self.assertIsNone(budget.reserve(3501, 0.0))  # Over the cycle's tokens.
+        self.assertIsNone(budget.reserve(0, 0.003))  # Over the day's cost, spent before a restart included.
+        self.assertEqual(budget.snapshot()["today"]["tokens"], 101500)
+
+        # A concurrent debate cannot reserve what another one holds, until it is settled or released.
+        reservation = budget.reserve(3000, 0.0)
+        self.assertIsNotNone(reservation)
+        self.assertIsNone(budget.reserve(1000, 0.0))
+        budget.record("openai", "gpt-4o", 1000, 0, debate_round=2, reservation=reservation)
+        self.assertIsNone(budget.reserve(1000, 0.0))
+        budget.release(reservation)
+        self.assertIsNotNone(budget.reserve(1000, 0.0))
+
+        records = budget.end_cycle()
+        self.assertEqual([(r["provider"], r["round"], r["prompt_tokens"]) for r in records],
+                         [("openai", 1, 1000), ("openai", 2, 1000)])
+        self.assertEqual(budget.end_cycle(), [])
+
+    def test_unpriced_models_are_charged_conservatively(self):
+        budget = LLMBudget(prices={"gpt-4o": PRICES["gpt-4o"]}, daily_cost=1.0)
+        with self.assertLogs(level="WARNING"):
+            cost = budget.record("qwen", "qwen-max", 1000, 1000)
+        self.assertGreater(cost, budget.price("gpt-4o", 1000, 1000))
+
+    def test_usage_is_persisted_with_the_cycle(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            persistence = SQLitePersistence(os.path.join(tmp_dir, 'test.db'))
+            budget = LLMBudget(prices=PRICES)
+            for provider, debate_round in (("openai", 1), ("gemini", 1), ("openai", 2)):
+                budget.record(provider, "gpt-4o", 1000, 100, symbol="BTC/USDT", debate_round=debate_round)
+            persistence.save_cycle(Cycle(status="completed"), llm_usage=budget.end_cycle())
+
+            totals = persistence.get_llm_usage_totals(datetime(2000, 1, 1))
+            self.assertEqual(totals["tokens"], 3300)
+            self.assertAlmostEqual(totals["cost"], 3 * 0.0035)
+            rows = persistence.get_llm_usage_by_cycle()
+            self.assertEqual([(r["provider"], r["round"], r["calls"]) for r in rows],
+                             [("gemini", 1, 1), ("openai", 1, 1), ("openai", 2, 1)])
+            persistence.engine.dispose()
+
+class TestDebateWithinBudget(unittest.TestCase):
+    def test_debate_degrades_instead_of_overspending(self):
+        with StubServer() as server, \
+                patch('trading_bot.decision_engine.llm_decision_engine.config') as mock_config:
+            mock_config.get_llm_provider.return_value = "native_llms"
+            mock_config.get_llm_resilience_config.return_value = {}
+            mock_config.get_llm_config.return_value = {
+                provider: {"api_key": "stub", "model_name": f"stub-{provider}", "endpoint": server.base_url}
+                for provider in ("openai", "gemini", "qwen")
+            }
+            engine = LLMDecisionEngine()
+            engine.budget = budget = LLMBudget(cycle_tokens=2500)
+            budget.start_cycle()
+            context = {"symbol": "BTC/USDT", "ticker": {"last": 50000.0}, "indicators": {}}
+
+            # The second round, resending the first one, no longer fits: the debate stops after one.
+            decision = engine.decide(context)
+            self.assertEqual([m["name"] for m in engine.last_transcript[2:]], ["OpenAI", "Gemini", "Qwen"])
+            self.assertLessEqual(budget.snapshot()["cycle"]["tokens"], 2500)
+
+            # Exhausted: the recent decision is reused, or the engine waits when there is none.
+            budget.cycle_tokens = budget.snapshot()["cycle"]["tokens"]
+            reused = engine.decide(context)
+            self.assertEqual(reused.action, decision.action)
+            self.assertTrue(reused.reason.startswith("LLM budget exhausted; reusing"))
+            waited = engine.decide({**context, "symbol": "ETH/USDT"})
+            self.assertEqual(waited.action, "WAIT")
+            self.assertEqual(engine.last_transcript[0]["name"], "Budget")
+
+            records = budget.end_cycle()
+            self.assertEqual(server.stub.stats["requests"], 3)
+            self.assertEqual({(r["symbol"], r["round"]) for r in records}, {("BTC/USDT", 1)})
+
+if __name__ == '__main__':
+    unittest.main()
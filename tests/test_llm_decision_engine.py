@@ -20,6 +20,7 @@ class TestLLMDecisionEngine(unittest.TestCase):
         
         # Setup config mock
         mock_config.get_llm_provider.return_value = 'openrouter_llms'
+        mock_config.get_llm_resilience_config.return_value = {}
         mock_config.get_llm_config.return_value = {
             'openai': {'api_key': 'key1', 'model_name': 'gpt-3.5'},
             'gemini': {'api_key': 'key2', 'model_name': 'gemini-pro'},
@@ -51,6 +52,7 @@ class TestLLMDecisionEngine(unittest.TestCase):
         
         # Setup config mock
         mock_config.get_llm_provider.return_value = 'native_llms'
+        mock_config.get_llm_resilience_config.return_value = {}
         mock_config.get_llm_config.return_value = {
             'openai': {'api_key': 'key1', 'model_name': 'gpt-3.5'},
             'gemini': {'api_key': 'key2', 'model_name': 'gemini-pro'},
@@ -87,6 +89,7 @@ class TestLLMDecisionEngine(unittest.TestCase):
     def test_init_openrouter_custom_endpoint(self, mock_openai, mock_config):
         """Test openrouter with custom endpoint overridden."""
         mock_config.get_llm_provider.return_value = 'openrouter_llms'
+        mock_config.get_llm_resilience_config.return_value = {}
         mock_config.get_llm_config.return_value = {
             'openai': {'api_key': 'key1', 'endpoint': 'https://custom.endpoint'},
         }
@@ -103,6 +106,7 @@ class TestLLMDecisionEngine(unittest.TestCase):
         
         # Setup config
         mock_config.get_llm_provider.return_value = 'openrouter_llms'
+        mock_config.get_llm_resilience_config.return_value = {}
         mock_config.get_llm_config.return_value = {
             'openai': {'api_key': 'k1'},
             'gemini': {'api_key': 'k2'},
@@ -161,6 +165,8 @@ class TestLLMDecisionEngine(unittest.TestCase):
         """Test decide method resilience to markdown blocks and mixed content."""
         
         mock_config.get_llm_provider.return_value = 'openrouter_llms'
+        
+        mock_config.get_llm_resilience_config.return_value = {}
         mock_config.get_llm_config.return_value = {'openai': {'api_key': 'k1'}}
         
         mock_client_instance = MagicMock()
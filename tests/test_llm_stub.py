@@ -0,0 +1,82 @@
+import unittest
+import os
+import sys
+import json
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+# Add the parent directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_bot.decision_engine.llm_decision_engine import LLMDecisionEngine
+from trading_bot.llm_stub.server import StubServer, create_app
+
+def request(schema=True, stream=False, content="BTC/USDT is ranging."):
+    body = {"model": "stub", "messages": [{"role": "user", "content": content}]}
+    if schema:
+        body["response_format"] = LLMDecisionEngine._get_json_schema_param(None)
+    if stream:
+        body.update(stream=True, stream_options={"include_usage": True})
+    return body
+
+class TestStubApp(unittest.TestCase):
+    def test_replies_are_schema_valid_and_deterministic(self):
+        client = TestClient(create_app({"seed": 3}))
+        response = client.post("/v1/chat/completions", json=request())
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        decision = json.loads(body["choices"][0]["message"]["content"])
+        self.assertEqual(set(decision), {"Decision", "Rating", "Thinking"})
+        self.assertIn(decision["Decision"], ("BUY", "SELL", "HOLD", "WAIT"))
+        self.assertTrue(1 <= decision["Rating"] <= 5)
+        self.assertGreater(body["usage"]["completion_tokens"], 0)
+
+        # A fresh server with the same seed replies the same to the same requests.
+        other = TestClient(create_app({"seed": 3}))
+        self.assertEqual(other.post("/v1/chat/completions", json=request()).json()["choices"],
+                         body["choices"])
+
+    def test_faults_are_injected(self):
+        client = TestClient(create_app({"error_rate": 1.0, "error_status": 429}))
+        response = client.post("/v1/chat/completions", json=request())
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("message", response.json()["error"])
+
+        client = TestClient(create_app({"json_schema": False, "invalid_rate": 1.0}))
+        self.assertEqual(client.post("/v1/chat/completions", json=request()).status_code, 400)
+        content = client.post("/v1/chat/completions", json=request(schema=False)).json()["choices"][0]["message"]
+        with self.assertRaises(json.JSONDecodeError):
+            json.loads(content["content"])
+        self.assertEqual(client.get("/stats").json()["errors"], 1)
+
+    def test_streams_server_sent_events(self):
+        client = TestClient(create_app())
+        with client.stream("POST", "/v1/chat/completions", json=request(stream=True)) as response:
+            events = [line[len("data: "):] for line in response.iter_lines() if line.startswith("data: ")]
+        self.assertEqual(events[-1], "[DONE]")
+        chunks = [json.loads(event) for event in events[:-1]]
+        content = "".join(c["choices"][0]["delta"].get("content", "") for c in chunks if c["choices"])
+        self.assertIn(json.loads(content)["Decision"], ("BUY", "SELL", "HOLD", "WAIT"))
+        self.assertEqual(chunks[-1]["choices"], [])
+        self.assertIn("total_tokens", chunks[-1]["usage"])
+
+class TestDebateAgainstStub(unittest.TestCase):
+    def test_engine_debates_through_the_endpoint_config(self):
+        with StubServer({"malformed_rate": 0.5}) as server, \
+                patch('trading_bot.decision_engine.llm_decision_engine.config') as mock_config:
+            mock_config.get_llm_provider.return_value = "native_llms"
+            mock_config.get_llm_resilience_config.return_value = {}
+            mock_config.get_llm_config.return_value = {
+                provider: {"api_key": "stub", "model_name": f"stub-{provider}", "endpoint": server.base_url}
+                for provider in ("openai", "gemini", "qwen")
+            }
+            engine = LLMDecisionEngine()
+            decision = engine.decide({"symbol": "ETH/USDT", "ticker": {"last": 3000.0}, "indicators": {}})
+            self.assertEqual(decision.symbol, "ETH/USDT")
+            self.assertFalse(decision.reason.startswith("Failed to parse"))
+            self.assertEqual(server.stub.stats["requests"], 9)
+            self.assertEqual(len(engine.last_transcript), 11)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import os
+import sys
+
+# Add the parent directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_bot.execution.matching_engine import SimulatedMatchingEngine
+from trading_bot.execution.mock_execution_adapter import MockExecutionAdapter
+
+class TestSimulatedMatchingEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = SimulatedMatchingEngine(taker_fee=0.001, maker_fee=0.0005, min_spread_bps=0,
+                                              level_size=1.0, level_spacing_bps=10, max_levels=5)
+        self.engine.update_market("BTC/USDT", 60000.0, 60010.0, 1000)
+
+    def test_market_order_walks_the_book_and_pays_fees(self):
+        order = self.engine.submit("BTC/USDT", "buy", "market", 1.5)
+        # One full level at the ask, half a level 10 bps higher.
+        expected_cost = 60010.0 + 0.5 * 60010.0 * 1.001
+        self.assertEqual(order["status"], "closed")
+        self.assertAlmostEqual(order["cost"], expected_cost, places=6)
+        self.assertAlmostEqual(order["fee"]["cost"], expected_cost * 0.001, places=6)
+        self.assertGreater(order["average"], 60010.0)
+
+    def test_market_order_beyond_depth_fills_partially(self):
+        order = self.engine.submit("BTC/USDT", "sell", "market", 8.0)
+        self.assertEqual(order["status"], "canceled")
+        self.assertAlmostEqual(order["filled"], 5.0)
+        # Depth is only replenished by the next market update.
+        self.assertEqual(self.engine.submit("BTC/USDT", "sell", "market", 1.0)["filled"], 0.0)
+
+    def test_limit_order_rests_and_fills_as_maker(self):
+        order = self.engine.submit("BTC/USDT", "buy", "limit", 3.0, price=59000.0)
+        self.assertEqual(order["status"], "open")
+        # Only the best level is within the limit price, so each update fills one level.
+        self.engine.update_market("BTC/USDT", 58990.0, 58995.0, 2000)
+        self.assertEqual((order["status"], order["filled"]), ("open", 1.0))
+        self.engine.update_market("BTC/USDT", 58990.0, 58995.0, 3000)
+        self.engine.update_market("BTC/USDT", 58990.0, 58995.0, 4000)
+        self.assertEqual(order["status"], "closed")
+        self.assertAlmostEqual(order["fee"]["cost"], order["cost"] * 0.0005)
+        self.assertLessEqual(order["average"], 59000.0)
+
+    def test_stop_loss_triggers_on_falling_price(self):
+        stop = self.engine.submit("BTC/USDT", "sell", "market", 1.0, params={"stopLossPrice": 59000.0})
+        take_profit = self.engine.submit("BTC/USDT", "sell", "market", 1.0, params={"takeProfitPrice": 62000.0})
+        self.engine.update_market("BTC/USDT", 59500.0, 59510.0, 2000)
+        self.assertEqual(stop["status"], "open")
+        self.engine.update_market("BTC/USDT", 58900.0, 58910.0, 3000)
+        self.assertEqual(stop["status"], "closed")
+        self.assertEqual(take_profit["status"], "open")
+
+    def test_latency_delays_arrival(self):
+        engine = SimulatedMatchingEngine(latency_ms=50)
+        engine.update_market("BTC/USDT", 60000.0, 60010.0, 1000)
+        order = engine.submit("BTC/USDT", "buy", "market", 0.1)
+        self.assertEqual(order["filled"], 0.0)
+        engine.update_market("BTC/USDT", 61000.0, 61010.0, 1050)
+        self.assertEqual(order["status"], "closed")
+        self.assertGreaterEqual(order["average"], 61010.0)
+
+class TestMockExecutionAdapter(unittest.TestCase):
+    def test_fills_at_the_simulated_price_and_updates_balance(self):
+        adapter = MockExecutionAdapter(quote_source=lambda symbol: {"last": 65000.0, "bid": 64990.0, "ask": 65010.0},
+                                       balance={"USDT": 10000.0})
+        order = adapter.create_order("BTC/USDT", "buy", "market", 0.1)
+        self.assertGreaterEqual(order["average"], 65010.0)
+        balance = adapter.get_balance()["free"]
+        self.assertAlmostEqual(balance["BTC"], 0.1)
+        self.assertAlmostEqual(balance["USDT"], 10000.0 - order["cost"] - order["fee"]["cost"])
+
+if __name__ == '__main__':
+    unittest.main()
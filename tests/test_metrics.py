@@ -0,0 +1,53 @@
+import unittest
+import os
+import sys
+
+# Add the parent directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_bot.metrics.registry import MetricsRegistry
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        self.metrics = MetricsRegistry(buckets=(0.1, 1.0))
+
+    def test_render_prometheus(self):
+        self.metrics.inc("llm_tokens_total", 120, provider="openai", kind="prompt")
+        self.metrics.inc("llm_tokens_total", 30, provider="openai", kind="prompt")
+        self.metrics.set("exchange_used_weight", 42, exchange="binance")
+        self.metrics.observe("exchange_request_seconds", 0.05, endpoint="ticker/24hr")
+        self.metrics.observe("exchange_request_seconds", 0.5, endpoint="ticker/24hr")
+        self.metrics.register_collector(lambda: [("cache_requests_total", "counter", {"cache": "embedding", "result": "hits"}, 7)])
+        text = self.metrics.render_prometheus()
+
+        self.assertIn("# TYPE llm_tokens_total counter", text)
+        self.assertIn('llm_tokens_total{kind="prompt",provider="openai"} 150.0', text)
+        self.assertIn('exchange_used_weight{exchange="binance"} 42', text)
+        self.assertIn('exchange_request_seconds_bucket{endpoint="ticker/24hr",le="0.1"} 1', text)
+        self.assertIn('exchange_request_seconds_bucket{endpoint="ticker/24hr",le="+Inf"} 2', text)
+        self.assertIn('exchange_request_seconds_count{endpoint="ticker/24hr"} 2', text)
+        self.assertIn('cache_requests_total{cache="embedding",result="hits"} 7.0', text)
+
+    def test_cycle_summary_reports_deltas(self):
+        self.metrics.inc("cycles_total", status="completed")
+        with self.metrics.time("cycle_seconds"):
+            pass
+        first = {row["name"]: row for row in self.metrics.cycle_summary()}
+        self.assertEqual(first["cycles_total"]["value"], 1)
+        self.assertEqual(first["cycle_seconds"]["count"], 1)
+
+        self.metrics.inc("cycles_total", 2, status="completed")
+        self.metrics.set("exchange_used_weight", 10)
+        second = {row["name"]: row for row in self.metrics.cycle_summary()}
+        self.assertEqual(second["cycles_total"]["value"], 2)
+        self.assertEqual(second["cycles_total"]["labels"], '{status="completed"}')
+        self.assertEqual(second["exchange_used_weight"]["value"], 10)
+        self.assertNotIn("cycle_seconds", second)
+
+    def test_kind_conflicts_are_rejected(self):
+        self.metrics.inc("requests_total")
+        with self.assertRaises(ValueError):
+            self.metrics.observe("requests_total", 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
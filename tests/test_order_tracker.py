@@ -0,0 +1,80 @@
+import unittest
+import os
+import sys
+import time
+
+# Add the parent directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_bot.execution.order_tracker import OrderTracker
+from fakes import FakeExchange
+
+class TestOrderTracker(unittest.TestCase):
+    def setUp(self):
+        self.exchange = FakeExchange(fill_delay=0.05, fill_steps=3)
+        self.tracker = OrderTracker(self.exchange, initial_delay=0.01, max_delay=0.02, timeout=5.0)
+
+    def tearDown(self):
+        self.tracker.stop()
+
+    def test_track_returns_immediately_and_reports_partial_fills(self):
+        fills, completed = [], []
+        order = self.exchange.create_order("BTC/USDT", "buy", "limit", 0.3, 50000.0)
+
+        start = time.monotonic()
+        future = self.tracker.track(order, on_complete=completed.append, on_fill=lambda o: fills.append(o["filled"]))
+        self.assertLess(time.monotonic() - start, 0.01)
+        self.assertFalse(future.done())
+
+        final = future.result(timeout=2)
+        self.assertEqual(final["status"], "closed")
+        self.assertAlmostEqual(final["filled"], 0.3)
+        self.assertEqual(len(fills), 3)
+        self.assertEqual(completed, [final])
+        self.assertEqual(self.tracker.pending(), [])
+
+    def test_already_filled_order_completes_without_polling(self):
+        order = {"id": "x", "symbol": "BTC/USDT", "status": "closed", "filled": 1.0}
+        future = self.tracker.track(order)
+        self.assertTrue(future.done())
+        self.assertEqual(self.exchange.fetch_calls, 0)
+
+    def test_stream_update_completes_order(self):
+        slow_tracker = OrderTracker(self.exchange, initial_delay=60.0, max_delay=60.0)
+        order = self.exchange.create_order("BTC/USDT", "sell", "market", 1.0)
+        future = slow_tracker.track(order)
+
+        slow_tracker.on_order_update({"id": order["id"], "status": "closed", "filled": 1.0, "average": 50010.0})
+        self.assertEqual(future.result(timeout=1)["average"], 50010.0)
+        self.assertEqual(self.exchange.fetch_calls, 0)
+        slow_tracker.stop()
+
+    def test_resting_order_is_polled_slowly_until_it_fills(self):
+        self.exchange.fill_delay = 0.3
+        self.exchange.fill_steps = 1
+        tracker = OrderTracker(self.exchange, initial_delay=0.01, max_delay=0.01, timeout=0.05,
+                               resting_poll_seconds=0.2)
+        order = self.exchange.create_order("BTC/USDT", "buy", "limit", 1.0, 40000.0)
+
+        future = tracker.track(order)
+        time.sleep(0.15)
+        calls = self.exchange.fetch_calls
+        self.assertFalse(future.done())
+        self.assertEqual(future.result(timeout=2)["status"], "closed")
+        self.assertLessEqual(self.exchange.fetch_calls - calls, 2)
+        tracker.stop()
+
+    def test_stream_update_before_tracking_is_buffered(self):
+        slow_tracker = OrderTracker(self.exchange, initial_delay=60.0, max_delay=60.0)
+        order = self.exchange.create_order("BTC/USDT", "sell", "market", 1.0)
+        # The fill is pushed before create_order returned to the caller.
+        slow_tracker.on_order_update({"id": order["id"], "status": "closed", "filled": 1.0, "average": 50010.0})
+        slow_tracker.on_order_update({"id": "unknown", "status": "open"})
+
+        future = slow_tracker.track(order)
+        self.assertEqual(future.result(timeout=1)["filled"], 1.0)
+        self.assertEqual(self.exchange.fetch_calls, 0)
+        slow_tracker.stop()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import os
+import sys
+import time
+
+# Add the parent directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_bot.orchestrator.pipeline import StagePipeline, StageSkipped
+
+class TestStagePipeline(unittest.TestCase):
+    def test_independent_branches_overlap(self):
+        def slow(value):
+            def stage(*args):
+                time.sleep(0.2)
+                return value + sum(args)
+            return stage
+
+        pipeline = StagePipeline()
+        a = pipeline.add("a", slow(1))
+        b = pipeline.add("b", slow(2))
+        c = pipeline.add("c", slow(3), [a])
+        pipeline.add("d", slow(0), [b, c])
+        run = pipeline.run()
+
+        self.assertEqual(run.results["d"], 6)
+        # The critical path is a -> c -> d; b runs alongside a.
+        self.assertLess(run.total_seconds, 0.75)
+        self.assertLess(run.timings["b"]["start"], 0.1)
+        self.assertGreaterEqual(run.timings["d"]["start"], run.timings["c"]["start"] + 0.2)
+
+    def test_failure_skips_only_dependents(self):
+        async def fetch():
+            return 1
+
+        def fail():
+            raise RuntimeError("exchange unavailable")
+
+        pipeline = StagePipeline()
+        ok = pipeline.add("ok", fetch)
+        bad = pipeline.add("bad", fail)
+        downstream = pipeline.add("downstream", lambda x: x, [bad])
+        pipeline.add("leaf", lambda x: x, [downstream])
+        pipeline.add("independent", lambda x: x + 1, [ok])
+        run = pipeline.run()
+
+        self.assertEqual(run.results, {"ok": 1, "independent": 2})
+        self.assertIsInstance(run.errors["bad"], RuntimeError)
+        self.assertIsInstance(run.errors["leaf"], StageSkipped)
+        self.assertIn("bad failed", str(run.errors["leaf"]))
+        self.assertEqual(run.timings["leaf"]["status"], "skipped")
+
+    def test_unknown_dependency_is_rejected(self):
+        with self.assertRaises(ValueError):
+            StagePipeline().add("a", lambda: None, ["missing"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Add the parent directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_bot.persistence.sqlite_persistence import SQLitePersistence
+from trading_bot.portfolio import PositionLedger
+
+class TestPositionLedger(unittest.TestCase):
+    def setUp(self):
+        self.ledger = PositionLedger(starting_equity=10000.0)
+
+    def test_average_cost_and_realized_pnl(self):
+        self.ledger.apply_fill("BTC/USDT", "buy", 1.0, 100.0)
+        self.ledger.apply_fill("BTC/USDT", "buy", 1.0, 200.0)
+        position = self.ledger.get_position("BTC/USDT")
+        self.assertAlmostEqual(position.avg_cost, 150.0)
+
+        realized = self.ledger.apply_fill("BTC/USDT", "sell", 1.5, 180.0, fee=1.0)
+        self.assertAlmostEqual(realized, 1.5 * 30.0 - 1.0)
+        self.assertAlmostEqual(position.size, 0.5)
+        self.assertAlmostEqual(position.avg_cost, 150.0)
+
+    def test_mark_to_market_updates_equity_and_drawdown(self):
+        self.ledger.apply_fill("BTC/USDT", "buy", 2.0, 1000.0)
+        self.ledger.mark("BTC/USDT", 1500.0)
+        self.assertAlmostEqual(self.ledger.unrealized_pnl, 1000.0)
+        self.assertAlmostEqual(self.ledger.high_water_mark, 11000.0)
+
+        self.ledger.mark("BTC/USDT", 950.0)
+        self.assertAlmostEqual(self.ledger.equity, 9900.0)
+        self.assertAlmostEqual(self.ledger.drawdown, 1100.0 / 11000.0)
+
+    def test_fill_flipping_the_position_opens_at_fill_price(self):
+        self.ledger.apply_fill("BTC/USDT", "buy", 1.0, 100.0)
+        self.ledger.apply_fill("BTC/USDT", "sell", 3.0, 120.0)
+        position = self.ledger.get_position("BTC/USDT")
+        self.assertAlmostEqual(position.size, -2.0)
+        self.assertAlmostEqual(position.avg_cost, 120.0)
+        self.assertAlmostEqual(self.ledger.realized_pnl, 20.0)
+
+    def test_snapshot_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            persistence = SQLitePersistence(os.path.join(tmp_dir, 'test.db'))
+            ledger = PositionLedger(persistence, starting_equity=10000.0, snapshot_interval_seconds=60)
+            ledger.apply_fill("BTC/USDT", "buy", 1.0, 100.0)
+            ledger.mark("BTC/USDT", 110.0)
+            self.assertTrue(ledger.maybe_snapshot(now=1000.0))
+            self.assertFalse(ledger.maybe_snapshot(now=1030.0))
+
+            restored = PositionLedger(persistence)
+            self.assertEqual(restored.starting_equity, 10000.0)
+            self.assertAlmostEqual(restored.equity, 10010.0)
+            self.assertAlmostEqual(restored.get_position("BTC/USDT").avg_cost, 100.0)
+            persistence.engine.dispose()
+
+    def test_fills_are_snapshotted_at_once(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            persistence = SQLitePersistence(os.path.join(tmp_dir, 'test.db'))
+            ledger = PositionLedger(persistence, starting_equity=10000.0, snapshot_interval_seconds=3600)
+            ledger.apply_fill("BTC/USDT", "buy", 1.0, 100.0)
+            ledger.apply_fill("BTC/USDT", "sell", 0.5, 120.0)
+
+            restored = PositionLedger(persistence)
+            self.assertAlmostEqual(restored.get_position("BTC/USDT").size, 0.5)
+            self.assertAlmostEqual(restored.realized_pnl, 10.0)
+            persistence.engine.dispose()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+import unittest
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+# Add the parent directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from trading_bot.persistence.sqlite_persistence import SQLitePersistence
+from trading_bot.rag_store.chromadb_service import ChromaDBService
+from trading_bot.rag_store.embedding_service import ManagedEmbeddingFunction
+from trading_bot.rag_store.news_retriever import NewsRetriever, market_state_bucket
+from trading_bot.rag_store.retention import NewsRetentionManager
+from fakes import HashEmbeddingFunction
+
+class TestChromaDBService(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.persistence = SQLitePersistence(os.path.join(self.tmp_dir.name, 'test.db'))
+        self.embedding_function = HashEmbeddingFunction()
+        self.service = ChromaDBService(
+            path=os.path.join(self.tmp_dir.name, 'chroma'),
+            persistence=self.persistence,
+            embedding_function=self.embedding_function
+        )
+
+    def tearDown(self):
+        self.persistence.engine.dispose()
+        self.tmp_dir.cleanup()
+
+    def test_get_latest_news_uses_recency_index(self):
+        now = datetime.now()
+        for hours in [5, 1, 3, 2, 4]:
+            self.service.add_news(f"Headline published {hours} hours ago", "summary", "Test", now - timedelta(hours=hours))
+
+        latest = self.service.get_latest_news(k=3)
+        self.assertEqual([n["title"] for n in latest], [
+            "Headline published 1 hours ago",
+            "Headline published 2 hours ago",
+            "Headline published 3 hours ago",
+        ])
+
+    def test_get_latest_news_falls_back_to_window_filters(self):
+        now = datetime.now()
+        # Articles written before the recency index existed are only in Chroma.
+        self.service.collection.add(
+            documents=["Legacy old headline", "Legacy recent headline"],
+            metadatas=[
+                {"title": "Legacy old headline", "summary": "", "source": "Test",
+                 "published_at": int((now - timedelta(days=60)).timestamp())},
+                {"title": "Legacy recent headline", "summary": "", "source": "Test",
+                 "published_at": int((now - timedelta(hours=1)).timestamp())},
+            ],
+            ids=["legacy-old", "legacy-recent"]
+        )
+
+        latest = self.service.get_latest_news(k=2)
+        self.assertEqual([n["title"] for n in latest], ["Legacy recent headline", "Legacy old headline"])
+
+        # The next startup backfills the recency index, which then serves the reads.
+        reopened = ChromaDBService(path=self.service.path, persistence=self.persistence,
+                                   embedding_function=self.embedding_function)
+        self.assertEqual(self.persistence.count_news_index_entries(), 2)
+        self.assertEqual([n["title"] for n in reopened.get_latest_news(k=2)],
+                         ["Legacy recent headline", "Legacy old headline"])
+
+    def test_retriever_ranks_by_relevance_and_caches_query(self):
+        now = datetime.now()
+        self.service.add_news("bitcoin price uptrend as bullish momentum builds", "", "Test", now - timedelta(hours=6))
+        self.service.add_news("ethereum developers ship testnet upgrade", "", "Test", now)
+        self.service.add_news("celebrity launches meme token on solana", "", "Test", now - timedelta(hours=1))
+
+        retriever = NewsRetriever(self.service, similarity_weight=0.9)
+        indicators = {"4h": {"ema": 101.0, "sma": 100.0, "rsi": 55.0, "macd": {"hist": 1.2}, "atr": 0.5}}
+        ticker = {"last": 100.0}
+
+        news = retriever.retrieve("BTC/USDT", indicators, ticker, k=2)
+        self.assertEqual(len(news), 2)
+        self.assertTrue(news[0]["title"].startswith("bitcoin"))
+        self.assertGreaterEqual(news[0]["relevance"], news[1]["relevance"])
+
+        calls = self.embedding_function.calls
+        retriever.retrieve("BTC/USDT", indicators, ticker, k=2)
+        self.assertEqual(self.embedding_function.calls, calls)
+
+    def test_retriever_considers_the_latest_news(self):
+        now = datetime.now()
+        self.service.add_news("bitcoin price uptrend as bullish momentum builds", "", "Test", now - timedelta(days=2))
+        self.service.add_news("exchange halts withdrawals after hack", "", "Test", now)
+
+        # The breaking headline is no nearest neighbour, but its recency ranks it first.
+        retriever = NewsRetriever(self.service, similarity_weight=0.1, candidates=1, recent_candidates=1)
+        indicators = {"4h": {"ema": 101.0, "sma": 100.0, "rsi": 55.0, "macd": {"hist": 1.2}}}
+        news = retriever.retrieve("BTC/USDT", indicators, {"last": 100.0}, k=2)
+        self.assertEqual([n["title"] for n in news],
+                         ["exchange halts withdrawals after hack", "bitcoin price uptrend as bullish momentum builds"])
+
+    def test_market_state_bucket_is_coarse(self):
+        a = market_state_bucket("BTC/USDT", {"1h": {"ema": 2.0, "sma": 1.0, "rsi": 25.0, "macd": {"hist": -1.0}}})
+        b = market_state_bucket("BTC/USDT", {"1h": {"ema": 3.0, "sma": 1.5, "rsi": 22.0, "macd": {"hist": -3.0}}})
+        self.assertEqual(a, b)
+        self.assertEqual(a[1:4], ("uptrend", "oversold", "bearish"))
+
+    def test_retention_archives_expired_news_and_compacts(self):
+        now = datetime.now()
+        self.service.add_news("bitcoin halving recap from last spring", "old", "Test", now - timedelta(days=45))
+        self.service.add_news("bitcoin funding rates turn negative", "new", "Test", now - timedelta(days=1))
+
+        retention = NewsRetentionManager(self.service, horizon_days=30, compact_interval_hours=24)
+        result = retention.maybe_run(now.timestamp())
+        self.assertEqual(result["archived"], 1)
+        self.assertEqual(self.service.collection.count(), 1)
+        self.assertEqual([n["title"] for n in self.service.get_latest_news()], ["bitcoin funding rates turn negative"])
+        # Archived articles are still recognised as already seen.
+        self.assertTrue(self.service.is_news_present("bitcoin halving recap from last spring"))
+
+        result = retention.maybe_run(now.timestamp() + 25 * 3600)
+        self.assertEqual(result["compacted"], 1)
+        self.assertEqual(self.service.collection.count(), 1)
+
+        stats = retention.get_stats()
+        self.assertEqual(stats["live_articles"], 1)
+        self.assertEqual(stats["archived_articles"], 1)
+        self.assertGreater(stats["vector_store_disk_bytes"], 0)
+
+    def test_interrupted_rebuild_is_recovered_on_startup(self):
+        now = datetime.now()
+        for title in ("bitcoin etf inflows climb", "ethereum gas fees drop"):
+            self.service.add_news(title, "", "Test", now)
+        # Crash after the copy was complete and the live collection was dropped.
+        live = self.service.collection.get(include=["embeddings", "documents", "metadatas"])
+        rebuilt = self.service._get_or_create_collection("news_rebuild")
+        rebuilt.add(ids=live['ids'], embeddings=live['embeddings'], documents=live['documents'],
+                    metadatas=live['metadatas'])
+        self.service.client.delete_collection("news")
+
+        reopened = ChromaDBService(path=self.service.path, persistence=self.persistence,
+                                   embedding_function=self.embedding_function)
+        self.assertEqual(reopened.collection.count(), 2)
+        self.assertEqual({c.name for c in reopened.client.list_collections()}, {"news"})
+
+        # A copy interrupted before the swap is dropped, leaving the live collection as it was.
+        reopened._get_or_create_collection("news_rebuild").add(
+            ids=live['ids'][:1], embeddings=live['embeddings'][:1], documents=live['documents'][:1])
+        reopened = ChromaDBService(path=self.service.path, persistence=self.persistence,
+                                   embedding_function=self.embedding_function)
+        self.assertEqual(reopened.collection.count(), 2)
+        self.assertEqual({c.name for c in reopened.client.list_collections()}, {"news"})
+
+class TestManagedEmbeddingFunction(unittest.TestCase):
+    def setUp(self):
+        self.model_calls = []
+        self.loads = 0
+
+        def model_factory():
+            self.loads += 1
+
+            def model(texts):
+                self.model_calls.append(list(texts))
+                time.sleep(0.05)
+                return [np.full(4, float(len(text)), dtype=np.float32) for text in texts]
+            return model
+
+        self.embedding_function = ManagedEmbeddingFunction(cache_size=2, model_factory=model_factory)
+
+    def test_model_is_loaded_lazily_and_cached(self):
+        self.assertFalse(self.embedding_function.loaded)
+        self.assertEqual(self.loads, 0)
+
+        first = self.embedding_function(["a", "bb", "a"])
+        self.assertEqual(self.loads, 1)
+        self.assertEqual(self.model_calls, [["a", "bb"]])
+        self.assertEqual(float(first[2][0]), 1.0)
+
+        self.embedding_function(["bb"])
+        self.assertEqual(len(self.model_calls), 1)
+
+        # The cache is bounded: adding a third text evicts the least recently used one ("a").
+        self.embedding_function(["ccc"])
+        self.embedding_function(["a"])
+        self.assertEqual(self.model_calls[-1], ["a"])
+
+    def test_concurrent_requests_are_batched(self):
+        texts = [f"text {i}" for i in range(8)]
+        threads = [threading.Thread(target=self.embedding_function, args=([text],)) for text in texts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(t for call in self.model_calls for t in call), sorted(texts))
+        self.assertLess(len(self.model_calls), len(texts))
+
+if __name__ == '__main__':
+    unittest.main()
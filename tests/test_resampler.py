@@ -0,0 +1,86 @@
+import unittest
+import os
+import sys
+import time
+from unittest.mock import MagicMock
+
+import ccxt
+import numpy as np
+
+# Add the parent directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_bot.market_data.candle_store import CandleArray
+from trading_bot.market_data.market_data_manager import MarketDataManager
+from trading_bot.market_data.resampler import Resampler, resample
+from fakes import FakeOHLCVExchange
+
+HOUR_MS = 3600 * 1000
+DAY_MS = 24 * HOUR_MS
+
+def hourly(start_hour, count):
+    rng = np.random.default_rng(start_hour)
+    close = 100 + rng.normal(0, 1, count).cumsum()
+    return CandleArray(np.arange(start_hour, start_hour + count, dtype=np.int64) * HOUR_MS, close - 0.5,
+                       close + rng.uniform(0, 2, count), close - rng.uniform(0, 2, count), close,
+                       rng.uniform(1, 10, count))
+
+class TestResample(unittest.TestCase):
+    def test_aggregates_on_exchange_boundaries(self):
+        base = hourly(2, 11)  # 02:00 to 12:00
+        four_hourly = resample(base, "4h", "1h")
+        self.assertEqual(four_hourly.timestamp.tolist(), [0, 4 * HOUR_MS, 8 * HOUR_MS, 12 * HOUR_MS])
+        second = base[2:6]
+        self.assertEqual(four_hourly[1], [4 * HOUR_MS, second.open[0], second.high.max(), second.low.min(),
+                                          second.close[-1], second.volume.sum()])
+        # 12:00 only has its first hour.
+        self.assertEqual(len(resample(base, "4h", "1h", include_partial=False)), 3)
+
+    def test_weeks_open_on_monday(self):
+        base = hourly(0, 24 * 14)  # From Thursday 1970-01-01.
+        weekly = resample(base, "1w", "1h")
+        self.assertEqual(weekly.timestamp.tolist(), [-3 * DAY_MS, 4 * DAY_MS, 11 * DAY_MS])
+
+    def test_incremental_updates_match_a_full_resample(self):
+        full = hourly(0, 200)
+        resampler = Resampler("1h", max_base_candles=1000)
+        resampler.update(full[:120])
+        self.assertEqual(len(resampler.get("4h")), 30)
+        # The forming candle is refetched with new values, followed by new ones.
+        resampler.update(full[119:150])
+        resampler.update(full[149:])
+        for tf in ("4h", "1d"):
+            expected = resample(full, tf, "1h")
+            self.assertEqual(resampler.get(tf).tolist(), expected.tolist())
+        self.assertEqual(resampler.get("1d", limit=2).timestamp.tolist(), [7 * DAY_MS, 8 * DAY_MS])
+
+class TestMultiTimeframeCandles(unittest.TestCase):
+    def test_fetches_only_the_base_timeframe(self):
+        now_hour = int(time.time() * 1000) // HOUR_MS
+        fake = FakeOHLCVExchange(listed_at=(now_hour - 5000) * HOUR_MS, now=(now_hour + 1) * HOUR_MS)
+        exchange = MagicMock(spec=ccxt.Exchange)
+        exchange.fetch_ohlcv.side_effect = fake.fetch_ohlcv
+        manager = MarketDataManager(backtesting=True)
+        manager.data_source = exchange
+
+        candles = manager.get_multi_timeframe_candles("BTC/USDT", ["1h", "4h", "1d"], limit=100)
+        self.assertEqual({call[1] for call in fake.calls}, {"1h"})
+        self.assertEqual([len(candles[tf]) for tf in ("1h", "4h", "1d")], [100, 100, 100])
+        # Every timeframe ends with the same forming candle.
+        self.assertEqual({candles[tf].close[-1] for tf in ("1h", "4h", "1d")}, {candles["1h"].close[-1]})
+
+        fake.calls.clear()
+        manager.get_multi_timeframe_candles("BTC/USDT", ["1h", "4h", "1d"], limit=100)
+        self.assertEqual(fake.calls, [("BTC/USDT", "1h", now_hour * HOUR_MS, 1000)])
+
+    def test_simulated_timeframes_are_consistent(self):
+        manager = MarketDataManager(backtesting=True)
+        candles = manager.get_multi_timeframe_candles("BTC/USDT", ["1h", "4h"], limit=10)
+        last_4h = candles["4h"][-1]
+        within = manager.resamplers[("BTC/USDT", "1h")].get("1h")
+        within = within[int(np.searchsorted(within.timestamp, last_4h[0])):]
+        self.assertEqual(last_4h[2], within.high.max())
+        self.assertEqual(last_4h[4], within.close[-1])
+
+if __name__ == '__main__':
+    unittest.main()
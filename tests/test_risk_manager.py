@@ -0,0 +1,99 @@
+import unittest
+import os
+import sys
+from unittest.mock import MagicMock
+import numpy as np
+
+# Add the parent directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_bot.models.decision import Decision
+from trading_bot.portfolio import PositionLedger
+from trading_bot.risk_management.risk_manager import MarketSnapshot, RiskLimits, RiskManager
+
+class TestRiskManager(unittest.TestCase):
+    def setUp(self):
+        self.market_data_manager = MagicMock()
+        self.ledger = PositionLedger(starting_equity=10000.0)
+        self.risk_manager = RiskManager(self.market_data_manager, position_ledger=self.ledger)
+        self.risk_manager.limits = RiskLimits(max_position_size=0.5, per_trade_risk_cap=0.01, max_drawdown=0.1,
+                                              max_exposure=0.8, atr_multiplier=2.0, cooldown_seconds=600)
+        self.risk_manager.update_market(MarketSnapshot("BTC/USDT", 100.0, atr=2.0))
+
+    def validate(self, action, size, **kwargs):
+        return self.risk_manager.validate_decision(Decision(action=action, symbol="BTC/USDT", size=size, **kwargs), 0.0)
+
+    def test_atr_sizing_uses_the_snapshot_without_fetching(self):
+        is_valid, decision = self.validate("BUY", 40.0)
+        # Risk budget 100 over a stop 2 ATRs (4.0) away.
+        self.assertTrue(is_valid)
+        self.assertAlmostEqual(decision.size, 25.0)
+        self.market_data_manager.get_current_quote.assert_not_called()
+
+    def test_drawdown_blocks_new_risk_but_not_reductions(self):
+        self.ledger.apply_fill("BTC/USDT", "buy", 20.0, 100.0)
+        self.ledger.mark("BTC/USDT", 40.0)
+        self.assertFalse(self.validate("BUY", 1.0)[0])
+        self.assertTrue(self.validate("SELL", 20.0)[0])
+
+    def test_exposure_and_cooldown(self):
+        self.ledger.apply_fill("ETH/USDT", "buy", 78.0, 100.0)
+        is_valid, decision = self.validate("BUY", 5.0, stop_loss=99.0)
+        self.assertTrue(is_valid)
+        self.assertAlmostEqual(decision.size, 2.0)
+
+        self.risk_manager.record_trade("BTC/USDT")
+        self.assertFalse(self.validate("BUY", 1.0)[0])
+
+    def test_pending_entries_count_against_the_limits(self):
+        self.risk_manager.update_market(MarketSnapshot("ETH/USDT", 100.0))
+        first = self.risk_manager.reserve_decision(Decision(action="BUY", symbol="ETH/USDT", size=50.0,
+                                                            stop_loss=99.0), 0.0)
+        self.assertTrue(first[0])
+        # Not filled yet, the first entry's 5000 of exposure leaves room for 30 of the second's 50.
+        is_valid, decision, second = self.risk_manager.reserve_decision(
+            Decision(action="BUY", symbol="BTC/USDT", size=50.0, stop_loss=99.0), 0.0)
+        self.assertTrue(is_valid)
+        self.assertAlmostEqual(decision.size, 30.0)
+
+        self.risk_manager.release(first[2])
+        self.risk_manager.release(second)
+        self.assertAlmostEqual(self.risk_manager.pending_exposure, 0.0)
+
+    def test_pending_reductions_reserve_no_exposure(self):
+        self.ledger.apply_fill("ETH/USDT", "buy", 40.0, 100.0)
+        self.risk_manager.update_market(MarketSnapshot("ETH/USDT", 100.0))
+        is_valid, _, closing = self.risk_manager.reserve_decision(
+            Decision(action="SELL", symbol="ETH/USDT", size=40.0), 0.0)
+        self.assertTrue(is_valid)
+        self.assertEqual(closing["exposure"], 0.0)
+        # While the sale is in flight, an entry on another symbol keeps its full size.
+        is_valid, decision, _ = self.risk_manager.reserve_decision(
+            Decision(action="BUY", symbol="BTC/USDT", size=40.0, stop_loss=99.0), 0.0)
+        self.assertTrue(is_valid)
+        self.assertAlmostEqual(decision.size, 40.0)
+
+    def test_arrays_match_scalar_rules(self):
+        rng = np.random.default_rng(7)
+        n = 500
+        direction = rng.choice([-1, 1], n)
+        size = rng.uniform(0.1, 60.0, n)
+        held = rng.choice([0.0, 10.0, -10.0], n)
+        atr = np.where(rng.random(n) < 0.5, rng.uniform(0.5, 5.0, n), np.nan)
+        valid, sizes = self.risk_manager.evaluate_arrays(
+            direction, size, np.full(n, 100.0), np.full(n, 10000.0), held=held,
+            gross_exposure=np.abs(held) * 100.0, atr=atr)
+
+        for i in range(n):
+            ledger = PositionLedger(starting_equity=10000.0)
+            if held[i]:
+                ledger.apply_fill("BTC/USDT", "buy" if held[i] > 0 else "sell", abs(held[i]), 100.0)
+            self.risk_manager.position_ledger = ledger
+            self.risk_manager.update_market(MarketSnapshot("BTC/USDT", 100.0, None if np.isnan(atr[i]) else atr[i]))
+            is_valid, decision = self.validate("BUY" if direction[i] > 0 else "SELL", size[i])
+            self.assertEqual(is_valid, bool(valid[i]), i)
+            if is_valid:
+                self.assertAlmostEqual(decision.size, sizes[i], places=9)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+# Add the parent directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_bot.decision_engine.rule_based_decision_engine import RuleBasedDecisionEngine, create_decision_engine
+from trading_bot.models import Decision
+
+def make_context(rsi_1h=50.0, rsi_4h=50.0, hist=1.0, price=100.0, ema_1d=99.0, atr=1.0):
+    timeframe = lambda rsi: {"rsi": rsi, "ema": ema_1d, "atr": atr, "macd": {"macd": 0.0, "signal": 0.0, "hist": hist}}
+    return {
+        "symbol": "BTC/USDT",
+        "ticker": {"last": price},
+        "indicators": {"1h": timeframe(rsi_1h), "4h": timeframe(rsi_4h), "1d": timeframe(50.0)},
+    }
+
+class TestRuleBasedDecisionEngine(unittest.TestCase):
+    def setUp(self):
+        self.llm = MagicMock()
+        self.llm.decide.return_value = Decision(action="BUY", symbol="BTC/USDT", size=0.1, confidence=0.8)
+        self.llm.last_transcript = [{"role": "assistant", "name": "OpenAI", "content": "BUY"}]
+        self.engine = RuleBasedDecisionEngine(self.llm)
+
+    def test_quiet_market_is_decided_without_the_llm(self):
+        decision = self.engine.decide(make_context())
+        self.assertEqual(decision.action, "HOLD")
+        self.assertIn("macd_1h_bullish", decision.reason)
+        self.llm.decide.assert_not_called()
+        self.assertEqual(self.engine.last_transcript[0]["name"], "Rules")
+
+    def test_significant_and_ambiguous_signals_are_escalated(self):
+        self.engine.decide(make_context())
+        decision = self.engine.decide(make_context(rsi_1h=25.0))  # oversold, bullish MACD and trend
+        self.assertEqual(decision.action, "BUY")
+        self.assertEqual(self.engine.last_transcript, self.llm.last_transcript)
+        self.assertEqual(self.engine.escalation_rate, 0.5)
+
+        result = self.engine.evaluate([
+            make_context(rsi_1h=25.0, rsi_4h=75.0, hist=0.0, price=99.0),  # oversold 1h, overbought 4h
+            make_context(atr=5.0),  # volatility spike
+            {"symbol": "BTC/USDT", "indicators": {}},  # nothing to go by
+            make_context(rsi_1h=60.0, hist=-1.0),  # bearish MACD in an uptrend
+        ])
+        self.assertEqual(result["escalated"].tolist(), [True, True, True, False])
+        self.assertEqual(result["fired"].shape, (4, len(self.engine.rules)))
+        self.assertEqual((result["bullish"][3], result["bearish"][3]), (0.5, 0.5))
+
+    def test_engine_is_selected_from_config(self):
+        with patch('trading_bot.decision_engine.rule_based_decision_engine.config') as mock_config, \
+                patch('trading_bot.decision_engine.rule_based_decision_engine.services') as mock_services:
+            mock_config.get_decision_engine_config.return_value = {"engine": "rules", "quiet_action": "WAIT"}
+            engine = create_decision_engine()
+            self.assertIsInstance(engine, RuleBasedDecisionEngine)
+            self.assertEqual(engine.quiet_action, "WAIT")
+            mock_services.get.assert_not_called()
+
+            mock_config.get_decision_engine_config.return_value = {}
+            self.assertIs(create_decision_engine(), mock_services.get.return_value)
+            mock_services.get.assert_called_once_with("llm_decision_engine")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import os
+import sys
+
+# Add the parent directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_bot.orchestrator.scheduler import CycleScheduler
+
+class FakeClock:
+    """A wall clock and a monotonic clock that only move when slept on or advanced."""
+
+    def __init__(self, wall: float):
+        self.wall = wall
+        self.mono = 1000.0
+
+    def advance(self, seconds: float):
+        self.wall += seconds
+        self.mono += seconds
+
+class TestCycleScheduler(unittest.TestCase):
+    def make_scheduler(self, clock, **kwargs):
+        return CycleScheduler(3600, wall_clock=lambda: clock.wall, monotonic=lambda: clock.mono,
+                              sleep=clock.advance, **kwargs)
+
+    def run_cycles(self, scheduler, clock, durations):
+        starts = []
+
+        def cycle():
+            starts.append(clock.wall)
+            clock.advance(durations[len(starts) - 1])
+        scheduler.run(cycle, max_cycles=len(durations))
+        return starts
+
+    def test_cycles_align_to_boundaries_without_drift(self):
+        clock = FakeClock(wall=7200 + 1234.5)
+        scheduler = self.make_scheduler(clock, offset_seconds=5)
+        starts = self.run_cycles(scheduler, clock, [100, 900, 30])
+        self.assertEqual(starts, [3 * 3600 + 5, 4 * 3600 + 5, 5 * 3600 + 5])
+        self.assertEqual(scheduler.stats["cycles"], 3)
+        self.assertEqual(scheduler.stats["overruns"], 0)
+        self.assertEqual(scheduler.stats["max_duration_seconds"], 900)
+
+    def test_overrun_skips_missed_boundaries(self):
+        clock = FakeClock(wall=3600 - 10)
+        scheduler = self.make_scheduler(clock)
+        starts = self.run_cycles(scheduler, clock, [2.5 * 3600, 10])
+        self.assertEqual(starts, [3600, 4 * 3600])
+        self.assertEqual(scheduler.stats["overruns"], 1)
+        self.assertEqual(scheduler.stats["skipped"], 2)
+
+    def test_overrun_coalesces_into_one_catch_up_cycle(self):
+        clock = FakeClock(wall=3600 - 10)
+        scheduler = self.make_scheduler(clock, overrun_policy="coalesce")
+        starts = self.run_cycles(scheduler, clock, [2.5 * 3600, 10, 10])
+        self.assertEqual(starts, [3600, 3.5 * 3600, 4 * 3600])
+        self.assertEqual(scheduler.stats["coalesced"], 1)
+        self.assertEqual(scheduler.stats["last_lateness_seconds"], 0)
+        self.assertEqual(scheduler.stats["max_lateness_seconds"], 0.5 * 3600)
+
+    def test_from_config_prefers_timeframe(self):
+        scheduler = CycleScheduler.from_config({"cycle_timeframe": "4h", "cycle_interval_minutes": 10,
+                                                "cycle_offset_seconds": 5})
+        self.assertEqual((scheduler.interval, scheduler.offset), (4 * 3600, 5))
+        self.assertEqual(CycleScheduler.from_config({}).interval, 600)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+import os
+import subprocess
+import sys
+
+# Add the parent directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_bot.services import ServiceContainer, lazy_import
+
+class TestServiceContainer(unittest.TestCase):
+    def test_services_are_built_once_on_first_use(self):
+        container = ServiceContainer()
+        built = []
+        container.register("ledger", lambda: built.append(1) or {"equity": 100.0})
+        handle = container.lazy("ledger")
+        self.assertEqual(built, [])
+        self.assertFalse(container.is_loaded("ledger"))
+
+        self.assertEqual(handle.get("equity"), 100.0)
+        self.assertIs(container.get("ledger"), container.get("ledger"))
+        self.assertEqual(built, [1])
+
+        container.override("ledger", {"equity": 5.0})
+        self.assertEqual(handle.get("equity"), 5.0)
+
+    def test_path_factories_and_lazy_imports(self):
+        container = ServiceContainer()
+        container.register("decoder", "json:JSONDecoder")
+        self.assertEqual(container.get("decoder").decode("[1]"), [1])
+        dumps = lazy_import("json", "dumps")
+        self.assertEqual(dumps({"a": 1}), '{"a": 1}')
+        with self.assertRaises(KeyError):
+            container.get("missing")
+
+    def test_orchestrator_import_loads_no_heavy_dependency(self):
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        probe = (
+            "import sys; import trading_bot.orchestrator, trading_bot.execution.matching_engine; "
+            "print('LOADED:' + ','.join(m for m in ('ccxt', 'openai', 'google.generativeai', 'dashscope', 'chromadb', "
+            "'pandas', 'sqlalchemy', 'fastapi') if m in sys.modules))"
+        )
+        result = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, cwd=root)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        loaded = [line for line in result.stdout.splitlines() if line.startswith("LOADED:")]
+        self.assertEqual(loaded, ["LOADED:"])
+
+if __name__ == '__main__':
+    unittest.main()
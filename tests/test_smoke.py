@@ -1,16 +1,27 @@
 import unittest
 import os
 import sys
+import tempfile
 from unittest.mock import MagicMock, patch
 from trading_bot.models.decision import Decision
 
 # Add the parent directory to the python path so we can import the package
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from trading_bot.services import services
+from fakes import use_temp_stores
+
 class TestSmoke(unittest.TestCase):
     def setUp(self):
         # Set the config path to the test config
         os.environ['CONFIG_PATH'] = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'config.test.yaml'))
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.persistence = use_temp_stores(self.tmp_dir.name)
+
+    def tearDown(self):
+        services.reset()
+        self.persistence.engine.dispose()
+        self.tmp_dir.cleanup()
 
     @patch('trading_bot.orchestrator.orchestrator.persistence')
     @patch('trading_bot.orchestrator.orchestrator.ExecutionManager')
@@ -27,12 +38,12 @@ class TestSmoke(unittest.TestCase):
         # Mock the return values
         mock_news_ingestor.fetch_cointelegraph_news.return_value = []
         mock_news_analyzer.process_news.return_value = None
-        mock_rag_store.get_latest_news.return_value = "Mock news context"
+        mock_rag_store.get_relevant_news.return_value = "Mock news context"
         mock_indicators_engine.get_all_indicators.return_value = {}
         
         # Setup new mocks
         mock_market_data_manager = mock_market_data_manager_cls.return_value
-        mock_market_data_manager.get_latest_candles.return_value = []
+        mock_market_data_manager.get_multi_timeframe_candles.return_value = {"1h": [], "4h": [], "1d": []}
         mock_market_data_manager.get_current_quote.return_value = 50000.0
         
         mock_execution_manager = mock_execution_manager_cls.return_value
@@ -61,15 +72,59 @@ class TestSmoke(unittest.TestCase):
         # Verify that the mocks were called
         mock_news_ingestor.fetch_cointelegraph_news.assert_called_once()
         mock_news_analyzer.process_news.assert_called_once()
-        mock_rag_store.get_latest_news.assert_called_once()
+        mock_rag_store.get_relevant_news.assert_called_once()
         mock_decision_engine.decide.assert_called_once()
         mock_indicators_engine.get_all_indicators.assert_called()
         
         # Verify new mocks were called
-        mock_market_data_manager.get_latest_candles.assert_called()
+        mock_market_data_manager.get_multi_timeframe_candles.assert_called_once()
         mock_market_data_manager.get_current_quote.assert_called()
         mock_execution_manager.execute_trade.assert_called_once_with(mock_decision)
         mock_persistence.save.assert_called()
 
+    @patch('trading_bot.orchestrator.orchestrator.config')
+    @patch('trading_bot.orchestrator.orchestrator.persistence')
+    @patch('trading_bot.orchestrator.orchestrator.ExecutionManager')
+    @patch('trading_bot.orchestrator.orchestrator.MarketDataManager')
+    @patch('trading_bot.orchestrator.orchestrator.logger')
+    @patch('trading_bot.orchestrator.orchestrator.indicators_engine')
+    @patch('trading_bot.orchestrator.orchestrator.decision_engine')
+    @patch('trading_bot.orchestrator.orchestrator.rag_store')
+    @patch('trading_bot.orchestrator.orchestrator.news_analyzer')
+    @patch('trading_bot.orchestrator.orchestrator.news_ingestor')
+    def test_orchestrator_multi_symbol_cycle(self, mock_news_ingestor, mock_news_analyzer, mock_rag_store, mock_decision_engine, mock_indicators_engine, mock_logger, mock_market_data_manager_cls, mock_execution_manager_cls, mock_persistence, mock_config):
+        """Test that one cycle trades every symbol, ingests news once and isolates a failing symbol."""
+        mock_config.get_trading_config.return_value = {"symbols": ["BTC/USDT", "ETH/USDT", "SOL/USDT"], "max_workers": 2}
+        mock_config.get_journal_config.return_value = {}
+        mock_config.get_backtesting_config.return_value = {}
+        mock_news_ingestor.fetch_cointelegraph_news.return_value = []
+        mock_indicators_engine.get_all_indicators.return_value = {}
+        mock_market_data_manager = mock_market_data_manager_cls.return_value
+        mock_market_data_manager.get_multi_timeframe_candles.return_value = {"1h": [], "4h": [], "1d": []}
+
+        def get_current_quote(symbol):
+            if symbol == "ETH/USDT":
+                raise RuntimeError("exchange unavailable")
+            return {"symbol": symbol, "last": 100.0}
+        mock_market_data_manager.get_current_quote.side_effect = get_current_quote
+        mock_decision_engine.decide.side_effect = lambda context: Decision(
+            action="HOLD", symbol=context["symbol"], size=0.0, confidence=0.0, reason="Mock decision"
+        )
+
+        from trading_bot.orchestrator.orchestrator import Orchestrator
+        orchestrator = Orchestrator(backtesting=True)
+        orchestrator.run()
+
+        mock_news_ingestor.fetch_cointelegraph_news.assert_called_once()
+        mock_news_analyzer.process_news.assert_called_once()
+        traded = sorted(call.args[0].symbol for call in mock_execution_manager_cls.return_value.execute_trade.call_args_list)
+        self.assertEqual(traded, ["BTC/USDT", "SOL/USDT"])
+        cycle, timings, _ = mock_persistence.save_cycle.call_args.args
+        self.assertEqual(cycle.status, "completed")
+        self.assertIn("ETH/USDT", cycle.logs)
+        skipped = {(t["symbol"], t["stage"]) for t in timings if t["status"] == "skipped"}
+        self.assertIn(("ETH/USDT", "decision"), skipped)
+        self.assertNotIn(("BTC/USDT", "decision"), skipped)
+
 if __name__ == '__main__':
     unittest.main()
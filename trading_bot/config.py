@@ -54,4 +54,40 @@ class Config:
         """Get the risk management settings."""
         return self.config.get('risk_management', {})
 
+    def get_portfolio_config(self) -> Dict[str, Any]:
+        """Get the position ledger settings."""
+        return self.config.get('portfolio', {})
+
+    def get_backtesting_config(self) -> Dict[str, Any]:
+        """Get the backtest's replayed range and simulated exchange (fees, liquidity and latency) settings."""
+        return self.config.get('backtesting', {})
+
+    def get_decision_engine_config(self) -> Dict[str, Any]:
+        """Get the decision engine selection and the rule-based pre-filter settings."""
+        return self.config.get('decision_engine', {})
+
+    def get_market_data_config(self) -> Dict[str, Any]:
+        """Get the market data (local candle store) settings."""
+        return self.config.get('market_data', {})
+
+    def get_rag_store_config(self) -> Dict[str, Any]:
+        """Get the RAG store (vector database and embedding model) settings."""
+        return self.config.get('rag_store', {})
+
+    def get_journal_config(self) -> Dict[str, Any]:
+        """Get the cycle journal (context, LLM transcript and decision of each cycle) settings."""
+        return self.config.get('journal', {})
+
+    def get_llm_resilience_config(self) -> Dict[str, Any]:
+        """Get the LLM request timeout, circuit breaker and hedging settings."""
+        return self.config.get('llm_resilience', {})
+
+    def get_llm_budget_config(self) -> Dict[str, Any]:
+        """Get the LLM model prices and the per-cycle and per-day token and cost budgets."""
+        return self.config.get('llm_budget', {})
+
+    def get_llm_stub_config(self) -> Dict[str, Any]:
+        """Get the local stub LLM server (address, latency and fault injection) settings."""
+        return self.config.get('llm_stub', {})
+
 config = Config()
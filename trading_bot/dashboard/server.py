@@ -4,9 +4,10 @@ import uvicorn
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 import logging
+from trading_bot.market_data.candle_store import CandleArray
 
 # Configure logging
 logger = logging.getLogger("Dashboard")
@@ -57,7 +58,8 @@ class DashboardServer:
                         "price": t.price,
                         "status": t.status,
                         "time": t.completed_at.isoformat() if t.completed_at else None,
-                        "profit": 0 # Placeholder, logic to calculate profit needed if applicable
+                        # Realized P&L of the fill, recorded when the ledger applied it.
+                        "profit": t.realized_pnl or 0
                     })
                 
                 # Fetch recent logs/cycles
@@ -79,12 +81,14 @@ class DashboardServer:
                 session.close()
 
         @self.app.get("/api/market_data")
-        async def get_market_data():
-            # Get latest candles for the active symbol
-            symbol = self.orchestrator.trading_config.get("symbol", "BTC/USDT")
+        async def get_market_data(symbol: str = None):
+            # Get latest candles for the requested symbol, by default the first traded one
+            symbol = symbol or self.orchestrator.symbols[0]
             timeframe = "1h" # Default timeframe for chart
             try:
                 candles = self.orchestrator.market_data_manager.get_latest_candles(symbol, timeframe, limit=100)
+                if isinstance(candles, CandleArray):
+                    candles = candles.tolist()
                 
                 # Check if it's a list (from ccxt or simulator)
                 if isinstance(candles, list):
@@ -124,6 +128,7 @@ class DashboardServer:
         @self.app.get("/api/status")
         async def get_status():
             try:
+                # Served from the in-memory balance cache, never from the exchange.
                 balance = self.orchestrator.execution_manager.get_balance()
                 # Extract relevant balance info (e.g., USDT free/total)
                 # Structure depends on CCXT response
@@ -141,12 +146,47 @@ class DashboardServer:
                         "total": total_balance,
                         "free": free_balance
                     },
-                    "status": current_status
+                    "status": current_status,
+                    # Cycle lateness, durations and overruns.
+                    "scheduler": self.orchestrator.scheduler.stats,
                 }
             except Exception as e:
                 logger.error(f"Error fetching status: {e}")
                 return {}
 
+        @self.app.get("/api/positions")
+        async def get_positions():
+            from trading_bot.portfolio.position_ledger import position_ledger
+            try:
+                return position_ledger.get_snapshot()
+            except Exception as e:
+                logger.error(f"Error fetching positions: {e}")
+                return {}
+
+        @self.app.get("/metrics")
+        async def get_metrics():
+            from trading_bot.metrics.registry import metrics
+            return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+        @self.app.get("/api/llm_usage")
+        async def get_llm_usage(cycles: int = 20):
+            from trading_bot.decision_engine.llm_budget import llm_budget
+            from trading_bot.persistence.sqlite_persistence import persistence
+            try:
+                return {**llm_budget.snapshot(), "cycles": persistence.get_llm_usage_by_cycle(cycles)}
+            except Exception as e:
+                logger.error(f"Error fetching LLM usage: {e}")
+                return {}
+
+        @self.app.get("/api/news_store")
+        async def get_news_store():
+            from trading_bot.rag_store.retention import news_retention
+            try:
+                return news_retention.get_stats()
+            except Exception as e:
+                logger.error(f"Error fetching news store stats: {e}")
+                return {}
+
     def run(self):
         self.server_thread = threading.Thread(target=self._run_server, daemon=True)
         self.server_thread.start()
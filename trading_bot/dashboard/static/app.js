@@ -78,6 +78,16 @@ async function fetchStatus() {
     }
 }
 
+async function fetchLLMUsage() {
+    try {
+        const response = await fetch('/api/llm_usage');
+        const data = await response.json();
+        updateLLMUsageUI(data);
+    } catch (error) {
+        console.error('Error fetching LLM usage:', error);
+    }
+}
+
 // UI Updates
 function updateHistoryUI(data) {
     const container = document.getElementById('history-content');
@@ -118,6 +128,16 @@ function updateStatusUI(data) {
     }
 }
 
+function updateLLMUsageUI(data) {
+    if (!data.today) return;
+    const today = data.today;
+    const tokens = new Intl.NumberFormat('en-US').format(today.tokens);
+    document.getElementById('llm-tokens-today').innerText =
+        today.token_limit ? `${tokens} / ${new Intl.NumberFormat('en-US').format(today.token_limit)}` : tokens;
+    document.getElementById('llm-cost-today').innerText =
+        today.cost_limit ? `${formatCurrency(today.cost)} / ${formatCurrency(today.cost_limit)}` : formatCurrency(today.cost);
+}
+
 function formatCurrency(value) {
     if (value === undefined || value === null) return '--';
     return new Intl.NumberFormat('en-US', { style: 'currency', currency: 'USD' }).format(value);
@@ -127,7 +147,9 @@ function formatCurrency(value) {
 fetchMarketData(); // Fetch once initially heavy data
 fetchHistory();
 fetchStatus();
+fetchLLMUsage();
 
 setInterval(fetchHistory, 5000);
 setInterval(fetchStatus, 2000);
+setInterval(fetchLLMUsage, 10000);
 setInterval(fetchMarketData, 60000); // Update chart every minute
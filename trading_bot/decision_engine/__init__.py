@@ -1,2 +1,8 @@
 # trading_bot/decision_engine/__init__.py
-from .llm_decision_engine import LLMDecisionEngine
+from trading_bot.services import lazy_exports
+
+__all__ = ['LLMDecisionEngine', 'RuleBasedDecisionEngine']
+__getattr__ = lazy_exports(__name__, {
+    "LLMDecisionEngine": ".llm_decision_engine",
+    "RuleBasedDecisionEngine": ".rule_based_decision_engine",
+})
@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+import numpy as np
+from trading_bot.metrics.registry import metrics
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """
+    Tracks the health of an LLM provider and stops calling it while it is failing or too slow.
+
+    The health score is the moving average of the call successes, scaled
+    down by how far the moving average latency exceeds latency_budget.
+    The breaker opens after failure_threshold consecutive failures, or
+    when the health drops under min_health once min_calls calls were
+    made. After recovery_seconds it lets a single probe call through
+    (half-open): the breaker closes again if the probe succeeds and stays
+    open for another recovery_seconds if it fails.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, recovery_seconds: float = 120.0,
+                 latency_budget: Optional[float] = None, min_health: float = 0.3, min_calls: int = 5,
+                 window: int = 50, smoothing: float = 0.2, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the CircuitBreaker.
+
+        Args:
+            name: The provider, used as the metrics label.
+            failure_threshold: The consecutive failures that open the breaker.
+            recovery_seconds: How long the breaker stays open before a probe call.
+            latency_budget: The latency in seconds above which the health score decreases; None ignores latency.
+            min_health: The health score under which the breaker opens.
+            min_calls: The calls to observe before opening on the health score.
+            window: The number of latencies kept for the percentiles.
+            smoothing: The weight of the latest call in the moving averages.
+            clock: The monotonic time source, in seconds.
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.latency_budget = latency_budget
+        self.min_health = min_health
+        self.min_calls = min_calls
+        self.smoothing = smoothing
+        self.clock = clock
+        self.state = CLOSED
+        self.calls = 0
+        self.consecutive_failures = 0
+        self.success_rate = 1.0
+        self.mean_latency: Optional[float] = None
+        self.latencies = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def health(self) -> float:
+        """The health score, from 0 (failing) to 1 (succeeding within the latency budget)."""
+        if self.latency_budget and self.mean_latency and self.mean_latency > self.latency_budget:
+            return self.success_rate * self.latency_budget / self.mean_latency
+        return self.success_rate
+
+    def p95(self) -> Optional[float]:
+        """The 95th percentile latency of the recent calls, or None before min_calls calls."""
+        with self._lock:
+            if len(self.latencies) < self.min_calls:
+                return None
+            return float(np.percentile(self.latencies, 95))
+
+    def allow(self) -> bool:
+        """Whether a call may be made now; takes the probe slot when the breaker is due for one."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self.clock() - self._opened_at >= self.recovery_seconds:
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record(self, latency: float, success: bool):
+        """
+        Record the outcome of a call.
+
+        Args:
+            latency: The call's duration in seconds.
+            success: Whether the provider answered.
+        """
+        with self._lock:
+            self.calls += 1
+            self.latencies.append(latency)
+            self.success_rate += self.smoothing * (float(success) - self.success_rate)
+            self.mean_latency = latency if self.mean_latency is None else \
+                self.mean_latency + self.smoothing * (latency - self.mean_latency)
+            self.consecutive_failures = 0 if success else self.consecutive_failures + 1
+
+            if self.state == HALF_OPEN:
+                self._probing = False
+                if success:
+                    # Give the recovered provider a fresh start, or its old failures would reopen it at once.
+                    self.success_rate = max(self.success_rate, 1.0 - self.smoothing)
+                    self._set_state(CLOSED)
+                else:
+                    self._open()
+            elif self.state == CLOSED and (self.consecutive_failures >= self.failure_threshold
+                                           or (self.calls >= self.min_calls and self.health < self.min_health)):
+                self._open()
+            metrics.set("llm_provider_health", self.health, provider=self.name)
+
+    def _open(self):
+        self._opened_at = self.clock()
+        self._set_state(OPEN)
+        metrics.inc("llm_circuit_opened_total", provider=self.name)
+
+    def _set_state(self, state: str):
+        self.state = state
+        metrics.set("llm_circuit_state", STATE_VALUES[state], provider=self.name)
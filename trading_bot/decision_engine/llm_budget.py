@@ -0,0 +1,241 @@
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from trading_bot.config import config
+from trading_bot.logging.logger import logger
+from trading_bot.metrics.registry import metrics
+from trading_bot.services import services
+
+# The completion tokens expected from a provider before any of its replies was seen.
+DEFAULT_COMPLETION_TOKENS = 300
+# USD per million tokens charged for a model without a price or a "default" one: on the expensive side,
+# so an unpriced model cannot slip past a cost budget.
+UNPRICED_PRICE = {"prompt": 15.0, "completion": 60.0}
+
+
+def estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Approximate the prompt tokens of a conversation: about four characters per token."""
+    return sum(len(str(message.get("content", ""))) for message in messages) // 4 + 1
+
+
+class LLMBudget:
+    """
+    Accounts the tokens and cost of the LLM debates and enforces per-cycle and per-day budgets.
+
+    Each completion's usage is recorded with its provider, model, symbol
+    and debate round, priced from a per-model table, and kept for the
+    cycle's save. Before each debate round the engine reserves the
+    round's estimated tokens and cost: every round resends the whole
+    conversation, so its prompt tokens grow with each reply. Reservations
+    count against the budgets until the round's usage is recorded, so
+    symbols debating concurrently cannot all pass the check before any
+    of them spends. When a round does not fit, the engine stops debating
+    after min_rounds, debates with fewer participants, or reuses a recent
+    decision instead of overspending.
+    """
+
+    def __init__(self, prices: Optional[Dict[str, Dict[str, float]]] = None, cycle_tokens: Optional[int] = None,
+                 cycle_cost: Optional[float] = None, daily_tokens: Optional[int] = None,
+                 daily_cost: Optional[float] = None, min_rounds: int = 1, cache_seconds: float = 900.0,
+                 daily_usage_loader: Optional[Callable[[datetime], Dict[str, float]]] = None,
+                 clock: Callable[[], datetime] = datetime.now):
+        """
+        Initialize the LLMBudget.
+
+        Args:
+            prices: USD per million tokens by model name, as {"prompt": ..., "completion": ...};
+                "default" prices unlisted models. Without one, unlisted models are charged UNPRICED_PRICE.
+            cycle_tokens: The tokens a cycle may spend, or None for no limit.
+            cycle_cost: The USD a cycle may spend, or None for no limit.
+            daily_tokens: The tokens a day may spend, or None for no limit.
+            daily_cost: The USD a day may spend, or None for no limit.
+            min_rounds: The debate rounds to complete before dropping participants to save budget.
+            cache_seconds: How old a symbol's last decision may be to be reused when the budget is exhausted.
+            daily_usage_loader: Returns the {"tokens", "cost"} spent since a time, so a restart keeps the day's spend.
+            clock: The time source.
+        """
+        self.prices = prices or {}
+        self.cycle_tokens = cycle_tokens
+        self.cycle_cost = cycle_cost
+        self.daily_tokens = daily_tokens
+        self.daily_cost = daily_cost
+        self.min_rounds = min_rounds
+        self.cache_seconds = cache_seconds
+        self.daily_usage_loader = daily_usage_loader
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._cycle = {"tokens": 0, "cost": 0.0}
+        self._day: Dict[str, Any] = {"date": None, "tokens": 0, "cost": 0.0}
+        self._records: List[Dict[str, Any]] = []
+        self._completion_tokens: Dict[str, float] = {}
+        self._reserved = {"tokens": 0.0, "cost": 0.0}
+        self._unpriced: set = set()
+
+    def price(self, model: str, prompt_tokens: float, completion_tokens: float) -> float:
+        """The USD cost of a completion."""
+        price = self.prices.get(model) or self.prices.get("default")
+        if price is None:
+            if model not in self._unpriced:
+                self._unpriced.add(model)
+                logger.warning(f"No price configured for LLM model {model}; charging it {UNPRICED_PRICE} "
+                               f"USD per million tokens. Add it or a 'default' entry to llm_budget.prices.")
+            price = UNPRICED_PRICE
+        return (prompt_tokens * price.get("prompt", 0.0) + completion_tokens * price.get("completion", 0.0)) / 1e6
+
+    def expected_completion_tokens(self, provider: str) -> float:
+        """The moving average of a provider's completion tokens."""
+        return self._completion_tokens.get(provider, DEFAULT_COMPLETION_TOKENS)
+
+    def _today(self) -> Dict[str, Any]:
+        """The day's spend, loaded from the persisted usage on the first use of a day."""
+        now = self.clock()
+        if self._day["date"] != now.date():
+            spent = {"tokens": 0, "cost": 0.0}
+            if self.daily_usage_loader is not None:
+                try:
+                    spent = self.daily_usage_loader(datetime.combine(now.date(), datetime.min.time()))
+                except Exception as e:
+                    logger.warning(f"Could not load today's LLM usage: {e}")
+            self._day = {"date": now.date(), "tokens": spent.get("tokens") or 0, "cost": spent.get("cost") or 0.0}
+        return self._day
+
+    def start_cycle(self):
+        """Start accounting a new cycle."""
+        with self._lock:
+            self._cycle = {"tokens": 0, "cost": 0.0}
+            self._records = []
+
+    def end_cycle(self) -> List[Dict[str, Any]]:
+        """End the cycle. Returns its usage records, as dicts with LLMUsage columns without cycle_id."""
+        with self._lock:
+            records, self._records = self._records, []
+        return records
+
+    def record(self, provider: str, model: str, prompt_tokens: int, completion_tokens: int,
+               symbol: Optional[str] = None, debate_round: Optional[int] = None,
+               reservation: Optional[Dict[str, float]] = None) -> float:
+        """
+        Record the usage of a completion.
+
+        Args:
+            provider: The debate provider, "openai", "gemini" or "qwen".
+            model: The model that answered, for its price.
+            prompt_tokens: The prompt tokens reported.
+            completion_tokens: The completion tokens reported.
+            symbol: The symbol debated.
+            debate_round: The debate round, from 1.
+            reservation: The round's reservation, which the usage is settled against.
+
+        Returns:
+            The completion's USD cost.
+        """
+        cost = self.price(model, prompt_tokens, completion_tokens)
+        tokens = prompt_tokens + completion_tokens
+        with self._lock:
+            if reservation is not None:
+                # The spent amount replaces as much of the reservation as it covers.
+                for key, amount in (("tokens", tokens), ("cost", cost)):
+                    settled = min(amount, reservation[key])
+                    reservation[key] -= settled
+                    self._reserved[key] -= settled
+            day = self._today()
+            for totals in (self._cycle, day):
+                totals["tokens"] += tokens
+                totals["cost"] += cost
+            mean = self._completion_tokens.get(provider)
+            self._completion_tokens[provider] = completion_tokens if mean is None else \
+                mean + 0.2 * (completion_tokens - mean)
+            self._records.append({
+                "timestamp": self.clock(),
+                "symbol": symbol,
+                "provider": provider,
+                "model": model,
+                "round": debate_round,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "cost": cost,
+            })
+        if cost:
+            metrics.inc("llm_cost_usd_total", cost, provider=provider)
+        return cost
+
+    def reserve(self, tokens: float, cost: float) -> Optional[Dict[str, float]]:
+        """
+        Reserve tokens and cost if they fit the cycle and day budgets, on top of the spent and reserved ones.
+
+        Returns:
+            The reservation, to pass to record() and release(), or None if it does not fit.
+        """
+        with self._lock:
+            day = self._today()
+            reserved_tokens, reserved_cost = self._reserved["tokens"], self._reserved["cost"]
+            limits = ((self.cycle_tokens, self._cycle["tokens"] + reserved_tokens, tokens),
+                      (self.cycle_cost, self._cycle["cost"] + reserved_cost, cost),
+                      (self.daily_tokens, day["tokens"] + reserved_tokens, tokens),
+                      (self.daily_cost, day["cost"] + reserved_cost, cost))
+            if not all(limit is None or spent + amount <= limit for limit, spent, amount in limits):
+                return None
+            self._reserved["tokens"] += tokens
+            self._reserved["cost"] += cost
+            return {"tokens": tokens, "cost": cost}
+
+    def release(self, reservation: Optional[Dict[str, float]]):
+        """Release what is left of a reservation once its round is over, or failed."""
+        if reservation is None:
+            return
+        with self._lock:
+            for key in ("tokens", "cost"):
+                self._reserved[key] -= reservation[key]
+                reservation[key] = 0.0
+
+    def round_estimate(self, participants: List[Tuple[str, str]], prompt_tokens: int) -> Tuple[float, float]:
+        """
+        Estimate the tokens and cost of a debate round.
+
+        Args:
+            participants: The (provider, model) pairs answering in turn.
+            prompt_tokens: The tokens of the conversation so far, resent to each of them.
+
+        Returns:
+            The (tokens, cost) of the round, each reply lengthening the next participants' prompts.
+        """
+        tokens, cost = 0.0, 0.0
+        for provider, model in participants:
+            completion = self.expected_completion_tokens(provider)
+            tokens += prompt_tokens + completion
+            cost += self.price(model, prompt_tokens, completion)
+            prompt_tokens += completion
+        return tokens, cost
+
+    def snapshot(self) -> Dict[str, Any]:
+        """The spend of the current cycle and day, with their limits."""
+        with self._lock:
+            day = self._today()
+            return {
+                "cycle": {"tokens": self._cycle["tokens"], "cost": self._cycle["cost"],
+                          "token_limit": self.cycle_tokens, "cost_limit": self.cycle_cost},
+                "today": {"tokens": day["tokens"], "cost": day["cost"],
+                          "token_limit": self.daily_tokens, "cost_limit": self.daily_cost},
+            }
+
+
+def create_llm_budget() -> LLMBudget:
+    """Create the shared LLMBudget from the llm_budget config section."""
+    budget_config = config.get_llm_budget_config()
+
+    def load_daily_usage(since: datetime) -> Dict[str, float]:
+        return services.get("persistence").get_llm_usage_totals(since)
+
+    return LLMBudget(
+        prices=budget_config.get("prices"),
+        cycle_tokens=budget_config.get("cycle_tokens"),
+        cycle_cost=budget_config.get("cycle_cost"),
+        daily_tokens=budget_config.get("daily_tokens"),
+        daily_cost=budget_config.get("daily_cost"),
+        min_rounds=budget_config.get("min_rounds", 1),
+        cache_seconds=budget_config.get("cache_seconds", 900.0),
+        daily_usage_loader=load_daily_usage,
+    )
+
+# The global LLM budget instance, created on first use
+llm_budget = services.lazy("llm_budget")
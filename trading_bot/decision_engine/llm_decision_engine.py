@@ -1,12 +1,25 @@
-import openai
-import google.generativeai as genai
-from dashscope import Generation
 from trading_bot.config import config
+from trading_bot.services import lazy_import, services
 from trading_bot.interfaces import DecisionEngine as DecisionEngineInterface
+from trading_bot.metrics.registry import metrics
 from trading_bot.models import Decision
-from typing import Dict, Any, List
+from trading_bot.decision_engine.circuit_breaker import CircuitBreaker
+from trading_bot.decision_engine.llm_budget import estimate_tokens
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import replace
+from typing import Callable, Dict, Any, List, Optional
 import json
 import re
+import threading
+import time
+
+# Provider SDKs are imported on first use: a deployment only loads the ones its providers need.
+openai = lazy_import("openai")
+genai = lazy_import("google.generativeai")
+Generation = lazy_import("dashscope", "Generation")
+
+class ErrorReply(str):
+    """The stand-in WAIT reply of a participant whose provider failed; tells failures from answers."""
 
 class LLMDecisionEngine(DecisionEngineInterface):
     """Makes trading decisions using a multi-LLM debate."""
@@ -14,6 +27,8 @@ class LLMDecisionEngine(DecisionEngineInterface):
     def __init__(self):
         """Initialize the DecisionEngine and the LLM clients based on the config."""
         self.provider = config.get_llm_provider()
+        # Symbols decide concurrently on one engine, so each thread keeps its own last transcript.
+        self._local = threading.local()
         llm_config_obj = config.get_llm_config()
         if isinstance(llm_config_obj, list):
              self.llm_config = {cfg['provider']: cfg for cfg in llm_config_obj}
@@ -26,6 +41,37 @@ class LLMDecisionEngine(DecisionEngineInterface):
         self.openai_model_name = self.llm_config.get("openai", {}).get("model_name")
         self.gemini_model_name = self.llm_config.get("gemini", {}).get("model_name")
         self.qwen_model_name = self.llm_config.get("qwen", {}).get("model_name")
+        self.model_names = {"openai": self.openai_model_name or "gpt-3.5-turbo",
+                            "gemini": self.gemini_model_name or "gemini-pro",
+                            "qwen": self.qwen_model_name or "qwen-turbo"}
+
+        # Token and cost accounting, and the last decision of each symbol to fall back on over budget
+        self.budget = services.get("llm_budget")
+        self._last_decisions: Dict[str, tuple] = {}
+        self._last_decisions_lock = threading.Lock()
+
+        # Provider resilience: bounded requests, a circuit breaker per provider and optional hedging
+        resilience = config.get_llm_resilience_config()
+        client_options = {key: resilience[name] for key, name in (("timeout", "request_timeout"),
+                                                                  ("max_retries", "max_retries"))
+                          if resilience.get(name) is not None}
+        self.breakers = {
+            provider: CircuitBreaker(
+                provider,
+                failure_threshold=resilience.get("failure_threshold", 3),
+                recovery_seconds=resilience.get("recovery_seconds", 120.0),
+                latency_budget=resilience.get("latency_budget"),
+                min_health=resilience.get("min_health", 0.3),
+                min_calls=resilience.get("min_calls", 5),
+            )
+            for provider in ("openai", "gemini", "qwen")
+        }
+        self.fallback_model_names = {provider: self.llm_config.get(provider, {}).get("fallback_model_name")
+                                     for provider in self.breakers}
+        self.hedge_after = resilience.get("hedge_after")
+        self._hedge_executor = ThreadPoolExecutor(max_workers=resilience.get("hedge_workers", 6),
+                                                  thread_name_prefix="llm-hedge") \
+            if resilience.get("hedge") else None
 
         # Initialize LLM 1 (OpenAI Role)
         # Supports: Native (OpenAI), OpenRouter (OpenAI-compatible)
@@ -38,7 +84,8 @@ class LLMDecisionEngine(DecisionEngineInterface):
             
             self.llm_1 = openai.OpenAI(
                 base_url=base_url,
-                api_key=openai_api_key
+                api_key=openai_api_key,
+                **client_options
             )
         else:
             print("Warning: OpenAI API key not found. LLM 1 will not work.")
@@ -58,13 +105,15 @@ class LLMDecisionEngine(DecisionEngineInterface):
                  base_url = endpoint or "https://openrouter.ai/api/v1"
                  self.llm_2 = openai.OpenAI(
                     base_url=base_url,
-                    api_key=gemini_api_key
+                    api_key=gemini_api_key,
+                    **client_options
                 )
             elif endpoint:
                 # User provided specific endpoint (e.g. local or proxy), treat as OpenAI compatible
                 self.llm_2 = openai.OpenAI(
                     base_url=endpoint,
-                    api_key=gemini_api_key
+                    api_key=gemini_api_key,
+                    **client_options
                 )
             else:
                 # Native or native_llms without endpoint -> Use Google GenAI
@@ -86,12 +135,14 @@ class LLMDecisionEngine(DecisionEngineInterface):
                  base_url = endpoint or "https://openrouter.ai/api/v1"
                  self.llm_3 = openai.OpenAI(
                     base_url=base_url,
-                    api_key=self.qwen_api_key
+                    api_key=self.qwen_api_key,
+                    **client_options
                 )
             elif endpoint:
                  self.llm_3 = openai.OpenAI(
                     base_url=endpoint,
-                    api_key=self.qwen_api_key
+                    api_key=self.qwen_api_key,
+                    **client_options
                 )
             # Else falls back to self.qwen_api_key usage in _get_qwen_response for native dashscope
         else:
@@ -116,23 +167,150 @@ class LLMDecisionEngine(DecisionEngineInterface):
         conversation_history = [{"role": "system", "content": system_instruction},
                                 {"role": "user", "content": initial_prompt}]
 
-        for _ in range(3): # 3 rounds of debate
-            openai_response = self._get_openai_response(conversation_history)
-            conversation_history.append({"role": "assistant", "name": "OpenAI", "content": openai_response})
+        symbol = context.get("symbol", "BTC/USDT")
+        debate = self._local.debate = {"symbol": symbol, "round": 0}
+        participants = (("openai", "OpenAI", self._get_openai_response),
+                        ("gemini", "Gemini", self._get_gemini_response),
+                        ("qwen", "Qwen", self._get_qwen_response))
+        skipped = set()
+        for debate_round in range(1, 4): # 3 rounds of debate
+            debate["round"] = debate_round
+            active = [participant for participant in participants if participant[0] not in skipped]
+            # Every round resends the whole conversation: only debate on within the budget.
+            affordable, reservation = self._reserve_round(active, conversation_history)
+            if len(affordable) < len(active) and (debate_round > self.budget.min_rounds or not affordable):
+                self.budget.release(reservation)
+                if debate_round == 1:
+                    return self._budget_fallback(symbol)
+                metrics.inc("llm_budget_degradations_total", mode="fewer_rounds")
+                break
+            if len(affordable) < len(active):
+                metrics.inc("llm_budget_degradations_total", mode="fewer_participants")
+                skipped.update(provider for provider, _, _ in active[len(affordable):])
+                active = affordable
+            debate["reservation"] = reservation
+            try:
+                self._debate_round(active, skipped, conversation_history)
+            finally:
+                debate["reservation"] = None
+                self.budget.release(reservation)
+
+        self._local.transcript = conversation_history
+        final_decision = self._parse_final_decision(conversation_history, symbol)
+        if not final_decision.reason.startswith("Failed to parse"):
+            with self._last_decisions_lock:
+                self._last_decisions[symbol] = (time.monotonic(), final_decision)
+        return final_decision
 
-            gemini_response = self._get_gemini_response(conversation_history)
-            conversation_history.append({"role": "assistant", "name": "Gemini", "content": gemini_response})
+    def _debate_round(self, participants: List[tuple], skipped: set, history: List[Dict]):
+        """Let each participant answer in turn, appending the replies to the conversation."""
+        for provider, name, get_response in participants:
+            # A participant whose breaker is open sits out the rest of the debate.
+            if provider in skipped or not self.breakers[provider].allow():
+                if provider not in skipped:
+                    skipped.add(provider)
+                    metrics.inc("llm_participants_skipped_total", provider=provider)
+                continue
+            with metrics.time("llm_request_seconds", provider=provider):
+                response = self._ask(provider, get_response, history)
+            history.append({"role": "assistant", "name": name, "content": response})
 
-            qwen_response = self._get_qwen_response(conversation_history)
-            conversation_history.append({"role": "assistant", "name": "Qwen", "content": qwen_response})
+    def _reserve_round(self, participants: List[tuple], history: List[Dict]) -> tuple:
+        """
+        Reserve the budget of the next round for the most participants, in speaking order, that fit.
 
-        final_decision = self._parse_final_decision(conversation_history)
-        return final_decision
+        Returns:
+            The participants and their round's reservation, or ([], None) if not even one fits.
+        """
+        prompt_tokens = estimate_tokens(history)
+        for count in range(len(participants), 0, -1):
+            tokens, cost = self.budget.round_estimate(
+                [(provider, self.model_names[provider]) for provider, _, _ in participants[:count]], prompt_tokens)
+            reservation = self.budget.reserve(tokens, cost)
+            if reservation is not None:
+                return participants[:count], reservation
+        return [], None
+
+    def _budget_fallback(self, symbol: str) -> Decision:
+        """Without the budget for a debate, reuse the symbol's last decision while recent, or wait."""
+        with self._last_decisions_lock:
+            decided_at, last_decision = self._last_decisions.get(symbol, (None, None))
+        age = time.monotonic() - decided_at if decided_at is not None else None
+        if age is not None and age <= self.budget.cache_seconds:
+            metrics.inc("llm_budget_degradations_total", mode="cached")
+            decision = replace(last_decision, reason=f"LLM budget exhausted; reusing the decision of {age:.0f}s ago: "
+                                                     f"{last_decision.reason}")
+        else:
+            metrics.inc("llm_budget_degradations_total", mode="exhausted")
+            decision = Decision(action="WAIT", symbol=symbol, size=0.0, confidence=0.0,
+                                reason="LLM budget exhausted and no recent decision to reuse.")
+        self._local.transcript = [{"role": "assistant", "name": "Budget", "content": decision.reason}]
+        return decision
+
+    def _ask(self, provider: str, get_response: Callable[..., str], history: List[Dict]) -> str:
+        """
+        Get a participant's response, recording its outcome in the provider's circuit breaker.
+
+        With hedging enabled and a fallback model configured, a duplicate
+        request goes to the fallback model once the primary one has taken
+        longer than hedge_after (by default the provider's p95 latency),
+        and the first answer wins. The primary request still completes in
+        the background and is recorded in the breaker.
+
+        Args:
+            provider: The provider, "openai", "gemini" or "qwen".
+            get_response: The participant's response method.
+            history: The conversation so far.
+        """
+        breaker = self.breakers[provider]
+        # Usage is accounted to the debate (symbol and round) from whichever thread makes the request.
+        debate = getattr(self._local, "debate", None)
+
+        def timed_response() -> str:
+            self._local.debate = debate
+            start = time.monotonic()
+            response = get_response(history)
+            breaker.record(time.monotonic() - start, not isinstance(response, ErrorReply))
+            return response
+
+        fallback_model_name = self.fallback_model_names.get(provider)
+        hedge_after = self.hedge_after or breaker.p95()
+        if self._hedge_executor is None or not fallback_model_name or not hedge_after:
+            return timed_response()
+
+        # The conversation keeps growing while an abandoned request is still running.
+        history = list(history)
+        primary = self._hedge_executor.submit(timed_response)
+        done, _ = wait([primary], timeout=hedge_after)
+        if done:
+            return primary.result()
+        metrics.inc("llm_hedged_requests_total", provider=provider)
+        def hedged_response() -> str:
+            self._local.debate = debate
+            return get_response(history, fallback_model_name)
+
+        hedge = self._hedge_executor.submit(hedged_response)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if not isinstance(future.result(), ErrorReply):
+                    if future is hedge:
+                        metrics.inc("llm_hedge_wins_total", provider=provider)
+                    return future.result()
+        return primary.result()
+
+    @property
+    def last_transcript(self) -> Optional[List[Dict[str, str]]]:
+        """The debate of the last decide() call made on the current thread, or None."""
+        return getattr(self._local, "transcript", None)
 
     def _build_initial_prompt(self, context: Dict[str, Any]) -> str:
         """Build the initial prompt for the LLM debate."""
         news_str = "\n".join([f"- {n.get('title')}: {n.get('summary')}" for n in context.get("news", [])])
         return f"""
+        Symbol: {context.get("symbol", "BTC/USDT")}
+
         Market Data:
         - Ticker: {context.get("ticker")}
         - Indicators: {context.get("indicators")}
@@ -174,14 +352,14 @@ class LLMDecisionEngine(DecisionEngineInterface):
             }
         }
 
-    def _get_openai_response(self, history: List[Dict]) -> str:
-        """Get a response from the OpenAI model."""
+    def _get_openai_response(self, history: List[Dict], model_name: Optional[str] = None) -> str:
+        """Get a response from the OpenAI model, or from model_name when given (e.g. a hedging fallback)."""
         try:
             if not self.llm_1:
-                return '{"Decision": "WAIT", "Rating": 1, "Thinking": "Error: OpenAI client not initialized."}'
+                return ErrorReply('{"Decision": "WAIT", "Rating": 1, "Thinking": "Error: OpenAI client not initialized."}')
                 
             messages = [{"role": msg["role"], "content": msg["content"]} for msg in history]
-            model_name = self.openai_model_name or "gpt-3.5-turbo"
+            model_name = model_name or self.openai_model_name or "gpt-3.5-turbo"
 
             # Try to use structured outputs if possible, blindly passing the param
             # If it fails (e.g. model doesn't support it), we might want a fallback, 
@@ -203,16 +381,18 @@ class LLMDecisionEngine(DecisionEngineInterface):
                     response_format={"type": "json_object"}
                 )
 
+            self._record_usage("openai", response)
             return response.choices[0].message.content
         except Exception as e:
-            return f'{{"Decision": "WAIT", "Rating": 1, "Thinking": "Error from OpenAI: {e}"}}'
+            metrics.inc("llm_request_errors_total", provider="openai")
+            return ErrorReply(f'{{"Decision": "WAIT", "Rating": 1, "Thinking": "Error from OpenAI: {e}"}}')
 
-    def _get_gemini_response(self, history: List[Dict]) -> str:
-        """Get a response from the Gemini model."""
+    def _get_gemini_response(self, history: List[Dict], model_name: Optional[str] = None) -> str:
+        """Get a response from the Gemini model, or from model_name when given (e.g. a hedging fallback)."""
         try:
             if self.llm_2: # OpenAI Compatible
                 messages = [{"role": msg["role"], "content": msg["content"]} for msg in history]
-                model_name = self.gemini_model_name or "gemini-pro"
+                model_name = model_name or self.gemini_model_name or "gemini-pro"
                 
                 try:
                     response = self.llm_2.chat.completions.create(
@@ -227,6 +407,7 @@ class LLMDecisionEngine(DecisionEngineInterface):
                         messages=messages,
                         response_format={"type": "json_object"}
                     )
+                self._record_usage("gemini", response)
                 return response.choices[0].message.content
 
             elif self.gemini_model: # Google GenAI Native
@@ -236,22 +417,25 @@ class LLMDecisionEngine(DecisionEngineInterface):
                 contents = [{"role": "user" if msg["role"] == "user" else "model", "parts": [{"text": msg["content"]}]} for msg in history]
                 
                 # Check generation config availability for json
-                response = self.gemini_model.generate_content(
+                gemini_model = genai.GenerativeModel(model_name) if model_name else self.gemini_model
+                response = gemini_model.generate_content(
                     contents,
                     generation_config=genai.types.GenerationConfig(response_mime_type="application/json")
                 )
+                self._record_usage("gemini", response)
                 return response.text
             else:
-                 return '{"Decision": "WAIT", "Rating": 1, "Thinking": "Error: Gemini client not initialized."}'
+                 return ErrorReply('{"Decision": "WAIT", "Rating": 1, "Thinking": "Error: Gemini client not initialized."}')
         except Exception as e:
-            return f'{{"Decision": "WAIT", "Rating": 1, "Thinking": "Error from Gemini: {e}"}}'
+            metrics.inc("llm_request_errors_total", provider="gemini")
+            return ErrorReply(f'{{"Decision": "WAIT", "Rating": 1, "Thinking": "Error from Gemini: {e}"}}')
 
-    def _get_qwen_response(self, history: List[Dict]) -> str:
-        """Get a response from the Qwen model."""
+    def _get_qwen_response(self, history: List[Dict], model_name: Optional[str] = None) -> str:
+        """Get a response from the Qwen model, or from model_name when given (e.g. a hedging fallback)."""
         try:
             if self.llm_3: # OpenAI Compatible
                 messages = [{"role": msg["role"], "content": msg["content"]} for msg in history]
-                model_name = self.qwen_model_name or "qwen-turbo"
+                model_name = model_name or self.qwen_model_name or "qwen-turbo"
                 
                 try:
                     response = self.llm_3.chat.completions.create(
@@ -266,6 +450,7 @@ class LLMDecisionEngine(DecisionEngineInterface):
                         messages=messages,
                         response_format={"type": "json_object"}
                     )
+                self._record_usage("qwen", response)
                 return response.choices[0].message.content
 
             elif self.qwen_api_key: # Dashscope Native
@@ -273,20 +458,48 @@ class LLMDecisionEngine(DecisionEngineInterface):
                 # Dashscope native might support json result_format='message' but strictly structured output
                 # depends on the model. We'll rely on the prompt here or check if generation call supports it.
                 # Simplest is to just call it and hope prompt engineering works (system prompt requests JSON).
-                response = Generation.call(model="qwen-turbo", messages=messages, api_key=self.qwen_api_key, result_format='message')
+                response = Generation.call(model=model_name or "qwen-turbo", messages=messages, api_key=self.qwen_api_key, result_format='message')
                 if response.status_code == 200:
+                     self._record_usage("qwen", response)
                      return response.output.choices[0].message.content
                 else:
-                     return f'{{"Decision": "WAIT", "Rating": 1, "Thinking": "Error from DashScope: {response.message}"}}'
+                     metrics.inc("llm_request_errors_total", provider="qwen")
+                     return ErrorReply(f'{{"Decision": "WAIT", "Rating": 1, "Thinking": "Error from DashScope: {response.message}"}}')
             else:
-                return '{"Decision": "WAIT", "Rating": 1, "Thinking": "Error: Qwen client not initialized."}'
+                return ErrorReply('{"Decision": "WAIT", "Rating": 1, "Thinking": "Error: Qwen client not initialized."}')
         except Exception as e:
-            return f'{{"Decision": "WAIT", "Rating": 1, "Thinking": "Error from Qwen: {e}"}}'
+            metrics.inc("llm_request_errors_total", provider="qwen")
+            return ErrorReply(f'{{"Decision": "WAIT", "Rating": 1, "Thinking": "Error from Qwen: {e}"}}')
 
-    def _parse_final_decision(self, history: List[Dict]) -> Decision:
+    def _record_usage(self, provider: str, response):
+        """Account the prompt and completion tokens reported in an OpenAI-compatible, Gemini or DashScope response."""
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            prompt = getattr(usage, "prompt_tokens", None) or getattr(usage, "input_tokens", None)
+            completion = getattr(usage, "completion_tokens", None) or getattr(usage, "output_tokens", None)
+        else:
+            usage = getattr(response, "usage_metadata", None)
+            prompt = getattr(usage, "prompt_token_count", None)
+            completion = getattr(usage, "candidates_token_count", None)
+        prompt, completion = (tokens if isinstance(tokens, (int, float)) else 0 for tokens in (prompt, completion))
+        for kind, tokens in (("prompt", prompt), ("completion", completion)):
+            if tokens:
+                metrics.inc("llm_tokens_total", tokens, provider=provider, kind=kind)
+        if prompt or completion:
+            model = getattr(response, "model", None)
+            debate = getattr(self._local, "debate", None) or {}
+            self.budget.record(provider, model if isinstance(model, str) else self.model_names[provider],
+                               int(prompt), int(completion), symbol=debate.get("symbol"),
+                               debate_round=debate.get("round"), reservation=debate.get("reservation"))
+
+    def _parse_final_decision(self, history: List[Dict], symbol: str = "BTC/USDT") -> Decision:
         """
         Parse the conversation history to make a final decision.
         Considers only the final (last) response of each LLM.
+
+        Args:
+            history: The debate's conversation history.
+            symbol: The symbol the debate was about.
         """
         # 1. Identify the last response from each distinct LLM
         last_responses = {}
@@ -342,7 +555,7 @@ class LLMDecisionEngine(DecisionEngineInterface):
         if not any(total_scores.values()):
             return Decision(
                 action="WAIT",
-                symbol="BTC/USDT",
+                symbol=symbol,
                 size=0.01,
                 reason="Failed to parse any valid decisions from LLMs.",
                 confidence=0.0
@@ -357,10 +570,10 @@ class LLMDecisionEngine(DecisionEngineInterface):
 
         return Decision(
             action=best_action,
-            symbol="BTC/USDT",
+            symbol=symbol,
             size=0.01,
             reason=f"Based on LLM debate. Votes: {dict(scores)}. Totals: {total_scores}",
             confidence=confidence
         )
 
-decision_engine = LLMDecisionEngine()
+decision_engine = services.lazy("decision_engine")
@@ -0,0 +1,184 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from trading_bot.config import config
+from trading_bot.interfaces import DecisionEngine as DecisionEngineInterface
+from trading_bot.metrics.registry import metrics
+from trading_bot.models import Decision
+from trading_bot.services import services
+
+# Positive weights are bullish signals, negative ones bearish; "escalate" rules always hand the decision over.
+DEFAULT_RULES = [
+    {"name": "rsi_1h_oversold", "value": "1h.rsi", "op": "<", "threshold": 30, "weight": 1.0},
+    {"name": "rsi_1h_overbought", "value": "1h.rsi", "op": ">", "threshold": 70, "weight": -1.0},
+    {"name": "rsi_4h_oversold", "value": "4h.rsi", "op": "<", "threshold": 30, "weight": 1.0},
+    {"name": "rsi_4h_overbought", "value": "4h.rsi", "op": ">", "threshold": 70, "weight": -1.0},
+    {"name": "macd_1h_bullish", "value": "1h.macd.hist", "op": ">", "threshold": 0, "weight": 0.5},
+    {"name": "macd_1h_bearish", "value": "1h.macd.hist", "op": "<", "threshold": 0, "weight": -0.5},
+    {"name": "above_1d_ema", "value": "ticker.last", "op": ">", "threshold": "1d.ema", "weight": 0.5},
+    {"name": "below_1d_ema", "value": "ticker.last", "op": "<", "threshold": "1d.ema", "weight": -0.5},
+    {"name": "volatility_spike", "value": "1h.atr", "op": ">", "threshold": "ticker.last", "scale": 0.03,
+     "escalate": True},
+]
+OPERATORS = {"<": 0, ">": 1, "<=": 2, ">=": 3}
+
+
+def _lookup(context: Dict[str, Any], path: str) -> float:
+    """Look up a dotted path in a decision context: 'ticker.last', or '<timeframe>.<indicator>[.<field>]'."""
+    node: Any = context.get("ticker") if path.startswith("ticker.") else context.get("indicators")
+    for key in (path.split(".")[1:] if path.startswith("ticker.") else path.split(".")):
+        if not isinstance(node, dict):
+            return np.nan
+        node = node.get(key)
+    try:
+        return float(node)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class RuleBasedDecisionEngine(DecisionEngineInterface):
+    """
+    Decides quiet markets from indicator rules and escalates the rest to another engine.
+
+    Each rule compares a precomputed indicator (or ticker field) with a
+    constant or with another indicator, and carries a signed weight. The
+    rules are compiled into arrays and evaluated for a batch of contexts
+    at once. When the fired bullish and bearish weights both stay under
+    escalate_score, nothing significant is happening and the engine
+    answers quiet_action itself, in microseconds; when either reaches it,
+    when both reach ambiguity_score, when an "escalate" rule fires or
+    when too many indicators are missing, the context is escalated to
+    the LLM debate.
+    """
+
+    def __init__(self, escalation_engine: DecisionEngineInterface, rules: Optional[List[Dict[str, Any]]] = None,
+                 escalate_score: float = 1.5, ambiguity_score: float = 1.0, quiet_action: str = "HOLD",
+                 max_missing_ratio: float = 0.5):
+        """
+        Initialize the RuleBasedDecisionEngine.
+
+        Args:
+            escalation_engine: The engine deciding escalated contexts, e.g. the LLMDecisionEngine.
+            rules: The rules, as dicts with name, value (a path such as '1h.rsi'), op ('<', '>', '<=', '>='),
+                threshold (a number or a path), optional scale of the threshold, weight and escalate.
+                Defaults to DEFAULT_RULES.
+            escalate_score: The bullish or bearish weight from which a signal is significant.
+            ambiguity_score: The weight from which bullish and bearish signals together are ambiguous.
+            quiet_action: The action decided when no signal is significant, "HOLD" or "WAIT".
+            max_missing_ratio: The share of rule values that may be missing before escalating.
+        """
+        self.escalation_engine = escalation_engine
+        self.rules = rules or DEFAULT_RULES
+        self.escalate_score = escalate_score
+        self.ambiguity_score = ambiguity_score
+        self.quiet_action = quiet_action
+        self.max_missing_ratio = max_missing_ratio
+        self._compile(self.rules)
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.stats = {"decisions": 0, "escalations": 0}
+
+    def _compile(self, rules: Sequence[Dict[str, Any]]):
+        for rule in rules:
+            if rule.get("op") not in OPERATORS:
+                raise ValueError(f"Rule {rule.get('name')} has an unknown operator {rule.get('op')!r}")
+        self.rule_names = [rule["name"] for rule in rules]
+        self._value_paths = [rule["value"] for rule in rules]
+        self._threshold_paths = [(i, rule["threshold"]) for i, rule in enumerate(rules)
+                                 if isinstance(rule["threshold"], str)]
+        self._constants = np.array([0.0 if isinstance(rule["threshold"], str) else float(rule["threshold"])
+                                    for rule in rules])
+        self._scales = np.array([float(rule.get("scale", 1.0)) for rule in rules])
+        self._ops = np.array([OPERATORS[rule["op"]] for rule in rules])
+        weights = np.array([float(rule.get("weight", 0.0)) for rule in rules])
+        self._bullish = np.clip(weights, 0, None)
+        self._bearish = np.clip(-weights, 0, None)
+        self._escalating = np.array([bool(rule.get("escalate")) for rule in rules])
+
+    def evaluate(self, contexts: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """
+        Evaluate the rules for a batch of decision contexts.
+
+        Returns:
+            Arrays over the contexts: "fired" (contexts x rules), "bullish" and "bearish" weights,
+            "missing" value ratios and whether each is to be "escalated".
+        """
+        values = np.array([[_lookup(context, path) for path in self._value_paths] for context in contexts])
+        thresholds = np.tile(self._constants, (len(contexts), 1))
+        for i, path in self._threshold_paths:
+            thresholds[:, i] = [_lookup(context, path) for context in contexts]
+        thresholds *= self._scales
+        comparisons = np.stack((values < thresholds, values > thresholds, values <= thresholds,
+                                values >= thresholds))
+        fired = np.take_along_axis(comparisons, np.broadcast_to(self._ops, values.shape)[None], axis=0)[0]
+        missing = np.isnan(values) | np.isnan(thresholds)
+        bullish, bearish = fired @ self._bullish, fired @ self._bearish
+        missing_ratio = missing.mean(axis=1)
+        escalated = ((bullish >= self.escalate_score) | (bearish >= self.escalate_score)
+                     | ((bullish >= self.ambiguity_score) & (bearish >= self.ambiguity_score))
+                     | (fired & self._escalating).any(axis=1)
+                     | (missing_ratio > self.max_missing_ratio))
+        return {"fired": fired, "bullish": bullish, "bearish": bearish, "missing": missing_ratio,
+                "escalated": escalated}
+
+    def decide(self, context: Dict[str, Any]) -> Decision:
+        """Decide from the rules, or escalate the context when its signals are significant or ambiguous."""
+        started = time.perf_counter()
+        result = self.evaluate([context])
+        metrics.observe("rule_evaluation_seconds", time.perf_counter() - started)
+        escalated = bool(result["escalated"][0])
+        with self._stats_lock:
+            self.stats["decisions"] += 1
+            self.stats["escalations"] += int(escalated)
+        metrics.inc("decisions_total", engine="rules", outcome="escalated" if escalated else "decided")
+
+        fired = [name for name, hit in zip(self.rule_names, result["fired"][0]) if hit]
+        bullish, bearish = float(result["bullish"][0]), float(result["bearish"][0])
+        summary = f"bullish {bullish:.2f}, bearish {bearish:.2f}, fired: {', '.join(fired) or 'none'}"
+        if escalated:
+            decision = self.escalation_engine.decide(context)
+            self._local.transcript = getattr(self.escalation_engine, "last_transcript", None)
+            return decision
+
+        self._local.transcript = [{"role": "assistant", "name": "Rules", "content": summary}]
+        return Decision(
+            action=self.quiet_action,
+            symbol=context.get("symbol", "BTC/USDT"),
+            size=0.0,
+            confidence=round(1 - max(bullish, bearish) / self.escalate_score, 2),
+            reason=f"No significant signal ({summary}).",
+        )
+
+    @property
+    def escalation_rate(self) -> float:
+        """The share of decisions escalated to the escalation engine."""
+        return self.stats["escalations"] / self.stats["decisions"] if self.stats["decisions"] else 0.0
+
+    @property
+    def last_transcript(self) -> Optional[List[Dict[str, str]]]:
+        """The rules' verdict, or the escalation engine's debate, of the current thread's last decision."""
+        return getattr(self._local, "transcript", None)
+
+
+def create_decision_engine() -> DecisionEngineInterface:
+    """
+    Create the shared decision engine selected in the decision_engine config section.
+
+    "llm" (the default) debates every decision; "rules" puts the rule-based
+    pre-filter in front of the debate.
+    """
+    engine_config = config.get_decision_engine_config()
+    engine = engine_config.get("engine", "llm")
+    if engine == "llm":
+        return services.get("llm_decision_engine")
+    if engine != "rules":
+        raise ValueError(f"Unknown decision engine {engine!r}")
+    return RuleBasedDecisionEngine(
+        services.lazy("llm_decision_engine"),
+        rules=engine_config.get("rules"),
+        escalate_score=engine_config.get("escalate_score", 1.5),
+        ambiguity_score=engine_config.get("ambiguity_score", 1.0),
+        quiet_action=engine_config.get("quiet_action", "HOLD"),
+        max_missing_ratio=engine_config.get("max_missing_ratio", 0.5),
+    )
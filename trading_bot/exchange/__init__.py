@@ -0,0 +1,8 @@
+# trading_bot/exchange/__init__.py
+from trading_bot.services import lazy_exports
+
+__all__ = ['ExchangeRegistry', 'RateLimiter']
+__getattr__ = lazy_exports(__name__, {
+    "ExchangeRegistry": ".exchange_registry",
+    "RateLimiter": ".exchange_registry",
+})
@@ -0,0 +1,244 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import ccxt
+
+from trading_bot.config import config
+from trading_bot.logging.logger import logger
+from trading_bot.metrics.registry import metrics
+from trading_bot.services import services
+
+# Binance reports the request weight used in the current minute in this header.
+USED_WEIGHT_HEADER = "x-mbx-used-weight-1m"
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by every caller of one exchange.
+
+    Costs are in ccxt rate limiter units (one unit per ``rateLimit``
+    milliseconds). Bans and near-exhausted weight budgets reported by the
+    exchange pause all callers until the given time.
+    """
+
+    def __init__(self, rate_per_second: float, burst: float, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Initialize the RateLimiter.
+
+        Args:
+            rate_per_second: The sustained number of cost units allowed per second.
+            burst: The maximum number of cost units that can be spent at once.
+            clock: A monotonic clock, injectable for tests.
+            sleep: The sleep function, injectable for tests.
+        """
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = burst
+        self._updated_at = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.used_weight = 0
+
+    def acquire(self, cost: float = 1) -> float:
+        """
+        Reserve capacity for a request, sleeping until it is available.
+
+        Returns:
+            The time in seconds the caller waited.
+        """
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate_per_second)
+            self._updated_at = now
+            # Reserve the tokens now, so concurrent callers queue up behind this one.
+            self._tokens -= cost
+            wait = max(-self._tokens / self.rate_per_second, self._paused_until - now, 0.0)
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float):
+        """Block every caller for the given number of seconds (e.g. after a 418/429)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self.clock() + seconds)
+
+    def throttle(self, cost: Optional[float] = None):
+        """Drop-in replacement for ccxt's Exchange.throttle."""
+        self.acquire(1 if cost is None else cost)
+
+
+class ExchangeRegistry:
+    """
+    Hands out one ccxt exchange instance per (exchange, account, mode).
+
+    Market data and trading share the same instance, connection pool and
+    rate limiter, instead of each building their own client. Market metadata
+    is cached on disk with a TTL, so load_markets is not paid on every start.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, markets_ttl_hours: float = 6.0,
+                 burst_seconds: float = 5.0, weight_limit: int = 6000, weight_headroom: float = 0.9):
+        """
+        Initialize the ExchangeRegistry.
+
+        Args:
+            cache_dir: The directory for cached market metadata. Defaults to ~/.cache/trading_bot.
+            markets_ttl_hours: How long cached market metadata stays valid.
+            burst_seconds: The rate limiter burst, in seconds' worth of sustained rate.
+            weight_limit: The exchange's request weight limit per minute.
+            weight_headroom: The share of weight_limit at which requests are paused until the next minute.
+        """
+        self.cache_dir = cache_dir or os.path.join(os.path.expanduser("~"), ".cache", "trading_bot")
+        self.markets_ttl_seconds = markets_ttl_hours * 3600
+        self.burst_seconds = burst_seconds
+        self.weight_limit = weight_limit
+        self.weight_headroom = weight_headroom
+        self._exchanges: Dict[Tuple[str, str, str], ccxt.Exchange] = {}
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def get(self, exchange_id: str = "binance", api_key: Optional[str] = None, secret: Optional[str] = None,
+            sandbox: bool = False, default_type: str = "spot") -> ccxt.Exchange:
+        """
+        Get the shared exchange instance for an account and mode, creating it on first use.
+
+        Args:
+            exchange_id: The ccxt exchange id.
+            api_key: The API key, or None for public data only.
+            secret: The API secret.
+            sandbox: Whether to use the exchange's sandbox/testnet.
+            default_type: The default market type (e.g. 'spot').
+
+        Returns:
+            The ccxt exchange instance.
+        """
+        mode = f"{'sandbox' if sandbox else 'live'}-{default_type}"
+        key = (exchange_id, api_key or "public", mode)
+        with self._lock:
+            exchange = self._exchanges.get(key)
+            if exchange is None:
+                exchange = getattr(ccxt, exchange_id)({
+                    'apiKey': api_key,
+                    'secret': secret,
+                    'options': {'defaultType': default_type},
+                })
+                if sandbox:
+                    exchange.set_sandbox_mode(True)
+                self._install_rate_limiter(exchange)
+                self._install_market_cache(exchange, mode)
+                self._exchanges[key] = exchange
+            return exchange
+
+    def get_limiter(self, exchange_id: str) -> Optional[RateLimiter]:
+        """Get the rate limiter shared by every instance of an exchange (request weight is per IP)."""
+        return self._limiters.get(exchange_id)
+
+    def _install_rate_limiter(self, exchange: ccxt.Exchange):
+        limiter = self._limiters.get(exchange.id)
+        if limiter is None:
+            rate = 1000.0 / exchange.rateLimit
+            limiter = RateLimiter(rate, rate * self.burst_seconds)
+            self._limiters[exchange.id] = limiter
+        exchange.throttle = limiter.throttle
+
+        fetch2 = exchange.fetch2
+
+        def limited_fetch2(path, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fetch2(path, *args, **kwargs)
+            except Exception as e:
+                metrics.inc("exchange_request_errors_total", exchange=exchange.id, error=type(e).__name__)
+                if isinstance(e, (ccxt.DDoSProtection, ccxt.RateLimitExceeded)):
+                    headers = exchange.last_response_headers or {}
+                    retry_after = float(headers.get("Retry-After") or headers.get("retry-after") or 60)
+                    logger.warning(f"{exchange.id} rate limit hit, pausing all requests for {retry_after:.0f}s")
+                    limiter.pause(retry_after)
+                raise
+            finally:
+                metrics.observe("exchange_request_seconds", time.perf_counter() - started,
+                                exchange=exchange.id, endpoint=path)
+                self._check_used_weight(exchange, limiter)
+
+        exchange.fetch2 = limited_fetch2
+
+    def _check_used_weight(self, exchange: ccxt.Exchange, limiter: RateLimiter):
+        """Pause until the next minute when the reported weight nears the exchange limit."""
+        headers = exchange.last_response_headers or {}
+        used = headers.get(USED_WEIGHT_HEADER) or headers.get(USED_WEIGHT_HEADER.upper())
+        if used is None:
+            return
+        limiter.used_weight = int(used)
+        metrics.set("exchange_used_weight", limiter.used_weight, exchange=exchange.id)
+        if limiter.used_weight >= self.weight_limit * self.weight_headroom:
+            limiter.pause(60 - time.time() % 60)
+
+    def _markets_cache_path(self, exchange: ccxt.Exchange, mode: str) -> str:
+        return os.path.join(self.cache_dir, f"markets_{exchange.id}_{mode}.json")
+
+    def _install_market_cache(self, exchange: ccxt.Exchange, mode: str):
+        """Serve load_markets from a disk cache while it is fresh."""
+        load_markets = exchange.load_markets
+        path = self._markets_cache_path(exchange, mode)
+        lock = threading.Lock()
+
+        def cached_load_markets(reload: bool = False, params: Dict[str, Any] = {}):
+            with lock:
+                if exchange.markets and not reload:
+                    return exchange.markets
+                if not reload:
+                    cached = self._read_markets_cache(path)
+                    if cached is not None:
+                        return exchange.set_markets(cached["markets"], cached.get("currencies"))
+                markets = load_markets(reload, params)
+                self._write_markets_cache(path, exchange)
+                return markets
+
+        exchange.load_markets = cached_load_markets
+
+    def _read_markets_cache(self, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            if time.time() - os.path.getmtime(path) > self.markets_ttl_seconds:
+                return None
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_markets_cache(self, path: str, exchange: ccxt.Exchange):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"markets": exchange.markets, "currencies": exchange.currencies}, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not cache {exchange.id} markets: {e}")
+
+
+def create_exchange_registry() -> ExchangeRegistry:
+    """Create the shared registry, configured from the binance section."""
+    exchange_config = config.get_binance_config()
+    return ExchangeRegistry(
+        cache_dir=exchange_config.get("markets_cache_dir"),
+        markets_ttl_hours=exchange_config.get("markets_ttl_hours", 6.0),
+    )
+
+exchange_registry = services.lazy("exchange_registry")
+
+
+def get_binance_exchange() -> ccxt.Exchange:
+    """Get the shared Binance exchange instance for the configured account."""
+    binance_config = config.get_binance_config()
+    return exchange_registry.get(
+        "binance",
+        api_key=binance_config.get('api_key'),
+        secret=binance_config.get('secret_key'),
+        sandbox=bool(binance_config.get('sandbox') or binance_config.get('testnet')),
+    )
@@ -1,3 +1,8 @@
 # trading_bot/execution/__init__.py
-from .execution_manager import ExecutionManager
-from .ccxt_adapter import CCXTAdapter
+from trading_bot.services import lazy_exports
+
+__all__ = ['ExecutionManager', 'CCXTAdapter']
+__getattr__ = lazy_exports(__name__, {
+    "ExecutionManager": ".execution_manager",
+    "CCXTAdapter": ".ccxt_adapter",
+})
@@ -0,0 +1,243 @@
+import copy
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+from trading_bot.logging.logger import logger
+
+TERMINAL_STATUSES = ("closed", "canceled", "cancelled", "expired", "rejected")
+
+# Balance changes by ("free" | "used" | "total", currency).
+Changes = Dict[Tuple[str, str], float]
+
+
+class BalanceCache:
+    """
+    In-memory account balance, kept current without fetching on every read.
+
+    The balance is fetched once on first use. Fills are applied as they are
+    reported, pushed balance updates (the user-data stream in live mode)
+    replace the affected currencies, and a background refresh re-syncs with
+    the exchange once the snapshot is older than the TTL. Reads never wait
+    for the exchange after the first load.
+
+    Every fill and order reservation is journaled with its time. A snapshot
+    only covers the changes older than it: the others are replayed on top
+    of it, and the covered ones are dropped from the journal. Without
+    an exchange timestamp, a snapshot is taken to be as old as its fetch;
+    changes made while it was in flight are replayed and the balance is
+    re-synced on the next read, as the snapshot may already include them.
+    Resting orders move their locked funds from free to used until they
+    fill or end.
+    """
+
+    MAX_TRACKED_ORDERS = 1000
+
+    def __init__(self, fetch_balance: Callable[[], Dict], ttl_seconds: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic, wall_clock: Callable[[], float] = time.time):
+        """
+        Initialize the BalanceCache.
+
+        Args:
+            fetch_balance: Fetches the full balance from the exchange (ccxt fetch_balance structure).
+            ttl_seconds: The age after which a read triggers a background refresh.
+            clock: A monotonic clock, injectable for tests.
+            wall_clock: The time in seconds since the epoch, compared with the exchange's timestamps.
+        """
+        self.fetch_balance = fetch_balance
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.refreshed_at: Optional[float] = None
+        self.stats = {"reads": 0, "refreshes": 0, "fills": 0, "pushes": 0}
+        self._balance: Optional[Dict] = None
+        # Filled amount already applied per order, for the most recent orders.
+        self._applied_fills: "OrderedDict[str, float]" = OrderedDict()
+        # When the orders that ended did so; their entries go once a snapshot covers them.
+        self._ended_at: Dict[str, float] = {}
+        # The [currency, amount] still locked by each resting order.
+        self._reserved: Dict[str, list] = {}
+        self._journal: Deque[Tuple[float, Changes]] = deque(maxlen=self.MAX_TRACKED_ORDERS)
+        # The time the current snapshot was taken at.
+        self._taken_at = float("-inf")
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def get(self) -> Dict:
+        """Get a copy of the balance with 'free', 'used' and 'total' per currency."""
+        with self._lock:
+            self.stats["reads"] += 1
+            loaded = self._balance is not None
+            stale = loaded and self.clock() - self.refreshed_at >= self.ttl_seconds
+            if stale and not self._refreshing:
+                self._refreshing = True
+                threading.Thread(target=self.refresh, name="BalanceRefresh", daemon=True).start()
+        if not loaded:
+            self.refresh()
+        with self._lock:
+            return copy.deepcopy(self._balance)
+
+    def refresh(self):
+        """Fetch the balance from the exchange and replace the cached one, replaying the changes it misses."""
+        started_at = self.wall_clock()
+        try:
+            balance = self.fetch_balance()
+        except Exception as e:
+            logger.warning(f"Balance refresh failed, serving the cached balance: {e}")
+            balance = None
+        finished_at = self.wall_clock()
+        with self._lock:
+            self._refreshing = False
+            if balance is not None:
+                taken_at = balance["timestamp"] / 1000 if balance.get("timestamp") else started_at
+                self._balance = {key: dict(balance.get(key) or {}) for key in ("free", "used", "total")}
+                self._taken_at = taken_at
+                in_flight = self._replay_after(taken_at)
+                for order_id, ended_at in list(self._ended_at.items()):
+                    if ended_at < taken_at:
+                        del self._ended_at[order_id]
+                        self._applied_fills.pop(order_id, None)
+                self.refreshed_at = self.clock()
+                if not balance.get("timestamp") and any(t <= finished_at for t in in_flight):
+                    self.refreshed_at -= self.ttl_seconds
+                self.stats["refreshes"] += 1
+            elif self._balance is None:
+                self._balance = {"free": {}, "used": {}, "total": {}}
+                self.refreshed_at = self.clock()
+
+    def _replay_after(self, taken_at: float, currencies: Optional[set] = None) -> list:
+        """
+        Re-apply the journaled changes newer than a snapshot, dropping the older ones when it is a full one.
+
+        Returns:
+            The times of the replayed changes.
+        """
+        replayed = []
+        for event_time, changes in self._journal:
+            if event_time >= taken_at:
+                self._change(changes, currencies)
+                replayed.append(event_time)
+        if currencies is None:
+            self._journal = deque(((t, c) for t, c in self._journal if t >= taken_at),
+                                  maxlen=self.MAX_TRACKED_ORDERS)
+        return replayed
+
+    def _change(self, changes: Changes, currencies: Optional[set] = None):
+        for (key, currency), change in changes.items():
+            if currencies is None or currency in currencies:
+                self._balance[key][currency] = self._balance[key].get(currency, 0.0) + change
+
+    def _record(self, changes: Changes, event_time: float):
+        if event_time < self._taken_at:
+            # Reported after a snapshot that already includes it.
+            return
+        self._change(changes)
+        self._journal.append((event_time, changes))
+
+    def invalidate(self):
+        """Make the next read trigger a background refresh."""
+        with self._lock:
+            if self.refreshed_at is not None:
+                self.refreshed_at -= self.ttl_seconds
+
+    @staticmethod
+    def _locked_funds(order: Dict) -> Optional[Tuple[str, float]]:
+        """The currency and amount a resting order locks, or None if it is unknown."""
+        base, quote = order["symbol"].split("/")
+        remaining = order.get("remaining")
+        if remaining is None:
+            remaining = (order.get("amount") or 0.0) - (order.get("filled") or 0.0)
+        if remaining <= 0:
+            return None
+        if order.get("side") == "buy":
+            price = order.get("price")
+            return (quote, remaining * price) if price else None
+        return base, remaining
+
+    def reserve_order(self, order: Dict):
+        """Move the funds a resting order locks from free to used, once per order."""
+        order_id = order.get("id")
+        if order.get("status") in TERMINAL_STATUSES:
+            return
+        with self._lock:
+            if self._balance is None or order_id in self._reserved:
+                return
+            locked = self._locked_funds(order)
+            if locked is None:
+                return
+            currency, amount = locked
+            self._reserved[order_id] = [currency, amount]
+            self._record({("free", currency): -amount, ("used", currency): amount}, self.wall_clock())
+
+    def apply_fill(self, order: Dict):
+        """
+        Apply the newly filled part of an order to the balance.
+
+        Safe to call repeatedly with the cumulative order state: only the
+        amount filled since the last call for the same order is applied.
+        A fill spends the order's locked funds first, and an order that
+        ended releases what it still locks.
+        """
+        order_id = order.get("id")
+        filled = order.get("filled") or 0.0
+        last_trade = order.get("lastTradeTimestamp")
+        event_time = last_trade / 1000 if last_trade else self.wall_clock()
+        with self._lock:
+            if self._balance is None:
+                return
+            changes: Changes = {}
+            delta = filled - self._applied_fills.get(order_id, 0.0)
+            if delta > 0:
+                self._applied_fills[order_id] = filled
+                self._applied_fills.move_to_end(order_id)
+                if len(self._applied_fills) > self.MAX_TRACKED_ORDERS:
+                    self._applied_fills.popitem(last=False)
+
+                base, quote = order["symbol"].split("/")
+                price = order.get("average") or order.get("price") or 0.0
+                cost = delta * price
+                spent, spent_amount, received, received_amount = (quote, cost, base, delta) \
+                    if order.get("side") == "buy" else (base, delta, quote, cost)
+                reserved = self._reserved.get(order_id)
+                from_used = min(spent_amount, reserved[1]) if reserved and reserved[0] == spent else 0.0
+                if reserved:
+                    reserved[1] -= from_used
+                fee = order.get("fee") or {}
+                fee_cost = (fee.get("cost") or 0.0) * (delta / filled) if filled else 0.0
+                for key, currency, change in (("used", spent, -from_used), ("free", spent, from_used - spent_amount),
+                                              ("total", spent, -spent_amount), ("free", received, received_amount),
+                                              ("total", received, received_amount),
+                                              ("free", fee.get("currency"), -fee_cost),
+                                              ("total", fee.get("currency"), -fee_cost)):
+                    if currency and change:
+                        changes[(key, currency)] = changes.get((key, currency), 0.0) + change
+                self.stats["fills"] += 1
+
+            if order.get("status") in TERMINAL_STATUSES:
+                self._ended_at[order_id] = event_time
+                reserved = self._reserved.pop(order_id, None)
+                if reserved and reserved[1] > 0:
+                    currency, amount = reserved
+                    changes[("used", currency)] = changes.get(("used", currency), 0.0) - amount
+                    changes[("free", currency)] = changes.get(("free", currency), 0.0) + amount
+            if changes:
+                self._record(changes, event_time)
+
+    def apply_balance_update(self, balance: Dict):
+        """
+        Apply a balance pushed by the exchange, replacing the currencies it contains.
+        The journaled changes newer than the update are replayed on top of those currencies.
+        """
+        with self._lock:
+            if self._balance is None:
+                # The first read loads the full balance.
+                return
+            currencies = set()
+            for key in ("free", "used", "total"):
+                for currency, amount in (balance.get(key) or {}).items():
+                    if amount is not None:
+                        self._balance[key][currency] = amount
+                        currencies.add(currency)
+            if balance.get("timestamp"):
+                self._replay_after(balance["timestamp"] / 1000, currencies)
+            self.stats["pushes"] += 1
@@ -1,25 +1,16 @@
 import ccxt
-from trading_bot.config import config
+from concurrent.futures import ThreadPoolExecutor
+from trading_bot.exchange.exchange_registry import get_binance_exchange
 from trading_bot.interfaces.exchange_adapter import ExchangeAdapter
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any
 
 class CCXTAdapter(ExchangeAdapter):
     """An adapter for the CCXT library."""
 
     def __init__(self):
         """Initialize the CCXTAdapter."""
-        binance_config = config.get_binance_config()
-        self.exchange = ccxt.binance({
-            'apiKey': binance_config.get('api_key'),
-            'secret': binance_config.get('secret_key'),
-            'options': {
-                'defaultType': 'spot',
-            },
-        })
-        
-        # Enable sandbox mode only if specified in config
-        if binance_config.get('testnet', False):
-            self.exchange.set_sandbox_mode(True)
+        # Shares its instance, rate limiter and market metadata with MarketDataManager.
+        self.exchange = get_binance_exchange()
 
     def get_balance(self) -> Dict[str, float]:
         """Get the account balance."""
@@ -29,9 +20,70 @@ class CCXTAdapter(ExchangeAdapter):
         """Get the latest ticker information for a symbol."""
         return self.exchange.fetch_ticker(symbol)
 
-    def create_order(self, symbol: str, side: str, order_type: str, amount: float, price: Optional[float] = None) -> Dict:
+    def create_order(self, symbol: str, side: str, order_type: str, amount: float, price: Optional[float] = None,
+                     params: Optional[Dict] = None) -> Dict:
         """Create a new order."""
-        return self.exchange.create_order(symbol, order_type, side, amount, price)
+        return self.exchange.create_order(symbol, order_type, side, amount, price, params or {})
+
+    def create_orders(self, orders: List[Dict]) -> List[Dict]:
+        """
+        Create several orders with the exchange's batch endpoint where available.
+        Markets without one (e.g. Binance spot) get the orders submitted concurrently.
+        """
+        if self.exchange.has.get('createOrders'):
+            try:
+                return self.exchange.create_orders([{
+                    'symbol': order['symbol'],
+                    'type': order['order_type'],
+                    'side': order['side'],
+                    'amount': order['amount'],
+                    'price': order.get('price'),
+                    'params': order.get('params') or {},
+                } for order in orders])
+            except ccxt.NotSupported:
+                pass
+
+        with ThreadPoolExecutor(max_workers=len(orders)) as pool:
+            return list(pool.map(lambda order: self.create_order(**order), orders))
+
+    def create_oco_order(self, stop_loss: Dict, take_profit: Dict) -> Optional[List[Dict]]:
+        """
+        Create a one-cancels-the-other exit pair with Binance's order list endpoint.
+
+        The take-profit rests as a LIMIT_MAKER order and the stop-loss as a
+        STOP_LOSS order; the exchange cancels one as soon as the other fills.
+        Other exchanges and non-spot markets get None.
+        """
+        symbol = stop_loss['symbol']
+        market = self.exchange.market(symbol)
+        if self.exchange.id != 'binance' or not market.get('spot'):
+            return None
+
+        stop_price = self.exchange.price_to_precision(symbol, stop_loss['params']['stopLossPrice'])
+        limit_price = self.exchange.price_to_precision(symbol, take_profit['params']['takeProfitPrice'])
+        # The take-profit of a long exit sits above the market and its stop-loss below; a short's the other way.
+        stop_leg, limit_leg = ('below', 'above') if stop_loss['side'] == 'sell' else ('above', 'below')
+        response = self.exchange.private_post_orderlist_oco({
+            'symbol': market['id'],
+            'side': stop_loss['side'].upper(),
+            'quantity': self.exchange.amount_to_precision(symbol, stop_loss['amount']),
+            f'{stop_leg}Type': 'STOP_LOSS',
+            f'{stop_leg}StopPrice': stop_price,
+            f'{stop_leg}ClientOrderId': stop_loss['params']['clientOrderId'],
+            f'{limit_leg}Type': 'LIMIT_MAKER',
+            f'{limit_leg}Price': limit_price,
+            f'{limit_leg}ClientOrderId': take_profit['params']['clientOrderId'],
+        })
+        orders = {report['clientOrderId']: self.exchange.parse_order(report, market)
+                  for report in response['orderReports']}
+        return [orders[stop_loss['params']['clientOrderId']], orders[take_profit['params']['clientOrderId']]]
+
+    def fetch_order_by_client_id(self, client_order_id: str, symbol: str) -> Optional[Dict]:
+        """Fetch an order by its client order id. Returns None if the exchange does not know it."""
+        try:
+            return self.exchange.fetch_order(None, symbol, {'clientOrderId': client_order_id})
+        except ccxt.OrderNotFound:
+            return None
 
     def cancel_order(self, order_id: str, symbol: str = None) -> bool:
         """Cancel an existing order."""
@@ -1,10 +1,19 @@
+import asyncio
+import time
+from trading_bot.config import config
+from trading_bot.execution.balance_cache import BalanceCache
 from trading_bot.execution.ccxt_adapter import CCXTAdapter
+from trading_bot.execution.order_requests import LEG_CODES, TRADE_ACTIONS, build_order_requests
+from trading_bot.execution.order_tracker import OrderTracker, UserDataStream
 from trading_bot.models.decision import Decision
-from trading_bot.risk_management.risk_manager import RiskManager
+from trading_bot.services import services
+from trading_bot.risk_management.risk_manager import MarketSnapshot, RiskManager
 from trading_bot.market_data.market_data_manager import MarketDataManager
 from trading_bot.persistence.sqlite_persistence import persistence, Order, Trade
+from trading_bot.logging.logger import logger
+from concurrent.futures import Future
 from datetime import datetime
-import time
+from typing import Callable, Dict, List, Optional
 
 class ExecutionManager:
     """Manages the execution of trades."""
@@ -17,39 +26,227 @@ class ExecutionManager:
             backtesting: Whether to run in backtesting mode.
         """
         if backtesting:
+            from trading_bot.execution.matching_engine import SimulatedMatchingEngine
             from trading_bot.execution.mock_execution_adapter import MockExecutionAdapter
-            self.exchange_adapter = MockExecutionAdapter()
+            # Orders fill against the simulated market the decisions are made on.
+            self.exchange_adapter = MockExecutionAdapter(
+                quote_source=market_data_manager.get_current_quote,
+                engine=SimulatedMatchingEngine(**config.get_backtesting_config()),
+            )
         else:
             self.exchange_adapter = CCXTAdapter()
-            
-        self.risk_manager = RiskManager(market_data_manager)
 
-    def execute_trade(self, decision: Decision):
+        self.position_ledger = services.get("position_ledger")
+        self.risk_manager = RiskManager(market_data_manager, position_ledger=self.position_ledger)
+        self.order_tracker = OrderTracker(self.exchange_adapter)
+        self.order_retries = 1
+        self.balance_cache = BalanceCache(
+            lambda: self.exchange_adapter.get_balance(),
+            ttl_seconds=config.get_trading_config().get("balance_ttl_seconds", 60),
+        )
+        self.user_data_stream = None
+        if not backtesting and UserDataStream.is_available():
+            binance_config = config.get_binance_config()
+            self.user_data_stream = UserDataStream({
+                'apiKey': binance_config.get('api_key'),
+                'secret': binance_config.get('secret_key'),
+                'options': {'defaultType': 'spot'},
+            }, self.order_tracker, balance_cache=self.balance_cache)
+            self.user_data_stream.start()
+
+    def execute_trade(self, decision: Decision) -> List[Dict]:
         """
         Execute a trade based on a decision from the DecisionEngine.
+        Synchronous wrapper around execute_trade_async.
 
         Args:
             decision: The trading decision to execute.
+
+        Returns:
+            The orders placed for the decision.
+        """
+        return asyncio.run(self.execute_trade_async(decision))
+
+    async def execute_trade_async(self, decision: Decision) -> List[Dict]:
+        """
+        Validate a decision and place its entry order and protective stop-loss/take-profit legs.
+
+        The price comes from the cycle's market snapshot held by the risk
+        manager and the balance from the balance cache, so no ticker is
+        fetched here.
+
+        The decision is validated and its exposure reserved in one step, and
+        the reservation is held until the entry order ends, so symbols
+        executing concurrently cannot exceed the risk limits together.
+
+        Every order carries a deterministic client order id, so a retry
+        after a timeout never places a duplicate. The protective legs go
+        out once the entry is done, sized to its filled amount (see
+        _protect).
+
+        Args:
+            decision: The trading decision to execute.
+
+        Returns:
+            The orders placed for the decision: the entry, and its protective legs if it filled at once.
+        """
+        if decision.action.upper() not in TRADE_ACTIONS:
+            logger.info(f"No order for {decision.action} decision on {decision.symbol}.")
+            return []
+
+        balance = await asyncio.to_thread(self.get_balance)
+        is_valid, adjusted_decision, reservation = self.risk_manager.reserve_decision(
+            decision, balance.get("free", {}).get("USDT", 0)
+        )
+        if not is_valid:
+            logger.info(f"Decision rejected by risk management: {adjusted_decision.reason}")
+            return []
+
+        entry_request, *protective_requests = build_order_requests(adjusted_decision)
+        try:
+            entry = await asyncio.to_thread(self.submit_order, entry_request)
+        except Exception as e:
+            logger.error(f"Error executing trade: {e}")
+            self.risk_manager.release(reservation)
+            return []
+        self.risk_manager.record_trade(adjusted_decision.symbol)
+        self.save_order(entry)
+
+        legs = []
+
+        def on_entry_complete(order: Dict):
+            self.record_trade(order)
+            # The fill is in the ledger now, or the entry ended without one.
+            self.risk_manager.release(reservation)
+            legs.extend(self._protect(order, protective_requests))
+
+        # An entry that filled at once completes, and gets its legs, before monitor_order returns.
+        await asyncio.to_thread(self.monitor_order, entry, on_entry_complete)
+        return [entry, *legs]
+
+    def _protect(self, entry: Dict, requests: List[Dict]) -> List[Dict]:
+        """
+        Place the protective legs of a completed entry, for the amount it filled.
+
+        A stop-loss and take-profit pair goes out as an exchange OCO order
+        where the adapter supports one. Otherwise the legs are placed
+        separately and a fill of either cancels the other. Both legs are
+        tracked, so their fills reach the ledger and the trade records.
+
+        Args:
+            entry: The entry order, in a terminal state.
+            requests: The protective legs' create_order keyword arguments.
+
+        Returns:
+            The protective orders placed.
+        """
+        filled = entry.get("filled") or 0.0
+        if not requests or filled <= 0:
+            return []
+        requests = [{**request, "amount": filled} for request in requests]
+
+        legs = None
+        if len(requests) == 2:
+            try:
+                legs = self.exchange_adapter.create_oco_order(*requests)
+            except Exception as e:
+                logger.warning(f"OCO order failed for {entry['symbol']}, placing the legs separately: {e}")
+        paired = legs is None
+        if paired:
+            legs = self.submit_orders(requests)
+
+        for leg in legs:
+            self.save_order(leg)
+            siblings = [sibling for sibling in legs if sibling is not leg] if paired else []
+            reason = "Stop loss" if (leg.get("clientOrderId") or "").endswith(LEG_CODES["stop_loss"]) else "Take profit"
+            self.monitor_order(leg, on_complete=lambda order, reason=reason: self.record_trade(order, reason),
+                               on_fill=lambda order, siblings=siblings: self._on_leg_fill(order, siblings))
+        return legs
+
+    def _on_leg_fill(self, order: Dict, siblings: List[Dict]):
+        """Apply a protective leg's fill to the balance, and cancel its sibling the first time it fills."""
+        self.balance_cache.apply_fill(order)
+        while siblings:
+            sibling = siblings.pop()
+            try:
+                self.exchange_adapter.cancel_order(sibling["id"], sibling["symbol"])
+            except Exception as e:
+                logger.error(f"Could not cancel order {sibling['id']} after its sibling filled: {e}")
+
+    def submit_order(self, request: Dict, check_existing: bool = False) -> Dict:
+        """
+        Submit an order idempotently.
+
+        If submission fails (e.g. on a timeout after the exchange accepted the
+        order), the order is looked up by its client order id before retrying
+        with the same id.
+
+        Args:
+            request: The create_order keyword arguments, with a clientOrderId in params.
+            check_existing: Whether to look the order up before the first submission.
+
+        Returns:
+            The created order.
+        """
+        for attempt in range(self.order_retries + 1):
+            if check_existing or attempt > 0:
+                existing = self._find_submitted_order(request)
+                if existing:
+                    return existing
+            try:
+                return self.exchange_adapter.create_order(**request)
+            except Exception as e:
+                if attempt == self.order_retries:
+                    raise
+                logger.warning(f"Order {request['params']['clientOrderId']} failed, checking before retrying: {e}")
+
+    def submit_orders(self, requests: List[Dict]) -> List[Dict]:
+        """
+        Submit several orders as one batch, falling back to idempotent one-by-one submission.
+
+        Returns:
+            The orders that were placed. Legs that fail are logged and left out.
         """
-        balance = self.get_balance()
-        is_valid, adjusted_decision = self.risk_manager.validate_decision(decision, balance.get("free", {}).get("USDT", 0))
+        try:
+            return self.exchange_adapter.create_orders(requests)
+        except Exception as e:
+            logger.warning(f"Batch order submission failed, submitting orders individually: {e}")
 
-        if is_valid:
+        orders = []
+        for request in requests:
             try:
-                order_result = self.exchange_adapter.create_order(
-                    symbol=adjusted_decision.symbol,
-                    side=adjusted_decision.action.lower(),
-                    order_type="market",
-                    amount=adjusted_decision.size
-                )
-                self.save_order(order_result)
-                self.monitor_order(order_result["id"], adjusted_decision.symbol)
+                orders.append(self.submit_order(request, check_existing=True))
             except Exception as e:
-                print(f"Error executing trade: {e}")
+                logger.error(f"Error placing order {request['params']['clientOrderId']}: {e}")
+        return orders
+
+    def _find_submitted_order(self, request: Dict) -> Optional[Dict]:
+        try:
+            return self.exchange_adapter.fetch_order_by_client_id(request["params"]["clientOrderId"], request["symbol"])
+        except Exception as e:
+            logger.warning(f"Could not look up order {request['params']['clientOrderId']}: {e}")
+            return None
+
+    def mark_to_market(self, symbol: str, ticker: Dict, atr: Optional[float] = None):
+        """
+        Mark the position of a symbol to the latest ticker, hand the cycle's market
+        snapshot to the risk manager and snapshot the ledger when due.
+        The first call also sets the ledger's starting equity from the cached balance.
+        """
+        price = ticker.get("last") if isinstance(ticker, dict) else ticker
+        if not price:
+            return
+        self.risk_manager.update_market(MarketSnapshot(symbol, price, atr, time.time()))
+        if self.position_ledger.starting_equity is None:
+            base, quote = symbol.split("/")
+            total = self.get_balance().get("total", {})
+            self.position_ledger.set_starting_equity(total.get(quote, 0.0) + total.get(base, 0.0) * price)
+        self.position_ledger.mark(symbol, price)
+        self.position_ledger.maybe_snapshot()
 
     def get_balance(self):
-        """Get the current account balance."""
-        return self.exchange_adapter.get_balance()
+        """Get the current account balance from the in-memory balance cache."""
+        return self.balance_cache.get()
 
     def save_order(self, order_result):
         """Save an order to the database."""
@@ -61,27 +258,48 @@ class ExecutionManager:
             amount=order_result["amount"],
             price=order_result.get("price"),
             status=order_result["status"],
-            created_at=datetime.fromtimestamp(order_result["timestamp"] / 1000)
+            created_at=datetime.fromtimestamp(order_result["timestamp"] / 1000) if order_result.get("timestamp") else datetime.now()
         )
         persistence.save(order)
 
-    def monitor_order(self, order_id: str, symbol: str):
-        """Monitor an order and create a trade record when it's filled."""
-        for _ in range(10): # 10 retries
-            order = self.exchange_adapter.fetch_order(order_id, symbol)
-            if order["status"] == "closed":
-                trade = Trade(
-                    order_id=order["id"],
-                    symbol=order["symbol"],
-                    side=order["side"],
-                    size=order["filled"],
-                    price=order["average"],
-                    status="filled",
-                    filled_size=order["filled"],
-                    requested_at=datetime.fromtimestamp(order["timestamp"] / 1000),
-                    completed_at=datetime.now(),
-                    reason="LLM Decision"
-                )
-                persistence.save(trade)
-                break
-            time.sleep(6) # Wait 6 seconds before retrying
+    def monitor_order(self, order_result: Dict, on_complete: Optional[Callable[[Dict], None]] = None,
+                      on_fill: Optional[Callable[[Dict], None]] = None) -> Future:
+        """
+        Track an order in the background and create a trade record once it is done.
+        The funds a resting order locks are moved to the balance's used part meanwhile.
+        Returns immediately; the returned Future resolves to the final order.
+
+        Args:
+            order_result: The order to track.
+            on_complete: Called with the final order instead of record_trade.
+            on_fill: Called with the order on each fill instead of the balance update.
+        """
+        self.balance_cache.reserve_order(order_result)
+        return self.order_tracker.track(order_result, on_complete=on_complete or self.record_trade,
+                                        on_fill=on_fill or self.balance_cache.apply_fill)
+
+    def record_trade(self, order: Dict, reason: str = "LLM Decision"):
+        """Save a trade record for a completed order and update its stored status."""
+        self.balance_cache.apply_fill(order)
+        persistence.update_order_status(order["id"], order.get("status"))
+        filled = order.get("filled") or 0.0
+        if filled <= 0:
+            logger.info(f"Order {order['id']} ended as {order.get('status')} without fills.")
+            return
+
+        realized_pnl = self.position_ledger.apply_order(order)
+
+        trade = Trade(
+            order_id=order["id"],
+            symbol=order["symbol"],
+            side=order["side"],
+            size=filled,
+            price=order.get("average") or order.get("price"),
+            status="filled" if order.get("status") == "closed" else "partially_filled",
+            filled_size=filled,
+            requested_at=datetime.fromtimestamp(order["timestamp"] / 1000),
+            completed_at=datetime.now(),
+            reason=reason,
+            realized_pnl=realized_pnl
+        )
+        persistence.save(trade)
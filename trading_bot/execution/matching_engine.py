@@ -0,0 +1,323 @@
+import heapq
+import itertools
+import math
+from typing import Callable, Dict, List, Optional
+
+FillCallback = Callable[[Dict, float, float, float], None]
+
+_EPSILON = 1e-12
+
+
+class _Book:
+    """The simulated top of book of one symbol, with the resting and conditional orders on it."""
+
+    __slots__ = ("bid", "ask", "last", "timestamp", "consumed_bid", "consumed_ask",
+                 "buy_limits", "sell_limits", "falling_triggers", "rising_triggers")
+
+    def __init__(self):
+        self.bid = self.ask = self.last = 0.0
+        self.timestamp = 0
+        # Depth already taken from each side since the last market update.
+        self.consumed_bid = self.consumed_ask = 0.0
+        # Heaps of (sort key, sequence, order). Canceled orders are skipped when popped.
+        self.buy_limits: List = []
+        self.sell_limits: List = []
+        self.falling_triggers: List = []
+        self.rising_triggers: List = []
+
+
+class SimulatedMatchingEngine:
+    """
+    A matching-engine stand-in for backtesting.
+
+    Orders fill against a synthetic book built around the latest quote:
+    ``max_levels`` levels per side, ``level_size`` deep each and
+    ``level_spacing_bps`` apart, so large orders walk the book and pay
+    slippage. Depth taken is only replenished by the next market update,
+    so orders exceeding it fill partially: market orders cancel their
+    remainder, limit orders rest and keep filling on later updates.
+
+    Resting limit orders and stop/take-profit triggers are kept in
+    price-indexed heaps, so each market update only touches the orders
+    that actually cross. Fills are priced in closed form from the depth
+    coordinate, without iterating over levels.
+    """
+
+    def __init__(self, taker_fee: float = 0.001, maker_fee: float = 0.001, min_spread_bps: float = 1.0,
+                 level_size: float = 0.5, level_spacing_bps: float = 1.0, max_levels: int = 20,
+                 latency_ms: int = 0, on_fill: Optional[FillCallback] = None):
+        """
+        Initialize the SimulatedMatchingEngine.
+
+        Args:
+            taker_fee: The fee rate charged on fills that take liquidity.
+            maker_fee: The fee rate charged on fills of resting limit orders.
+            min_spread_bps: The minimum bid/ask spread in basis points, applied when the quote is tighter.
+            level_size: The base amount available at each price level.
+            level_spacing_bps: The distance between two price levels in basis points.
+            max_levels: The number of price levels on each side of the book.
+            latency_ms: The delay between submitting an order and its arrival at the book.
+            on_fill: Called with (order, amount, cost, fee) for every fill.
+        """
+        self.taker_fee = taker_fee
+        self.maker_fee = maker_fee
+        self.min_spread = min_spread_bps / 10000
+        self.level_size = level_size
+        self.level_spacing = level_spacing_bps / 10000
+        self.max_levels = max_levels
+        self.latency_ms = latency_ms
+        self.on_fill = on_fill
+        self.orders: Dict[str, Dict] = {}
+        self._books: Dict[str, _Book] = {}
+        # Orders submitted but not yet arrived at the book: (active_at, sequence, order).
+        self._in_flight: List = []
+        # Trigger direction of the conditional orders not yet triggered: True if they fire on a falling price.
+        self._falling: Dict[str, bool] = {}
+        self._quote_currencies: Dict[str, str] = {}
+        self._sequence = itertools.count()
+
+    def update_market(self, symbol: str, bid: float, ask: float, timestamp: int,
+                      last: Optional[float] = None) -> List[Dict]:
+        """
+        Move the book of a symbol to a new quote and match the orders it makes executable.
+
+        Args:
+            symbol: The trading symbol.
+            bid: The best bid.
+            ask: The best ask.
+            timestamp: The quote time in milliseconds.
+            last: The last traded price, used for triggers. Defaults to the mid price.
+
+        Returns:
+            The orders that received fills.
+        """
+        book = self._books.get(symbol)
+        if book is None:
+            book = self._books[symbol] = _Book()
+        mid = (bid + ask) / 2
+        half_spread = mid * self.min_spread / 2
+        book.bid = min(bid, mid - half_spread)
+        book.ask = max(ask, mid + half_spread)
+        book.last = last if last is not None else mid
+        book.timestamp = timestamp
+        book.consumed_bid = book.consumed_ask = 0.0
+
+        filled: List[Dict] = []
+        waiting = []
+        while self._in_flight and self._in_flight[0][0] <= timestamp:
+            entry = heapq.heappop(self._in_flight)
+            order = entry[2]
+            if order["status"] != "open":
+                continue
+            if order["symbol"] not in self._books:
+                waiting.append(entry)
+                continue
+            self._arrive(order, self._books[order["symbol"]])
+            if order["filled"] > 0:
+                filled.append(order)
+        for entry in waiting:
+            heapq.heappush(self._in_flight, entry)
+
+        self._fire_triggers(book, filled)
+        self._match_resting(book, book.buy_limits, "buy", filled)
+        self._match_resting(book, book.sell_limits, "sell", filled)
+        return filled
+
+    def get_quote(self, symbol: str) -> Optional[Dict]:
+        """Get the current top of book of a symbol, or None before its first update."""
+        book = self._books.get(symbol)
+        if book is None:
+            return None
+        return {"symbol": symbol, "bid": book.bid, "ask": book.ask, "last": book.last, "timestamp": book.timestamp}
+
+    def submit(self, symbol: str, side: str, order_type: str, amount: float, price: Optional[float] = None,
+               params: Optional[Dict] = None, order_id: Optional[str] = None) -> Dict:
+        """
+        Submit an order.
+
+        Stop-loss and take-profit orders use ccxt's unified stopLossPrice,
+        takeProfitPrice or triggerPrice params; they rest until the last
+        price crosses the trigger and then execute as market orders (or as
+        limit orders when a price is given).
+
+        Args:
+            symbol: The trading symbol.
+            side: 'buy' or 'sell'.
+            order_type: 'market' or 'limit'.
+            amount: The order amount in base currency.
+            price: The limit price, if any.
+            params: ccxt-style order params.
+            order_id: The order id. Defaults to a sequential id.
+
+        Returns:
+            The order, in ccxt's order structure. The engine keeps updating it in place.
+        """
+        book = self._books.get(symbol)
+        now = book.timestamp if book else 0
+        order_id = order_id or "sim-%d" % next(self._sequence)
+        quote_currency = self._quote_currencies.get(symbol)
+        if quote_currency is None:
+            quote_currency = self._quote_currencies[symbol] = symbol.split("/")[1]
+        order = {
+            "id": order_id,
+            "clientOrderId": params.get("clientOrderId") if params else None,
+            "symbol": symbol,
+            "type": order_type,
+            "side": side,
+            "amount": amount,
+            "price": price,
+            "average": None,
+            "cost": 0.0,
+            "filled": 0.0,
+            "remaining": amount,
+            "status": "open",
+            "timestamp": now,
+            "lastTradeTimestamp": None,
+            "fee": {"cost": 0.0, "currency": quote_currency},
+            "triggerPrice": None,
+        }
+        if params:
+            trigger = params.get("stopLossPrice") or params.get("takeProfitPrice") or params.get("triggerPrice") \
+                or params.get("stopPrice")
+            if trigger:
+                order["triggerPrice"] = trigger
+                if params.get("stopLossPrice"):
+                    self._falling[order_id] = side == "sell"
+                elif params.get("takeProfitPrice"):
+                    self._falling[order_id] = side == "buy"
+                else:
+                    self._falling[order_id] = book is not None and trigger < book.last
+        self.orders[order_id] = order
+
+        if self.latency_ms > 0 or book is None:
+            heapq.heappush(self._in_flight, (now + self.latency_ms, next(self._sequence), order))
+        elif order["triggerPrice"] is not None:
+            self._arrive(order, book)
+        else:
+            # Inlined _arrive for plain orders, the bulk of a backtest's order flow.
+            self._execute(order, book, self.taker_fee)
+            if order["status"] == "open":
+                if price is None:
+                    order["status"] = "canceled"
+                elif side == "buy":
+                    heapq.heappush(book.buy_limits, (-price, next(self._sequence), order))
+                else:
+                    heapq.heappush(book.sell_limits, (price, next(self._sequence), order))
+        return order
+
+    def cancel(self, order_id: str) -> bool:
+        """Cancel an open order. Returns False if it is unknown or already done."""
+        order = self.orders.get(order_id)
+        if order is None or order["status"] != "open":
+            return False
+        order["status"] = "canceled"
+        return True
+
+    def _arrive(self, order: Dict, book: _Book):
+        """Handle an order reaching the book: park it as a trigger, or execute it as a taker."""
+        trigger = order["triggerPrice"]
+        if order["id"] in self._falling:
+            if self._falling[order["id"]]:
+                heapq.heappush(book.falling_triggers, (-trigger, next(self._sequence), order))
+            else:
+                heapq.heappush(book.rising_triggers, (trigger, next(self._sequence), order))
+            return
+        self._execute(order, book, self.taker_fee)
+        if order["status"] == "open":
+            if order["price"] is None:
+                # Market orders are immediate-or-cancel: the book ran out of depth.
+                order["status"] = "canceled"
+            else:
+                self._rest(order, book)
+
+    def _rest(self, order: Dict, book: _Book):
+        if order["side"] == "buy":
+            heapq.heappush(book.buy_limits, (-order["price"], next(self._sequence), order))
+        else:
+            heapq.heappush(book.sell_limits, (order["price"], next(self._sequence), order))
+
+    def _fire_triggers(self, book: _Book, filled: List[Dict]):
+        fired = []
+        while book.falling_triggers and -book.falling_triggers[0][0] >= book.last:
+            fired.append(heapq.heappop(book.falling_triggers)[2])
+        while book.rising_triggers and book.rising_triggers[0][0] <= book.last:
+            fired.append(heapq.heappop(book.rising_triggers)[2])
+        for order in fired:
+            del self._falling[order["id"]]
+            if order["status"] != "open":
+                continue
+            self._arrive(order, book)
+            if order["filled"] > 0:
+                filled.append(order)
+
+    def _match_resting(self, book: _Book, heap: List, side: str, filled: List[Dict]):
+        while heap:
+            key, sequence, order = heap[0]
+            if order["status"] != "open":
+                heapq.heappop(heap)
+                continue
+            crosses = -key >= book.ask if side == "buy" else key <= book.bid
+            if not crosses:
+                return
+            before = order["filled"]
+            self._execute(order, book, self.maker_fee)
+            if order["filled"] == before:
+                # No depth left on this side until the next update.
+                return
+            filled.append(order)
+            if order["status"] != "open":
+                heapq.heappop(heap)
+
+    def _execute(self, order: Dict, book: _Book, fee_rate: float):
+        """Fill as much of an order as the remaining depth within its limit price allows."""
+        buy = order["side"] == "buy"
+        best = book.ask if buy else book.bid
+        step = best * self.level_spacing * (1 if buy else -1)
+        levels = self.max_levels
+        limit = order["price"]
+        if limit is not None:
+            distance = (limit - best) if buy else (best - limit)
+            if distance < 0:
+                return
+            if step:
+                levels = min(levels, int(distance / abs(step) + _EPSILON) + 1)
+
+        level_size = self.level_size
+        consumed = book.consumed_ask if buy else book.consumed_bid
+        available = levels * level_size - consumed
+        remaining = order["remaining"]
+        amount = remaining if remaining < available else available
+        if amount <= _EPSILON:
+            return
+        level = int(consumed / level_size + _EPSILON)
+        if consumed + amount <= (level + 1) * level_size:
+            # Common case: the fill stays within one price level.
+            cost = amount * (best + step * level)
+        else:
+            cost = self._depth_cost(consumed + amount, best, step) - self._depth_cost(consumed, best, step)
+        if buy:
+            book.consumed_ask = consumed + amount
+        else:
+            book.consumed_bid = consumed + amount
+        fee = cost * fee_rate
+
+        filled = order["filled"] + amount
+        order["filled"] = filled
+        order["cost"] += cost
+        order["average"] = order["cost"] / filled
+        order["fee"]["cost"] += fee
+        order["lastTradeTimestamp"] = book.timestamp
+        if remaining - amount <= _EPSILON:
+            order["remaining"] = 0.0
+            order["status"] = "closed"
+        else:
+            order["remaining"] = remaining - amount
+        if self.on_fill:
+            self.on_fill(order, amount, cost, fee)
+
+    def _depth_cost(self, depth: float, best: float, step: float) -> float:
+        """The cost of taking ``depth`` from the best level outwards."""
+        levels = math.floor(depth / self.level_size + _EPSILON)
+        partial = depth - levels * self.level_size
+        full_cost = self.level_size * (levels * best + step * levels * (levels - 1) / 2)
+        return full_cost + max(partial, 0.0) * (best + step * levels)
@@ -1,81 +1,140 @@
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
+from trading_bot.execution.matching_engine import SimulatedMatchingEngine
 from trading_bot.interfaces.exchange_adapter import ExchangeAdapter
+import ccxt
+import threading
 import time
-import uuid
+
+# Conditional exit orders are not checked against the free balance: they close a position.
+CONDITIONAL_PARAMS = ("stopLossPrice", "takeProfitPrice", "triggerPrice", "stopPrice")
+
 
 class MockExecutionAdapter(ExchangeAdapter):
-    """A mock adapter for testing purposes."""
+    """
+    A simulated exchange for backtesting.
+
+    Orders are matched by a SimulatedMatchingEngine against the quotes of
+    the market data source (the MarketDataSimulator when backtesting), with
+    fees, spread, depth-based slippage, latency and partial fills.
+    """
+
+    def __init__(self, quote_source: Optional[Callable[[str], Dict]] = None, balance: Optional[Dict[str, float]] = None,
+                 quote_refresh_seconds: float = 1.0, engine: Optional[SimulatedMatchingEngine] = None,
+                 clock: Callable[[], float] = time.time):
+        """
+        Initialize the MockExecutionAdapter.
+
+        Args:
+            quote_source: Returns the current ticker of a symbol. Defaults to a fixed 50000.0 quote.
+            balance: The starting balance per currency.
+            quote_refresh_seconds: How long a quote is reused before the book is moved to a new one.
+            engine: The matching engine. Defaults to one with the default fee and liquidity model.
+            clock: The clock the book timestamps come from, in seconds.
+        """
+        self.balance = dict(balance) if balance else {"USDT": 10000.0, "BTC": 0.5}
+        self.quote_source = quote_source or self._fixed_quote
+        self.quote_refresh_seconds = quote_refresh_seconds
+        self.clock = clock
+        self.engine = engine or SimulatedMatchingEngine()
+        self.engine.on_fill = self._apply_fill
+        self.orders = self.engine.orders
+        self.client_order_ids = {}
+        self._quoted_at: Dict[str, float] = {}
+        # The engine is not thread-safe; symbol cycles may trade concurrently.
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _fixed_quote(symbol: str) -> Dict:
+        return {"symbol": symbol, "last": 50000.0, "bid": 49990.0, "ask": 50010.0}
+
+    def sync_market(self, symbol: str):
+        """Move the simulated book of a symbol to the current quote, if the last one is stale."""
+        with self._lock:
+            self._sync_market(symbol)
 
-    def __init__(self):
-        """Initialize the MockExecutionAdapter."""
-        self.balance = {"USDT": 10000.0, "BTC": 0.5}
-        self.orders = {}
+    def _sync_market(self, symbol: str):
+        now = self.clock()
+        quoted_at = self._quoted_at.get(symbol)
+        if quoted_at is not None and now - quoted_at < self.quote_refresh_seconds:
+            return
+        self._quoted_at[symbol] = now
+        quote = self.quote_source(symbol)
+        last = quote.get("last") or quote.get("close")
+        self.engine.update_market(symbol, quote.get("bid") or last, quote.get("ask") or last, int(now * 1000), last)
 
     def get_balance(self) -> Dict[str, float]:
         """Get the account balance."""
         # Return a structure similar to ccxt fetch_balance
-        return {
-            "free": self.balance,
-            "total": self.balance,
-            "used": {k: 0.0 for k in self.balance},
-            "info": "Mock Balance"
-        }
+        with self._lock:
+            return {
+                "free": dict(self.balance),
+                "total": dict(self.balance),
+                "used": {k: 0.0 for k in self.balance},
+                "info": "Mock Balance"
+            }
 
     def get_ticker(self, symbol: str) -> Dict:
         """Get the latest ticker information for a symbol."""
-        return {
-            "symbol": symbol,
-            "last": 50000.0, # Dummy price
-            "bid": 49990.0,
-            "ask": 50010.0,
-            "timestamp": int(time.time() * 1000)
-        }
-
-    def create_order(self, symbol: str, side: str, order_type: str, amount: float, price: Optional[float] = None) -> Dict:
+        with self._lock:
+            self._sync_market(symbol)
+            return self.engine.get_quote(symbol)
+
+    def create_order(self, symbol: str, side: str, order_type: str, amount: float, price: Optional[float] = None,
+                     params: Optional[Dict] = None) -> Dict:
         """Create a new order."""
-        order_id = str(uuid.uuid4())
-        timestamp = int(time.time() * 1000)
-        
-        # Simulate filling the order immediately for market orders
-        status = "closed" if order_type == "market" else "open"
-        filled = amount if status == "closed" else 0.0
-        
-        # Update mock balance (simplified)
+        params = params or {}
+        client_order_id = params.get("clientOrderId")
+        with self._lock:
+            if client_order_id in self.client_order_ids:
+                raise ccxt.DuplicateOrderId(f"Duplicate client order id {client_order_id}")
+
+            self._sync_market(symbol)
+            if not any(key in params for key in CONDITIONAL_PARAMS):
+                self._check_funds(symbol, side, amount, price)
+
+            order = self.engine.submit(symbol, side, order_type, amount, price, params)
+            if client_order_id:
+                self.client_order_ids[client_order_id] = order["id"]
+            return self._snapshot(order)
+
+    @staticmethod
+    def _snapshot(order: Dict) -> Dict:
+        """Copy an order, so callers do not see the engine's later in-place updates."""
+        return {**order, "fee": dict(order["fee"])}
+
+    def _check_funds(self, symbol: str, side: str, amount: float, price: Optional[float]):
         base, quote = symbol.split('/')
         if side == 'buy':
-            cost = amount * (price if price else 50000.0)
-            if self.balance.get(quote, 0) >= cost:
-                self.balance[quote] -= cost
-                self.balance[base] = self.balance.get(base, 0) + amount
-        elif side == 'sell':
-            if self.balance.get(base, 0) >= amount:
-                self.balance[base] -= amount
-                self.balance[quote] = self.balance.get(quote, 0) + (amount * (price if price else 50000.0))
-
-        order = {
-            "id": order_id,
-            "symbol": symbol,
-            "type": order_type,
-            "side": side,
-            "amount": amount,
-            "price": price or 50000.0,
-            "cost": amount * (price or 50000.0),
-            "filled": filled,
-            "remaining": amount - filled,
-            "status": status,
-            "timestamp": timestamp,
-            "average": price or 50000.0
-        }
-        self.orders[order_id] = order
-        return order
+            notional = amount * (price or self.engine.get_quote(symbol)["ask"])
+            if self.balance.get(quote, 0.0) < notional:
+                raise ccxt.InsufficientFunds(f"Insufficient {quote} for {notional:.2f}")
+        elif self.balance.get(base, 0.0) < amount:
+            raise ccxt.InsufficientFunds(f"Insufficient {base} for {amount}")
+
+    def _apply_fill(self, order: Dict, amount: float, cost: float, fee: float):
+        base, quote = order["symbol"].split('/')
+        if order["side"] == 'buy':
+            self.balance[base] = self.balance.get(base, 0.0) + amount
+            self.balance[quote] = self.balance.get(quote, 0.0) - cost - fee
+        else:
+            self.balance[base] = self.balance.get(base, 0.0) - amount
+            self.balance[quote] = self.balance.get(quote, 0.0) + cost - fee
 
     def cancel_order(self, order_id: str, symbol: str = None) -> bool:
         """Cancel an existing order."""
-        if order_id in self.orders:
-            self.orders[order_id]["status"] = "canceled"
-            return True
-        return False
+        with self._lock:
+            return self.engine.cancel(order_id)
 
     def fetch_order(self, order_id: str, symbol: str = None) -> Dict:
         """Fetch the details of an order."""
-        return self.orders.get(order_id, {"status": "unknown"})
+        with self._lock:
+            order = self.orders.get(order_id)
+            if order is None:
+                return {"status": "unknown"}
+            self._sync_market(order["symbol"])
+            return self._snapshot(order)
+
+    def fetch_order_by_client_id(self, client_order_id: str, symbol: str) -> Optional[Dict]:
+        """Fetch an order by its client order id."""
+        order_id = self.client_order_ids.get(client_order_id)
+        return self.fetch_order(order_id, symbol) if order_id else None
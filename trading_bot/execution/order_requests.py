@@ -0,0 +1,77 @@
+import hashlib
+import time
+from typing import Dict, List, Optional
+from trading_bot.models.decision import Decision
+
+TRADE_ACTIONS = ("BUY", "SELL")
+
+# Short leg codes keep client order ids within Binance's 36 character limit.
+LEG_CODES = {"entry": "en", "stop_loss": "sl", "take_profit": "tp"}
+
+
+def client_order_id(decision: Decision, leg: str = "entry", bucket_seconds: int = 60,
+                    now: Optional[float] = None) -> str:
+    """
+    Build a deterministic client order id for one leg of a decision.
+
+    The same decision submitted again within the same time bucket maps to
+    the same id, so a retry after a timeout cannot place a second order:
+    the exchange rejects the duplicate id and the original can be looked up.
+
+    Args:
+        decision: The trading decision the order belongs to.
+        leg: The order leg ('entry', 'stop_loss' or 'take_profit').
+        bucket_seconds: The width of the time bucket the decision is assigned to.
+        now: The decision time in seconds since the epoch. Defaults to the current time.
+
+    Returns:
+        The client order id.
+    """
+    bucket = int((now if now is not None else time.time()) // bucket_seconds)
+    key = f"{decision.symbol}|{decision.action.upper()}|{decision.size:.8f}|{decision.price}|{bucket}"
+    return f"tb{hashlib.sha1(key.encode()).hexdigest()[:28]}-{LEG_CODES[leg]}"
+
+
+def build_order_requests(decision: Decision, bucket_seconds: int = 60, now: Optional[float] = None) -> List[Dict]:
+    """
+    Build the order requests for a decision: the entry, then its protective legs.
+
+    Stop-loss and take-profit legs close the entry and use ccxt's unified
+    stopLossPrice/takeProfitPrice parameters, so they rest as conditional
+    orders on the exchange.
+
+    Args:
+        decision: A validated BUY or SELL decision.
+        bucket_seconds: The width of the time bucket used for the client order ids.
+        now: The decision time in seconds since the epoch. Defaults to the current time.
+
+    Returns:
+        A list of create_order keyword arguments, entry first.
+    """
+    now = now if now is not None else time.time()
+    side = decision.action.lower()
+    exit_side = "sell" if side == "buy" else "buy"
+    requests = [{
+        "symbol": decision.symbol,
+        "side": side,
+        "order_type": "limit" if decision.price else "market",
+        "amount": decision.size,
+        "price": decision.price,
+        "params": {"clientOrderId": client_order_id(decision, "entry", bucket_seconds, now)},
+    }]
+
+    for leg, trigger_param, trigger_price in (("stop_loss", "stopLossPrice", decision.stop_loss),
+                                              ("take_profit", "takeProfitPrice", decision.take_profit)):
+        if trigger_price:
+            requests.append({
+                "symbol": decision.symbol,
+                "side": exit_side,
+                "order_type": "market",
+                "amount": decision.size,
+                "price": None,
+                "params": {
+                    "clientOrderId": client_order_id(decision, leg, bucket_seconds, now),
+                    trigger_param: trigger_price,
+                },
+            })
+    return requests
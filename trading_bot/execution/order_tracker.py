@@ -0,0 +1,302 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import ccxt.pro as ccxtpro
+except ImportError:
+    ccxtpro = None
+
+from trading_bot.logging.logger import logger
+
+TERMINAL_STATUSES = ("closed", "canceled", "cancelled", "expired", "rejected")
+
+OrderCallback = Callable[[Dict], None]
+
+
+class _TrackedOrder:
+    """Bookkeeping for one order being tracked."""
+
+    def __init__(self, order: Dict, future: Future, on_complete: Optional[OrderCallback],
+                 on_fill: Optional[OrderCallback], delay: float, deadline: float, now: float):
+        self.order = order
+        self.future = future
+        self.on_complete = on_complete
+        self.on_fill = on_fill
+        self.delay = delay
+        self.deadline = deadline
+        self.next_poll_at = now + delay
+        self.filled = order.get("filled") or 0.0
+
+
+class OrderTracker:
+    """
+    Tracks submitted orders until they reach a terminal state.
+
+    Fills are learned from pushed order updates (the exchange user-data
+    stream) when available. A background thread polls fetch_order as a
+    fallback, backing off exponentially between polls so an order that
+    rests on the book costs few requests; after timeout it is polled every
+    resting_poll_seconds until it ends, so a late fill is still recorded.
+    Stream updates for an order not tracked yet (pushed before create_order
+    returned) are buffered for unmatched_ttl seconds and applied when it is.
+    Completion is reported through a Future and an optional callback, so
+    the caller never blocks on it.
+    """
+
+    def __init__(self, exchange_adapter, initial_delay: float = 0.5, max_delay: float = 15.0,
+                 backoff: float = 2.0, timeout: float = 300.0, resting_poll_seconds: float = 300.0,
+                 unmatched_ttl: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the OrderTracker.
+
+        Args:
+            exchange_adapter: The ExchangeAdapter used to poll orders.
+            initial_delay: The delay in seconds before the first poll of a new order.
+            max_delay: The maximum delay in seconds between two polls of the same order.
+            backoff: The factor the delay grows by after each poll that finds the order still open.
+            timeout: How long in seconds an order is polled with backoff before it is considered resting.
+            resting_poll_seconds: The delay in seconds between two polls of a resting order.
+            unmatched_ttl: How long in seconds a stream update for an untracked order is kept.
+            clock: A monotonic clock, injectable for tests.
+        """
+        self.exchange_adapter = exchange_adapter
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff = backoff
+        self.timeout = timeout
+        self.resting_poll_seconds = resting_poll_seconds
+        self.unmatched_ttl = unmatched_ttl
+        self.clock = clock
+        # While a user-data stream delivers updates, polling only serves as a safety net.
+        self.stream_connected = False
+        self._orders: Dict[str, _TrackedOrder] = {}
+        # Order id -> (update, received at), for stream updates that arrived before their order was tracked.
+        self._unmatched: Dict[str, Tuple[Dict, float]] = {}
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def track(self, order: Dict, on_complete: Optional[OrderCallback] = None,
+              on_fill: Optional[OrderCallback] = None) -> Future:
+        """
+        Track an order until it is filled or ends otherwise.
+
+        Args:
+            order: The order as returned by create_order (must contain 'id' and 'symbol').
+            on_complete: Called with the final order once it reaches a terminal state.
+            on_fill: Called with the order whenever its filled amount grows (including partial fills).
+
+        Returns:
+            A Future resolving to the final order.
+        """
+        future: Future = Future()
+        now = self.clock()
+        delay = self.max_delay if self.stream_connected else self.initial_delay
+        tracked = _TrackedOrder(order, future, on_complete, on_fill, delay, now + self.timeout, now)
+
+        with self._condition:
+            self._expire_unmatched(now)
+            buffered = self._unmatched.pop(order["id"], None)
+            done = self._apply_update(tracked, buffered[0]) if buffered else order.get("status") in TERMINAL_STATUSES
+            if not done:
+                self._orders[order["id"]] = tracked
+                self._ensure_running()
+                self._condition.notify()
+        if done:
+            self._complete(tracked)
+        return future
+
+    def on_order_update(self, order: Dict):
+        """Apply an order update pushed by the exchange (e.g. from the user-data stream)."""
+        with self._condition:
+            tracked = self._orders.get(order.get("id"))
+            if tracked is None:
+                # The order may be tracked as soon as create_order returns: keep its latest update until then.
+                now = self.clock()
+                self._expire_unmatched(now)
+                if order.get("id") is not None:
+                    previous = self._unmatched.get(order["id"], ({}, now))[0]
+                    self._unmatched[order["id"]] = ({**previous, **{k: v for k, v in order.items() if v is not None}},
+                                                    now)
+                return
+            done = self._apply_update(tracked, order)
+            if done:
+                del self._orders[order["id"]]
+        if done:
+            self._complete(tracked)
+
+    def _expire_unmatched(self, now: float):
+        for order_id, (_, received_at) in list(self._unmatched.items()):
+            if now - received_at > self.unmatched_ttl:
+                del self._unmatched[order_id]
+
+    def pending(self) -> List[str]:
+        """Get the ids of the orders still being tracked."""
+        with self._condition:
+            return list(self._orders)
+
+    def stop(self):
+        """Stop the polling thread. Orders still tracked are left unresolved."""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _ensure_running(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._running = True
+            self._thread = threading.Thread(target=self._poll_loop, name="OrderTracker", daemon=True)
+            self._thread.start()
+
+    def _apply_update(self, tracked: _TrackedOrder, order: Dict) -> bool:
+        """Merge an order update into the tracked state. Returns True if the order is done."""
+        tracked.order = {**tracked.order, **{k: v for k, v in order.items() if v is not None}}
+        filled = tracked.order.get("filled") or 0.0
+        if filled > tracked.filled:
+            tracked.filled = filled
+            if tracked.on_fill:
+                try:
+                    tracked.on_fill(tracked.order)
+                except Exception as e:
+                    logger.error(f"Order fill callback failed for {order.get('id')}: {e}")
+        return tracked.order.get("status") in TERMINAL_STATUSES
+
+    def _complete(self, tracked: _TrackedOrder):
+        if tracked.on_complete:
+            try:
+                tracked.on_complete(tracked.order)
+            except Exception as e:
+                logger.error(f"Order completion callback failed for {tracked.order.get('id')}: {e}")
+        tracked.future.set_result(tracked.order)
+
+    def _poll_loop(self):
+        while True:
+            with self._condition:
+                if not self._running:
+                    return
+                now = self.clock()
+                due = [t for t in self._orders.values() if t.next_poll_at <= now]
+                if not due:
+                    wait = min((t.next_poll_at for t in self._orders.values()), default=now + self.max_delay) - now
+                    self._condition.wait(timeout=max(wait, 0.0))
+                    continue
+
+            for tracked in due:
+                self._poll(tracked)
+
+    def _poll(self, tracked: _TrackedOrder):
+        order_id = tracked.order["id"]
+        try:
+            order = self.exchange_adapter.fetch_order(order_id, tracked.order.get("symbol"))
+        except Exception as e:
+            logger.warning(f"Polling order {order_id} failed: {e}")
+            order = {}
+
+        with self._condition:
+            if order_id not in self._orders:
+                # Completed by a stream update while the poll was in flight.
+                return
+            done = self._apply_update(tracked, order) if order else False
+            now = self.clock()
+            resting = not done and now >= tracked.deadline
+            if done:
+                del self._orders[order_id]
+            elif resting:
+                if tracked.delay < self.resting_poll_seconds:
+                    logger.info(f"Order {order_id} still {tracked.order.get('status')} after {self.timeout}s, "
+                                f"polling it every {self.resting_poll_seconds}s")
+                tracked.delay = self.resting_poll_seconds
+                tracked.next_poll_at = now + tracked.delay
+            else:
+                tracked.delay = min(tracked.delay * self.backoff, self.max_delay)
+                tracked.next_poll_at = now + tracked.delay
+
+        if done:
+            self._complete(tracked)
+
+
+class UserDataStream:
+    """
+    Pushes order and balance updates from the exchange's private websocket
+    stream to an OrderTracker and, optionally, a BalanceCache.
+
+    Requires ccxt.pro (bundled with recent ccxt releases); without it, the
+    tracker relies on polling alone.
+    """
+
+    def __init__(self, exchange_config: Dict, tracker: OrderTracker, exchange_id: str = "binance",
+                 balance_cache=None):
+        """
+        Initialize the UserDataStream.
+
+        Args:
+            exchange_config: The ccxt exchange configuration (API credentials and options).
+            tracker: The OrderTracker receiving order updates.
+            exchange_id: The ccxt exchange id.
+            balance_cache: The BalanceCache receiving balance updates, if any.
+        """
+        self.exchange_config = exchange_config
+        self.tracker = tracker
+        self.exchange_id = exchange_id
+        self.balance_cache = balance_cache
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    @staticmethod
+    def is_available() -> bool:
+        """Whether websocket streams are supported by the installed ccxt."""
+        return ccxtpro is not None
+
+    def start(self):
+        """Start streaming in a background thread."""
+        if not self.is_available() or self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._run()), name="UserDataStream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop streaming."""
+        self._running = False
+
+    async def _run(self):
+        exchange = getattr(ccxtpro, self.exchange_id)(self.exchange_config)
+        try:
+            watchers = [self._watch_orders(exchange)]
+            if self.balance_cache is not None:
+                watchers.append(self._watch_balance(exchange))
+            await asyncio.gather(*watchers)
+        finally:
+            self.tracker.stream_connected = False
+            await exchange.close()
+
+    async def _watch_orders(self, exchange):
+        delay = 1.0
+        while self._running:
+            try:
+                orders = await exchange.watch_orders()
+                self.tracker.stream_connected = True
+                delay = 1.0
+                for order in orders:
+                    self.tracker.on_order_update(order)
+            except Exception as e:
+                self.tracker.stream_connected = False
+                logger.warning(f"User-data stream error, reconnecting in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60.0)
+
+    async def _watch_balance(self, exchange):
+        delay = 1.0
+        while self._running:
+            try:
+                balance = await exchange.watch_balance()
+                delay = 1.0
+                self.balance_cache.apply_balance_update(balance)
+            except Exception as e:
+                logger.warning(f"Balance stream error, reconnecting in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60.0)
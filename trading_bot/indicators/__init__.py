@@ -1,2 +1,7 @@
 # trading_bot/indicators/__init__.py
-from .indicators_engine import IndicatorsEngine
+from trading_bot.services import lazy_exports
+
+__all__ = ['IndicatorsEngine']
+__getattr__ = lazy_exports(__name__, {
+    "IndicatorsEngine": ".indicators_engine",
+})
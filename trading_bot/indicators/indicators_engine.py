@@ -1,5 +1,7 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Union
 import pandas as pd
+from trading_bot.market_data.candle_store import CandleArray
+from trading_bot.services import services
 try:
     import ta
     from ta.trend import EMAIndicator, SMAIndicator, MACD
@@ -16,12 +18,12 @@ class IndicatorsEngine:
         """Initialize the IndicatorsEngine."""
         pass
 
-    def get_all_indicators(self, candles: List[List[Any]]) -> Dict[str, Any]:
+    def get_all_indicators(self, candles: Union[List[List[Any]], CandleArray]) -> Dict[str, Any]:
         """
         Compute all technical indicators for a given symbol and timeframe.
 
         Args:
-            candles: A list of OHLCV candles.
+            candles: A list of OHLCV candles, or the columns of stored candles.
 
         Returns:
             A dictionary containing the computed indicators.
@@ -37,9 +39,13 @@ class IndicatorsEngine:
             "vwap": self.get_vwap(df),
         }
 
-    def _candles_to_dataframe(self, candles: List[List[Any]]) -> pd.DataFrame:
-        """Converts a list of OHLCV candles to a pandas DataFrame."""
-        df = pd.DataFrame(candles, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    def _candles_to_dataframe(self, candles: Union[List[List[Any]], CandleArray]) -> pd.DataFrame:
+        """Converts OHLCV candles to a pandas DataFrame."""
+        if isinstance(candles, CandleArray):
+            # Wrap the (memory-mapped) columns as they are instead of boxing every value.
+            df = pd.DataFrame(candles.columns(), copy=False)
+        else:
+            df = pd.DataFrame(candles, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
         df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
         return df
 
@@ -88,4 +94,4 @@ class IndicatorsEngine:
         indicator = VolumeWeightedAveragePrice(high=df['high'], low=df['low'], close=df['close'], volume=df['volume'])
         return indicator.volume_weighted_average_price().iloc[-1]
 
-indicators_engine = IndicatorsEngine()
+indicators_engine = services.lazy("indicators_engine")
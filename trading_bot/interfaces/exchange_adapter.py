@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 class ExchangeAdapter(ABC):
     """Abstract base class for an exchange adapter."""
@@ -15,10 +15,41 @@ class ExchangeAdapter(ABC):
         pass
 
     @abstractmethod
-    def create_order(self, symbol: str, side: str, order_type: str, amount: float, price: Optional[float] = None) -> Dict:
+    def create_order(self, symbol: str, side: str, order_type: str, amount: float, price: Optional[float] = None,
+                     params: Optional[Dict] = None) -> Dict:
         """Create a new order."""
         pass
 
+    def create_orders(self, orders: List[Dict]) -> List[Dict]:
+        """
+        Create several orders, in one request where the exchange allows it.
+
+        Args:
+            orders: A list of create_order keyword arguments.
+
+        Returns:
+            The created orders, in the same order.
+        """
+        return [self.create_order(**order) for order in orders]
+
+    def create_oco_order(self, stop_loss: Dict, take_profit: Dict) -> Optional[List[Dict]]:
+        """
+        Create a stop-loss and a take-profit order as a one-cancels-the-other pair, where the exchange has one.
+
+        Args:
+            stop_loss: The create_order keyword arguments of the stop-loss, with stopLossPrice in params.
+            take_profit: The create_order keyword arguments of the take-profit, with takeProfitPrice in params.
+
+        Returns:
+            The stop-loss and take-profit orders, or None if the exchange has no OCO orders.
+        """
+        return None
+
+    @abstractmethod
+    def fetch_order_by_client_id(self, client_order_id: str, symbol: str) -> Optional[Dict]:
+        """Fetch an order by its client order id. Returns None if the exchange does not know it."""
+        pass
+
     @abstractmethod
     def cancel_order(self, order_id: str) -> bool:
         """Cancel an existing order."""
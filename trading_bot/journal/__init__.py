@@ -0,0 +1 @@
+from .cycle_journal import CycleJournal, create_cycle_journal
@@ -0,0 +1,251 @@
+import dataclasses
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, Optional
+from trading_bot.config import config
+from trading_bot.logging.logger import logger
+
+# msgpack and zstandard are optional: without them records are JSON compressed with zlib.
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MAGIC = b"TBJRNL\x00\x01"
+# Each record is its payload length, the CRC32 of the payload and the codec it was written with.
+RECORD_HEADER = struct.Struct("<IIB")
+# The index holds the offset of each record in the data file.
+INDEX_ENTRY = struct.Struct("<Q")
+
+SERIALIZER_JSON, SERIALIZER_MSGPACK = 0x00, 0x01
+COMPRESSOR_ZLIB, COMPRESSOR_ZSTD = 0x00, 0x10
+
+
+def _to_serializable(value: Any) -> Any:
+    """Convert the values a cycle context holds besides plain types (numpy scalars, datetimes, dataclasses)."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Cannot journal a value of type {type(value).__name__}")
+
+
+class CycleJournal:
+    """
+    An append-only journal of the decisions made in each cycle.
+
+    Every record keeps what a decision was made from and how: the full
+    context given to the decision engine, the LLM transcript and the
+    decision. Records are serialized with msgpack (or JSON), compressed
+    with zstd (or zlib) and appended to a data file; a second file indexes
+    their offsets. Both are memory-mapped for reading, so any record can
+    be read without scanning the journal, e.g. to replay a cycle offline
+    through another decision engine.
+
+    Appends are flushed to the OS but not synced to disk: sync() is called
+    once per cycle, so a machine crash loses at most the last cycle's
+    records. A record torn by a crash is detected by its checksum and
+    dropped when the journal is reopened.
+    """
+
+    def __init__(self, path: str, compression_level: int = 3):
+        """
+        Open or create a journal.
+
+        Args:
+            path: The directory holding the journal files.
+            compression_level: The zstd (or zlib) compression level.
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.compression_level = compression_level
+        self.codec = (SERIALIZER_MSGPACK if msgpack else SERIALIZER_JSON) | \
+                     (COMPRESSOR_ZSTD if zstandard else COMPRESSOR_ZLIB)
+        self._lock = threading.RLock()
+        self._data_map: Optional[mmap.mmap] = None
+        self._index_map: Optional[mmap.mmap] = None
+        self._data = open(os.path.join(path, "cycles.journal"), "a+b")
+        self._index = open(os.path.join(path, "cycles.idx"), "a+b")
+        if os.fstat(self._data.fileno()).st_size == 0:
+            self._data.write(MAGIC)
+            self._data.flush()
+        self._recover()
+
+    def _recover(self):
+        """Reconcile the index with the data file after an unclean shutdown."""
+        self._data.seek(0)
+        if self._data.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{self.path} is not a cycle journal")
+        data_size = os.fstat(self._data.fileno()).st_size
+        index_size = os.fstat(self._index.fileno()).st_size
+        count = index_size // INDEX_ENTRY.size
+
+        # Drop index entries that do not point at a complete record.
+        offsets = []
+        self._index.seek(0)
+        for _ in range(count):
+            offsets.append(INDEX_ENTRY.unpack(self._index.read(INDEX_ENTRY.size))[0])
+        while offsets and self._record_end(offsets[-1], data_size) is None:
+            offsets.pop()
+
+        # Index the complete records written after the last indexed one, then drop a torn tail.
+        end = self._record_end(offsets[-1], data_size) if offsets else len(MAGIC)
+        recovered = []
+        while True:
+            record_end = self._record_end(end, data_size)
+            if record_end is None:
+                break
+            recovered.append(end)
+            end = record_end
+
+        if len(offsets) != count or recovered or end != data_size:
+            logger.warning(f"Recovering cycle journal {self.path}: {count - len(offsets)} stale index entries, "
+                           f"{len(recovered)} unindexed records, {data_size - end} torn bytes.")
+            self._data.truncate(end)
+            self._index.truncate(len(offsets) * INDEX_ENTRY.size)
+            for offset in recovered:
+                self._index.write(INDEX_ENTRY.pack(offset))
+            self._data.flush()
+            self._index.flush()
+        self._count = len(offsets) + len(recovered)
+
+    def _record_end(self, offset: int, data_size: int) -> Optional[int]:
+        """The end offset of the record at an offset, or None if it is incomplete or corrupt."""
+        if offset + RECORD_HEADER.size > data_size:
+            return None
+        self._data.seek(offset)
+        length, crc, _ = RECORD_HEADER.unpack(self._data.read(RECORD_HEADER.size))
+        end = offset + RECORD_HEADER.size + length
+        if end > data_size or zlib.crc32(self._data.read(length)) != crc:
+            return None
+        return end
+
+    def _encode(self, record: Dict[str, Any]) -> bytes:
+        if self.codec & SERIALIZER_MSGPACK:
+            raw = msgpack.packb(record, default=_to_serializable, use_bin_type=True)
+        else:
+            raw = json.dumps(record, default=_to_serializable, separators=(",", ":")).encode("utf-8")
+        if self.codec & COMPRESSOR_ZSTD:
+            return zstandard.ZstdCompressor(level=self.compression_level).compress(raw)
+        return zlib.compress(raw, min(self.compression_level, 9))
+
+    @staticmethod
+    def _decode(codec: int, payload: bytes) -> Dict[str, Any]:
+        if codec & COMPRESSOR_ZSTD:
+            if zstandard is None:
+                raise RuntimeError("The record is compressed with zstd; install zstandard to read it.")
+            raw = zstandard.ZstdDecompressor().decompress(payload)
+        else:
+            raw = zlib.decompress(payload)
+        if codec & SERIALIZER_MSGPACK:
+            if msgpack is None:
+                raise RuntimeError("The record is serialized with msgpack; install msgpack to read it.")
+            return msgpack.unpackb(raw, raw=False)
+        return json.loads(raw)
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """
+        Append a record.
+
+        Args:
+            record: The record, made of plain types, numpy values, datetimes and dataclasses.
+
+        Returns:
+            The position of the record in the journal.
+        """
+        payload = self._encode(record)
+        with self._lock:
+            self._data.seek(0, os.SEEK_END)
+            offset = self._data.tell()
+            self._data.write(RECORD_HEADER.pack(len(payload), zlib.crc32(payload), self.codec) + payload)
+            self._data.flush()
+            # The index is written after the record, so it never points at a record that is not on disk.
+            self._index.write(INDEX_ENTRY.pack(offset))
+            self._index.flush()
+            position = self._count
+            self._count += 1
+            return position
+
+    def sync(self):
+        """Force the appended records to disk, the data file before the index that points into it."""
+        with self._lock:
+            for file in (self._data, self._index):
+                file.flush()
+                os.fsync(file.fileno())
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _maps(self):
+        """The memory maps of the data and index files, remapped when records were appended since."""
+        index_size = self._count * INDEX_ENTRY.size
+        if self._index_map is None or len(self._index_map) < index_size:
+            self._index.flush()
+            self._data.flush()
+            for mapped in (self._index_map, self._data_map):
+                if mapped is not None:
+                    mapped.close()
+            self._index_map = mmap.mmap(self._index.fileno(), 0, access=mmap.ACCESS_READ)
+            self._data_map = mmap.mmap(self._data.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._data_map, self._index_map
+
+    def read(self, position: int) -> Dict[str, Any]:
+        """Read the record at a position; negative positions count from the end."""
+        with self._lock:
+            if position < 0:
+                position += self._count
+            if not 0 <= position < self._count:
+                raise IndexError(f"Journal position {position} out of range ({self._count} records)")
+            data_map, index_map = self._maps()
+            offset = INDEX_ENTRY.unpack_from(index_map, position * INDEX_ENTRY.size)[0]
+            length, crc, codec = RECORD_HEADER.unpack_from(data_map, offset)
+            start = offset + RECORD_HEADER.size
+            payload = data_map[start:start + length]
+        if zlib.crc32(payload) != crc:
+            raise ValueError(f"Journal record {position} is corrupt")
+        return self._decode(codec, payload)
+
+    def __getitem__(self, position: int) -> Dict[str, Any]:
+        return self.read(position)
+
+    def records(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Iterate over the records from start (inclusive) to stop (exclusive)."""
+        stop = self._count if stop is None else min(stop, self._count)
+        for position in range(start, stop):
+            yield self.read(position)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.records()
+
+    def close(self):
+        """Close the journal files."""
+        with self._lock:
+            for mapped in (self._index_map, self._data_map):
+                if mapped is not None:
+                    mapped.close()
+            self._index_map = self._data_map = None
+            self._data.close()
+            self._index.close()
+
+
+def create_cycle_journal() -> CycleJournal:
+    """Create the shared cycle journal, configured from the journal section."""
+    journal_config = config.get_journal_config()
+    return CycleJournal(
+        journal_config.get("path", "./cycle_journal"),
+        compression_level=journal_config.get("compression_level", 3),
+    )
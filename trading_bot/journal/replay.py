@@ -0,0 +1,110 @@
+"""
+Replay journaled cycles through a decision engine, offline.
+
+Feeds the context of each journaled decision back to a decision engine
+(the configured LLMDecisionEngine by default, or any other given as a
+'module:attribute' path to an engine class or factory) and compares its
+decisions with the journaled ones, e.g. to evaluate a prompt change or an
+alternative engine on the same market states.
+
+Usage:
+    python -m trading_bot.journal.replay [--path ./cycle_journal] [--engine package.module:Engine]
+        [--symbol BTC/USDT] [--start 0] [--limit 100] [--show-transcript]
+"""
+import argparse
+import importlib
+import time
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional
+from trading_bot.config import config
+from trading_bot.journal.cycle_journal import CycleJournal
+from trading_bot.services import services
+
+
+def load_engine(path: Optional[str] = None) -> Any:
+    """
+    Load a decision engine.
+
+    Args:
+        path: The 'module:attribute' path of an engine class, factory or instance. Defaults to the configured engine.
+    """
+    if path is None:
+        return services.get("decision_engine")
+    module_name, _, attribute = path.partition(":")
+    target = getattr(importlib.import_module(module_name), attribute)
+    if isinstance(target, type) or not hasattr(target, "decide"):
+        target = target()
+    return target
+
+
+def replay(journal: CycleJournal, engine: Any, symbol: Optional[str] = None, start: int = 0,
+           stop: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Replay journaled decisions through an engine.
+
+    Args:
+        journal: The journal.
+        engine: The decision engine to replay them through.
+        symbol: Only replay the decisions of this symbol.
+        start: The position of the first record to replay.
+        stop: The position after the last record to replay. Defaults to the end of the journal.
+
+    Returns:
+        One result per replayed record: its position, symbol and timestamp, the journaled and replayed
+        decisions, whether their actions match, the decide() duration and the replayed transcript, if any.
+    """
+    results = []
+    for position, record in enumerate(journal.records(start, stop), start=start):
+        if symbol and record.get("symbol") != symbol:
+            continue
+        started = time.perf_counter()
+        decision = engine.decide(record["context"])
+        seconds = time.perf_counter() - started
+        journaled = record.get("decision") or {}
+        results.append({
+            "position": position,
+            "symbol": record.get("symbol"),
+            "timestamp": record.get("timestamp"),
+            "journaled": journaled,
+            "replayed": asdict(decision),
+            "match": journaled.get("action") == decision.action,
+            "seconds": seconds,
+            "transcript": getattr(engine, "last_transcript", None),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay journaled cycles through a decision engine.')
+    parser.add_argument('--path', default=config.get_journal_config().get("path", "./cycle_journal"),
+                        help='The journal directory.')
+    parser.add_argument('--engine', help="The 'module:attribute' path of the engine. Defaults to the configured one.")
+    parser.add_argument('--symbol', help='Only replay the decisions of this symbol.')
+    parser.add_argument('--start', type=int, default=0, help='The first record to replay.')
+    parser.add_argument('--limit', type=int, help='The number of records to replay.')
+    parser.add_argument('--show-transcript', action='store_true', help='Print the transcript of each replayed debate.')
+    args = parser.parse_args()
+
+    journal = CycleJournal(args.path)
+    stop = args.start + args.limit if args.limit is not None else None
+    results = replay(journal, load_engine(args.engine), symbol=args.symbol, start=args.start, stop=stop)
+    journal.close()
+
+    for result in results:
+        journaled, replayed = result["journaled"], result["replayed"]
+        print(f"#{result['position']} {result['timestamp']} {result['symbol']}: journaled {journaled.get('action')} "
+              f"({journaled.get('confidence')}), replayed {replayed['action']} ({replayed['confidence']}) "
+              f"in {result['seconds']:.2f}s{'' if result['match'] else '  <-- differs'}")
+        if args.show_transcript:
+            for message in result["transcript"] or []:
+                print(f"    [{message.get('name', message['role'])}] {message['content']}")
+    if results:
+        matches = sum(result["match"] for result in results)
+        print(f"{matches}/{len(results)} decisions match ({matches / len(results):.0%}), "
+              f"{sum(result['seconds'] for result in results) / len(results):.2f}s per decision.")
+    else:
+        print("No journaled decisions to replay.")
+
+
+if __name__ == "__main__":
+    main()
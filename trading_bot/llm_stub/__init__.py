@@ -0,0 +1,9 @@
+# trading_bot/llm_stub/__init__.py
+from trading_bot.services import lazy_exports
+
+__all__ = ['StubLLM', 'StubServer', 'create_app']
+__getattr__ = lazy_exports(__name__, {
+    "StubLLM": ".server",
+    "StubServer": ".server",
+    "create_app": ".server",
+})
@@ -0,0 +1,42 @@
+"""
+Run the stub LLM server.
+
+Usage:
+    python -m trading_bot.llm_stub [--host 127.0.0.1] [--port 8600] [--profile stub_profile.yaml]
+        [--seed 0] [--latency 0.5] [--error-rate 0.0]
+"""
+import argparse
+import uvicorn
+import yaml
+from trading_bot.config import config
+from trading_bot.llm_stub.server import create_app
+
+
+def main():
+    stub_config = config.get_llm_stub_config()
+    parser = argparse.ArgumentParser(description='Run a local OpenAI-compatible server answering with stub decisions.')
+    parser.add_argument('--host', default=stub_config.get("host", "127.0.0.1"), help='The interface to listen on.')
+    parser.add_argument('--port', type=int, default=stub_config.get("port", 8600), help='The port to listen on.')
+    parser.add_argument('--profile', help='A YAML file of profile settings, overriding the llm_stub config section.')
+    parser.add_argument('--seed', type=int, help='The seed of the replies.')
+    parser.add_argument('--latency', type=float, help='A constant latency in seconds.')
+    parser.add_argument('--error-rate', type=float, help='The share of requests answered with an error.')
+    args = parser.parse_args()
+
+    profile = dict(stub_config.get("profile") or {})
+    if args.profile:
+        with open(args.profile, 'r') as f:
+            profile.update(yaml.safe_load(f) or {})
+    if args.seed is not None:
+        profile["seed"] = args.seed
+    if args.latency is not None:
+        profile["latency"] = {"distribution": "constant", "value": args.latency}
+    if args.error_rate is not None:
+        profile["error_rate"] = args.error_rate
+
+    print(f"Stub LLM server at http://{args.host}:{args.port}/v1")
+    uvicorn.run(create_app(profile), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""
+A local OpenAI-compatible chat completions server standing in for the LLM providers.
+
+Answers every chat completion with a schema-valid trading decision
+({"Decision", "Rating", "Thinking"}) after a latency drawn from a
+configurable distribution, and injects errors, malformed and invalid
+replies at configurable rates. It honours (or, to exercise the engine's
+json_object fallback, rejects) json_schema response formats, streams
+server-sent events when asked to and reports token usage like the real
+APIs. Point a provider's `endpoint` at it to run the LLMDecisionEngine
+end to end offline, e.g. in native_llms:
+
+    openai:
+      api_key: "stub"
+      endpoint: "http://127.0.0.1:8600/v1"
+"""
+import asyncio
+import copy
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+ACTIONS = ("BUY", "SELL", "HOLD", "WAIT")
+THOUGHTS = ("momentum", "support", "resistance", "volume", "divergence", "trend", "volatility", "liquidity",
+            "funding", "sentiment", "breakout", "range", "consolidation", "exhaustion", "accumulation")
+
+DEFAULT_PROFILE: Dict[str, Any] = {
+    # Replies are drawn from a generator seeded with the seed, the request and how often it was seen.
+    "seed": 0,
+    # Seconds before the reply: constant (value), uniform (low, high), normal (mean, stddev)
+    # or lognormal (median, sigma).
+    "latency": {"distribution": "constant", "value": 0.0},
+    # The share of requests answered with error_status, e.g. 429 or 503.
+    "error_rate": 0.0,
+    "error_status": 503,
+    # The share of replies wrapping the JSON in prose or a code fence (the engine can still extract it).
+    "malformed_rate": 0.0,
+    # The share of replies with truncated, unparseable JSON.
+    "invalid_rate": 0.0,
+    # Whether json_schema response formats are honoured; if not, they are rejected with a 400 like older servers.
+    "json_schema": True,
+    # The relative frequency of each action.
+    "actions": {"BUY": 0.2, "SELL": 0.2, "HOLD": 0.5, "WAIT": 0.1},
+    # The length of the Thinking field, which drives the completion token volume.
+    "thinking_words": 40,
+    # Per-model overrides of any of the above, e.g. {"stub-gemini": {"latency": {...}}}.
+    "models": {},
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate a tokenizer: about four characters per token."""
+    return max(1, math.ceil(len(text) / 4))
+
+
+def sample_latency(latency: Dict[str, Any], rng: random.Random) -> float:
+    """Draw a latency in seconds from a latency distribution setting."""
+    distribution = latency.get("distribution", "constant")
+    if distribution == "constant":
+        value = latency.get("value", 0.0)
+    elif distribution == "uniform":
+        value = rng.uniform(latency["low"], latency["high"])
+    elif distribution == "normal":
+        value = rng.gauss(latency["mean"], latency["stddev"])
+    elif distribution == "lognormal":
+        value = latency["median"] * math.exp(rng.gauss(0, latency["sigma"]))
+    else:
+        raise ValueError(f"Unknown latency distribution {distribution!r}")
+    return max(0.0, value)
+
+
+class StubLLM:
+    """
+    Generates the replies of the stub server: decision JSON, injected faults and token usage.
+
+    Replies are deterministic: each is drawn from a generator seeded with
+    the profile's seed, the model, the messages and the number of times
+    the same request was seen before, so a retried request can succeed
+    after an injected error, and a rerun of a benchmark sees the same
+    replies in the same order.
+    """
+
+    def __init__(self, profile: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the StubLLM.
+
+        Args:
+            profile: Overrides of DEFAULT_PROFILE.
+        """
+        self.profile = copy.deepcopy(DEFAULT_PROFILE)
+        self.profile.update(profile or {})
+        self._seen: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "malformed": 0, "invalid": 0, "streamed": 0,
+                      "prompt_tokens": 0, "completion_tokens": 0}
+
+    def settings(self, model: str) -> Dict[str, Any]:
+        """The profile of a model, with its overrides applied."""
+        settings = dict(self.profile)
+        settings.update(self.profile.get("models", {}).get(model, {}))
+        return settings
+
+    def _rng(self, model: str, messages: List[Dict[str, Any]]) -> random.Random:
+        key = hashlib.sha256(json.dumps([model, messages], sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        with self._lock:
+            attempt = self._seen.get(key, 0)
+            self._seen[key] = attempt + 1
+        return random.Random(f"{self.profile['seed']}:{key}:{attempt}")
+
+    def _count(self, key: str, value: int = 1):
+        with self._lock:
+            self.stats[key] += value
+
+    def reply(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Draw the reply to a chat completion request.
+
+        Returns:
+            Either {"error": (status, message), "latency"} or {"content", "latency", "usage"}.
+        """
+        model = body.get("model", "stub")
+        messages = body.get("messages", [])
+        settings = self.settings(model)
+        rng = self._rng(model, messages)
+        latency = sample_latency(settings["latency"], rng)
+        self._count("requests")
+
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") == "json_schema" and not settings["json_schema"]:
+            self._count("errors")
+            return {"error": (400, "response_format json_schema is not supported by this model"), "latency": 0.0}
+        if rng.random() < settings["error_rate"]:
+            self._count("errors")
+            return {"error": (settings["error_status"], "The stub server is overloaded"), "latency": latency}
+
+        schema = (response_format.get("json_schema") or {}).get("schema") or {}
+        decision_enum = schema.get("properties", {}).get("Decision", {}).get("enum") or list(ACTIONS)
+        weights = [settings["actions"].get(action, 0.0) for action in decision_enum]
+        action = rng.choices(decision_enum, weights=weights if any(weights) else None)[0]
+        thinking = " ".join(rng.choice(THOUGHTS) for _ in range(settings["thinking_words"]))
+        content = json.dumps({"Decision": action, "Rating": rng.randint(1, 5), "Thinking": thinking[:1000]})
+
+        draw = rng.random()
+        if draw < settings["invalid_rate"]:
+            content = content[:len(content) // 2]
+            self._count("invalid")
+        elif draw < settings["invalid_rate"] + settings["malformed_rate"]:
+            content = f"After weighing the arguments, here is my answer:\n```json\n{content}\n```"
+            self._count("malformed")
+
+        prompt_tokens = sum(estimate_tokens(str(m.get("content", ""))) for m in messages)
+        completion_tokens = estimate_tokens(content)
+        self._count("prompt_tokens", prompt_tokens)
+        self._count("completion_tokens", completion_tokens)
+        return {
+            "content": content,
+            "latency": latency,
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+
+def create_app(profile: Optional[Dict[str, Any]] = None) -> FastAPI:
+    """
+    Create an OpenAI-compatible chat completions server replying with stub decisions.
+
+    Args:
+        profile: Overrides of DEFAULT_PROFILE.
+    """
+    app = FastAPI(title="Stub LLM")
+    stub = app.state.stub = StubLLM(profile)
+
+    @app.get("/v1/models")
+    async def list_models():
+        models = ["stub", *stub.profile.get("models", {})]
+        return {"object": "list", "data": [{"id": m, "object": "model", "owned_by": "stub"} for m in models]}
+
+    @app.get("/stats")
+    async def get_stats():
+        return stub.stats
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        reply = stub.reply(body)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created, model = int(time.time()), body.get("model", "stub")
+
+        if "error" in reply:
+            await asyncio.sleep(reply["latency"])
+            status, message = reply["error"]
+            return JSONResponse(status_code=status, content={
+                "error": {"message": message, "type": "invalid_request_error" if status == 400 else "server_error",
+                          "code": status}})
+
+        if not body.get("stream"):
+            await asyncio.sleep(reply["latency"])
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": reply["content"]},
+                             "finish_reason": "stop"}],
+                "usage": reply["usage"],
+            }
+
+        stub._count("streamed")
+        include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+
+        async def events():
+            content = reply["content"]
+            pieces = [content[i:i + 16] for i in range(0, len(content), 16)]
+            # A third of the latency before the first token, the rest spread over the pieces.
+            await asyncio.sleep(reply["latency"] / 3)
+            for i, piece in enumerate(pieces):
+                if i:
+                    await asyncio.sleep(reply["latency"] * 2 / 3 / len(pieces))
+                delta = {"content": piece, **({"role": "assistant"} if i == 0 else {})}
+                yield _sse(completion_id, created, model, [{"index": 0, "delta": delta, "finish_reason": None}])
+            yield _sse(completion_id, created, model, [{"index": 0, "delta": {}, "finish_reason": "stop"}])
+            if include_usage:
+                yield _sse(completion_id, created, model, [], usage=reply["usage"])
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def _sse(completion_id: str, created: int, model: str, choices: List[Dict[str, Any]], usage=None) -> str:
+    chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+             "choices": choices}
+    if usage is not None:
+        chunk["usage"] = usage
+    return f"data: {json.dumps(chunk)}\n\n"
+
+
+class StubServer:
+    """Runs the stub server in a background thread, e.g. for a benchmark or a test."""
+
+    def __init__(self, profile: Optional[Dict[str, Any]] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize the StubServer.
+
+        Args:
+            profile: Overrides of DEFAULT_PROFILE.
+            host: The interface to listen on.
+            port: The port to listen on; 0 picks a free one.
+        """
+        self.app = create_app(profile)
+        self.host = host
+        self.port = port
+        self.server: Optional[uvicorn.Server] = None
+        self.server_thread: Optional[threading.Thread] = None
+
+    @property
+    def stub(self) -> StubLLM:
+        return self.app.state.stub
+
+    @property
+    def base_url(self) -> str:
+        """The OpenAI base URL of the server, to use as a provider's endpoint."""
+        return f"http://{self.host}:{self.port}/v1"
+
+    def start(self, timeout: float = 10.0) -> "StubServer":
+        """Start the server and wait until it accepts connections."""
+        self.server = uvicorn.Server(uvicorn.Config(self.app, host=self.host, port=self.port, log_level="warning"))
+        self.server_thread = threading.Thread(target=self.server.run, daemon=True, name="StubLLMServer")
+        self.server_thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if time.monotonic() > deadline or not self.server_thread.is_alive():
+                raise RuntimeError("The stub LLM server did not start")
+            time.sleep(0.01)
+        self.port = self.server.servers[0].sockets[0].getsockname()[1]
+        return self
+
+    def stop(self):
+        """Stop the server."""
+        if self.server is not None:
+            self.server.should_exit = True
+            self.server_thread.join(timeout=10)
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
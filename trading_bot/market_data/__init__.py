@@ -1,2 +1,10 @@
 # trading_bot/market_data/__init__.py
-from .market_data_manager import MarketDataManager
+from trading_bot.services import lazy_exports
+
+__all__ = ['MarketDataManager', 'CandleStore', 'CandleArray', 'HistoryDownloader']
+__getattr__ = lazy_exports(__name__, {
+    "MarketDataManager": ".market_data_manager",
+    "CandleStore": ".candle_store",
+    "CandleArray": ".candle_store",
+    "HistoryDownloader": ".history_downloader",
+})
@@ -0,0 +1,301 @@
+import json
+import os
+import shutil
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from trading_bot.config import config
+from trading_bot.services import services
+
+COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+# Timestamps are epoch milliseconds; prices and volumes are float64.
+DTYPES = {"timestamp": np.dtype("<i8"), "open": np.dtype("<f8"), "high": np.dtype("<f8"), "low": np.dtype("<f8"),
+          "close": np.dtype("<f8"), "volume": np.dtype("<f8")}
+# Names the generation directory holding a series' columns, once the series was rewritten by a merge.
+POINTER_FILE = "CURRENT"
+TIMEFRAME_UNITS_MS = {"s": 1000, "m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}
+
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """Convert a ccxt timeframe string (e.g. '1m', '1h', '1w') to milliseconds."""
+    unit = timeframe[-1]
+    if unit not in TIMEFRAME_UNITS_MS:
+        raise ValueError(f"Unsupported timeframe {timeframe}")
+    return int(timeframe[:-1]) * TIMEFRAME_UNITS_MS[unit]
+
+
+class CandleArray:
+    """
+    OHLCV candles held as one NumPy array per column.
+
+    Read from a CandleStore, the columns are views of the memory-mapped
+    files, so slicing or handing them to the indicators copies nothing.
+    Indexing a single candle and iterating yield ccxt-style
+    [timestamp, open, high, low, close, volume] rows, for code written
+    against the lists ccxt returns.
+    """
+
+    __slots__ = COLUMNS
+
+    def __init__(self, timestamp: np.ndarray, open: np.ndarray, high: np.ndarray, low: np.ndarray,
+                 close: np.ndarray, volume: np.ndarray):
+        self.timestamp = timestamp
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    @classmethod
+    def from_rows(cls, rows: Union[Sequence[Sequence[Any]], np.ndarray]) -> "CandleArray":
+        """Build the columns from ccxt-style OHLCV rows (a list of lists or an (n, 6) array)."""
+        table = np.asarray(rows, dtype=np.float64).reshape(-1, len(COLUMNS))
+        return cls(*(table[:, i].astype(DTYPES[name]) for i, name in enumerate(COLUMNS)))
+
+    @classmethod
+    def empty(cls) -> "CandleArray":
+        return cls(*(np.empty(0, dtype=DTYPES[name]) for name in COLUMNS))
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """The columns by name."""
+        return {name: getattr(self, name) for name in COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return CandleArray(*(getattr(self, name)[key] for name in COLUMNS))
+        return [getattr(self, name)[key].item() for name in COLUMNS]
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def tolist(self) -> List[List[Any]]:
+        """The candles as ccxt-style rows, materialized."""
+        return [list(row) for row in zip(*(getattr(self, name).tolist() for name in COLUMNS))]
+
+    def __repr__(self) -> str:
+        return f"<CandleArray of {len(self)} candles>"
+
+
+class CandleStore:
+    """
+    A columnar on-disk store of OHLCV history, one series per symbol and timeframe.
+
+    Each series is a directory holding one raw little-endian array file per
+    column, sorted by timestamp, which doubles as the index: a time range
+    is located by binary search. Reads memory-map the files and return
+    CandleArray views, so years of 1m candles cost no Python objects and
+    only the pages actually used are loaded.
+
+    Appending candles newer than a series' last one only extends the
+    files; candles overlapping or preceding it (e.g. a filled gap) are
+    merged, newer values replacing older ones of the same timestamp, and
+    the series is rewritten as a new generation directory. The CURRENT
+    pointer file is then replaced atomically, so readers and a crash see
+    either all of the old columns or all of the new ones.
+    """
+
+    def __init__(self, root: str):
+        """
+        Initialize the CandleStore.
+
+        Args:
+            root: The directory of the store. It is created on the first write.
+        """
+        self.root = root
+        self._lock = threading.RLock()
+        # (symbol, timeframe) -> (length, memory-mapped columns)
+        self._maps: Dict[Tuple[str, str], Tuple[int, CandleArray]] = {}
+
+    @staticmethod
+    def _symbol_dir_name(symbol: str) -> str:
+        return symbol.replace("/", "-").replace(":", "_")
+
+    def _series_dir(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, self._symbol_dir_name(symbol), timeframe)
+
+    def _generation_dir(self, symbol: str, timeframe: str) -> str:
+        """The directory of a series' current columns: the series directory itself until its first merge."""
+        series_dir = self._series_dir(symbol, timeframe)
+        try:
+            with open(os.path.join(series_dir, POINTER_FILE)) as f:
+                return os.path.join(series_dir, f.read().strip())
+        except FileNotFoundError:
+            return series_dir
+
+    @staticmethod
+    def _column_path(directory: str, name: str) -> str:
+        return os.path.join(directory, f"{name}.bin")
+
+    def symbols(self) -> List[str]:
+        """The symbols with stored history."""
+        if not os.path.isdir(self.root):
+            return []
+        symbols = []
+        for entry in sorted(os.listdir(self.root)):
+            meta_path = os.path.join(self.root, entry, "meta.json")
+            if os.path.exists(meta_path):
+                with open(meta_path) as f:
+                    symbols.append(json.load(f)["symbol"])
+        return symbols
+
+    def timeframes(self, symbol: str) -> List[str]:
+        """The timeframes with stored history for a symbol."""
+        symbol_dir = os.path.join(self.root, self._symbol_dir_name(symbol))
+        if not os.path.isdir(symbol_dir):
+            return []
+        return sorted(tf for tf in os.listdir(symbol_dir)
+                      if os.path.isdir(os.path.join(symbol_dir, tf)) and self._length(symbol, tf) > 0)
+
+    def _length(self, symbol: str, timeframe: str) -> int:
+        """The number of complete candles of a series; a write interrupted between columns leaves a shorter one."""
+        directory = self._generation_dir(symbol, timeframe)
+        lengths = []
+        for name in COLUMNS:
+            path = self._column_path(directory, name)
+            lengths.append(os.path.getsize(path) // DTYPES[name].itemsize if os.path.exists(path) else 0)
+        return min(lengths)
+
+    def _mapped(self, symbol: str, timeframe: str) -> CandleArray:
+        """The memory-mapped columns of a series, remapped when it changed size."""
+        key = (symbol, timeframe)
+        length = self._length(symbol, timeframe)
+        cached = self._maps.get(key)
+        if cached is not None and cached[0] == length:
+            return cached[1]
+        if length == 0:
+            candles = CandleArray.empty()
+        else:
+            directory = self._generation_dir(symbol, timeframe)
+            candles = CandleArray(*(
+                np.memmap(self._column_path(directory, name), dtype=DTYPES[name], mode="r", shape=(length,))
+                for name in COLUMNS
+            ))
+        self._maps[key] = (length, candles)
+        return candles
+
+    def read(self, symbol: str, timeframe: str, start: Optional[int] = None, end: Optional[int] = None,
+             limit: Optional[int] = None) -> CandleArray:
+        """
+        Read candles without copying them.
+
+        Args:
+            symbol: The trading symbol (e.g., 'BTC/USDT').
+            timeframe: The timeframe of the candles (e.g., '1m', '1h').
+            start: The earliest open timestamp to include, in epoch milliseconds.
+            end: The latest open timestamp to include, in epoch milliseconds.
+            limit: Return at most the last limit candles of the range.
+
+        Returns:
+            Read-only views of the stored columns.
+        """
+        with self._lock:
+            candles = self._mapped(symbol, timeframe)
+        lo = 0 if start is None else int(np.searchsorted(candles.timestamp, start, side="left"))
+        hi = len(candles) if end is None else int(np.searchsorted(candles.timestamp, end, side="right"))
+        if limit is not None:
+            lo = max(lo, hi - limit)
+        return candles[lo:hi]
+
+    def info(self, symbol: str, timeframe: str) -> Optional[Dict[str, int]]:
+        """The first and last timestamps and the number of candles of a series, or None if it is empty."""
+        candles = self.read(symbol, timeframe)
+        if len(candles) == 0:
+            return None
+        return {"first": int(candles.timestamp[0]), "last": int(candles.timestamp[-1]), "count": len(candles)}
+
+    def write(self, symbol: str, timeframe: str, candles: Union[CandleArray, Sequence[Sequence[Any]]]) -> int:
+        """
+        Store candles, appending or merging them into the series.
+
+        Args:
+            symbol: The trading symbol (e.g., 'BTC/USDT').
+            timeframe: The timeframe of the candles (e.g., '1m', '1h').
+            candles: A CandleArray or ccxt-style OHLCV rows, in any order.
+
+        Returns:
+            The number of candles the series grew by.
+        """
+        new = candles if isinstance(candles, CandleArray) else CandleArray.from_rows(candles)
+        if len(new) == 0:
+            return 0
+        with self._lock:
+            series_dir = self._series_dir(symbol, timeframe)
+            os.makedirs(series_dir, exist_ok=True)
+            meta_path = os.path.join(os.path.dirname(series_dir), "meta.json")
+            if not os.path.exists(meta_path):
+                with open(meta_path, "w") as f:
+                    json.dump({"symbol": symbol}, f)
+
+            length = self._length(symbol, timeframe)
+            existing = self._mapped(symbol, timeframe)
+            new = self._deduplicated([new])
+            if length == 0 or new.timestamp[0] > existing.timestamp[-1]:
+                directory = self._generation_dir(symbol, timeframe)
+                for name in COLUMNS:
+                    with open(self._column_path(directory, name), "r+b" if length else "wb") as f:
+                        # Drop the tail of a previously interrupted write before appending.
+                        f.truncate(length * DTYPES[name].itemsize)
+                        f.seek(0, os.SEEK_END)
+                        getattr(new, name).astype(DTYPES[name], copy=False).tofile(f)
+                return len(new)
+
+            merged = self._deduplicated([existing, new])
+            self._write_generation(series_dir, merged)
+            self._maps.pop((symbol, timeframe), None)
+            return len(merged) - length
+
+    def _write_generation(self, series_dir: str, candles: CandleArray):
+        """Write a series' columns to a new generation directory and point CURRENT at it."""
+        pointer_path = os.path.join(series_dir, POINTER_FILE)
+        current = None
+        if os.path.exists(pointer_path):
+            with open(pointer_path) as f:
+                current = f.read().strip()
+        generation = f"g{int(current[1:]) + 1 if current else 1:06d}"
+
+        generation_dir = os.path.join(series_dir, generation)
+        # A directory of that name is left over from a crash before the pointer was replaced.
+        shutil.rmtree(generation_dir, ignore_errors=True)
+        os.makedirs(generation_dir)
+        for name in COLUMNS:
+            with open(self._column_path(generation_dir, name), "wb") as f:
+                getattr(candles, name).astype(DTYPES[name], copy=False).tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+        with open(pointer_path + ".tmp", "w") as f:
+            f.write(generation)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(pointer_path + ".tmp", pointer_path)
+
+        # Superseded columns: the previous generation, or the series' own files before its first merge.
+        # Readers still mapping them keep their pages, except on Windows, where they are removed next time.
+        for entry in os.listdir(series_dir):
+            path = os.path.join(series_dir, entry)
+            if entry.endswith(".bin") or (os.path.isdir(path) and entry != generation):
+                try:
+                    if os.path.isdir(path):
+                        shutil.rmtree(path)
+                    else:
+                        os.remove(path)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _deduplicated(parts: List[CandleArray]) -> CandleArray:
+        """Concatenate candles sorted by timestamp, keeping the last given of each timestamp."""
+        columns = {name: np.concatenate([getattr(part, name) for part in parts]) for name in COLUMNS}
+        order = np.argsort(columns["timestamp"], kind="stable")
+        timestamps = columns["timestamp"][order]
+        keep = order[np.append(timestamps[1:] != timestamps[:-1], True)]
+        return CandleArray(*(columns[name][keep] for name in COLUMNS))
+
+
+def create_candle_store() -> CandleStore:
+    """Create the shared candle store, configured from the market_data section."""
+    return CandleStore(config.get_market_data_config().get("candle_store", {}).get("path", "./candle_store"))
+
+candle_store = services.lazy("candle_store")
@@ -0,0 +1,276 @@
+"""
+Download deep OHLCV history into the local candle store.
+
+Pages fetch_ohlcv across the requested range for every symbol and
+timeframe, concurrently, checkpointing each series' progress so an
+interrupted download resumes where it stopped, then fills the gaps left
+by pages the exchange returned incomplete.
+
+Usage:
+    python -m trading_bot.market_data.history_downloader --symbols BTC/USDT ETH/USDT --timeframes 1m 1h
+        --since 2021-01-01 [--until 2024-01-01] [--direction forward] [--workers 4] [--checkpoint path]
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import ccxt
+from trading_bot.exchange.exchange_registry import RateLimiter
+from trading_bot.logging.logger import logger
+from trading_bot.market_data.candle_store import CandleStore, timeframe_to_ms
+
+DIRECTIONS = ("forward", "backward")
+
+
+class HistoryDownloader:
+    """
+    Pages an exchange's OHLCV history into a CandleStore.
+
+    Forward downloads start at the beginning of the range and page
+    towards the present; backward downloads start at the end and page
+    into the past until the range or the listing date is reached, for
+    when the start of a market's history is not known. An empty page
+    (e.g. an exchange outage) is skipped over, and paging only stops
+    early after max_empty_pages empty pages in a row. After each page the
+    contiguous range downloaded of the series is saved to a checkpoint
+    file, keyed on the symbol and timeframe only, so a rerun resumes it
+    in either direction and a rerun with a later end only fetches the
+    new candles.
+
+    Series are downloaded concurrently. The exchange's requests are
+    expected to be rate limited already (as the registry's exchanges
+    are); otherwise a RateLimiter can be given.
+    """
+
+    def __init__(self, exchange: Any, store: CandleStore, checkpoint_path: Optional[str] = None,
+                 page_limit: int = 1000, max_workers: int = 4, max_retries: int = 5, max_empty_pages: int = 3,
+                 limiter: Optional[RateLimiter] = None, retry_delay: float = 1.0,
+                 clock: Callable[[], float] = time.time, sleep: Callable[[float], None] = time.sleep):
+        """
+        Initialize the HistoryDownloader.
+
+        Args:
+            exchange: The ccxt exchange (or any object with fetch_ohlcv) to download from.
+            store: The store to write the candles to.
+            checkpoint_path: The progress file. Defaults to download_checkpoint.json in the store.
+            page_limit: The number of candles requested per page (Binance serves up to 1000).
+            max_workers: The number of series downloaded concurrently.
+            max_retries: The retries of a page after network errors, with exponential backoff.
+            max_empty_pages: The consecutive empty pages after which a series is taken to have no more candles.
+            limiter: A rate limiter to acquire before each request, if the exchange has none.
+            retry_delay: The delay before the first retry, in seconds.
+            clock: The wall clock, in epoch seconds; the default end of a download is its last closed candle.
+            sleep: The sleep function, injectable for tests.
+        """
+        self.exchange = exchange
+        self.store = store
+        self.checkpoint_path = checkpoint_path or os.path.join(store.root, "download_checkpoint.json")
+        self.page_limit = page_limit
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.max_empty_pages = max_empty_pages
+        self.limiter = limiter
+        self.retry_delay = retry_delay
+        self.clock = clock
+        self.sleep = sleep
+        self._checkpoint_lock = threading.Lock()
+        self.checkpoints: Dict[str, Dict[str, Any]] = self._load_checkpoints()
+
+    def _load_checkpoints(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.checkpoint_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable download checkpoint {self.checkpoint_path}: {e}")
+            return {}
+
+    def _save_checkpoint(self, key: str, entry: Dict[str, Any]):
+        with self._checkpoint_lock:
+            self.checkpoints[key] = entry
+            os.makedirs(os.path.dirname(os.path.abspath(self.checkpoint_path)), exist_ok=True)
+            tmp_path = f"{self.checkpoint_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.checkpoints, f, indent=1)
+            os.replace(tmp_path, self.checkpoint_path)
+
+    def _fetch_page(self, symbol: str, timeframe: str, since: int, limit: int) -> List[List[Any]]:
+        """Fetch one page of candles, retrying network errors and rate limit rejections."""
+        for attempt in range(self.max_retries + 1):
+            if self.limiter is not None:
+                self.limiter.acquire()
+            try:
+                return self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
+            except ccxt.NetworkError as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.retry_delay * 2 ** attempt
+                logger.warning(f"Fetching {symbol} {timeframe} candles since {since} failed ({e}), "
+                               f"retrying in {delay:.0f}s")
+                self.sleep(delay)
+
+    def _default_until(self, timeframe: str) -> int:
+        """The open time of the candle still forming: everything before it is closed."""
+        step = timeframe_to_ms(timeframe)
+        return int(self.clock() * 1000) // step * step
+
+    def download(self, symbol: str, timeframe: str, since: int, until: Optional[int] = None,
+                 direction: str = "forward", fill_gaps: bool = True) -> Dict[str, Any]:
+        """
+        Download a range of candles of one series, resuming from its checkpoint.
+
+        Args:
+            symbol: The trading symbol (e.g., 'BTC/USDT').
+            timeframe: The timeframe of the candles (e.g., '1m', '1h').
+            since: The start of the range, in epoch milliseconds.
+            until: The end of the range (exclusive). Defaults to the last closed candle.
+            direction: "forward" or "backward".
+            fill_gaps: Whether to refetch the gaps found in the range afterwards.
+
+        Returns:
+            The series' stats: candles stored, pages and gap pages fetched, and the gaps left.
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"direction must be one of {DIRECTIONS}")
+        step = timeframe_to_ms(timeframe)
+        until = self._default_until(timeframe) if until is None else until
+        key = f"{symbol}|{timeframe}"
+        # The contiguous [start, end) range already downloaded, if the requested range starts (or ends) in it.
+        done = self.checkpoints.get(key, {})
+        resumes = bool(done) and done["start"] <= (since if direction == "forward" else until) <= done["end"]
+        stats = {"symbol": symbol, "timeframe": timeframe, "stored": 0, "pages": 0, "gap_pages": 0}
+        span = self.page_limit * step
+
+        empty_pages = 0
+        if direction == "forward":
+            start = done["start"] if resumes else since
+            cursor = max(since, done["end"]) if resumes else since
+            while cursor < until and empty_pages < self.max_empty_pages:
+                page = [c for c in self._fetch_page(symbol, timeframe, cursor, self.page_limit) if cursor <= c[0] < until]
+                stats["pages"] += 1
+                if not page:
+                    # Skip the hole; the checkpoint only moves past it once candles follow.
+                    empty_pages += 1
+                    cursor += span
+                    continue
+                empty_pages = 0
+                stats["stored"] += self.store.write(symbol, timeframe, page)
+                cursor = int(max(c[0] for c in page)) + step
+                self._save_checkpoint(key, {"start": start, "end": cursor})
+        else:
+            end = done["end"] if resumes else until
+            cursor = min(until, done["start"]) if resumes else until
+            while cursor > since and empty_pages < self.max_empty_pages:
+                page_start = max(since, cursor - span)
+                page = [c for c in self._fetch_page(symbol, timeframe, page_start, self.page_limit)
+                        if page_start <= c[0] < cursor]
+                stats["pages"] += 1
+                if not page:
+                    # A hole, or the time before the listing date once max_empty_pages are empty.
+                    empty_pages += 1
+                    cursor = page_start
+                    continue
+                empty_pages = 0
+                stats["stored"] += self.store.write(symbol, timeframe, page)
+                cursor = int(min(c[0] for c in page))
+                self._save_checkpoint(key, {"start": cursor, "end": end})
+
+        if fill_gaps:
+            for gap_start, gap_end in self.find_gaps(symbol, timeframe, since, until):
+                cursor = gap_start
+                while cursor < gap_end:
+                    page = [c for c in self._fetch_page(symbol, timeframe, cursor, self.page_limit)
+                            if cursor <= c[0] < gap_end]
+                    stats["gap_pages"] += 1
+                    if not page:
+                        break
+                    stats["stored"] += self.store.write(symbol, timeframe, page)
+                    cursor = int(max(c[0] for c in page)) + step
+        stats["gaps"] = self.find_gaps(symbol, timeframe, since, until)
+        if stats["gaps"]:
+            logger.warning(f"{symbol} {timeframe} history has {len(stats['gaps'])} gap(s) the exchange did not fill.")
+        return stats
+
+    def find_gaps(self, symbol: str, timeframe: str, since: int, until: int) -> List[Tuple[int, int]]:
+        """
+        Find the missing candles between the stored ones of a range.
+
+        Returns:
+            The (start, end) open times of each run of missing candles, end exclusive.
+        """
+        step = timeframe_to_ms(timeframe)
+        timestamps = self.store.read(symbol, timeframe, start=since, end=until - 1).timestamp
+        if len(timestamps) < 2:
+            return []
+        breaks = (timestamps[1:] - timestamps[:-1] > step).nonzero()[0]
+        return [(int(timestamps[i]) + step, int(timestamps[i + 1])) for i in breaks]
+
+    def download_all(self, symbols: Sequence[str], timeframes: Sequence[str], since: int, until: Optional[int] = None,
+                     direction: str = "forward", fill_gaps: bool = True) -> List[Dict[str, Any]]:
+        """
+        Download every (symbol, timeframe) series concurrently.
+
+        A failing series is logged and reported with its error; its
+        checkpoint lets the next run resume it.
+
+        Returns:
+            The stats of each series, as returned by download(), or with an "error".
+        """
+        def run(symbol, timeframe):
+            try:
+                return self.download(symbol, timeframe, since, until, direction, fill_gaps)
+            except Exception as e:
+                logger.error(f"Downloading {symbol} {timeframe} history failed: {e}")
+                return {"symbol": symbol, "timeframe": timeframe, "error": str(e)}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="HistoryDownload") as executor:
+            futures = [executor.submit(run, symbol, timeframe) for symbol in symbols for timeframe in timeframes]
+            return [future.result() for future in futures]
+
+
+def parse_date(value: str) -> int:
+    """Parse an ISO date or datetime (UTC unless it has an offset) to epoch milliseconds."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Download OHLCV history into the local candle store.')
+    parser.add_argument('--symbols', nargs='+', required=True)
+    parser.add_argument('--timeframes', nargs='+', default=['1h'])
+    parser.add_argument('--since', required=True, help='The start of the range, e.g. 2021-01-01.')
+    parser.add_argument('--until', help='The end of the range (exclusive). Defaults to the last closed candle.')
+    parser.add_argument('--direction', choices=DIRECTIONS, default='forward')
+    parser.add_argument('--workers', type=int, default=4, help='The number of series downloaded concurrently.')
+    parser.add_argument('--page-limit', type=int, default=1000)
+    parser.add_argument('--checkpoint', help='The progress file. Defaults to one in the candle store.')
+    parser.add_argument('--no-fill-gaps', action='store_true')
+    args = parser.parse_args()
+
+    # Reuse the bot's exchange client, with its shared rate limiter and cached markets.
+    from trading_bot.market_data.market_data_manager import MarketDataManager
+    from trading_bot.services import services
+    downloader = HistoryDownloader(MarketDataManager().data_source, services.get("candle_store"),
+                                   checkpoint_path=args.checkpoint, page_limit=args.page_limit,
+                                   max_workers=args.workers)
+    results = downloader.download_all(args.symbols, args.timeframes, parse_date(args.since),
+                                      parse_date(args.until) if args.until else None,
+                                      direction=args.direction, fill_gaps=not args.no_fill_gaps)
+    for result in results:
+        if "error" in result:
+            print(f"{result['symbol']} {result['timeframe']}: failed ({result['error']}), rerun to resume")
+            continue
+        info = downloader.store.info(result["symbol"], result["timeframe"]) or {"count": 0}
+        print(f"{result['symbol']} {result['timeframe']}: {result['stored']} new candles in "
+              f"{result['pages'] + result['gap_pages']} pages, {info['count']} stored, {len(result['gaps'])} gaps left")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
 import ccxt
-from trading_bot.config import config
-from typing import List, Dict, Any
+import threading
+import time
+from trading_bot.exchange.exchange_registry import get_binance_exchange
+from typing import List, Dict, Any, Optional, Sequence, Union
+from trading_bot.market_data.candle_store import CandleArray, timeframe_to_ms
 from trading_bot.market_data.market_data_simulator import MarketDataSimulator
+from trading_bot.market_data.resampler import Resampler
+from trading_bot.services import services
 
 class MarketDataManager:
     """Manages fetching of market data from the exchange or a simulator."""
@@ -10,26 +15,44 @@ class MarketDataManager:
         """
         Initialize the MarketDataManager.
         Args:
-            backtesting: If True, use the MarketDataSimulator. Otherwise, use the live exchange.
+            backtesting: If True, use a MarketDataSimulator per symbol, replaying the candle store's history
+                where it has some. Otherwise, use the live exchange.
         """
-        self.data_source = (
-            MarketDataSimulator() if backtesting
-            else self._init_exchange()
-        )
+        self.backtesting = backtesting
+        self.simulators: Dict[str, MarketDataSimulator] = {}
+        # The time the simulators replay the history at, in epoch milliseconds; None is the end of the history.
+        self.replay_time: Optional[int] = None
+        self.candle_store = services.get("candle_store")
+        # (symbol, base timeframe) -> the base series and the timeframes derived from it.
+        self.resamplers: Dict[tuple, Resampler] = {}
+        self._resamplers_lock = threading.Lock()
+        # The live exchange; None when backtesting.
+        self.data_source = None if backtesting else self._init_exchange()
+
+    def get_simulator(self, symbol: str) -> MarketDataSimulator:
+        """Get the simulator of a symbol, creating it on first use."""
+        simulator = self.simulators.get(symbol)
+        if simulator is None:
+            simulator = MarketDataSimulator(symbol, self.candle_store)
+            simulator.set_time(self.replay_time)
+            simulator = self.simulators.setdefault(symbol, simulator)
+        return simulator
+
+    def set_time(self, timestamp: Optional[int]):
+        """
+        Move the replay of every symbol's history to a time, when backtesting.
+        Args:
+            timestamp: The time in epoch milliseconds, or None for the end of the history.
+        """
+        self.replay_time = timestamp
+        for simulator in list(self.simulators.values()):
+            simulator.set_time(timestamp)
 
     def _init_exchange(self):
-        """Initializes the ccxt exchange."""
-        binance_config = config.get_binance_config()
-        exchange = ccxt.binance({
-            'apiKey': binance_config.get('api_key'),
-            'secret': binance_config.get('secret_key'),
-            'options': {'defaultType': 'spot'},
-        })
-        if binance_config.get('sandbox', False):
-            exchange.set_sandbox_mode(True)
-        return exchange
-
-    def get_latest_candles(self, symbol: str, timeframe: str = '1h', limit: int = 100) -> List[List[Any]]:
+        """Gets the ccxt exchange shared with the execution adapter."""
+        return get_binance_exchange()
+
+    def get_latest_candles(self, symbol: str, timeframe: str = '1h', limit: int = 100) -> Union[List[List[Any]], CandleArray]:
         """
         Fetch the latest OHLCV candles for a symbol.
         Args:
@@ -37,14 +60,76 @@ class MarketDataManager:
             timeframe: The timeframe for the candles (e.g., '1m', '5m', '1h', '1d').
             limit: The number of candles to fetch.
         Returns:
-            A list of OHLCV candles.
+            A list of OHLCV candles, or views of stored candles when replaying history.
         """
         return (
             self.data_source.fetch_ohlcv(symbol, timeframe, limit=limit)
             if isinstance(self.data_source, ccxt.Exchange)
-            else self.data_source.get_latest_candles(timeframe, limit)
+            else self.get_simulator(symbol).get_latest_candles(timeframe, limit)
         )
 
+    def get_multi_timeframe_candles(self, symbol: str, timeframes: Sequence[str], limit: int = 100,
+                                    base_timeframe: str = '1h') -> Dict[str, CandleArray]:
+        """
+        Get the latest candles of several timeframes, all derived from one base series.
+
+        Only the base timeframe is fetched: the first call fetches enough
+        of it for limit candles of the highest timeframe (seeded from the
+        candle store where it has them), later calls only the candles
+        since the last one. The other timeframes are aggregated from it on
+        exchange boundaries, so they are consistent with each other; their
+        last candle is the one still forming. Timeframes that are not a
+        multiple of the base one are fetched separately.
+
+        Args:
+            symbol: The trading symbol (e.g., 'BTC/USDT').
+            timeframes: The timeframes to return (e.g., ['1h', '4h', '1d']).
+            limit: The number of candles per timeframe.
+            base_timeframe: The timeframe fetched and aggregated from.
+        Returns:
+            The candles of each timeframe.
+        """
+        base_step = timeframe_to_ms(base_timeframe)
+        derived = [tf for tf in timeframes if timeframe_to_ms(tf) % base_step == 0]
+        candles: Dict[str, Any] = {}
+        if derived:
+            # One extra candle of the highest timeframe, so its oldest returned one is complete.
+            needed = max((limit + 1) * timeframe_to_ms(tf) // base_step for tf in derived)
+            with self._resamplers_lock:
+                resampler = self.resamplers.get((symbol, base_timeframe))
+                if resampler is None or resampler.max_base_candles < needed:
+                    resampler = self.resamplers[(symbol, base_timeframe)] = Resampler(base_timeframe, needed)
+            self._refresh_base(symbol, resampler)
+            for tf in derived:
+                candles[tf] = resampler.get(tf, limit)
+        for tf in timeframes:
+            if tf not in candles:
+                candles[tf] = self.get_latest_candles(symbol, tf, limit)
+        return {tf: candles[tf] for tf in timeframes}
+
+    def _refresh_base(self, symbol: str, resampler: Resampler):
+        """Bring a base series up to date, refetching its last (possibly still forming) candle."""
+        timeframe, needed = resampler.base_timeframe, resampler.max_base_candles
+        if not isinstance(self.data_source, ccxt.Exchange):
+            candles = self.get_simulator(symbol).get_latest_candles(timeframe, needed)
+            resampler.update(candles if isinstance(candles, CandleArray) else CandleArray.from_rows(candles))
+            return
+
+        step = timeframe_to_ms(timeframe)
+        since = resampler.last_timestamp
+        if since is None:
+            since = (int(time.time() * 1000) // step - needed + 1) * step
+            stored = self.candle_store.read(symbol, timeframe, start=since)
+            if len(stored):
+                resampler.update(stored)
+                since = resampler.last_timestamp
+        while True:
+            page = self.data_source.fetch_ohlcv(symbol, timeframe, since=since, limit=1000)
+            resampler.update(CandleArray.from_rows(page))
+            if len(page) < 1000:
+                return
+            since = int(page[-1][0]) + step
+
     def get_current_quote(self, symbol: str) -> Dict[str, Any]:
         """
         Fetch the current ticker information for a symbol.
@@ -56,5 +141,5 @@ class MarketDataManager:
         return (
             self.data_source.fetch_ticker(symbol)
             if isinstance(self.data_source, ccxt.Exchange)
-            else self.data_source.get_current_quote()
+            else self.get_simulator(symbol).get_current_quote()
         )
@@ -2,18 +2,31 @@ import time
 import math
 import random
 from datetime import datetime, timezone
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Union
+from trading_bot.market_data.candle_store import CandleArray, CandleStore, timeframe_to_ms
 
 class MarketDataSimulator:
-    """Generates simulated market data for backtesting."""
+    """
+    Generates simulated market data for backtesting.
 
-    def __init__(self, symbol: str = 'BTC/USDT'):
+    Given a candle store holding history for the symbol, it replays that
+    history instead: candles are served as views of the stored columns,
+    up to a simulated current time that a backtest moves forward with
+    set_time() (through MarketDataManager.set_time()). Timeframes without
+    stored history are still generated.
+    """
+
+    def __init__(self, symbol: str = 'BTC/USDT', candle_store: Optional[CandleStore] = None):
         """
         Initialize the MarketDataSimulator.
         Args:
             symbol: The trading symbol (e.g., 'BTC/USDT').
+            candle_store: The store of the history to replay, if any.
         """
         self.symbol = symbol
+        self.candle_store = candle_store
+        # The simulated time in epoch milliseconds when replaying history; None is the end of the history.
+        self.current_time: Optional[int] = None
         self.start_time = time.time()
         self.start_price = 65000
         self.volatility = 0.2
@@ -33,22 +46,39 @@ class MarketDataSimulator:
         )
         return price
 
-    def get_latest_candles(self, timeframe: str = '1h', limit: int = 100) -> List[List[Any]]:
+    def set_time(self, timestamp: Optional[int]):
+        """Move the replay to a time in epoch milliseconds (None for the end of the history)."""
+        self.current_time = timestamp
+
+    def _stored_timeframes(self) -> List[str]:
+        return self.candle_store.timeframes(self.symbol) if self.candle_store is not None else []
+
+    def _replay_candles(self, timeframe: str, limit: int) -> CandleArray:
+        """The last candles of a stored timeframe closed by the current time, without copying them."""
+        end = None
+        if self.current_time is not None:
+            end = self.current_time - timeframe_to_ms(timeframe)
+        return self.candle_store.read(self.symbol, timeframe, end=end, limit=limit)
+
+    def get_latest_candles(self, timeframe: str = '1h', limit: int = 100) -> Union[List[List[Any]], CandleArray]:
         """
         Generate a list of simulated OHLCV candles.
         Args:
             timeframe: The timeframe for the candles (e.g., '1m', '5m', '1h', '1d').
             limit: The number of candles to fetch.
         Returns:
-            A list of OHLCV candles.
+            A list of OHLCV candles, or views of the stored ones when replaying history.
         """
-        now = time.time()
-        timeframe_seconds = self._timeframe_to_seconds(timeframe)
+        if timeframe in self._stored_timeframes():
+            return self._replay_candles(timeframe, limit)
+        timeframe_seconds = timeframe_to_ms(timeframe) // 1000
+        # Candles open on the timeframe's boundaries, like the exchange's; the last one is still forming.
+        now = time.time() // timeframe_seconds * timeframe_seconds
 
         return [
             [
-                (now - (limit - i) * timeframe_seconds) * 1000,  # timestamp
-                price := self._generate_price(now - (limit - i) * timeframe_seconds),  # open
+                int(now - (limit - 1 - i) * timeframe_seconds) * 1000,  # timestamp
+                price := self._generate_price(now - (limit - 1 - i) * timeframe_seconds),  # open
                 price * (1 + self.volatility * (random.random() - 0.5) / 5),  # high
                 price * (1 - self.volatility * (random.random() - 0.5) / 5),  # low
                 price * (1 + self.volatility * (random.random() - 0.5) / 2),  # close
@@ -63,6 +93,9 @@ class MarketDataSimulator:
         Returns:
             A dictionary containing the ticker information.
         """
+        stored = self._stored_timeframes()
+        if stored:
+            return self._replay_quote(min(stored, key=timeframe_to_ms))
         now = time.time()
         price = self._generate_price(now)
 
@@ -79,9 +112,22 @@ class MarketDataSimulator:
             'volume': self.liquidity * (1 + self.volatility * random.random()),
         }
 
-    def _timeframe_to_seconds(self, timeframe: str) -> int:
-        """Convert timeframe string to seconds."""
-        multipliers = {'m': 60, 'h': 3600, 'd': 86400}
-        unit = timeframe[-1]
-        value = int(timeframe[:-1])
-        return value * multipliers[unit]
+    def _replay_quote(self, timeframe: str) -> Dict[str, Any]:
+        """A ticker quoting the close of the last closed candle of the finest stored timeframe."""
+        candles = self._replay_candles(timeframe, 1)
+        if len(candles) == 0:
+            raise ValueError(f"No {self.symbol} history before {self.current_time}")
+        timestamp, _, high, low, price, volume = candles[-1]
+        now = int(timestamp) + timeframe_to_ms(timeframe)
+        return {
+            'symbol': self.symbol,
+            'timestamp': now,
+            'datetime': datetime.fromtimestamp(now / 1000, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+            'high': high,
+            'low': low,
+            'bid': price * 0.999,
+            'ask': price * 1.001,
+            'last': price,
+            'close': price,
+            'volume': volume,
+        }
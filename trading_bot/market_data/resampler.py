@@ -0,0 +1,132 @@
+import threading
+from typing import Dict, Optional
+import numpy as np
+from trading_bot.market_data.candle_store import COLUMNS, CandleArray, timeframe_to_ms
+
+# Exchanges open weekly candles on Mondays; the epoch fell on a Thursday.
+WEEK_OFFSET_MS = 4 * 86_400_000
+
+
+def bucket_starts(timestamps: np.ndarray, timeframe: str) -> np.ndarray:
+    """The open time of the candle of a timeframe containing each timestamp, aligned like the exchange's."""
+    step = timeframe_to_ms(timeframe)
+    offset = WEEK_OFFSET_MS if timeframe.endswith("w") else 0
+    return (timestamps - offset) // step * step + offset
+
+
+def resample(candles: CandleArray, timeframe: str, base_timeframe: str, include_partial: bool = True) -> CandleArray:
+    """
+    Aggregate candles into a higher timeframe.
+
+    Args:
+        candles: The base candles, sorted by timestamp.
+        timeframe: The timeframe to aggregate to, a multiple of the base one (e.g. '4h' from '1h').
+        base_timeframe: The timeframe of the base candles.
+        include_partial: Whether to keep the last candle when the base candles do not complete it yet.
+
+    Returns:
+        The candles of the timeframe: the first open, highest high, lowest low, last close and total volume
+        of the base candles within each.
+    """
+    step, base_step = timeframe_to_ms(timeframe), timeframe_to_ms(base_timeframe)
+    if step % base_step:
+        raise ValueError(f"{timeframe} is not a multiple of {base_timeframe}")
+    if len(candles) == 0:
+        return CandleArray.empty()
+    buckets = bucket_starts(candles.timestamp, timeframe)
+    starts = np.concatenate(([0], np.flatnonzero(buckets[1:] != buckets[:-1]) + 1))
+    ends = np.append(starts[1:], len(buckets)) - 1
+    resampled = CandleArray(
+        buckets[starts],
+        candles.open[starts],
+        np.maximum.reduceat(candles.high, starts),
+        np.minimum.reduceat(candles.low, starts),
+        candles.close[ends],
+        np.add.reduceat(candles.volume, starts),
+    )
+    if not include_partial and candles.timestamp[-1] + base_step < resampled.timestamp[-1] + step:
+        resampled = resampled[:-1]
+    return resampled
+
+
+class Resampler:
+    """
+    Keeps a base candle series and the higher timeframes derived from it.
+
+    Every timeframe is aggregated from the same base candles, so they
+    agree with each other, and only the base series has to be fetched.
+    update() merges newly fetched base candles (which may overlap the
+    kept ones and replace the still forming one) and re-aggregates only
+    the higher timeframe candles they touch, so the current partial
+    candle of each timeframe is updated incrementally.
+    """
+
+    def __init__(self, base_timeframe: str, max_base_candles: int = 10_000):
+        """
+        Initialize the Resampler.
+
+        Args:
+            base_timeframe: The timeframe of the base series (e.g. '1m', '1h').
+            max_base_candles: The number of base candles kept; older ones are dropped.
+        """
+        self.base_timeframe = base_timeframe
+        self.max_base_candles = max_base_candles
+        self.base = CandleArray.empty()
+        self._resampled: Dict[str, CandleArray] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        """The open time of the newest base candle, or None before the first update."""
+        return int(self.base.timestamp[-1]) if len(self.base) else None
+
+    def update(self, candles: CandleArray):
+        """
+        Merge new base candles, replacing kept ones of the same or a later open time.
+
+        Args:
+            candles: The newly fetched base candles, sorted by timestamp.
+        """
+        if len(candles) == 0:
+            return
+        with self._lock:
+            first = int(candles.timestamp[0])
+            keep = int(np.searchsorted(self.base.timestamp, first, side="left"))
+            self.base = CandleArray(*(
+                np.concatenate((getattr(self.base, name)[:keep], getattr(candles, name)))[-self.max_base_candles:]
+                for name in COLUMNS
+            ))
+            for timeframe, resampled in self._resampled.items():
+                self._resampled[timeframe] = self._merge(timeframe, resampled, first)
+
+    def _merge(self, timeframe: str, resampled: CandleArray, first: int) -> CandleArray:
+        """Re-aggregate the candles of a timeframe from the one containing the base candle at first."""
+        start = int(bucket_starts(np.array([first]), timeframe)[0])
+        kept = resampled[:int(np.searchsorted(resampled.timestamp, start, side="left"))]
+        base = self.base[int(np.searchsorted(self.base.timestamp, start, side="left")):]
+        fresh = resample(base, timeframe, self.base_timeframe)
+        if len(kept) == 0 and len(fresh) and fresh.timestamp[0] < self.base.timestamp[0]:
+            # The base candles start mid-way through the oldest candle: drop it rather than report it partial.
+            fresh = fresh[1:]
+        merged = CandleArray(*(np.concatenate((getattr(kept, name), getattr(fresh, name))) for name in COLUMNS))
+        return merged[-self.max_base_candles:]
+
+    def get(self, timeframe: str, limit: Optional[int] = None) -> CandleArray:
+        """
+        Get the latest candles of a timeframe, including the forming one.
+
+        Args:
+            timeframe: The base timeframe or a multiple of it.
+            limit: The number of candles to return.
+        """
+        with self._lock:
+            if timeframe == self.base_timeframe:
+                candles = self.base
+            elif timeframe in self._resampled:
+                candles = self._resampled[timeframe]
+            elif len(self.base):
+                candles = self._resampled[timeframe] = self._merge(timeframe, CandleArray.empty(),
+                                                                   int(self.base.timestamp[0]))
+            else:
+                candles = CandleArray.empty()
+        return candles[-limit:] if limit else candles
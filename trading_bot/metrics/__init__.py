@@ -0,0 +1,2 @@
+# trading_bot/metrics/__init__.py
+from .registry import MetricsRegistry, metrics
@@ -0,0 +1,196 @@
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Latency buckets in seconds, from a cached lookup to a slow LLM debate round.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+# A collected sample: (name, kind, labels, value). kind is "counter" or "gauge".
+Sample = Tuple[str, str, Dict[str, str], float]
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class MetricsRegistry:
+    """
+    Counters, gauges and latency histograms, exposed in the Prometheus text format.
+
+    Recording a value is a dict update under a lock, cheap enough for every
+    exchange request and LLM call. Components that already keep their own
+    counters (caches, the scheduler) are read through collectors only when
+    the metrics are rendered or persisted.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        """
+        Initialize the MetricsRegistry.
+
+        Args:
+            buckets: The upper bounds of the histogram buckets, in seconds. +Inf is implied.
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._kinds: Dict[str, str] = {}
+        self._values: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, _Histogram]] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+        # Counter and histogram totals at the last cycle summary, to report per-cycle deltas.
+        self._summarized: Dict[Tuple[str, Labels], Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _labels(labels: Dict[str, object]) -> Labels:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def _series(self, name: str, kind: str) -> Dict[Labels, float]:
+        if self._kinds.setdefault(name, kind) != kind:
+            raise ValueError(f"Metric {name} is a {self._kinds[name]}, not a {kind}")
+        return self._values.setdefault(name, {})
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        """Increase a counter."""
+        key = self._labels(labels)
+        with self._lock:
+            series = self._series(name, "counter")
+            series[key] = series.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels):
+        """Set a gauge."""
+        key = self._labels(labels)
+        with self._lock:
+            self._series(name, "gauge")[key] = value
+
+    def observe(self, name: str, value: float, **labels):
+        """Record a value, usually a duration in seconds, in a histogram."""
+        key = self._labels(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            if self._kinds.setdefault(name, "histogram") != "histogram":
+                raise ValueError(f"Metric {name} is a {self._kinds[name]}, not a histogram")
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(len(self.buckets) + 1)
+            histogram.counts[index] += 1
+            histogram.sum += value
+            histogram.count += 1
+
+    @contextmanager
+    def time(self, name: str, **labels):
+        """Observe the duration of the with block in a histogram, including when it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def register_collector(self, collector: Callable[[], Iterable[Sample]]):
+        """Register a function returning (name, kind, labels, value) samples, read at render time."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def get(self, name: str, **labels) -> Optional[float]:
+        """Get the value of a counter or gauge, or the count of a histogram."""
+        key = self._labels(labels)
+        with self._lock:
+            if name in self._histograms:
+                histogram = self._histograms[name].get(key)
+                return histogram.count if histogram else None
+            return self._values.get(name, {}).get(key)
+
+    def _collect(self) -> Tuple[Dict[str, str], Dict[str, Dict[Labels, float]], Dict[str, Dict[Labels, Tuple]]]:
+        """Copy all series, with the collectors' samples merged in."""
+        with self._lock:
+            kinds = dict(self._kinds)
+            values = {name: dict(series) for name, series in self._values.items()}
+            histograms = {
+                name: {key: (list(h.counts), h.sum, h.count) for key, h in series.items()}
+                for name, series in self._histograms.items()
+            }
+            collectors = list(self._collectors)
+        for collector in collectors:
+            try:
+                samples = list(collector())
+            except Exception:
+                continue
+            for name, kind, labels, value in samples:
+                if kinds.setdefault(name, kind) == kind:
+                    values.setdefault(name, {})[self._labels(labels)] = float(value)
+        return kinds, values, histograms
+
+    @staticmethod
+    def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(labels) + ([extra] if extra else [])
+        if not pairs:
+            return ""
+        escaped = (value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for _, value in pairs)
+        return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        kinds, values, histograms = self._collect()
+        lines = []
+        for name in sorted(kinds):
+            kind = kinds[name]
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "histogram":
+                for labels, (counts, total, count) in sorted(histograms.get(name, {}).items()):
+                    cumulative = 0
+                    for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                        cumulative += bucket_count
+                        le = "+Inf" if bound == math.inf else repr(float(bound))
+                        lines.append(f"{name}_bucket{self._format_labels(labels, ('le', le))} {cumulative}")
+                    lines.append(f"{name}_sum{self._format_labels(labels)} {total}")
+                    lines.append(f"{name}_count{self._format_labels(labels)} {count}")
+            else:
+                for labels, value in sorted(values.get(name, {}).items()):
+                    lines.append(f"{name}{self._format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def cycle_summary(self) -> List[Dict]:
+        """
+        Summarize the metrics since the previous summary, for persisting with a cycle.
+
+        Returns:
+            One dict per series with name, labels, kind, value and count. Counters
+            report their increase, histograms the sum and count of their new
+            observations, gauges their current value. Series without new
+            observations are left out.
+        """
+        kinds, values, histograms = self._collect()
+        summary = []
+        with self._lock:
+            for name, kind in kinds.items():
+                if kind == "histogram":
+                    series = ((labels, total, count) for labels, (_, total, count) in histograms.get(name, {}).items())
+                else:
+                    series = ((labels, value, 0) for labels, value in values.get(name, {}).items())
+                for labels, total, count in series:
+                    previous_total, previous_count = self._summarized.get((name, labels), (0.0, 0))
+                    if kind == "gauge":
+                        value = total
+                    else:
+                        self._summarized[(name, labels)] = (total, count)
+                        value, count = total - previous_total, count - previous_count
+                        if not value and not count:
+                            continue
+                    summary.append({
+                        "name": name,
+                        "labels": self._format_labels(labels),
+                        "kind": kind,
+                        "value": value,
+                        "count": count,
+                    })
+        return summary
+
+metrics = MetricsRegistry()
@@ -1,3 +1,8 @@
 # trading_bot/news/__init__.py
-from .news_ingestor import NewsIngestor
-from .news_analyzer import NewsAnalyzer
+from trading_bot.services import lazy_exports
+
+__all__ = ['NewsIngestor', 'NewsAnalyzer']
+__getattr__ = lazy_exports(__name__, {
+    "NewsIngestor": ".news_ingestor",
+    "NewsAnalyzer": ".news_analyzer",
+})
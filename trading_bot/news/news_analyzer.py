@@ -1,8 +1,12 @@
 from typing import List, Dict
+from trading_bot.interfaces import NewsAnalyzer as NewsAnalyzerInterface
+from trading_bot.models import NewsRecord
 from trading_bot.rag_store.chromadb_service import chroma_db_service
+from trading_bot.rag_store.fingerprint import compute_fingerprint
+from trading_bot.services import services
 from datetime import datetime
 
-class NewsAnalyzer:
+class NewsAnalyzer(NewsAnalyzerInterface):
     """Analyzes and processes news articles."""
 
     def __init__(self):
@@ -16,6 +20,7 @@ class NewsAnalyzer:
         Args:
             articles: A list of news articles.
         """
+        chroma_db_service.warm_embeddings([article["title"] for article in articles])
         for article in articles:
             if not chroma_db_service.is_news_present(article["title"]):
                 summary = self._generate_summary(article.get("content", ""))
@@ -26,6 +31,48 @@ class NewsAnalyzer:
                     published_at=datetime.now()
                 )
 
+    def ingest(self, raw_source: Dict) -> NewsRecord:
+        """Convert a scraped article into a NewsRecord."""
+        published_at = raw_source.get("published_at")
+        if isinstance(published_at, str):
+            published_at = datetime.fromisoformat(published_at)
+        return NewsRecord(
+            id=0,
+            title=raw_source["title"],
+            summary=self.summarize(raw_source),
+            source=raw_source.get("source", ""),
+            published_at=published_at or datetime.now(),
+            fingerprint=compute_fingerprint(raw_source["title"])
+        )
+
+    def summarize(self, news: Dict) -> str:
+        """Summarize a news article."""
+        return self._generate_summary(news.get("content", ""))
+
+    def query(self, query_text: str, k: int = 5) -> List[NewsRecord]:
+        """
+        Query the RAG store for the news most similar to a text.
+
+        Args:
+            query_text: The text to search for.
+            k: The number of news articles to return.
+
+        Returns:
+            A list of NewsRecords, most similar first.
+        """
+        hits = chroma_db_service.query_news(chroma_db_service.embed_query(query_text), k)
+        return [
+            NewsRecord(
+                id=rank,
+                title=metadata.get("title", ""),
+                summary=metadata.get("summary", ""),
+                source=metadata.get("source", ""),
+                published_at=datetime.fromtimestamp(metadata.get("published_at", 0)),
+                fingerprint=metadata.get("fingerprint") or compute_fingerprint(metadata.get("title", ""))
+            )
+            for rank, (metadata, _) in enumerate(hits)
+        ]
+
     def _generate_summary(self, content: str) -> str:
         """
         Generate a summary from the article content.
@@ -34,4 +81,4 @@ class NewsAnalyzer:
         sentences = content.split('.')
         return '.'.join(sentences[:3]) + '.' if len(sentences) > 3 else content
 
-news_analyzer = NewsAnalyzer()
+news_analyzer = services.lazy("news_analyzer")
@@ -1,6 +1,7 @@
 import requests
 from bs4 import BeautifulSoup
 from trading_bot.config import config
+from trading_bot.services import services
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 import re
@@ -107,4 +108,4 @@ class NewsIngestor:
             print(f"Error parsing date: {e}")
             return None
 
-news_ingestor = NewsIngestor()
+news_ingestor = services.lazy("news_ingestor")
@@ -1,2 +1,3 @@
 # trading_bot/orchestrator/__init__.py
 from .orchestrator import Orchestrator
+from .scheduler import CycleScheduler
@@ -1,15 +1,31 @@
-from datetime import datetime
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from datetime import datetime
+from functools import partial
+from typing import List, Optional
 from trading_bot.config import config
 from trading_bot.logging.logger import logger
-from trading_bot.market_data.market_data_manager import MarketDataManager
-from trading_bot.indicators.indicators_engine import indicators_engine
-from trading_bot.news.news_ingestor import news_ingestor
-from trading_bot.news.news_analyzer import news_analyzer
-from trading_bot.rag_store.rag_store import rag_store
-from trading_bot.decision_engine.llm_decision_engine import decision_engine
-from trading_bot.execution.execution_manager import ExecutionManager
-from trading_bot.persistence.sqlite_persistence import persistence, Cycle
+from trading_bot.metrics.registry import metrics
+from trading_bot.orchestrator.pipeline import StagePipeline, StageSkipped
+from trading_bot.orchestrator.scheduler import CycleScheduler
+from trading_bot.services import lazy_import, services
+
+# Components are imported and built on first use, so importing the orchestrator
+# (e.g. for a CLI tool or a backtest worker) does not load the exchange, LLM or
+# vector store clients.
+MarketDataManager = lazy_import("trading_bot.market_data.market_data_manager", "MarketDataManager")
+ExecutionManager = lazy_import("trading_bot.execution.execution_manager", "ExecutionManager")
+Cycle = lazy_import("trading_bot.persistence.sqlite_persistence", "Cycle")
+parse_date = lazy_import("trading_bot.market_data.history_downloader", "parse_date")
+persistence = services.lazy("persistence")
+indicators_engine = services.lazy("indicators_engine")
+news_ingestor = services.lazy("news_ingestor")
+news_analyzer = services.lazy("news_analyzer")
+rag_store = services.lazy("rag_store")
+news_retention = services.lazy("news_retention")
+decision_engine = services.lazy("decision_engine")
+llm_budget = services.lazy("llm_budget")
 
 class Orchestrator:
     """Orchestrates the trading bot's cycles."""
@@ -18,10 +34,30 @@ class Orchestrator:
         """Initialize the Orchestrator."""
         self.backtesting = backtesting
         self.trading_config = config.get_trading_config()
-        self.cycle_interval = self.trading_config.get("cycle_interval_minutes", 10) * 60
+        self.scheduler = CycleScheduler.from_config(self.trading_config)
+        self.symbols = self.trading_config.get("symbols") or [self.trading_config.get("symbol", "BTC/USDT")]
+        self.timeframes = ["1h", "4h", "1d"]
+        # Only the base timeframe is fetched; the others are aggregated from it.
+        self.base_timeframe = self.trading_config.get("base_timeframe", "1h")
+        self.candle_limit = self.trading_config.get("candle_limit", 100)
+        # Symbols share one process: the exchange client, the news store and the embedding model.
+        # Their stages are mostly I/O (exchange and LLM calls), so a bounded thread pool runs them concurrently.
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.trading_config.get("max_workers", 8),
+            thread_name_prefix="CycleStage",
+        )
+        # Finished cycles are persisted in the background, in order, while the next cycle starts.
+        self.persistence_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="PersistenceWriter")
+        self.last_stage_timings = {}
+        # The end of the last completed cycle, known before its background save lands.
+        self.last_completed_at = None
+        # Each decision's context, LLM transcript and outcome, kept for offline replay.
+        self.journal = services.get("cycle_journal") if config.get_journal_config().get("enabled") else None
         self.market_data_manager = MarketDataManager(backtesting=self.backtesting)
         self.execution_manager = ExecutionManager(market_data_manager=self.market_data_manager, backtesting=self.backtesting)
         
+        metrics.register_collector(self._metric_samples)
+
         # Initialize Dashboard
         from trading_bot.dashboard.server import DashboardServer
         self.dashboard = DashboardServer(self)
@@ -30,57 +66,197 @@ class Orchestrator:
     def run(self):
         """Run the trading bot in a loop."""
         logger.info("Starting trading bot...")
-        while True:
-            self._run_cycle()
-            if self.backtesting:
-                break
-            time.sleep(self.cycle_interval)
+        if self.backtesting:
+            for timestamp in self._backtest_times():
+                self.market_data_manager.set_time(timestamp)
+                self._run_cycle()
+            self.flush_persistence()
+            return
+        # Cycles start on candle closes (plus the configured offset), not every interval after the last one ended.
+        self.scheduler.run(self._run_cycle)
+
+    def _backtest_times(self) -> List[Optional[int]]:
+        """
+        The times a backtest runs its cycles at, in epoch milliseconds.
+
+        With a start (and optionally an end, by default now) in the
+        backtesting config section, cycles replay the stored history on
+        the cycle grid between them; otherwise a single cycle runs at the
+        end of the history.
+        """
+        backtesting_config = config.get_backtesting_config()
+        if not backtesting_config.get("start"):
+            return [None]
+        step = int(self.scheduler.interval * 1000)
+        start = -(-parse_date(backtesting_config["start"]) // step) * step
+        end = parse_date(backtesting_config["end"]) if backtesting_config.get("end") else int(time.time() * 1000)
+        return list(range(start, end + 1, step))
 
     def _run_cycle(self):
-        """Execute a single trading cycle."""
-        logger.info("Running trading cycle...")
+        """
+        Execute a single trading cycle over all configured symbols.
+
+        The cycle is a DAG of stages: news ingestion runs once, alongside
+        the candle and ticker fetches of every symbol; each symbol's news
+        retrieval waits for both, then its decision and execution follow.
+        A failing stage only skips the stages of its own symbol that depend
+        on it.
+        """
+        logger.info(f"Running trading cycle for {', '.join(self.symbols)}...")
         cycle = Cycle(status="running")
         persistence.save(cycle)
+        llm_budget.start_cycle()
 
+        timings = []
         try:
-            # 1. Fetch market data
-            symbol = self.trading_config.get("symbol", "BTC/USDT")
-            timeframes = ["1h", "4h", "1d"]
-            candles = {tf: self.market_data_manager.get_latest_candles(symbol, tf) for tf in timeframes}
-            ticker = self.market_data_manager.get_current_quote(symbol)
+            pipeline, stage_symbols = self._build_pipeline()
+            run = pipeline.run()
+            self.last_stage_timings = run.timings
+            metrics.observe("cycle_seconds", run.total_seconds)
+            for stage, t in run.timings.items():
+                if t["status"] != "skipped":
+                    metrics.observe("cycle_stage_seconds", t["duration"], stage=stage.split("|")[-1],
+                                    symbol=stage_symbols.get(stage, ""))
+            timings = [
+                {"stage": stage.split("|")[-1], "symbol": stage_symbols.get(stage), "started_offset": t["start"],
+                 "duration": t["duration"], "status": t["status"]}
+                for stage, t in run.timings.items()
+            ]
 
-            # 2. Compute indicators
-            indicators = {tf: indicators_engine.get_all_indicators(candles[tf]) for tf in timeframes}
-
-            # 3. Ingest and analyze news
-            last_cycle = persistence.get_last_completed_cycle()
-            last_run_time = last_cycle.ended_at if last_cycle else None
-            news_articles = news_ingestor.fetch_cointelegraph_news(last_run_time=last_run_time)
-            news_analyzer.process_news(news_articles)
-
-            # 4. Retrieve news from RAG store
-            rag_news = rag_store.get_latest_news()
-
-            # 5. Get a trading decision
-            context = {
-                "candles": candles,
-                "ticker": ticker,
-                "indicators": indicators,
-                "news": rag_news,
-            }
-            decision = decision_engine.decide(context)
-
-            # 6. Execute the trade
-            self.execution_manager.execute_trade(decision)
+            failures = {}
+            for stage, error in run.errors.items():
+                symbol = stage_symbols.get(stage)
+                if symbol is None:
+                    logger.error(f"Stage {stage} failed: {error}")
+                elif symbol not in failures or isinstance(failures[symbol], StageSkipped):
+                    failures[symbol] = error
+            for symbol, error in failures.items():
+                logger.error(f"Trading cycle for {symbol} failed: {error}")
+            if failures and len(failures) == len(self.symbols):
+                raise RuntimeError("; ".join(f"{symbol}: {error}" for symbol, error in failures.items()))
 
             cycle.SetStatus("completed")
             cycle.SetEnded_at(datetime.now())
-            persistence.save(cycle)
-            logger.info("Trading cycle completed successfully.")
+            self.last_completed_at = cycle.ended_at
+            if failures:
+                cycle.SetLogs("; ".join(f"{symbol}: {error}" for symbol, error in failures.items()))
+            logger.info(f"Trading cycle completed successfully in {run.total_seconds:.2f}s "
+                        f"(stages sum to {sum(t['duration'] for t in run.timings.values()):.2f}s).")
 
         except Exception as e:
             cycle.SetStatus("failed")
             cycle.SetEnded_at(datetime.now())
             cycle.SetLogs(str(e))
-            persistence.save(cycle)
             logger.error(f"Trading cycle failed: {e}")
+
+        metrics.inc("cycles_total", status=cycle.status)
+        self.persistence_writer.submit(self._save_cycle, cycle, timings, metrics.cycle_summary(),
+                                       llm_budget.end_cycle())
+        if self.journal is not None:
+            # Queued after the cycle's records, on the same writer thread.
+            self.persistence_writer.submit(self._sync_journal)
+
+    def _build_pipeline(self):
+        """Build the stage DAG of a cycle. Returns the pipeline and the symbol of each per-symbol stage."""
+        pipeline = StagePipeline(executor=self.executor)
+        stage_symbols = {}
+
+        def add(symbol, name, func, deps=()):
+            stage = pipeline.add(f"{symbol}|{name}" if symbol else name, func, deps)
+            if symbol:
+                stage_symbols[stage] = symbol
+            return stage
+
+        news = add(None, "news_ingest", self._ingest_news)
+        for symbol in self.symbols:
+            candles = add(symbol, "candles", partial(self.market_data_manager.get_multi_timeframe_candles, symbol,
+                                                     self.timeframes, self.candle_limit, self.base_timeframe))
+            ticker = add(symbol, "ticker", partial(self.market_data_manager.get_current_quote, symbol))
+            indicators = add(symbol, "indicators", partial(self._compute_indicators, symbol), [ticker, candles])
+            rag_news = add(symbol, "news_retrieval", partial(self._retrieve_news, symbol), [news, ticker, indicators])
+            decision = add(symbol, "decision", partial(self._decide, symbol), [ticker, indicators, rag_news, candles])
+            add(symbol, "execution", self.execution_manager.execute_trade, [decision])
+        return pipeline, stage_symbols
+
+    def _ingest_news(self):
+        """Ingest and analyze the news published since the last completed cycle."""
+        last_run_time = self.last_completed_at
+        if last_run_time is None:
+            last_cycle = persistence.get_last_completed_cycle()
+            last_run_time = last_cycle.ended_at if last_cycle else None
+        news_articles = news_ingestor.fetch_cointelegraph_news(last_run_time=last_run_time)
+        news_analyzer.process_news(news_articles)
+        news_retention.maybe_run()
+
+    def _compute_indicators(self, symbol: str, ticker, candles):
+        """Compute the indicators of every timeframe and mark the symbol's position to market."""
+        indicators = {tf: indicators_engine.get_all_indicators(candles[tf]) for tf in self.timeframes}
+        self.execution_manager.mark_to_market(symbol, ticker, atr=indicators["1h"].get("atr"))
+        return indicators
+
+    def _retrieve_news(self, symbol: str, _news_ingested, ticker, indicators):
+        """Retrieve the news most relevant to the current market state."""
+        return rag_store.get_relevant_news(symbol, indicators, ticker)
+
+    def _decide(self, symbol: str, ticker, indicators, rag_news, candles):
+        """Get a trading decision."""
+        context = {
+            "symbol": symbol,
+            "candles": candles,
+            "ticker": ticker,
+            "indicators": indicators,
+            "news": rag_news,
+        }
+        decision = decision_engine.decide(context)
+        if self.journal is not None:
+            record = {
+                "timestamp": datetime.now().isoformat(),
+                "symbol": symbol,
+                "context": context,
+                "transcript": getattr(decision_engine, "last_transcript", None),
+                "decision": asdict(decision),
+            }
+            self.persistence_writer.submit(self._journal_decision, record)
+        return decision
+
+    def _save_cycle(self, cycle: Cycle, timings, cycle_metrics, llm_usage=None):
+        try:
+            persistence.save_cycle(cycle, timings, cycle_metrics, llm_usage=llm_usage)
+        except Exception as e:
+            logger.error(f"Could not save cycle: {e}")
+
+    def _journal_decision(self, record):
+        try:
+            self.journal.append(record)
+        except Exception as e:
+            logger.error(f"Could not journal the {record['symbol']} decision: {e}")
+
+    def _sync_journal(self):
+        try:
+            self.journal.sync()
+        except Exception as e:
+            logger.error(f"Could not sync the cycle journal: {e}")
+
+    def _metric_samples(self):
+        """The counters the cycle's components keep themselves, read when metrics are rendered."""
+        samples = []
+        for key, value in self.scheduler.stats.items():
+            kind, name = ("gauge", f"scheduler_{key}") if key.endswith("_seconds") else ("counter", f"scheduler_{key}_total")
+            samples.append((name, kind, {}, value))
+        for key, value in self.execution_manager.balance_cache.stats.items():
+            samples.append((f"balance_cache_{key}_total", "counter", {}, value))
+        caches = {}
+        if services.is_loaded("rag_store"):
+            retriever = services.get("rag_store").retriever
+            caches["embedding"] = getattr(getattr(retriever.service, "embedding_function", None), "stats", None)
+            caches["news_retrieval"] = getattr(retriever, "stats", None)
+        for cache, stats in caches.items():
+            if isinstance(stats, dict):
+                for result in ("hits", "misses"):
+                    samples.append(("cache_requests_total", "counter", {"cache": cache, "result": result},
+                                    stats.get(result, 0)))
+        return samples
+
+    def flush_persistence(self):
+        """Wait for the background persistence of finished cycles."""
+        self.persistence_writer.submit(lambda: None).result()
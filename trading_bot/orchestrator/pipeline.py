@@ -0,0 +1,121 @@
+import asyncio
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Sequence
+
+
+class StageSkipped(Exception):
+    """Raised for a stage that did not run because a stage it depends on failed."""
+
+
+@dataclass
+class Stage:
+    """A named step of a pipeline and the stages whose results it takes as arguments."""
+    name: str
+    func: Callable
+    deps: Sequence[str] = ()
+
+
+@dataclass
+class PipelineRun:
+    """
+    The outcome of a pipeline run.
+
+    timings maps each stage to its start offset from the beginning of the
+    run, its duration (both in seconds) and its status: "ok", "failed" or
+    "skipped".
+    """
+    results: Dict[str, Any] = field(default_factory=dict)
+    errors: Dict[str, Exception] = field(default_factory=dict)
+    timings: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    total_seconds: float = 0.0
+
+
+class StagePipeline:
+    """
+    A DAG of stages run concurrently on an asyncio event loop.
+
+    Each stage starts as soon as all the stages it depends on have finished,
+    and is called with their results as positional arguments, in the order
+    of its deps. Independent branches therefore overlap, and the run takes
+    about as long as its slowest chain of dependent stages rather than the
+    sum of all stages. Plain functions run on the executor, coroutine
+    functions on the loop itself.
+
+    A failing stage does not stop the run: only the stages that depend on
+    it, directly or not, are skipped.
+    """
+
+    def __init__(self, executor: Optional[Executor] = None):
+        """
+        Initialize the StagePipeline.
+
+        Args:
+            executor: The executor blocking stages run on. Defaults to the event loop's default executor.
+        """
+        self.executor = executor
+        self.stages: Dict[str, Stage] = {}
+
+    def add(self, name: str, func: Callable, deps: Sequence[str] = ()) -> str:
+        """
+        Add a stage. Its dependencies must already have been added, which keeps the graph acyclic.
+
+        Returns:
+            The stage name, to be used in the deps of later stages.
+        """
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage {name}")
+        missing = [dep for dep in deps if dep not in self.stages]
+        if missing:
+            raise ValueError(f"Stage {name} depends on unknown stages {missing}")
+        self.stages[name] = Stage(name, func, tuple(deps))
+        return name
+
+    def run(self) -> PipelineRun:
+        """Run the pipeline to completion. Synchronous wrapper around run_async."""
+        return asyncio.run(self.run_async())
+
+    async def run_async(self) -> PipelineRun:
+        """Run the pipeline to completion."""
+        loop = asyncio.get_running_loop()
+        run = PipelineRun()
+        started = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(stage: Stage):
+            args = []
+            for dep in stage.deps:
+                try:
+                    args.append(await tasks[dep])
+                except Exception as e:
+                    cause = e if isinstance(e, StageSkipped) else StageSkipped(f"{dep} failed: {e}")
+                    run.errors[stage.name] = cause
+                    run.timings[stage.name] = {"start": time.perf_counter() - started, "duration": 0.0,
+                                               "status": "skipped"}
+                    raise cause
+            stage_started = time.perf_counter()
+            status = "ok"
+            try:
+                if asyncio.iscoroutinefunction(stage.func):
+                    result = await stage.func(*args)
+                else:
+                    result = await loop.run_in_executor(self.executor, stage.func, *args)
+                run.results[stage.name] = result
+                return result
+            except Exception as e:
+                status = "failed"
+                run.errors[stage.name] = e
+                raise
+            finally:
+                run.timings[stage.name] = {
+                    "start": stage_started - started,
+                    "duration": time.perf_counter() - stage_started,
+                    "status": status,
+                }
+
+        for stage in self.stages.values():
+            tasks[stage.name] = asyncio.ensure_future(run_stage(stage))
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        run.total_seconds = time.perf_counter() - started
+        return run
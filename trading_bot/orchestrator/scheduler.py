@@ -0,0 +1,162 @@
+import math
+import threading
+import time
+from typing import Callable, Dict, Optional
+from trading_bot.logging.logger import logger
+from trading_bot.market_data.candle_store import timeframe_to_ms
+
+OVERRUN_POLICIES = ("skip", "coalesce")
+
+
+class CycleScheduler:
+    """
+    Runs a cycle on a fixed grid of wall-clock boundaries.
+
+    Cycles fire at every multiple of the interval since the epoch, plus an
+    offset, so with a timeframe of "1h" and an offset of 5 seconds they start
+    5 seconds after each hourly candle closes. The boundaries are located
+    once on the wall clock and then followed on the monotonic clock, so the
+    period does not drift with the cycle duration or with wall-clock jumps.
+
+    A cycle that runs past one or more boundaries never queues up the missed
+    cycles. With the "skip" policy the next cycle waits for the next
+    boundary; with "coalesce" a single catch-up cycle runs immediately and
+    the schedule then continues on the grid.
+    """
+
+    def __init__(self, interval_seconds: float, offset_seconds: float = 0.0, overrun_policy: str = "skip",
+                 wall_clock: Callable[[], float] = time.time, monotonic: Callable[[], float] = time.monotonic,
+                 sleep: Optional[Callable[[float], None]] = None):
+        """
+        Initialize the CycleScheduler.
+
+        Args:
+            interval_seconds: The period of the cycle grid.
+            offset_seconds: The delay of each cycle after its boundary, e.g. to let the exchange close the candle.
+            overrun_policy: "skip" or "coalesce" the boundaries missed by an overrunning cycle.
+            wall_clock: The clock the boundaries are aligned to, in epoch seconds.
+            monotonic: The clock the waits are measured on.
+            sleep: Waits for a number of seconds. Defaults to a wait interrupted by stop().
+        """
+        if interval_seconds <= 0:
+            raise ValueError("interval_seconds must be positive")
+        if overrun_policy not in OVERRUN_POLICIES:
+            raise ValueError(f"overrun_policy must be one of {OVERRUN_POLICIES}")
+        self.interval = interval_seconds
+        self.offset = offset_seconds % interval_seconds
+        self.overrun_policy = overrun_policy
+        self.wall_clock = wall_clock
+        self.monotonic = monotonic
+        self._stop = threading.Event()
+        self.sleep = sleep or self._stop.wait
+        self.next_deadline: Optional[float] = None
+        self.stats: Dict[str, float] = {
+            "cycles": 0,
+            "overruns": 0,
+            "skipped": 0,
+            "coalesced": 0,
+            "last_lateness_seconds": 0.0,
+            "max_lateness_seconds": 0.0,
+            "total_lateness_seconds": 0.0,
+            "last_duration_seconds": 0.0,
+            "max_duration_seconds": 0.0,
+        }
+
+    @classmethod
+    def from_config(cls, trading_config: Dict, **kwargs) -> "CycleScheduler":
+        """
+        Create a scheduler from the trading config section.
+
+        cycle_timeframe (e.g. "1h") sets the interval and takes precedence
+        over cycle_interval_minutes; cycle_offset_seconds and overrun_policy
+        are passed through.
+        """
+        timeframe = trading_config.get("cycle_timeframe")
+        interval = timeframe_to_ms(timeframe) // 1000 if timeframe \
+            else trading_config.get("cycle_interval_minutes", 10) * 60
+        return cls(
+            interval,
+            offset_seconds=trading_config.get("cycle_offset_seconds", 0),
+            overrun_policy=trading_config.get("overrun_policy", "skip"),
+            **kwargs,
+        )
+
+    def first_deadline(self) -> float:
+        """The monotonic time of the next boundary from now."""
+        wall_now, monotonic_now = self.wall_clock(), self.monotonic()
+        boundary = (math.floor((wall_now - self.offset) / self.interval) + 1) * self.interval + self.offset
+        return monotonic_now + (boundary - wall_now)
+
+    def wait_next(self) -> Optional[float]:
+        """
+        Wait for the next scheduled cycle.
+
+        Returns:
+            The monotonic deadline of the cycle, or None if the scheduler was stopped.
+        """
+        if self.next_deadline is None:
+            self.next_deadline = self.first_deadline()
+        while not self._stop.is_set():
+            remaining = self.next_deadline - self.monotonic()
+            if remaining <= 0:
+                return self.next_deadline
+            self.sleep(remaining)
+        return None
+
+    def record(self, deadline: float, started: float, finished: float):
+        """
+        Record a finished cycle and schedule the next one.
+
+        Args:
+            deadline: The monotonic time the cycle was scheduled for.
+            started: The monotonic time it started.
+            finished: The monotonic time it finished.
+        """
+        lateness, duration = max(started - deadline, 0.0), finished - started
+        stats = self.stats
+        stats["cycles"] += 1
+        stats["last_lateness_seconds"] = lateness
+        stats["max_lateness_seconds"] = max(stats["max_lateness_seconds"], lateness)
+        stats["total_lateness_seconds"] += lateness
+        stats["last_duration_seconds"] = duration
+        stats["max_duration_seconds"] = max(stats["max_duration_seconds"], duration)
+
+        next_deadline = deadline + self.interval
+        missed = math.floor((finished - next_deadline) / self.interval) + 1 if finished > next_deadline else 0
+        if missed:
+            stats["overruns"] += 1
+            if self.overrun_policy == "skip":
+                next_deadline += missed * self.interval
+                stats["skipped"] += missed
+            else:
+                # Run once now for all missed boundaries, on the latest of them.
+                next_deadline += (missed - 1) * self.interval
+                stats["coalesced"] += missed - 1
+            logger.warning(f"Cycle took {duration:.1f}s, overrunning {missed} boundary(ies) "
+                           f"of the {self.interval:.0f}s schedule ({self.overrun_policy}).")
+        self.next_deadline = next_deadline
+
+    def run(self, cycle: Callable[[], None], max_cycles: Optional[int] = None):
+        """
+        Run a cycle on the schedule until stopped.
+
+        Args:
+            cycle: The cycle to run. Exceptions are logged and do not stop the schedule.
+            max_cycles: Stop after this many cycles. Defaults to running until stop().
+        """
+        runs = 0
+        while max_cycles is None or runs < max_cycles:
+            deadline = self.wait_next()
+            if deadline is None:
+                return
+            started = self.monotonic()
+            try:
+                cycle()
+            except Exception as e:
+                logger.error(f"Scheduled cycle failed: {e}")
+            self.record(deadline, started, self.monotonic())
+            runs += 1
+
+    def stop(self):
+        """Stop the schedule. A running cycle finishes first."""
+        self._stop.set()
@@ -1,2 +1,7 @@
 # trading_bot/persistence/__init__.py
-from .sqlite_persistence import SQLitePersistence
+from trading_bot.services import lazy_exports
+
+__all__ = ['SQLitePersistence']
+__getattr__ = lazy_exports(__name__, {
+    "SQLitePersistence": ".sqlite_persistence",
+})
@@ -1,7 +1,9 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, LargeBinary
+from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, LargeBinary, func, insert, inspect, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 from datetime import datetime
+from typing import Any, Dict, List
 from trading_bot.config import config
+from trading_bot.services import services
 import os
 
 Base = declarative_base()
@@ -20,6 +22,8 @@ class Trade(Base):
     completed_at = Column(DateTime)
     cycle_id = Column(Integer)
     reason = Column(Text)
+    # The P&L the fill realized in the position ledger, fees included.
+    realized_pnl = Column(Float)
 
 class Order(Base):
     __tablename__ = 'orders'
@@ -33,6 +37,25 @@ class Order(Base):
     status = Column(String)
     created_at = Column(DateTime, default=datetime.now)
 
+class NewsIndexEntry(Base):
+    __tablename__ = 'news_index'
+    id = Column(Integer, primary_key=True)
+    fingerprint = Column(String, unique=True, nullable=False)
+    title = Column(Text)
+    summary = Column(Text)
+    source = Column(String)
+    published_at = Column(Integer, index=True)
+
+class NewsArchiveEntry(Base):
+    __tablename__ = 'news_archive'
+    id = Column(Integer, primary_key=True)
+    fingerprint = Column(String, index=True)
+    title = Column(Text)
+    summary = Column(Text)
+    source = Column(String)
+    published_at = Column(Integer, index=True)
+    archived_at = Column(DateTime, default=datetime.now)
+
 class Cycle(Base):
     __tablename__ = 'cycles'
     id = Column(Integer, primary_key=True)
@@ -50,6 +73,39 @@ class Cycle(Base):
     def SetLogs(self, logs: str):
         self.logs = logs
 
+class CycleStageTiming(Base):
+    __tablename__ = 'cycle_stage_timings'
+    id = Column(Integer, primary_key=True)
+    cycle_id = Column(Integer, index=True)
+    stage = Column(String)
+    symbol = Column(String)
+    started_offset = Column(Float)
+    duration = Column(Float)
+    status = Column(String)
+
+class CycleMetric(Base):
+    __tablename__ = 'cycle_metrics'
+    id = Column(Integer, primary_key=True)
+    cycle_id = Column(Integer, index=True)
+    name = Column(String, index=True)
+    labels = Column(String)
+    kind = Column(String)
+    value = Column(Float)
+    count = Column(Integer)
+
+class LLMUsage(Base):
+    __tablename__ = 'llm_usage'
+    id = Column(Integer, primary_key=True)
+    cycle_id = Column(Integer, index=True)
+    timestamp = Column(DateTime, index=True)
+    symbol = Column(String)
+    provider = Column(String)
+    model = Column(String)
+    round = Column(Integer)
+    prompt_tokens = Column(Integer)
+    completion_tokens = Column(Integer)
+    cost = Column(Float)
+
 class IndicatorCache(Base):
     __tablename__ = 'indicators_cache'
     id = Column(Integer, primary_key=True)
@@ -65,6 +121,26 @@ class ConfigSnapshot(Base):
     timestamp = Column(DateTime, default=datetime.now)
     config_data = Column(Text)
 
+class NewsFingerprint(Base):
+    __tablename__ = 'news_fingerprints'
+    id = Column(Integer, primary_key=True)
+    fingerprint = Column(String, unique=True, nullable=False)
+    simhash = Column(Integer, nullable=False)
+    title = Column(Text)
+    created_at = Column(DateTime, default=datetime.now)
+
+class PortfolioSnapshot(Base):
+    __tablename__ = 'portfolio_snapshots'
+    id = Column(Integer, primary_key=True)
+    timestamp = Column(DateTime, default=datetime.now, index=True)
+    starting_equity = Column(Float)
+    equity = Column(Float)
+    realized_pnl = Column(Float)
+    unrealized_pnl = Column(Float)
+    high_water_mark = Column(Float)
+    drawdown = Column(Float)
+    positions = Column(Text)
+
 class SQLitePersistence:
     """Handles persistence of data to an SQLite database."""
 
@@ -74,8 +150,20 @@ class SQLitePersistence:
             db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'trading_bot.db')
         self.engine = create_engine(f'sqlite:///{db_path}')
         Base.metadata.create_all(self.engine)
+        self._add_missing_columns()
         self.Session = sessionmaker(bind=self.engine)
 
+    def _add_missing_columns(self):
+        """Add the columns added to the models since an existing database's tables were created."""
+        inspector = inspect(self.engine)
+        with self.engine.begin() as connection:
+            for table in Base.metadata.sorted_tables:
+                existing = {column["name"] for column in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name not in existing:
+                        column_type = column.type.compile(dialect=self.engine.dialect)
+                        connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+
     def get_session(self):
         """Get a new database session."""
         return self.Session()
@@ -87,6 +175,29 @@ class SQLitePersistence:
         session.commit()
         session.close()
 
+    def save_cycle(self, cycle: Cycle, stage_timings: List[Dict[str, Any]] = None,
+                   cycle_metrics: List[Dict[str, Any]] = None, llm_usage: List[Dict[str, Any]] = None):
+        """
+        Save a cycle with its stage timings, metrics and LLM usage in one transaction.
+
+        Args:
+            cycle: The cycle.
+            stage_timings: Dicts with CycleStageTiming columns, without cycle_id.
+            cycle_metrics: Dicts with CycleMetric columns, without cycle_id.
+            llm_usage: Dicts with LLMUsage columns, without cycle_id.
+        """
+        session = self.get_session()
+        try:
+            session.add(cycle)
+            session.flush()
+            for model, rows in ((CycleStageTiming, stage_timings), (CycleMetric, cycle_metrics),
+                                (LLMUsage, llm_usage)):
+                if rows:
+                    session.execute(insert(model), [{**row, "cycle_id": cycle.id} for row in rows])
+            session.commit()
+        finally:
+            session.close()
+
     def get_last_completed_cycle(self):
         """Retrieve the last completed cycle."""
         session = self.get_session()
@@ -96,5 +207,147 @@ class SQLitePersistence:
         finally:
             session.close()
 
-# Create a global persistence instance
-persistence = SQLitePersistence()
+    def update_order_status(self, order_id: str, status: str):
+        """Update the status of a stored order."""
+        session = self.get_session()
+        try:
+            session.query(Order).filter_by(order_id=order_id).update({"status": status})
+            session.commit()
+        finally:
+            session.close()
+
+    def get_news_fingerprints(self):
+        """Retrieve all stored news fingerprints as (fingerprint, simhash) pairs."""
+        session = self.get_session()
+        try:
+            rows = session.query(NewsFingerprint.fingerprint, NewsFingerprint.simhash).all()
+            # SQLite integers are signed 64-bit, so simhashes are stored in two's complement.
+            return [(fingerprint, simhash & 0xFFFFFFFFFFFFFFFF) for fingerprint, simhash in rows]
+        finally:
+            session.close()
+
+    def save_news_fingerprint(self, fingerprint: str, simhash: int, title: str):
+        """Save a news fingerprint."""
+        if simhash >= 1 << 63:
+            simhash -= 1 << 64
+        self.save(NewsFingerprint(fingerprint=fingerprint, simhash=simhash, title=title))
+
+    def save_news_index_entries(self, entries: List[Dict[str, Any]]):
+        """Bulk insert news recency index entries (dicts with NewsIndexEntry columns), skipping indexed ones."""
+        if not entries:
+            return
+        session = self.get_session()
+        try:
+            session.execute(insert(NewsIndexEntry).prefix_with("OR IGNORE"), entries)
+            session.commit()
+        finally:
+            session.close()
+
+    def get_latest_news_entries(self, k: int) -> List[Dict[str, Any]]:
+        """Retrieve the k most recently published news entries using the published_at index."""
+        session = self.get_session()
+        try:
+            rows = session.query(NewsIndexEntry).order_by(NewsIndexEntry.published_at.desc()).limit(k).all()
+            return [{
+                "source": row.source,
+                "summary": row.summary,
+                "title": row.title,
+                "fingerprint": row.fingerprint,
+                "published_at": row.published_at,
+            } for row in rows]
+        finally:
+            session.close()
+
+    def delete_news_index_entries_before(self, published_before: int) -> int:
+        """Delete news recency index entries published before a timestamp. Returns the number deleted."""
+        session = self.get_session()
+        try:
+            deleted = session.query(NewsIndexEntry).filter(NewsIndexEntry.published_at < published_before).delete()
+            session.commit()
+            return deleted
+        finally:
+            session.close()
+
+    def save_news_archive_entries(self, entries: List[Dict[str, Any]]):
+        """Bulk insert archived news articles (dicts with NewsArchiveEntry columns)."""
+        if not entries:
+            return
+        session = self.get_session()
+        try:
+            session.execute(insert(NewsArchiveEntry), entries)
+            session.commit()
+        finally:
+            session.close()
+
+    def count_news_archive_entries(self) -> int:
+        """Count the archived news articles."""
+        session = self.get_session()
+        try:
+            return session.query(func.count(NewsArchiveEntry.id)).scalar()
+        finally:
+            session.close()
+
+    def count_news_index_entries(self) -> int:
+        """Count the entries in the news recency index."""
+        session = self.get_session()
+        try:
+            return session.query(func.count(NewsIndexEntry.id)).scalar()
+        finally:
+            session.close()
+
+    def get_llm_usage_totals(self, since: datetime) -> Dict[str, float]:
+        """Sum the LLM tokens and cost spent since a time, as {"tokens", "cost"}."""
+        session = self.get_session()
+        try:
+            tokens, cost = session.query(
+                func.sum(LLMUsage.prompt_tokens + LLMUsage.completion_tokens), func.sum(LLMUsage.cost)
+            ).filter(LLMUsage.timestamp >= since).one()
+            return {"tokens": tokens or 0, "cost": cost or 0.0}
+        finally:
+            session.close()
+
+    def get_llm_usage_by_cycle(self, cycles: int = 20) -> List[Dict[str, Any]]:
+        """Sum the LLM usage of the last cycles by provider and debate round, newest cycle first."""
+        session = self.get_session()
+        try:
+            recent = session.query(LLMUsage.cycle_id).distinct().order_by(LLMUsage.cycle_id.desc()).limit(cycles)
+            rows = session.query(
+                LLMUsage.cycle_id, LLMUsage.provider, LLMUsage.round, func.count(LLMUsage.id),
+                func.sum(LLMUsage.prompt_tokens), func.sum(LLMUsage.completion_tokens), func.sum(LLMUsage.cost)
+            ).filter(LLMUsage.cycle_id.in_(recent.scalar_subquery())).group_by(
+                LLMUsage.cycle_id, LLMUsage.provider, LLMUsage.round
+            ).order_by(LLMUsage.cycle_id.desc(), LLMUsage.round, LLMUsage.provider).all()
+            return [{
+                "cycle_id": cycle_id,
+                "provider": provider,
+                "round": debate_round,
+                "calls": calls,
+                "prompt_tokens": prompt_tokens or 0,
+                "completion_tokens": completion_tokens or 0,
+                "cost": cost or 0.0,
+            } for cycle_id, provider, debate_round, calls, prompt_tokens, completion_tokens, cost in rows]
+        finally:
+            session.close()
+
+    def get_latest_portfolio_snapshot(self) -> Dict[str, Any]:
+        """Retrieve the most recent portfolio snapshot as a dict, or None if there is none."""
+        session = self.get_session()
+        try:
+            row = session.query(PortfolioSnapshot).order_by(PortfolioSnapshot.id.desc()).first()
+            if row is None:
+                return None
+            return {
+                "timestamp": row.timestamp,
+                "starting_equity": row.starting_equity,
+                "equity": row.equity,
+                "realized_pnl": row.realized_pnl,
+                "unrealized_pnl": row.unrealized_pnl,
+                "high_water_mark": row.high_water_mark,
+                "drawdown": row.drawdown,
+                "positions": row.positions,
+            }
+        finally:
+            session.close()
+
+# The global persistence instance, created on first use
+persistence = services.lazy("persistence")
@@ -0,0 +1,8 @@
+# trading_bot/portfolio/__init__.py
+from trading_bot.services import lazy_exports
+
+__all__ = ['PositionLedger', 'Position']
+__getattr__ = lazy_exports(__name__, {
+    "PositionLedger": ".position_ledger",
+    "Position": ".position_ledger",
+})
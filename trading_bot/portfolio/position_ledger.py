@@ -0,0 +1,266 @@
+import json
+import threading
+import time
+from typing import Any, Dict, Optional
+from trading_bot.config import config
+from trading_bot.logging.logger import logger
+from trading_bot.persistence.sqlite_persistence import PortfolioSnapshot
+from trading_bot.services import services
+
+
+class Position:
+    """An open position in one symbol, valued at average cost."""
+
+    __slots__ = ("symbol", "size", "avg_cost", "realized_pnl", "last_price")
+
+    def __init__(self, symbol: str, size: float = 0.0, avg_cost: float = 0.0, realized_pnl: float = 0.0,
+                 last_price: Optional[float] = None):
+        self.symbol = symbol
+        # Positive for long positions, negative for short ones.
+        self.size = size
+        self.avg_cost = avg_cost
+        self.realized_pnl = realized_pnl
+        self.last_price = last_price
+
+    @property
+    def exposure(self) -> float:
+        """The absolute market value of the open size at the last marked price."""
+        return abs(self.size) * (self.last_price or 0.0)
+
+    @property
+    def unrealized_pnl(self) -> float:
+        """The P&L of the open size at the last marked price."""
+        if not self.size or self.last_price is None:
+            return 0.0
+        return (self.last_price - self.avg_cost) * self.size
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "symbol": self.symbol,
+            "size": self.size,
+            "avg_cost": self.avg_cost,
+            "realized_pnl": self.realized_pnl,
+            "unrealized_pnl": self.unrealized_pnl,
+            "exposure": self.exposure,
+            "last_price": self.last_price,
+        }
+
+
+class PositionLedger:
+    """
+    Positions and P&L, updated incrementally from fills.
+
+    Every fill and every mark-to-market adjusts the running totals by the
+    change of one position only, so equity, drawdown and the high-water mark
+    are O(1) reads instead of a replay of the trade table. The state is
+    persisted as compact snapshots, after every fill and periodically as
+    prices move, and restored from the latest one at startup.
+    """
+
+    def __init__(self, persistence=None, starting_equity: Optional[float] = None,
+                 snapshot_interval_seconds: float = 300):
+        """
+        Initialize the PositionLedger.
+
+        Args:
+            persistence: The SQLitePersistence snapshots are saved to and restored from. None disables persistence.
+            starting_equity: The account equity before the first fill, in quote currency.
+                Defaults to the restored snapshot, or is set later with set_starting_equity.
+            snapshot_interval_seconds: The minimum time between two snapshots of marked prices.
+        """
+        self.persistence = persistence
+        self.snapshot_interval_seconds = snapshot_interval_seconds
+        self.positions: Dict[str, Position] = {}
+        self.starting_equity = starting_equity
+        self.realized_pnl = 0.0
+        self.unrealized_pnl = 0.0
+        # The summed absolute market value of all open positions.
+        self.gross_exposure = 0.0
+        self.high_water_mark = starting_equity or 0.0
+        self.last_snapshot_at: Optional[float] = None
+        self._lock = threading.Lock()
+        if persistence is not None:
+            self.restore()
+
+    @property
+    def equity(self) -> float:
+        """The starting equity plus realized and unrealized P&L."""
+        return (self.starting_equity or 0.0) + self.realized_pnl + self.unrealized_pnl
+
+    @property
+    def drawdown(self) -> float:
+        """The fall of equity from its high-water mark, as a fraction of the high-water mark."""
+        if self.high_water_mark <= 0:
+            return 0.0
+        return max(self.high_water_mark - self.equity, 0.0) / self.high_water_mark
+
+    def set_starting_equity(self, equity: float):
+        """Set the equity the P&L is measured from, if it is not known yet."""
+        with self._lock:
+            if self.starting_equity is None:
+                self.starting_equity = equity
+                self.high_water_mark = max(self.high_water_mark, self.equity)
+
+    def apply_fill(self, symbol: str, side: str, amount: float, price: float, fee: float = 0.0) -> float:
+        """
+        Apply a fill to the position of a symbol and persist a snapshot, so a restart cannot lose it.
+
+        Args:
+            symbol: The trading symbol.
+            side: 'buy' or 'sell'.
+            amount: The filled amount in base currency.
+            price: The fill price.
+            fee: The fee paid, in quote currency. Fees count against realized P&L.
+
+        Returns:
+            The P&L realized by the fill.
+        """
+        signed = amount if side == "buy" else -amount
+        with self._lock:
+            position = self.positions.get(symbol)
+            if position is None:
+                position = self.positions[symbol] = Position(symbol)
+            self.unrealized_pnl -= position.unrealized_pnl
+            self.gross_exposure -= position.exposure
+
+            realized = -fee
+            if position.size == 0 or (position.size > 0) == (signed > 0):
+                total = abs(position.size) + amount
+                position.avg_cost = (abs(position.size) * position.avg_cost + amount * price) / total
+                position.size += signed
+            else:
+                closed = min(amount, abs(position.size))
+                direction = 1 if position.size > 0 else -1
+                realized += closed * (price - position.avg_cost) * direction
+                position.size += signed
+                if abs(position.size) < 1e-12:
+                    position.size, position.avg_cost = 0.0, 0.0
+                elif (position.size > 0) != (direction > 0):
+                    # The fill flipped the position; the excess opens at the fill price.
+                    position.avg_cost = price
+
+            position.realized_pnl += realized
+            position.last_price = price
+            self.realized_pnl += realized
+            self.unrealized_pnl += position.unrealized_pnl
+            self.gross_exposure += position.exposure
+            self._update_high_water_mark()
+        if self.persistence is not None:
+            self._save_snapshot()
+        return realized
+
+    def apply_order(self, order: Dict, amount: Optional[float] = None) -> float:
+        """
+        Apply a ccxt order's fill to the ledger.
+
+        Args:
+            order: The order (ccxt order structure).
+            amount: The newly filled amount. Defaults to the order's whole filled amount.
+
+        Returns:
+            The P&L realized by the fill.
+        """
+        filled = order.get("filled") or 0.0
+        amount = filled if amount is None else amount
+        fee = (order.get("fee") or {}).get("cost") or 0.0
+        return self.apply_fill(
+            order["symbol"], order["side"], amount, order.get("average") or order.get("price"),
+            fee=fee * (amount / filled) if filled else 0.0
+        )
+
+    def mark(self, symbol: str, price: Optional[float]):
+        """Mark the position of a symbol to a new price."""
+        if not price:
+            return
+        with self._lock:
+            position = self.positions.get(symbol)
+            if position is None:
+                return
+            self.unrealized_pnl += (price - (position.last_price or price)) * position.size
+            self.gross_exposure += abs(position.size) * (price - (position.last_price or 0.0))
+            position.last_price = price
+            self._update_high_water_mark()
+
+    def _update_high_water_mark(self):
+        if self.starting_equity is not None:
+            self.high_water_mark = max(self.high_water_mark, self.equity)
+
+    def get_position(self, symbol: str) -> Optional[Position]:
+        """Get the position of a symbol, if there is one."""
+        return self.positions.get(symbol)
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        """Get the current equity, P&L, drawdown and open positions."""
+        with self._lock:
+            return {
+                "starting_equity": self.starting_equity,
+                "equity": self.equity,
+                "realized_pnl": self.realized_pnl,
+                "unrealized_pnl": self.unrealized_pnl,
+                "high_water_mark": self.high_water_mark,
+                "drawdown": self.drawdown,
+                "gross_exposure": self.gross_exposure,
+                "positions": [p.to_dict() for p in self.positions.values() if p.size],
+            }
+
+    def maybe_snapshot(self, now: Optional[float] = None) -> bool:
+        """
+        Persist a snapshot if the snapshot interval has elapsed. Cheap to call every cycle.
+
+        Returns:
+            True if a snapshot was saved.
+        """
+        now = now or time.time()
+        if self.persistence is None or (self.last_snapshot_at is not None
+                                        and now - self.last_snapshot_at < self.snapshot_interval_seconds):
+            return False
+        self._save_snapshot()
+        self.last_snapshot_at = now
+        return True
+
+    def _save_snapshot(self):
+        snapshot = self.get_snapshot()
+        with self._lock:
+            positions = {symbol: [p.size, p.avg_cost, p.realized_pnl, p.last_price]
+                         for symbol, p in self.positions.items()}
+        self.persistence.save(PortfolioSnapshot(
+            starting_equity=snapshot["starting_equity"],
+            equity=snapshot["equity"],
+            realized_pnl=snapshot["realized_pnl"],
+            unrealized_pnl=snapshot["unrealized_pnl"],
+            high_water_mark=snapshot["high_water_mark"],
+            drawdown=snapshot["drawdown"],
+            positions=json.dumps(positions, separators=(",", ":")),
+        ))
+
+    def restore(self):
+        """Restore the ledger from the latest persisted snapshot."""
+        try:
+            snapshot = self.persistence.get_latest_portfolio_snapshot()
+        except Exception as e:
+            logger.warning(f"Could not restore the position ledger: {e}")
+            return
+        if snapshot is None:
+            return
+        with self._lock:
+            if self.starting_equity is None:
+                self.starting_equity = snapshot["starting_equity"]
+            self.realized_pnl = snapshot["realized_pnl"] or 0.0
+            self.high_water_mark = max(self.high_water_mark, snapshot["high_water_mark"] or 0.0)
+            self.positions = {
+                symbol: Position(symbol, size, avg_cost, realized_pnl, last_price)
+                for symbol, (size, avg_cost, realized_pnl, last_price) in json.loads(snapshot["positions"] or "{}").items()
+            }
+            self.unrealized_pnl = sum(p.unrealized_pnl for p in self.positions.values())
+            self.gross_exposure = sum(p.exposure for p in self.positions.values())
+
+def create_position_ledger() -> PositionLedger:
+    """Create the shared ledger, restored from the default persistence and configured from the portfolio section."""
+    portfolio_config = config.get_portfolio_config()
+    return PositionLedger(
+        services.get("persistence"),
+        starting_equity=portfolio_config.get("starting_equity"),
+        snapshot_interval_seconds=portfolio_config.get("snapshot_interval_seconds", 300),
+    )
+
+position_ledger = services.lazy("position_ledger")
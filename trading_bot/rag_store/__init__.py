@@ -1,2 +1,7 @@
 # trading_bot/rag_store/__init__.py
-from .rag_store import RAGStore
+from trading_bot.services import lazy_exports
+
+__all__ = ['RAGStore']
+__getattr__ = lazy_exports(__name__, {
+    "RAGStore": ".rag_store",
+})
@@ -1,25 +1,105 @@
 import chromadb
-from chromadb.utils import embedding_functions
+import numpy as np
 from datetime import datetime
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional, Tuple
+from trading_bot.config import config
+from trading_bot.logging.logger import logger
+from trading_bot.persistence.sqlite_persistence import persistence as default_persistence
+from trading_bot.rag_store.embedding_service import ManagedEmbeddingFunction
+from trading_bot.rag_store.fingerprint import FingerprintIndex, compute_fingerprint
+from trading_bot.services import services
 
 class ChromaDBService:
     """Provides an interface to the ChromaDB service."""
 
-    def __init__(self, path: str = "./chroma_db"):
+    # Time windows (in seconds) tried in order when the recency index cannot be used.
+    RECENCY_FALLBACK_WINDOWS = (86400, 7 * 86400, 30 * 86400)
+    COLLECTION_NAME = "news"
+
+    def __init__(self, path: str = "./chroma_db", persistence=None, embedding_function=None):
         """
         Initialize the ChromaDBService.
 
         Args:
             path: The path to the ChromaDB database.
+            persistence: The SQLitePersistence backing the fingerprint and recency indexes.
+                Defaults to the global instance.
+            embedding_function: The embedding function for the collection. Defaults to Chroma's default
+                model, loaded on first use and wrapped with an embedding cache.
         """
+        self.path = path
+        self.persistence = persistence or default_persistence
+        self.fingerprints = FingerprintIndex(self.persistence)
+        if embedding_function is None:
+            embedding_config = config.get_rag_store_config().get("embedding", {})
+            embedding_function = ManagedEmbeddingFunction(
+                cache_size=embedding_config.get("cache_size", 4096),
+                num_threads=embedding_config.get("num_threads")
+            )
+        self.embedding_function = embedding_function
+        # Incremented on every insert so callers can invalidate cached query results.
+        self.version = 0
         self.client = chromadb.PersistentClient(path=path)
-        self.collection = self.client.get_or_create_collection(
-            name="news",
-            embedding_function=embedding_functions.DefaultEmbeddingFunction(),
+        self._recover_rebuild()
+        self.collection = self._get_or_create_collection()
+        self._backfill_news_index()
+
+    def _get_or_create_collection(self, name: Optional[str] = None):
+        return self.client.get_or_create_collection(
+            name=name or self.COLLECTION_NAME,
+            embedding_function=self.embedding_function,
             metadata={"hnsw:space": "cosine"}
         )
 
+    def _recover_rebuild(self):
+        """
+        Finish or roll back a rebuild_collection interrupted by a crash.
+
+        A leftover rebuild collection is complete once the live collection was
+        moved aside, so it is promoted if the live one is missing or empty;
+        otherwise the copy was interrupted and is dropped. A collection still
+        moved aside is restored if nothing replaced it, or dropped.
+        """
+        live, rebuild, old = (self.COLLECTION_NAME, f"{self.COLLECTION_NAME}_rebuild",
+                              f"{self.COLLECTION_NAME}_old")
+        names = {c.name for c in self.client.list_collections()}
+        if rebuild in names:
+            if live not in names or self._get_or_create_collection(live).count() == 0:
+                if live in names:
+                    self.client.delete_collection(live)
+                self._get_or_create_collection(rebuild).modify(name=live)
+                names.add(live)
+                logger.warning(f"Promoted the interrupted rebuild of the {live} collection.")
+            else:
+                self.client.delete_collection(rebuild)
+        if old in names:
+            if live in names:
+                self.client.delete_collection(old)
+            else:
+                self._get_or_create_collection(old).modify(name=live)
+                logger.warning(f"Restored the {live} collection moved aside by an interrupted rebuild.")
+
+    def _backfill_news_index(self, batch_size: int = 1000):
+        """
+        Index the articles stored before the recency index existed, once.
+
+        Only runs while the index is behind the collection, so later startups
+        only pay for the two counts.
+        """
+        count = self.collection.count()
+        if self.persistence.count_news_index_entries() >= count:
+            return
+        for offset in range(0, count, batch_size):
+            stored = self.collection.get(include=["metadatas"], limit=batch_size, offset=offset)
+            self.persistence.save_news_index_entries([{
+                "fingerprint": metadata.get("fingerprint") or article_id,
+                "title": metadata.get("title"),
+                "summary": metadata.get("summary"),
+                "source": metadata.get("source"),
+                "published_at": metadata.get("published_at"),
+            } for article_id, metadata in zip(stored['ids'], stored['metadatas'])])
+        logger.info(f"Backfilled the news recency index from {count} stored articles.")
+
     def add_news(self, title: str, summary: str, source: str, published_at: datetime):
         """
         Add a news article to the ChromaDB collection.
@@ -29,22 +109,37 @@ class ChromaDBService:
             summary: The summary of the news article.
             source: The source of the news article.
             published_at: The publication timestamp of the article.
+
+        Returns:
+            True if the article was added, False if it was an exact duplicate.
         """
+        fingerprint = compute_fingerprint(title)
+        if self.fingerprints.contains_exact(fingerprint):
+            return False
+
+        metadata = {
+            "source": source,
+            "summary": summary,
+            "title": title,
+            "fingerprint": fingerprint,
+            "published_at": int(published_at.timestamp())
+        }
         self.collection.add(
             documents=[title],
-            metadatas=[{
-                "source": source,
-                "summary": summary,
-                "title": title,
-                "published_at": int(published_at.timestamp())
-            }],
-            ids=[title]
+            metadatas=[metadata],
+            ids=[fingerprint]
         )
+        self.fingerprints.add(title)
+        self.persistence.save_news_index_entries([metadata])
+        self.version += 1
+        return True
 
     def is_news_present(self, title: str, threshold: float = 0.9) -> bool:
         """
         Check if a similar news article is already present in the collection.
-        Similarity is checked based on the title embedding.
+        Exact and near-exact duplicates are rejected by the fingerprint index
+        without touching the embedding model; only novel titles fall through
+        to the similarity check on the title embedding.
 
         Args:
             title: The title of the news article.
@@ -53,6 +148,9 @@ class ChromaDBService:
         Returns:
             True if a similar article is found, False otherwise.
         """
+        if self.fingerprints.is_duplicate(title):
+            return True
+
         if self.collection.count() == 0:
             return False
 
@@ -68,28 +166,172 @@ class ChromaDBService:
         # So 1 - distance >= threshold  => distance <= 1 - threshold
         return results['distances'][0][0] <= (1 - threshold)
 
+    def warm_embeddings(self, texts: List[str]):
+        """
+        Embed texts in a single batch so later queries and inserts hit the embedding cache.
+        Texts already rejected by the fingerprint index are skipped.
+        """
+        novel = [text for text in texts if not self.fingerprints.is_duplicate(text)]
+        if novel:
+            self.embedding_function(novel)
+
+    def delete_news_before(self, published_before: int, archive: Optional[Callable[[List[Dict]], None]] = None) -> int:
+        """
+        Delete the news articles published before a timestamp from the collection and recency index.
+
+        Args:
+            published_before: The cutoff as a Unix timestamp.
+            archive: Called with the metadata of the expired articles before they are deleted.
+                If it raises, nothing is deleted.
+
+        Returns:
+            The number of deleted articles.
+        """
+        expired = self.collection.get(where={"published_at": {"$lt": published_before}}, include=["metadatas"])
+        if not expired['ids']:
+            return 0
+
+        if archive is not None:
+            archive(expired['metadatas'])
+        self.collection.delete(ids=expired['ids'])
+        self.persistence.delete_news_index_entries_before(published_before)
+        self.version += 1
+        return len(expired['ids'])
+
+    def rebuild_collection(self, batch_size: int = 1000) -> int:
+        """
+        Rebuild the collection so its HNSW index only contains live articles.
+
+        Deleted entries are only marked as such in the HNSW graph, so memory and
+        query cost keep growing with everything ever inserted. Re-inserting the
+        live articles with their stored embeddings into a fresh collection drops
+        them without re-running the embedding model.
+
+        Returns:
+            The number of articles in the rebuilt collection.
+        """
+        live = self.collection.get(include=["embeddings", "documents", "metadatas"])
+        rebuild_name = f"{self.COLLECTION_NAME}_rebuild"
+        if rebuild_name in [c.name for c in self.client.list_collections()]:
+            self.client.delete_collection(rebuild_name)
+        rebuilt = self.client.create_collection(
+            name=rebuild_name,
+            embedding_function=self.embedding_function,
+            metadata={"hnsw:space": "cosine"}
+        )
+        for start in range(0, len(live['ids']), batch_size):
+            end = start + batch_size
+            rebuilt.add(
+                ids=live['ids'][start:end],
+                embeddings=live['embeddings'][start:end],
+                documents=live['documents'][start:end],
+                metadatas=live['metadatas'][start:end]
+            )
+
+        # Chroma has no atomic swap: the live collection is moved aside before the copy takes its name,
+        # and only dropped after. _recover_rebuild finishes or rolls back a swap a crash interrupted.
+        old_name = f"{self.COLLECTION_NAME}_old"
+        if old_name in [c.name for c in self.client.list_collections()]:
+            self.client.delete_collection(old_name)
+        self.collection.modify(name=old_name)
+        rebuilt.modify(name=self.COLLECTION_NAME)
+        self.client.delete_collection(old_name)
+        self.collection = self._get_or_create_collection()
+        self.version += 1
+        return len(live['ids'])
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query text with the collection's embedding function."""
+        return [float(x) for x in self.embedding_function([text])[0]]
+
+    def query_news(self, query_embedding: List[float], k: int = 5) -> List[Tuple[Dict, float]]:
+        """
+        Find the news articles most similar to a query embedding.
+
+        Args:
+            query_embedding: The embedding of the query text.
+            k: The maximum number of articles to return.
+
+        Returns:
+            A list of (metadata, cosine similarity) tuples, most similar first.
+        """
+        count = self.collection.count()
+        if count == 0:
+            return []
+
+        results = self.collection.query(
+            query_embeddings=[query_embedding],
+            n_results=min(k, count),
+            include=["metadatas", "distances"]
+        )
+        if not results['metadatas'] or not results['metadatas'][0]:
+            return []
+
+        return [
+            (metadata, 1 - distance)
+            for metadata, distance in zip(results['metadatas'][0], results['distances'][0])
+        ]
+
+    def score_news(self, query_embedding: List[float], ids: List[str]) -> List[Tuple[Dict, float]]:
+        """
+        Compute the similarity of a query embedding to the articles with the given ids.
+
+        Args:
+            query_embedding: The embedding of the query text.
+            ids: The ids (fingerprints) of the articles.
+
+        Returns:
+            A list of (metadata, cosine similarity) tuples, for the ids found in the collection.
+        """
+        if not ids:
+            return []
+        stored = self.collection.get(ids=ids, include=["embeddings", "metadatas"])
+        if not stored['ids']:
+            return []
+        query = np.asarray(query_embedding, dtype=np.float64)
+        embeddings = np.asarray(stored['embeddings'], dtype=np.float64)
+        similarities = embeddings @ query / (np.linalg.norm(embeddings, axis=1) * np.linalg.norm(query) + 1e-12)
+        return list(zip(stored['metadatas'], similarities.tolist()))
+
     def get_latest_news(self, k: int = 5) -> List[Dict]:
         """
         Get the k most recent news articles from the RAG store.
 
+        Reads from the SQLite recency index, which is ordered by 'published_at',
+        so the cost does not grow with the size of the collection. Articles
+        stored before the index existed are backfilled into it at startup; if
+        the index is still behind the collection (e.g. written by another
+        process), falls back to Chroma 'where' filters over widening time windows.
+
         Args:
             k: The number of news articles to retrieve.
 
         Returns:
             A list of dictionaries, where each dictionary is the metadata of a news article.
         """
-        all_news = self.collection.get()
+        if self.persistence.count_news_index_entries() >= self.collection.count():
+            return self.persistence.get_latest_news_entries(k)
+        return self._get_latest_news_by_window(k)
 
-        if 'metadatas' not in all_news or not all_news['metadatas']:
-            return []
+    def _get_latest_news_by_window(self, k: int) -> List[Dict]:
+        """Fetch the k most recent articles from Chroma using published_at window filters."""
+        now = int(datetime.now().timestamp())
+        metadatas = []
+        for window in self.RECENCY_FALLBACK_WINDOWS:
+            news = self.collection.get(where={"published_at": {"$gte": now - window}}, include=["metadatas"])
+            metadatas = news.get('metadatas') or []
+            if len(metadatas) >= k:
+                break
+        else:
+            metadatas = self.collection.get(include=["metadatas"]).get('metadatas') or []
 
         # Sort the news by 'published_at' timestamp in descending order.
         sorted_news_metadatas = sorted(
-            all_news['metadatas'],
+            metadatas,
             key=lambda meta: meta.get('published_at', 0),
             reverse=True
         )
 
         return sorted_news_metadatas[:k]
 
-chroma_db_service = ChromaDBService()
+chroma_db_service = services.lazy("chroma_db_service")
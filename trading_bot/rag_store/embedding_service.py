@@ -0,0 +1,174 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from queue import Empty, SimpleQueue
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+
+class _ThreadLimitedOrt:
+    """Proxy for the onnxruntime module that presets the thread count of new sessions."""
+
+    def __init__(self, ort, num_threads: int):
+        self._ort = ort
+        self._num_threads = num_threads
+
+    def __getattr__(self, name: str):
+        return getattr(self._ort, name)
+
+    def SessionOptions(self):
+        options = self._ort.SessionOptions()
+        options.intra_op_num_threads = self._num_threads
+        options.inter_op_num_threads = 1
+        return options
+
+
+def load_default_model(num_threads: Optional[int] = None) -> Callable[[List[str]], Any]:
+    """
+    Load Chroma's default all-MiniLM-L6-v2 ONNX model.
+
+    Args:
+        num_threads: The number of CPU threads used for inference. Defaults to onnxruntime's choice.
+
+    Returns:
+        A callable embedding a list of texts.
+    """
+    from chromadb.utils.embedding_functions.onnx_mini_lm_l6_v2 import ONNXMiniLM_L6_V2
+
+    model = ONNXMiniLM_L6_V2()
+    if num_threads:
+        model.ort = _ThreadLimitedOrt(model.ort, num_threads)
+    return model
+
+
+class ManagedEmbeddingFunction(EmbeddingFunction[Documents]):
+    """
+    Embedding function managing the lifecycle of a single embedding model.
+
+    The model is loaded on first use rather than at import time, and one
+    instance is reused for every call. Embeddings are kept in a bounded LRU
+    cache keyed by text. Concurrent requests are coalesced: whichever caller
+    runs inference embeds every pending text in one batch, and callers that
+    arrive meanwhile find their results ready once it finishes.
+    """
+
+    def __init__(self, cache_size: int = 4096, num_threads: Optional[int] = None,
+                 model_factory: Optional[Callable[[], Callable[[List[str]], Any]]] = None):
+        """
+        Initialize the ManagedEmbeddingFunction.
+
+        Args:
+            cache_size: The maximum number of text embeddings kept in memory.
+            num_threads: The number of CPU threads used for inference.
+            model_factory: A callable returning the model. Defaults to Chroma's default ONNX model.
+        """
+        self.cache_size = cache_size
+        self.num_threads = num_threads
+        self._model_factory = model_factory or (lambda: load_default_model(self.num_threads))
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._inference_lock = threading.Lock()
+        self._cache_lock = threading.Lock()
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._pending: SimpleQueue = SimpleQueue()
+        self.stats = {"hits": 0, "misses": 0, "batches": 0, "embedded": 0}
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the model has been loaded."""
+        return self._model is not None
+
+    def _get_model(self):
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    self._model = self._model_factory()
+        return self._model
+
+    def _cache_get(self, text: str) -> Optional[np.ndarray]:
+        with self._cache_lock:
+            embedding = self._cache.get(text)
+            if embedding is not None:
+                self._cache.move_to_end(text)
+            return embedding
+
+    def _cache_put(self, text: str, embedding: np.ndarray):
+        with self._cache_lock:
+            self._cache[text] = embedding
+            self._cache.move_to_end(text)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _run_pending(self):
+        """Embed every pending request in a single inference call."""
+        requests = []
+        while True:
+            try:
+                requests.append(self._pending.get_nowait())
+            except Empty:
+                break
+        if not requests:
+            return
+
+        texts = list(dict.fromkeys(text for request_texts, _ in requests for text in request_texts))
+        try:
+            embeddings = self._get_model()(texts)
+        except Exception as e:
+            for _, future in requests:
+                future.set_exception(e)
+            return
+
+        by_text = {text: np.asarray(embedding, dtype=np.float32) for text, embedding in zip(texts, embeddings)}
+        for text, embedding in by_text.items():
+            self._cache_put(text, embedding)
+        self.stats["batches"] += 1
+        self.stats["embedded"] += len(texts)
+        for request_texts, future in requests:
+            future.set_result({text: by_text[text] for text in request_texts})
+
+    def _embed_misses(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        future: Future = Future()
+        self._pending.put((texts, future))
+        with self._inference_lock:
+            if not future.done():
+                self._run_pending()
+        return future.result()
+
+    def __call__(self, input: Documents) -> Embeddings:
+        """Embed the given documents, serving repeated texts from the cache."""
+        results: Dict[str, np.ndarray] = {}
+        misses = []
+        for text in input:
+            if text in results:
+                continue
+            embedding = self._cache_get(text)
+            if embedding is None:
+                misses.append(text)
+            else:
+                results[text] = embedding
+        self.stats["hits"] += len(results)
+        self.stats["misses"] += len(misses)
+
+        if misses:
+            results.update(self._embed_misses(misses))
+        return [results[text] for text in input]
+
+    @staticmethod
+    def name() -> str:
+        # Same name and config as Chroma's default function, so existing collections stay compatible.
+        return "default"
+
+    def get_config(self) -> Dict[str, Any]:
+        return {}
+
+    @staticmethod
+    def build_from_config(config: Dict[str, Any]) -> "ManagedEmbeddingFunction":
+        return ManagedEmbeddingFunction()
+
+    def default_space(self) -> str:
+        return "cosine"
+
+    def max_tokens(self) -> int:
+        return 256
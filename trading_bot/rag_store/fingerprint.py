@@ -0,0 +1,158 @@
+import hashlib
+import re
+import unicodedata
+from typing import Dict, List, Set, Tuple
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4
+_BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+# Letters and digits of any script.
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize a news title for fingerprinting.
+
+    Lowercases, strips accents and punctuation, and collapses whitespace so
+    that re-scrapes differing only in formatting produce the same text.
+    Words in other scripts than Latin are kept, so non-English titles do
+    not all normalize to the same text.
+    """
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return " ".join(_TOKEN_RE.findall(text))
+
+
+def compute_fingerprint(text: str) -> str:
+    """Return the exact-match fingerprint (SHA-1 hex digest) of the normalized text."""
+    return hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def compute_simhash(text: str) -> int:
+    """
+    Compute a 64-bit SimHash sketch of the normalized text.
+
+    Word unigrams and bigrams are used as features, so titles differing by a
+    word or two land within a small Hamming distance of each other.
+    """
+    tokens = normalize_text(text).split()
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not features:
+        return 0
+
+    weights = [0] * SIMHASH_BITS
+    for feature in features:
+        h = _feature_hash(feature)
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+
+    simhash = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            simhash |= 1 << bit
+    return simhash
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Return the number of differing bits between two SimHash values."""
+    return bin(a ^ b).count("1")
+
+
+def _bands(simhash: int) -> List[Tuple[int, int]]:
+    return [(band, (simhash >> (band * _BAND_BITS)) & _BAND_MASK) for band in range(SIMHASH_BANDS)]
+
+
+class FingerprintIndex:
+    """
+    In-memory index of news fingerprints, backed by SQLite.
+
+    Exact duplicates are found with a set lookup on the normalized-text hash.
+    Near-duplicates are found by splitting each SimHash into bands: any two
+    sketches within ``max_distance`` bits (where ``max_distance`` is smaller
+    than the number of bands) share at least one identical band, so only the
+    few candidates in matching buckets need a Hamming distance check.
+    """
+
+    def __init__(self, persistence=None, max_distance: int = 3):
+        """
+        Initialize the FingerprintIndex.
+
+        Args:
+            persistence: A SQLitePersistence instance used to load and store fingerprints.
+                If None, the index is kept in memory only.
+            max_distance: The maximum Hamming distance for two titles to be considered near-duplicates.
+        """
+        if max_distance >= SIMHASH_BANDS:
+            raise ValueError(f"max_distance must be smaller than {SIMHASH_BANDS}")
+        self.persistence = persistence
+        self.max_distance = max_distance
+        self._fingerprints: Set[str] = set()
+        self._buckets: Dict[Tuple[int, int], Set[int]] = {}
+        self._load()
+
+    def _load(self):
+        """Load the persisted fingerprints into memory."""
+        if self.persistence is None:
+            return
+        for fingerprint, simhash in self.persistence.get_news_fingerprints():
+            self._remember(fingerprint, simhash)
+
+    def _remember(self, fingerprint: str, simhash: int):
+        self._fingerprints.add(fingerprint)
+        for key in _bands(simhash):
+            self._buckets.setdefault(key, set()).add(simhash)
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def contains_exact(self, fingerprint: str) -> bool:
+        """Check whether an exact fingerprint is already indexed."""
+        return fingerprint in self._fingerprints
+
+    def find_near_duplicate(self, simhash: int) -> bool:
+        """Check whether a sketch within ``max_distance`` bits is already indexed."""
+        for key in _bands(simhash):
+            for candidate in self._buckets.get(key, ()):
+                if hamming_distance(simhash, candidate) <= self.max_distance:
+                    return True
+        return False
+
+    def is_duplicate(self, text: str) -> bool:
+        """
+        Check whether a text is an exact or near-exact duplicate of an indexed one.
+
+        Args:
+            text: The text (e.g. a news title) to check.
+
+        Returns:
+            True if the text is a duplicate, False otherwise.
+        """
+        if self.contains_exact(compute_fingerprint(text)):
+            return True
+        return self.find_near_duplicate(compute_simhash(text))
+
+    def add(self, text: str) -> str:
+        """
+        Index a text and persist its fingerprint.
+
+        Args:
+            text: The text (e.g. a news title) to index.
+
+        Returns:
+            The exact fingerprint of the text.
+        """
+        fingerprint = compute_fingerprint(text)
+        if fingerprint in self._fingerprints:
+            return fingerprint
+        simhash = compute_simhash(text)
+        self._remember(fingerprint, simhash)
+        if self.persistence is not None:
+            self.persistence.save_news_fingerprint(fingerprint, simhash, text)
+        return fingerprint
@@ -0,0 +1,189 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Common names for base assets, so the query matches how headlines refer to them.
+ASSET_NAMES = {
+    "BTC": "bitcoin",
+    "ETH": "ethereum",
+    "SOL": "solana",
+    "BNB": "bnb binance",
+    "XRP": "xrp ripple",
+}
+
+MarketBucket = Tuple[str, str, str, str, str]
+
+
+def _value(indicators: Dict[str, Any], key: str) -> Optional[float]:
+    """Return an indicator as a float, or None if it is missing or NaN."""
+    value = indicators.get(key)
+    if isinstance(value, dict):
+        value = value.get("hist")
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+def _primary_indicators(indicators: Dict[str, Any]) -> Dict[str, Any]:
+    """Pick the indicators of the timeframe that best describes the current regime."""
+    for timeframe in ("4h", "1h", "1d"):
+        if isinstance(indicators.get(timeframe), dict):
+            return indicators[timeframe]
+    return indicators if "rsi" in indicators else {}
+
+
+def market_state_bucket(symbol: str, indicators: Dict[str, Any], ticker: Optional[Dict[str, Any]] = None) -> MarketBucket:
+    """
+    Reduce the current market state to a coarse, hashable bucket.
+
+    Args:
+        symbol: The trading symbol (e.g., 'BTC/USDT').
+        indicators: The indicators, either flat or keyed by timeframe.
+        ticker: The current ticker, used to normalize ATR into a volatility level.
+
+    Returns:
+        A (symbol, trend, rsi zone, momentum, volatility) tuple.
+    """
+    primary = _primary_indicators(indicators or {})
+
+    ema, sma = _value(primary, "ema"), _value(primary, "sma")
+    trend = "sideways" if ema is None or sma is None else ("uptrend" if ema >= sma else "downtrend")
+
+    rsi = _value(primary, "rsi")
+    if rsi is None:
+        rsi_zone = "neutral"
+    elif rsi < 30:
+        rsi_zone = "oversold"
+    elif rsi > 70:
+        rsi_zone = "overbought"
+    else:
+        rsi_zone = "neutral"
+
+    hist = _value(primary, "macd")
+    momentum = "flat" if not hist else ("bullish" if hist > 0 else "bearish")
+
+    atr = _value(primary, "atr")
+    price = _value(ticker, "last") if isinstance(ticker, dict) else None
+    volatility = "high" if atr and price and atr / price > 0.02 else "low"
+
+    return (symbol, trend, rsi_zone, momentum, volatility)
+
+
+def build_market_query(bucket: MarketBucket) -> str:
+    """Turn a market state bucket into a natural-language retrieval query."""
+    symbol, trend, rsi_zone, momentum, volatility = bucket
+    base = symbol.split("/")[0]
+    asset = ASSET_NAMES.get(base, base.lower())
+    return (
+        f"{asset} {base} price {trend} {rsi_zone} {momentum} momentum "
+        f"{volatility} volatility crypto market news"
+    )
+
+
+class NewsRetriever:
+    """
+    Ranks stored news by semantic relevance to the market state and recency.
+
+    The score of an article is a weighted sum of its cosine similarity to a
+    query describing the market state and an exponential recency decay. The
+    candidates are the query's nearest neighbours plus the latest articles
+    of the recency index, so breaking news with a low similarity can still
+    rank first. Query embeddings are cached per market state bucket, and
+    candidate results are cached until the news store changes, so repeated
+    cycles in the same regime neither re-embed the query nor re-query the
+    collection. The caches are shared by the symbols retrieving concurrently.
+    """
+
+    def __init__(self, service, half_life_hours: float = 12.0, similarity_weight: float = 0.7,
+                 candidates: int = 25, recent_candidates: int = 10, max_cached_buckets: int = 64):
+        """
+        Initialize the NewsRetriever.
+
+        Args:
+            service: The ChromaDBService to retrieve news from.
+            half_life_hours: The age at which the recency score of an article halves.
+            similarity_weight: The weight of semantic similarity (recency gets the remainder).
+            candidates: The number of nearest neighbours fetched before re-ranking.
+            recent_candidates: The number of latest articles added to the nearest neighbours.
+            max_cached_buckets: The maximum number of market state buckets kept in the cache.
+        """
+        self.service = service
+        self.half_life_seconds = half_life_hours * 3600
+        self.similarity_weight = similarity_weight
+        self.candidates = candidates
+        self.recent_candidates = recent_candidates
+        self.max_cached_buckets = max_cached_buckets
+        self._embeddings: "OrderedDict[MarketBucket, List[float]]" = OrderedDict()
+        self._results: Dict[MarketBucket, Tuple[int, List[Tuple[Dict, float]]]] = {}
+        self.stats = {"hits": 0, "misses": 0}
+        # Guards the caches and stats; embedding and querying run outside of it.
+        self._lock = threading.Lock()
+
+    def _get_query_embedding(self, bucket: MarketBucket) -> List[float]:
+        with self._lock:
+            if bucket in self._embeddings:
+                self._embeddings.move_to_end(bucket)
+                return self._embeddings[bucket]
+
+        embedding = self.service.embed_query(build_market_query(bucket))
+        with self._lock:
+            self._embeddings[bucket] = embedding
+            if len(self._embeddings) > self.max_cached_buckets:
+                evicted, _ = self._embeddings.popitem(last=False)
+                self._results.pop(evicted, None)
+        return embedding
+
+    def _get_candidates(self, bucket: MarketBucket) -> List[Tuple[Dict, float]]:
+        with self._lock:
+            # Read before querying, so an insert during the query leaves the result stale rather than cached.
+            version = self.service.version
+            cached = self._results.get(bucket)
+            if cached and cached[0] == version:
+                self.stats["hits"] += 1
+                return cached[1]
+            self.stats["misses"] += 1
+
+        embedding = self._get_query_embedding(bucket)
+        candidates = self.service.query_news(embedding, self.candidates)
+        seen = {metadata.get("fingerprint") for metadata, _ in candidates}
+        recent = [metadata.get("fingerprint") for metadata in self.service.get_latest_news(self.recent_candidates)]
+        candidates += self.service.score_news(embedding, [fp for fp in recent if fp and fp not in seen])
+        with self._lock:
+            self._results[bucket] = (version, candidates)
+        return candidates
+
+    def score(self, similarity: float, published_at: float, now: float) -> float:
+        """Combine semantic similarity and recency decay into a relevance score."""
+        age = max(0.0, now - published_at)
+        recency = 0.5 ** (age / self.half_life_seconds)
+        return self.similarity_weight * similarity + (1 - self.similarity_weight) * recency
+
+    def retrieve(self, symbol: str, indicators: Dict[str, Any], ticker: Optional[Dict[str, Any]] = None,
+                 k: int = 3) -> List[Dict]:
+        """
+        Get the k most relevant news articles for the current market state.
+
+        Args:
+            symbol: The trading symbol (e.g., 'BTC/USDT').
+            indicators: The indicators, either flat or keyed by timeframe.
+            ticker: The current ticker.
+            k: The number of news articles to retrieve.
+
+        Returns:
+            A list of news metadata dictionaries with an added 'relevance' score, most relevant first.
+        """
+        bucket = market_state_bucket(symbol, indicators, ticker)
+        now = time.time()
+        ranked = sorted(
+            (
+                dict(metadata, relevance=self.score(similarity, metadata.get("published_at", 0), now))
+                for metadata, similarity in self._get_candidates(bucket)
+            ),
+            key=lambda meta: meta["relevance"],
+            reverse=True
+        )
+        return ranked[:k]
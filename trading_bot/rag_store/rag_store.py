@@ -1,12 +1,23 @@
-from typing import List, Dict
+from typing import Any, Dict, List, Optional
+from trading_bot.config import config
 from trading_bot.rag_store.chromadb_service import chroma_db_service
+from trading_bot.rag_store.news_retriever import NewsRetriever
+from trading_bot.services import services
 
 class RAGStore:
     """Provides an interface to the RAG store."""
 
     def __init__(self):
         """Initialize the RAGStore."""
-        pass
+        retrieval_config = config.get_news_config().get("retrieval", {})
+        self.k = retrieval_config.get("k", 3)
+        self.retriever = NewsRetriever(
+            services.get("chroma_db_service"),
+            half_life_hours=retrieval_config.get("half_life_hours", 12.0),
+            similarity_weight=retrieval_config.get("similarity_weight", 0.7),
+            candidates=retrieval_config.get("candidates", 25),
+            recent_candidates=retrieval_config.get("recent_candidates", 10),
+        )
 
     def get_latest_news(self, k: int = 5) -> List[Dict]:
         """
@@ -20,4 +31,23 @@ class RAGStore:
         """
         return chroma_db_service.get_latest_news(k)
 
-rag_store = RAGStore()
+    def get_relevant_news(self, symbol: str, indicators: Dict[str, Any], ticker: Optional[Dict[str, Any]] = None,
+                          k: Optional[int] = None) -> List[Dict]:
+        """
+        Get the news articles most relevant to the current market state.
+
+        Articles are ranked by semantic similarity to a query derived from the
+        symbol and indicator regime, blended with recency decay.
+
+        Args:
+            symbol: The trading symbol (e.g., 'BTC/USDT').
+            indicators: The computed indicators, keyed by timeframe.
+            ticker: The current ticker.
+            k: The number of news articles to retrieve. Defaults to the configured value.
+
+        Returns:
+            A list of dictionaries containing the most relevant news articles.
+        """
+        return self.retriever.retrieve(symbol, indicators, ticker, k or self.k)
+
+rag_store = services.lazy("rag_store")
@@ -0,0 +1,141 @@
+import os
+import resource
+import time
+from typing import Any, Dict, Optional
+from trading_bot.config import config
+from trading_bot.services import services
+
+
+def _directory_size(path: str) -> int:
+    """Return the total size in bytes of the files under a directory."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _resident_memory() -> int:
+    """Return the resident set size of the process in bytes (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is in kilobytes on Linux.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class NewsRetentionManager:
+    """
+    Enforces the retention policy of the news vector store.
+
+    Articles older than the retention horizon are moved from the live Chroma
+    collection to the compact news_archive SQLite table. The HNSW index only
+    marks deleted entries, so the collection is also rebuilt periodically to
+    reclaim their memory and keep query cost proportional to the live set.
+    Fingerprints are kept, so archived articles are not ingested again.
+    """
+
+    def __init__(self, service, horizon_days: float = 30, check_interval_minutes: float = 60,
+                 compact_interval_hours: float = 24):
+        """
+        Initialize the NewsRetentionManager.
+
+        Args:
+            service: The ChromaDBService to enforce the policy on.
+            horizon_days: Articles published longer ago than this are archived.
+            check_interval_minutes: The minimum time between two retention passes.
+            compact_interval_hours: The minimum time between two collection rebuilds.
+        """
+        self.service = service
+        self.horizon_seconds = horizon_days * 86400
+        self.check_interval_seconds = check_interval_minutes * 60
+        self.compact_interval_seconds = compact_interval_hours * 3600
+        self.last_checked_at: Optional[float] = None
+        self.last_compacted_at: Optional[float] = None
+        self.deleted_since_compaction = 0
+
+    def archive_expired(self, now: Optional[float] = None) -> int:
+        """
+        Archive and delete the articles older than the retention horizon.
+
+        Returns:
+            The number of archived articles.
+        """
+        now = now or time.time()
+        cutoff = int(now - self.horizon_seconds)
+        archived = self.service.delete_news_before(cutoff, archive=self._archive)
+        self.deleted_since_compaction += archived
+        return archived
+
+    def _archive(self, metadatas):
+        """Copy expired articles to the news_archive table."""
+        self.service.persistence.save_news_archive_entries([{
+            "fingerprint": meta.get("fingerprint"),
+            "title": meta.get("title"),
+            "summary": meta.get("summary"),
+            "source": meta.get("source"),
+            "published_at": meta.get("published_at"),
+        } for meta in metadatas])
+
+    def compact(self, now: Optional[float] = None) -> int:
+        """
+        Rebuild the live collection to drop deleted entries from the HNSW index.
+
+        Returns:
+            The number of articles in the rebuilt collection.
+        """
+        live = self.service.rebuild_collection()
+        self.last_compacted_at = now or time.time()
+        self.deleted_since_compaction = 0
+        return live
+
+    def maybe_run(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Run the retention pass and compaction if their intervals have elapsed.
+        Cheap to call every cycle.
+
+        Returns:
+            A dictionary with the number of 'archived' articles and 'compacted' (live) articles.
+        """
+        now = now or time.time()
+        result = {"archived": 0, "compacted": 0}
+
+        if self.last_checked_at is None or now - self.last_checked_at >= self.check_interval_seconds:
+            self.last_checked_at = now
+            result["archived"] = self.archive_expired(now)
+
+        if self.last_compacted_at is None:
+            # Do not rebuild on startup; start the compaction clock instead.
+            self.last_compacted_at = now
+        elif self.deleted_since_compaction and now - self.last_compacted_at >= self.compact_interval_seconds:
+            result["compacted"] = self.compact(now)
+
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get memory and disk gauges for the news store."""
+        return {
+            "live_articles": self.service.collection.count(),
+            "archived_articles": self.service.persistence.count_news_archive_entries(),
+            "deleted_since_compaction": self.deleted_since_compaction,
+            "vector_store_disk_bytes": _directory_size(self.service.path),
+            "process_resident_bytes": _resident_memory(),
+            "last_checked_at": self.last_checked_at,
+            "last_compacted_at": self.last_compacted_at,
+        }
+
+def create_news_retention() -> NewsRetentionManager:
+    """Create the shared retention manager of the news store, configured from the rag_store section."""
+    retention_config = config.get_rag_store_config().get("retention", {})
+    return NewsRetentionManager(
+        services.get("chroma_db_service"),
+        horizon_days=retention_config.get("horizon_days", 30),
+        check_interval_minutes=retention_config.get("check_interval_minutes", 60),
+        compact_interval_hours=retention_config.get("compact_interval_hours", 24),
+    )
+
+news_retention = services.lazy("news_retention")
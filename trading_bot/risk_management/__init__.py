@@ -1,2 +1,7 @@
 # trading_bot/risk_management/__init__.py
-from .risk_manager import RiskManager
+from trading_bot.services import lazy_exports
+
+__all__ = ['RiskManager']
+__getattr__ = lazy_exports(__name__, {
+    "RiskManager": ".risk_manager",
+})
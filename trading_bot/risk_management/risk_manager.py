@@ -1,52 +1,280 @@
+import threading
+import time
+import numpy as np
+from dataclasses import dataclass
 from trading_bot.config import config
 from trading_bot.models.decision import Decision
 from trading_bot.market_data.market_data_manager import MarketDataManager
-from typing import Tuple
+from typing import Dict, Optional, Tuple
+
+SIDES = {"BUY": 1, "SELL": -1}
+
+
+@dataclass
+class MarketSnapshot:
+    """The market state of a symbol for one cycle, as already fetched by the orchestrator."""
+    symbol: str
+    price: float
+    atr: Optional[float] = None
+    timestamp: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class RiskLimits:
+    """Risk limits, resolved once from the risk_management config section."""
+    max_position_size: float = 0.1
+    per_trade_risk_cap: float = 0.01
+    max_drawdown: float = 0.1
+    max_exposure: float = 1.0
+    atr_multiplier: float = 2.0
+    cooldown_seconds: float = 0.0
+
+    @classmethod
+    def from_config(cls, risk_config: Dict) -> "RiskLimits":
+        return cls(
+            max_position_size=risk_config.get("max_position_size", 0.1),
+            per_trade_risk_cap=risk_config.get("per_trade_risk_cap", 0.01),
+            max_drawdown=risk_config.get("max_drawdown", 0.1),
+            max_exposure=risk_config.get("max_exposure", 1.0),
+            atr_multiplier=risk_config.get("atr_multiplier", 2.0),
+            cooldown_seconds=risk_config.get("cooldown_minutes", 0) * 60,
+        )
+
 
 class RiskManager:
-    """Enforces risk management rules."""
+    """
+    Enforces risk management rules.
+
+    Decisions are checked against the cycle's market snapshot and the live
+    position ledger, both already in memory, so validation makes no exchange
+    calls. The rules, in order:
+
+    - Trades that only reduce an open position are always allowed.
+    - No new risk while the drawdown from the equity high-water mark is at max_drawdown.
+    - No new risk on a symbol within cooldown_minutes of its last trade.
+    - The position in a symbol is capped at max_position_size of equity.
+    - The gross exposure over all symbols is capped at max_exposure of equity.
+    - The loss at the stop (the decision's stop-loss, or atr_multiplier ATRs
+      away) is capped at per_trade_risk_cap of equity. Without either, the
+      trade's notional value is capped at per_trade_risk_cap of equity.
+
+    Symbols are executed concurrently, so reserve_decision validates a
+    decision and reserves its size and exposure under a lock until its entry
+    order ends: a decision validated meanwhile counts the pending ones as
+    held, and concurrent entries cannot breach the limits together.
+
+    evaluate_arrays applies the same rules to NumPy arrays, for backtests.
+    """
 
-    def __init__(self, market_data_manager: MarketDataManager):
+    def __init__(self, market_data_manager: MarketDataManager, position_ledger=None):
         """
         Initialize the RiskManager.
         Args:
             market_data_manager: An instance of MarketDataManager.
+            position_ledger: The PositionLedger holding equity, drawdown and positions.
         """
         self.risk_config = config.get_risk_management_config()
+        self.limits = RiskLimits.from_config(self.risk_config)
         self.market_data_manager = market_data_manager
+        self.position_ledger = position_ledger
+        self.markets: Dict[str, MarketSnapshot] = {}
+        self.last_trade_at: Dict[str, float] = {}
+        # The signed size and the exposure of the validated entries whose orders have not ended.
+        self.pending_sizes: Dict[str, float] = {}
+        self.pending_exposure = 0.0
+        self._lock = threading.Lock()
+
+    def update_market(self, snapshot: MarketSnapshot):
+        """Set the market snapshot decisions on its symbol are validated against."""
+        self.markets[snapshot.symbol] = snapshot
+
+    def record_trade(self, symbol: str, timestamp: Optional[float] = None):
+        """Start the cooldown of a symbol."""
+        self.last_trade_at[symbol] = timestamp if timestamp is not None else time.time()
+
+    def reserve_decision(self, decision: Decision, balance: float) -> Tuple[bool, Decision, Optional[Dict]]:
+        """
+        Validate a decision and reserve its size and exposure, atomically with respect to other symbols.
+
+        Args:
+            decision: The trading decision to validate.
+            balance: The current account balance. Used as equity until the ledger knows it.
+
+        Returns:
+            Whether the decision is valid, the adjusted decision, and the reservation to release
+            once its entry order ended (None if it is not valid).
+        """
+        with self._lock:
+            held = self._held(decision.symbol)
+            is_valid, decision = self.validate_decision(decision, balance)
+            if not is_valid:
+                return False, decision, None
+            market = self.markets.get(decision.symbol)
+            price = decision.price or (market.price if market else self.get_current_price(decision.symbol))
+            direction = SIDES[decision.action.upper()]
+            # Only the part of the size beyond closing the opposite position opens new exposure.
+            opening = max(0.0, decision.size - max(-held * direction, 0.0))
+            reservation = {"symbol": decision.symbol, "size": decision.size * direction, "exposure": opening * price}
+            self.pending_sizes[decision.symbol] = self.pending_sizes.get(decision.symbol, 0.0) + reservation["size"]
+            self.pending_exposure += reservation["exposure"]
+            return True, decision, reservation
+
+    def _held(self, symbol: str) -> float:
+        """The signed size held of a symbol, counting the entries validated but not filled yet."""
+        held = 0.0
+        ledger = self.position_ledger
+        if ledger is not None and ledger.starting_equity is not None:
+            position = ledger.get_position(symbol)
+            held = position.size if position else 0.0
+        return held + self.pending_sizes.get(symbol, 0.0)
 
-    def validate_decision(self, decision: Decision, balance: float) -> Tuple[bool, Decision]:
+    def release(self, reservation: Optional[Dict]):
+        """Release a reservation once its entry order ended, filled into the ledger or not."""
+        if reservation is None:
+            return
+        with self._lock:
+            self.pending_sizes[reservation["symbol"]] -= reservation["size"]
+            self.pending_exposure -= reservation["exposure"]
+            reservation["size"] = reservation["exposure"] = 0.0
+
+    def validate_decision(self, decision: Decision, balance: float,
+                          current_price: Optional[float] = None) -> Tuple[bool, Decision]:
         """
         Validate and adjust a trading decision based on risk management rules.
 
         Args:
             decision: The trading decision to validate.
-            balance: The current account balance.
+            balance: The current account balance. Used as equity until the ledger knows it.
+            current_price: The latest price of the symbol, if already fetched by the caller.
 
         Returns:
             A tuple containing a boolean indicating if the decision is valid,
             and the (potentially adjusted) decision.
         """
-        max_position_size = self.risk_config.get("max_position_size", 0.1)
-        per_trade_risk_cap = self.risk_config.get("per_trade_risk_cap", 0.01)
+        limits = self.limits
+        market = self.markets.get(decision.symbol)
+        price = decision.price or current_price or (market.price if market else None)
+        if price is None:
+            price = self.get_current_price(decision.symbol)
+        direction = SIDES.get(decision.action.upper(), 0)
+        if not direction or not price:
+            decision.reason += " (Not a tradable decision)"
+            return False, decision
+
+        ledger = self.position_ledger
+        if ledger is not None and ledger.starting_equity is not None:
+            equity, drawdown, gross_exposure = ledger.equity, ledger.drawdown, ledger.gross_exposure
+        else:
+            equity, drawdown, gross_exposure = balance, 0.0, 0.0
+        # Entries validated but not filled yet count as held.
+        held = self._held(decision.symbol)
+        gross_exposure += self.pending_exposure
 
-        current_price = self.get_current_price(decision.symbol)
-        trade_value = decision.size * (decision.price or current_price)
-        max_position_value = balance * max_position_size
+        if held * direction < 0 and decision.size <= abs(held) + 1e-12:
+            return True, decision
 
-        if trade_value > max_position_value:
-            decision.size = max_position_value / (decision.price or current_price)
+        if drawdown >= limits.max_drawdown:
+            decision.reason += f" (Drawdown {drawdown:.1%} at max_drawdown)"
+            return False, decision
+
+        last_trade_at = self.last_trade_at.get(decision.symbol)
+        if last_trade_at is not None and time.time() - last_trade_at < limits.cooldown_seconds:
+            decision.reason += " (In cooldown)"
+            return False, decision
+
+        size = decision.size
+        position_room = equity * limits.max_position_size - max(held * direction, 0.0) * price
+        if size * price > position_room:
+            size = position_room / price
             decision.reason += " (Adjusted for max position size)"
 
-        if trade_value > balance * per_trade_risk_cap:
+        exposure_room = equity * limits.max_exposure - gross_exposure
+        if size * price > exposure_room:
+            size = exposure_room / price
+            decision.reason += " (Adjusted for max exposure)"
+
+        atr = market.atr if market else None
+        stop_distance = abs(price - decision.stop_loss) if decision.stop_loss else \
+            (limits.atr_multiplier * atr if atr else None)
+        risk_budget = equity * limits.per_trade_risk_cap
+        if stop_distance:
+            if size * stop_distance > risk_budget:
+                size = risk_budget / stop_distance
+                decision.reason += " (Sized to per-trade risk cap)"
+        elif size * price > risk_budget:
             decision.reason += " (Exceeds per-trade risk cap)"
             return False, decision
 
+        if size <= 0:
+            decision.reason += " (No room within risk limits)"
+            return False, decision
+
+        decision.size = size
         return True, decision
 
+    def evaluate_arrays(self, direction: np.ndarray, size: np.ndarray, price: np.ndarray, equity: np.ndarray,
+                        held: Optional[np.ndarray] = None, drawdown: Optional[np.ndarray] = None,
+                        gross_exposure: Optional[np.ndarray] = None, atr: Optional[np.ndarray] = None,
+                        stop_loss: Optional[np.ndarray] = None,
+                        seconds_since_trade: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Apply the risk rules to many bars at once.
+
+        Each argument holds one value per bar. Optional arguments default to
+        a flat book: no position, no drawdown, no exposure, no ATR, no stop
+        and no recent trade. NaN in atr or stop_loss means unknown.
+
+        Args:
+            direction: +1 for buy, -1 for sell, 0 for no trade.
+            size: The requested size in base currency.
+            price: The price.
+            equity: The account equity.
+            held: The signed position held before the trade.
+            drawdown: The drawdown from the equity high-water mark, as a fraction.
+            gross_exposure: The absolute market value of all open positions.
+            atr: The Average True Range.
+            stop_loss: The stop-loss price.
+            seconds_since_trade: The time since the last trade on the symbol.
+
+        Returns:
+            A tuple of the boolean validity mask and the adjusted sizes (0 where invalid).
+        """
+        limits = self.limits
+        zeros = np.zeros_like(price, dtype=float)
+        held = zeros if held is None else held
+        drawdown = zeros if drawdown is None else drawdown
+        gross_exposure = zeros if gross_exposure is None else gross_exposure
+        atr = np.full_like(zeros, np.nan) if atr is None else atr
+        stop_loss = np.full_like(zeros, np.nan) if stop_loss is None else stop_loss
+        seconds_since_trade = np.full_like(zeros, np.inf) if seconds_since_trade is None else seconds_since_trade
+
+        reducing = (held * direction < 0) & (size <= np.abs(held) + 1e-12)
+
+        position_room = equity * limits.max_position_size - np.maximum(held * direction, 0.0) * price
+        exposure_room = equity * limits.max_exposure - gross_exposure
+        adjusted = np.minimum(size, np.minimum(position_room, exposure_room) / price)
+
+        stop_distance = np.where(np.isnan(stop_loss) | (stop_loss == 0), limits.atr_multiplier * atr,
+                                 np.abs(price - stop_loss))
+        has_stop = np.isfinite(stop_distance) & (stop_distance > 0)
+        risk_budget = equity * limits.per_trade_risk_cap
+        with np.errstate(divide="ignore", invalid="ignore"):
+            adjusted = np.where(has_stop, np.minimum(adjusted, risk_budget / stop_distance), adjusted)
+        within_notional_cap = has_stop | (adjusted * price <= risk_budget)
+
+        valid = (direction != 0) & (price > 0) & (
+            reducing | (
+                (drawdown < limits.max_drawdown)
+                & (seconds_since_trade >= limits.cooldown_seconds)
+                & within_notional_cap
+                & (adjusted > 0)
+            )
+        )
+        return valid, np.where(valid, np.where(reducing, size, adjusted), 0.0)
+
     def get_current_price(self, symbol: str) -> float:
         """
-        Get the current price of a symbol.
+        Get the current price of a symbol. Only used when no market snapshot is available.
         """
         ticker = self.market_data_manager.get_current_quote(symbol)
         return ticker.get("last", 0.0)
@@ -0,0 +1,179 @@
+import importlib
+import threading
+from typing import Any, Callable, Dict, Optional, Union
+
+
+def _resolve_path(path: str) -> Any:
+    """Import 'package.module:attribute' (or just 'package.module') and return the object."""
+    module_name, _, attribute = path.partition(":")
+    target = importlib.import_module(module_name)
+    return getattr(target, attribute) if attribute else target
+
+
+class LazyImport:
+    """
+    A module, or an attribute of a module, imported on first use.
+
+    Stands in for a module-level import of a heavy dependency (an LLM
+    provider SDK, ccxt, a class whose module pulls them in) so that
+    importing the module holding it stays cheap. Attribute access and calls
+    are forwarded to the imported object.
+    """
+
+    __slots__ = ("_path", "_target")
+
+    def __init__(self, path: str):
+        object.__setattr__(self, "_path", path)
+        object.__setattr__(self, "_target", None)
+
+    def _resolve(self) -> Any:
+        target = self._target
+        if target is None:
+            target = _resolve_path(self._path)
+            object.__setattr__(self, "_target", target)
+        return target
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resolve(), name)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self._resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._target is not None else "not loaded"
+        return f"<lazy import {self._path} ({state})>"
+
+
+def lazy_import(module: str, attribute: Optional[str] = None) -> LazyImport:
+    """
+    Import a module, or one of its attributes, on first use.
+
+    Args:
+        module: The module name, e.g. 'google.generativeai'.
+        attribute: The attribute of the module, e.g. a class name.
+
+    Returns:
+        A proxy forwarding attribute access and calls to the imported object.
+    """
+    return LazyImport(f"{module}:{attribute}" if attribute else module)
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Callable[[str], Any]:
+    """
+    Build a package's module-level __getattr__ that imports its re-exported names on first access.
+
+    The packages re-export their submodules' names this way, so importing
+    one submodule does not import its siblings and their dependencies,
+    e.g. the bot does not load the LLM stub server's.
+
+    Args:
+        package: The package's __name__.
+        exports: Maps each exported name to the submodule defining it, e.g. {"ExecutionManager": ".execution_manager"}.
+    """
+    def __getattr__(name: str) -> Any:
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        return getattr(importlib.import_module(module, package), name)
+    return __getattr__
+
+
+class LazyService:
+    """A module-level handle to a container service, constructed on first attribute access."""
+
+    __slots__ = ("_container", "_name")
+
+    def __init__(self, container: "ServiceContainer", name: str):
+        object.__setattr__(self, "_container", container)
+        object.__setattr__(self, "_name", name)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._container.get(self._name), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._container.get(self._name), name, value)
+
+    def __repr__(self) -> str:
+        return f"<lazy service {self._name}>"
+
+
+class ServiceContainer:
+    """
+    Builds the bot's shared components on first use instead of at import time.
+
+    Each service is registered with a factory, given either as a callable or
+    as a 'module:attribute' path so that registering it imports nothing.
+    get() constructs a service once, thread-safely, and returns the same
+    instance afterwards; lazy() returns a handle that can be bound to a
+    module-level name and defers even that until an attribute is used.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Union[str, Callable[[], Any]]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Union[str, Callable[[], Any]]):
+        """
+        Register the factory of a service, replacing any previous one.
+
+        Args:
+            name: The service name.
+            factory: A callable returning the service, or the 'module:attribute' path of one.
+        """
+        with self._lock:
+            self._factories[name] = factory
+
+    def get(self, name: str) -> Any:
+        """Get a service, constructing it on first use."""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                factory = self._factories.get(name)
+                if factory is None:
+                    raise KeyError(f"Unknown service {name}")
+                if isinstance(factory, str):
+                    factory = _resolve_path(factory)
+                instance = self._instances[name] = factory()
+            return instance
+
+    def lazy(self, name: str) -> LazyService:
+        """Get a handle to a service that constructs it on first attribute access."""
+        return LazyService(self, name)
+
+    def override(self, name: str, instance: Any):
+        """Use an existing instance for a service, e.g. a fake in tests or tools."""
+        with self._lock:
+            self._instances[name] = instance
+
+    def is_loaded(self, name: str) -> bool:
+        """Whether a service has been constructed."""
+        return name in self._instances
+
+    def reset(self, name: Optional[str] = None):
+        """Forget a constructed service (or all of them), so the next use builds a new one."""
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+            else:
+                self._instances.pop(name, None)
+
+
+services = ServiceContainer()
+services.register("persistence", "trading_bot.persistence.sqlite_persistence:SQLitePersistence")
+services.register("exchange_registry", "trading_bot.exchange.exchange_registry:create_exchange_registry")
+services.register("position_ledger", "trading_bot.portfolio.position_ledger:create_position_ledger")
+services.register("candle_store", "trading_bot.market_data.candle_store:create_candle_store")
+services.register("indicators_engine", "trading_bot.indicators.indicators_engine:IndicatorsEngine")
+services.register("chroma_db_service", "trading_bot.rag_store.chromadb_service:ChromaDBService")
+services.register("rag_store", "trading_bot.rag_store.rag_store:RAGStore")
+services.register("news_retention", "trading_bot.rag_store.retention:create_news_retention")
+services.register("news_ingestor", "trading_bot.news.news_ingestor:NewsIngestor")
+services.register("news_analyzer", "trading_bot.news.news_analyzer:NewsAnalyzer")
+services.register("llm_decision_engine", "trading_bot.decision_engine.llm_decision_engine:LLMDecisionEngine")
+services.register("llm_budget", "trading_bot.decision_engine.llm_budget:create_llm_budget")
+services.register("decision_engine", "trading_bot.decision_engine.rule_based_decision_engine:create_decision_engine")
+services.register("cycle_journal", "trading_bot.journal.cycle_journal:create_cycle_journal")